@@ -0,0 +1,62 @@
+"""
+Benchmark for the dashboard route with each task repository. Running it with
+the in-memory repository isolates the routing and template overhead from the
+SQLite cost.
+
+Run with `python benchmarks/bench_dashboard_route.py [tasks] [requests]`.
+"""
+
+from datetime import date
+from pathlib import Path
+
+import sys
+import time
+
+BASE_DIR = Path(__file__).parent.parent
+if str(BASE_DIR) not in sys.path:
+    sys.path.append(str(BASE_DIR))
+
+from src.config import TestConfig  # noqa: E402
+from src.web.app import bcrypt, create_app  # noqa: E402
+
+
+def run(task_repository: str, tasks: int, requests: int) -> float:
+    config = type(
+        "BenchConfig", (TestConfig,), {"TASK_REPOSITORY": task_repository}
+    )
+    app = create_app(config)
+
+    from src.infra.db import create_test_admin, init_db
+
+    with app.app_context():
+        init_db()
+        create_test_admin(bcrypt, "admin", "admin@admin.com", "test123")
+        client = app.test_client()
+        client.post(
+            "/login", data={"username": "admin", "password": "test123"}
+        )
+        user = app.extensions["user_repo"].find_by_username("admin")
+        repo = app.extensions["task_repo"]
+        for i in range(tasks):
+            repo.create(
+                f"Task {i}", "x" * 200, str(date.today()), "To Do", user.id
+            )
+
+        client.get("/dashboard")
+        start = time.perf_counter()
+        for _ in range(requests):
+            client.get("/dashboard")
+        return (time.perf_counter() - start) / requests
+
+
+def main() -> None:
+    tasks = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+    requests = int(sys.argv[2]) if len(sys.argv) > 2 else 50
+    print(f"GET /dashboard with {tasks} tasks, {requests} requests")
+    for name in ("sql", "memory"):
+        per_request = run(name, tasks, requests)
+        print(f"{name:<8} {per_request * 1000:8.2f} ms/request")
+
+
+if __name__ == "__main__":
+    main()
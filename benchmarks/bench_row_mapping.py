@@ -0,0 +1,116 @@
+"""
+Benchmark for mapping task rows to domain objects. Compares the previous
+`sqlite3.Row` key lookups into a `__dict__`-backed class with the slotted
+`Task` built directly by `task_row_factory`.
+
+Run with `python benchmarks/bench_row_mapping.py [rows]`.
+"""
+
+from pathlib import Path
+
+import sqlite3
+import sys
+import time
+import tracemalloc
+
+BASE_DIR = Path(__file__).parent.parent
+if str(BASE_DIR) not in sys.path:
+    sys.path.append(str(BASE_DIR))
+
+from src.infra.repositories.row_mappers import (  # noqa: E402
+    TASK_COLUMNS,
+    query_tasks,
+)
+
+
+class DictTask:
+    """The pre-`__slots__` Task layout, kept here as the baseline."""
+
+    def __init__(self, id, title, description, due_date, status, user_id):
+        self.id = id
+        self.title = title
+        self.description = description
+        self.due_date = due_date
+        self.status = status
+        self.user_id = user_id
+
+
+def make_db(rows: int) -> sqlite3.Connection:
+    conn = sqlite3.connect(":memory:")
+    conn.row_factory = sqlite3.Row
+    conn.execute(
+        """
+        CREATE TABLE tasks (
+            id INTEGER PRIMARY KEY,
+            user_id INTEGER NOT NULL,
+            title TEXT NOT NULL,
+            description TEXT,
+            due_date DATE NOT NULL,
+            status TEXT NOT NULL
+        );
+        """
+    )
+    conn.executemany(
+        "INSERT INTO tasks (user_id, title, description, due_date, status) VALUES (?, ?, ?, ?, ?)",
+        (
+            (1, f"Task {i}", "x" * 120, "2025-01-01", "To Do")
+            for i in range(rows)
+        ),
+    )
+    conn.commit()
+    return conn
+
+
+def legacy_mapping(conn: sqlite3.Connection) -> list:
+    cur = conn.execute(
+        "SELECT id, user_id, title, description, due_date, status FROM tasks"
+    )
+    tasks = []
+    for row in cur.fetchall():
+        tasks.append(
+            DictTask(
+                id=row["id"],
+                title=row["title"],
+                description=row["description"],
+                due_date=row["due_date"],
+                status=row["status"],
+                user_id=row["user_id"],
+            )
+        )
+    return tasks
+
+
+def direct_mapping(conn: sqlite3.Connection) -> list:
+    return query_tasks(conn, f"SELECT {TASK_COLUMNS} FROM tasks").fetchall()
+
+
+def measure(name: str, fn, conn: sqlite3.Connection, rows: int) -> None:
+    fn(conn)  # warm the page cache
+    start = time.perf_counter()
+    result = fn(conn)
+    elapsed = time.perf_counter() - start
+    del result
+
+    tracemalloc.start()
+    result = fn(conn)
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+
+    print(
+        f"{name:<8} {elapsed * 1000:8.1f} ms  "
+        f"{current / 1024 / 1024:7.1f} MiB  "
+        f"{current / rows:6.0f} B/row"
+    )
+
+
+def main() -> None:
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    conn = make_db(rows)
+    print(f"Mapping {rows} task rows")
+    measure("legacy", legacy_mapping, conn, rows)
+    measure("direct", direct_mapping, conn, rows)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""
+Benchmark for a cold start of the app: importing `src.web.app`, `create_app`,
+`warm_up` and the first response. Every run uses a fresh interpreter so
+nothing is cached in memory. Exits with status 1 when the median import time
+or time to first response exceeds its budget, so it can guard against
+regressions in CI.
+
+Run with `python benchmarks/bench_startup.py [--runs N] [--json]`.
+"""
+
+from pathlib import Path
+
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+
+BASE_DIR = Path(__file__).parent.parent
+
+# budgets in milliseconds, roughly three times the measured values so only
+# real regressions (e.g. a heavy import at module level) trip them
+IMPORT_BUDGET_MS = 900.0
+FIRST_RESPONSE_BUDGET_MS = 1500.0
+
+# executed in a fresh interpreter, prints the phase timings as JSON
+CHILD = """
+import json, sys, time
+start = time.perf_counter()
+from src.config import TestConfig
+from src.web.app import create_app, warm_up
+imported = time.perf_counter()
+app = create_app(TestConfig)
+created = time.perf_counter()
+warm_up(app)
+warmed = time.perf_counter()
+status = app.test_client().get("/login").status_code
+responded = time.perf_counter()
+assert status == 200, status
+print(json.dumps({
+    "import_ms": (imported - start) * 1000,
+    "create_app_ms": (created - imported) * 1000,
+    "warm_up_ms": (warmed - created) * 1000,
+    "first_response_ms": (responded - start) * 1000,
+}))
+"""
+
+
+def measure() -> dict[str, float]:
+    """Start a fresh interpreter and return its startup phase timings."""
+    result = subprocess.run(
+        [sys.executable, "-c", CHILD],
+        cwd=BASE_DIR,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--json", action="store_true")
+    args = parser.parse_args()
+
+    runs = [measure() for _ in range(args.runs)]
+    medians = {key: statistics.median(r[key] for r in runs) for key in runs[0]}
+    over_budget = (
+        medians["import_ms"] > IMPORT_BUDGET_MS
+        or medians["first_response_ms"] > FIRST_RESPONSE_BUDGET_MS
+    )
+
+    if args.json:
+        print(json.dumps({**medians, "over_budget": over_budget}))
+    else:
+        print(f"Cold start, median of {args.runs} runs")
+        for key, value in medians.items():
+            print(f"{key:<20} {value:8.1f} ms")
+        if over_budget:
+            print(
+                f"Over budget: import {IMPORT_BUDGET_MS:.0f} ms, "
+                f"first response {FIRST_RESPONSE_BUDGET_MS:.0f} ms"
+            )
+    return 1 if over_budget else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
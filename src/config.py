@@ -5,6 +5,77 @@ class Config:
 
     DATABASE = "db/app.db"
     TESTING = False
+    # "sql", "postgres" or "memory". The in-memory task store is not persisted
+    # and is meant for benchmarking route overhead or as a hot tier in front of
+    # the database
+    TASK_REPOSITORY = "sql"
+    # "sql" or "postgres". Tasks and jobs refer to their users, so Postgres
+    # users go with Postgres (or in-memory) tasks and bring the job queue along
+    USER_REPOSITORY = "sql"
+    # the Postgres repositories share a pool of POSTGRES_POOL_MIN_SIZE to
+    # POSTGRES_POOL_MAX_SIZE connections per process, a request waiting
+    # POSTGRES_POOL_TIMEOUT seconds for one gets a 503. Run `flask init-db`
+    # to create the schema. Needs `pip install "psycopg[binary,pool]"`
+    POSTGRES_DSN = "postgresql://itol@localhost:5432/itol"
+    POSTGRES_POOL_MIN_SIZE = 2
+    POSTGRES_POOL_MAX_SIZE = 20
+    POSTGRES_POOL_TIMEOUT = 5.0
+    # "sharded" keeps tasks in TASK_SHARDS database files in TASK_SHARD_DIR,
+    # placed by user. Run `flask init-db` and `flask rebalance-task-shards`
+    # after changing the number of shards
+    TASK_SHARDS = 4
+    TASK_SHARD_DIR = "db/shards"
+    # number of most recent change feed entries kept by `flask compact-task-changes`
+    TASK_CHANGES_RETAIN = 10000
+    # server-sent events: undelivered events per stream and idle heartbeat
+    EVENT_BUFFER_SIZE = 64
+    EVENT_HEARTBEAT_SECONDS = 15.0
+    # compiled templates are cached on disk, None disables the bytecode cache
+    JINJA_BYTECODE_CACHE_DIR = "db/jinja_cache"
+    # compile every template when the app is created instead of on first use
+    PRECOMPILE_TEMPLATES = True
+    # rendered task cards kept in memory, keyed by task id, owner and the
+    # rendered fields. Edits change the key, the cards of deleted tasks are
+    # discarded and stale entries age out
+    FRAGMENT_CACHE_SIZE = 4096
+    # compress HTML, JSON and CSV responses in the app, disable when a proxy
+    # in front already compresses. Smaller buffered responses are sent as is
+    COMPRESS_RESPONSES = True
+    COMPRESSION_MIN_SIZE = 1024
+    COMPRESSION_LEVEL = 6
+    # group commit: task and user writes are committed in batches of up to
+    # WRITE_BATCH_SIZE writes by one writer thread, a batch waits at most
+    # WRITE_BATCH_DELAY seconds for more writes. Not used for in-memory databases
+    WRITE_COORDINATOR = True
+    WRITE_BATCH_SIZE = 64
+    WRITE_BATCH_DELAY = 0.001
+    # the write lock is retried with jitter for WRITE_BUSY_DEADLINE seconds, in
+    # steps of WRITE_BUSY_TIMEOUT_MS. At most WRITE_MAX_CONCURRENCY writers are
+    # admitted, a writer waiting WRITE_ADMISSION_TIMEOUT seconds for a slot gets
+    # a 503 asking to retry after WRITE_RETRY_AFTER seconds, as does a busy timeout
+    WRITE_BUSY_TIMEOUT_MS = 50
+    WRITE_BUSY_DEADLINE = 2.0
+    WRITE_MAX_CONCURRENCY = 64
+    WRITE_ADMISSION_TIMEOUT = 0.5
+    WRITE_RETRY_AFTER = 1
+    # read-only GET requests read through a pool of READ_POOL_SIZE read-only
+    # connections, waiting at most READ_POOL_TIMEOUT seconds for a free one.
+    # 0 reads on the request's own connection, with writes still denied
+    READ_POOL_SIZE = 16
+    READ_POOL_TIMEOUT = 5.0
+    # seconds an idle `flask worker` waits before polling the job queue again
+    JOB_POLL_INTERVAL = 1.0
+    # background exports are written here and can be downloaded for a day
+    EXPORT_DIR = "db/exports"
+    EXPORT_TTL_SECONDS = 86400
+    # seconds the watermark of an export is moved back, so the next incremental
+    # export overlaps it. Must exceed the longest time between a write's
+    # `updated_at` stamp and its commit (lock waits up to WRITE_BUSY_DEADLINE,
+    # group commits up to WRITE_BATCH_DELAY) and the clock skew to Postgres
+    EXPORT_WATERMARK_OVERLAP = 60.0
+    # admin exports of every user's tasks: processes and users per shard
+    EXPORT_ARCHIVE_PROCESSES = 4
+    EXPORT_ARCHIVE_SHARD_SIZE = 100
 
     @classmethod
     def inject_secret(cls, secret: str):
@@ -19,3 +90,5 @@ class TestConfig(Config):
     SECRET_KEY = "replace-this-with-a-real-secret"
     TESTING = True
     DATABASE = ":memory:"
+    JINJA_BYTECODE_CACHE_DIR = None
+    PRECOMPILE_TEMPLATES = False
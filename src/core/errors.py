@@ -71,6 +71,29 @@ class InvalidPassword(ValidationError):
         self.password = password
 
 
+class UnknownJobKindError(ValidationError):
+    def __init__(self, kind: str):
+        super().__init__(f"Unknown job kind: {kind}")
+        self.kind = kind
+
+
+class UnsupportedExportFormatError(ValidationError):
+    def __init__(self, format: str, available: list[str]):
+        super().__init__(
+            f"Unsupported export format: {format}. Available formats: {', '.join(available)}."
+        )
+        self.format = format
+
+
+class ExportSinceCompactedError(ValidationError):
+    def __init__(self, since: str, compacted_at: str):
+        super().__init__(
+            f"Deletions up to {compacted_at} are no longer retained, changes since {since} cannot be exported. Export all tasks instead."
+        )
+        self.since = since
+        self.compacted_at = compacted_at
+
+
 # =============================================================================
 # Domain Errors (Business Logic violations)
 # =============================================================================
@@ -110,6 +133,14 @@ class PasswordsDoNotMatchError(ApplicationError):
         super().__init__("Passwords do not match. Please try again.")
 
 
+class JobLeaseLostError(ApplicationError):
+    def __init__(self, job_id: int):
+        super().__init__(
+            f"Lease of job {job_id} expired, another worker may run it."
+        )
+        self.job_id = job_id
+
+
 # =============================================================================
 # Authentication Errors (Identity verification)
 # =============================================================================
@@ -142,3 +173,45 @@ class UserNotAuthorizedError(AuthorizationError):
 class UserCreationError(InfrastructureError):
     def __init__(self):
         super().__init__("Error creating user. Please try again later.")
+
+
+class DatabaseBusyError(InfrastructureError):
+    message = "The database is busy. Please try again shortly."
+
+    def __init__(self, retry_after: int = 1):
+        super().__init__(self.message)
+        self.retry_after = retry_after
+
+
+class WritesOverloadedError(DatabaseBusyError):
+    message = "Too many concurrent writes. Please try again shortly."
+
+
+class ReadOnlyWriteError(InfrastructureError):
+    def __init__(self):
+        super().__init__("Writes are not allowed in a read-only request.")
+
+
+class DatabaseNotInitializedError(InfrastructureError):
+    def __init__(self, database: str):
+        super().__init__(
+            f"The database {database} has no tables yet. "
+            "Run `flask init-db` first."
+        )
+
+
+class TasksMovedError(InfrastructureError):
+    def __init__(self, user_id: int):
+        super().__init__(
+            f"The tasks of user {user_id} were moved to another database."
+        )
+        self.user_id = user_id
+
+
+class TaskIdRangeExhaustedError(InfrastructureError):
+    def __init__(self, low: int, high: int):
+        super().__init__(
+            f"No task IDs are left in the range {low} to {high} of this database."
+        )
+        self.low = low
+        self.high = high
@@ -0,0 +1,79 @@
+from typing import Any
+
+JOB_STATUSES = ("queued", "running", "succeeded", "failed")
+
+
+class Job:
+    """A unit of background work stored in the job queue.
+
+    `kind` selects the handler that runs the job, `payload` holds its
+    JSON-serializable arguments. A job is claimed by one worker at a time for
+    a limited lease, `attempts` counts the claims so far.
+    """
+
+    __slots__ = (
+        "id",
+        "kind",
+        "payload",
+        "user_id",
+        "status",
+        "attempts",
+        "max_attempts",
+        "progress",
+        "result",
+        "error",
+    )
+
+    id: int
+    kind: str
+    payload: dict[str, Any]
+    user_id: int | None
+    status: str
+    attempts: int
+    max_attempts: int
+    progress: float
+    result: dict[str, Any] | None
+    error: str | None
+
+    def __init__(
+        self,
+        id: int,
+        kind: str,
+        payload: dict[str, Any],
+        user_id: int | None = None,
+        status: str = "queued",
+        attempts: int = 0,
+        max_attempts: int = 3,
+        progress: float = 0.0,
+        result: dict[str, Any] | None = None,
+        error: str | None = None,
+    ) -> None:
+        """Initializes a Job instance.
+
+        Args:
+            id (int): Unique identifier for the job.
+            kind (str): Name of the handler that runs the job.
+            payload (dict[str, Any]): Arguments of the handler.
+            user_id (int | None): The user who requested the job, None for system jobs. Defaults to None.
+            status (str): One of `JOB_STATUSES`. Defaults to "queued".
+            attempts (int): Number of times the job has been claimed. Defaults to 0.
+            max_attempts (int): Claims allowed before the job fails for good. Defaults to 3.
+            progress (float): Fraction of the work done, between 0 and 1. Defaults to 0.0.
+            result (dict[str, Any] | None): Output of a succeeded job. Defaults to None.
+            error (str | None): Last error of the job. Defaults to None.
+        """
+        self.id = id
+        self.kind = kind
+        self.payload = payload
+        self.user_id = user_id
+        self.status = status
+        self.attempts = attempts
+        self.max_attempts = max_attempts
+        self.progress = progress
+        self.result = result
+        self.error = error
+
+    @property
+    def is_finished(self) -> bool:
+        """Whether the job succeeded or failed for good."""
+        return self.status in ("succeeded", "failed")
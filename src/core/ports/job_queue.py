@@ -0,0 +1,58 @@
+from abc import ABC, abstractmethod
+from typing import Any
+
+from src.core.job import Job
+
+
+class JobQueue(ABC):
+    default_max_attempts = 3
+    # a claimed job is invisible to other workers until its lease runs out,
+    # workers extend the lease while they make progress
+    lease_seconds = 60.0
+    # a failed attempt is retried after base * 2 ** (attempts - 1) seconds,
+    # capped at backoff_max_seconds
+    backoff_base_seconds = 5.0
+    backoff_max_seconds = 600.0
+
+    @abstractmethod
+    def enqueue(
+        self,
+        kind: str,
+        payload: dict[str, Any],
+        user_id: int | None = None,
+        max_attempts: int | None = None,
+        delay: float = 0.0,
+    ) -> Job: ...
+
+    @abstractmethod
+    def get(self, job_id: int) -> Job | None: ...
+
+    @abstractmethod
+    def claim(
+        self, worker_id: str, lease_seconds: float | None = None
+    ) -> Job | None: ...
+
+    @abstractmethod
+    def extend_lease(
+        self,
+        job_id: int,
+        worker_id: str,
+        progress: float | None = None,
+        lease_seconds: float | None = None,
+    ) -> bool: ...
+
+    @abstractmethod
+    def complete(
+        self,
+        job_id: int,
+        worker_id: str,
+        result: dict[str, Any] | None = None,
+    ) -> bool: ...
+
+    @abstractmethod
+    def fail(
+        self, job_id: int, worker_id: str, error: str, retry: bool = True
+    ) -> bool: ...
+
+    @abstractmethod
+    def purge_finished(self, older_than: float) -> int: ...
@@ -1,9 +1,12 @@
 from abc import ABC, abstractmethod
-from typing import Union
+from datetime import date
+from typing import ContextManager, Iterator, Union
 
 from src.core.errors import DomainError, InfrastructureError, ValidationError
 from src.core.result import Result
-from src.core.task import Task
+from src.core.task import Task, TaskSummary
+from src.core.task_change import TaskChange
+from src.core.task_stats import TaskStats
 
 RepositoryError = Union[DomainError, ValidationError, InfrastructureError]
 
@@ -11,6 +14,11 @@ RepositoryError = Union[DomainError, ValidationError, InfrastructureError]
 class TaskRepository(ABC):
     max_title_length = 100
     max_description_length = 500
+    summary_preview_length = 100
+    iter_batch_size = 500
+    change_batch_size = 500
+    # accepted values of the `sort` argument of the search methods
+    sort_keys = ("due_date", "title", "status")
 
     @abstractmethod
     def get_by_id(self, task_id: int) -> Task | None: ...
@@ -21,6 +29,30 @@ class TaskRepository(ABC):
     @abstractmethod
     def list_by_user(self, user_id: int) -> list[Task]: ...
 
+    @abstractmethod
+    def iter_all(self, batch_size: int | None = None) -> Iterator[Task]: ...
+
+    @abstractmethod
+    def iter_by_user(
+        self, user_id: int, batch_size: int | None = None
+    ) -> Iterator[Task]: ...
+
+    @abstractmethod
+    def iter_changed_since(
+        self, user_id: int, since: str, batch_size: int | None = None
+    ) -> Iterator[Task]: ...
+
+    @abstractmethod
+    def deleted_since(
+        self, user_id: int, since: str
+    ) -> list[tuple[int, str]]: ...
+
+    @abstractmethod
+    def compacted_at(self) -> str | None: ...
+
+    @abstractmethod
+    def snapshot(self) -> ContextManager[None]: ...
+
     @abstractmethod
     def create(
         self,
@@ -51,4 +83,54 @@ class TaskRepository(ABC):
         user_id: int,
         title: str | None = None,
         description: str | None = None,
+        status: str | None = None,
+        open_only: bool = False,
+        due_from: date | None = None,
+        due_to: date | None = None,
+        sort: str | None = None,
+        limit: int | None = None,
+        offset: int = 0,
     ) -> list[Task]: ...
+
+    @abstractmethod
+    def list_all_summaries(self) -> list[TaskSummary]: ...
+
+    @abstractmethod
+    def list_summaries_by_user(self, user_id: int) -> list[TaskSummary]: ...
+
+    @abstractmethod
+    def search_summaries(
+        self,
+        user_id: int,
+        title: str | None = None,
+        description: str | None = None,
+        status: str | None = None,
+        open_only: bool = False,
+        due_from: date | None = None,
+        due_to: date | None = None,
+        sort: str | None = None,
+        limit: int | None = None,
+        offset: int = 0,
+    ) -> list[TaskSummary]: ...
+
+    @abstractmethod
+    def get_stats(self, user_id: int, today: date) -> TaskStats: ...
+
+    @abstractmethod
+    def rebuild_stats(self) -> None: ...
+
+    @abstractmethod
+    def changes_since(
+        self, user_id: int, since: int, limit: int | None = None
+    ) -> list[TaskChange]: ...
+
+    @abstractmethod
+    def change_feed_bounds(
+        self, user_id: int | None = None
+    ) -> tuple[int, int]: ...
+
+    @abstractmethod
+    def compact_changes(self, before_seq: int) -> int: ...
+
+    @abstractmethod
+    def compact_changes_retaining(self, retain: int) -> int: ...
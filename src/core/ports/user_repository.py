@@ -1,5 +1,5 @@
 from abc import ABC, abstractmethod
-from typing import Union
+from typing import Iterator, Union
 
 from src.core.errors import DomainError, InfrastructureError, ValidationError
 from src.core.result import Result
@@ -10,6 +10,7 @@ RepositoryError = Union[DomainError, ValidationError, InfrastructureError]
 
 class UserRepository(ABC):
     min_password_length: int = 8
+    iter_batch_size: int = 500
 
     @abstractmethod
     def find_by_username(self, username: str) -> User | None: ...
@@ -31,6 +32,9 @@ class UserRepository(ABC):
     @abstractmethod
     def list_all(self) -> list[User]: ...
 
+    @abstractmethod
+    def iter_all(self, batch_size: int | None = None) -> Iterator[User]: ...
+
     @abstractmethod
     def register(
         self, username: str, email: str, password: str
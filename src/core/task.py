@@ -5,12 +5,27 @@ from src.core.result import Result
 
 
 class Task:
+    __slots__ = (
+        "id",
+        "title",
+        "description",
+        "due_date",
+        "status",
+        "user_id",
+        "version",
+        "created_at",
+        "updated_at",
+    )
+
     id: int
     title: str
     description: str
     due_date: str
     status: str
     user_id: int
+    version: int
+    created_at: str | None
+    updated_at: str | None
 
     def __init__(
         self,
@@ -20,6 +35,9 @@ class Task:
         due_date: str,
         status: str,
         user_id: int,
+        version: int = 1,
+        created_at: str | None = None,
+        updated_at: str | None = None,
     ) -> None:
         """Initializes a Task instance. Does not validate the parameters.
 
@@ -30,6 +48,9 @@ class Task:
             due_date (str): The due date of the task.
             status (str): The status of the task.
             user_id (int): The ID of the user who created the task.
+            version (int): Incremented on every update of the task. Defaults to 1.
+            created_at (str | None): When the task was stored, see `src.core.timestamp`. Defaults to None for unsaved tasks.
+            updated_at (str | None): When the task was last written. Defaults to None for unsaved tasks.
         """
         self.id = id
         self.title = title
@@ -37,6 +58,9 @@ class Task:
         self.due_date = due_date
         self.status = status
         self.user_id = user_id
+        self.version = version
+        self.created_at = created_at
+        self.updated_at = updated_at
 
     @classmethod
     def create(
@@ -141,3 +165,63 @@ class Task:
             return True
         except ValueError:
             return False
+
+
+class TaskSummary:
+    """Lightweight projection of a Task used by listings.
+
+    Only carries a bounded preview of the description, the full Task is loaded
+    on demand (e.g. when a task is opened for editing).
+    """
+
+    __slots__ = (
+        "id",
+        "title",
+        "due_date",
+        "status",
+        "user_id",
+        "preview",
+        "truncated",
+        "version",
+    )
+
+    id: int
+    title: str
+    due_date: str
+    status: str
+    user_id: int
+    preview: str
+    truncated: bool
+    version: int
+
+    def __init__(
+        self,
+        id: int,
+        title: str,
+        due_date: str,
+        status: str,
+        user_id: int,
+        preview: str = "",
+        truncated: bool = False,
+        version: int = 1,
+    ) -> None:
+        """Initializes a TaskSummary instance. Does not validate the parameters.
+
+        Args:
+            id (int): Unique identifier for the task.
+            title (str): The title of the task.
+            due_date (str): The due date of the task.
+            status (str): The status of the task.
+            user_id (int): The ID of the user who created the task.
+            preview (str): The leading part of the description. Defaults to "".
+            truncated (bool): Whether the description is longer than the preview. Defaults to False.
+            version (int): The version of the task, see `Task.version`. Defaults to 1.
+        """
+        self.id = id
+        self.title = title
+        self.due_date = due_date
+        self.status = status
+        self.user_id = user_id
+        self.preview = preview
+        self.truncated = truncated
+        self.version = version
@@ -0,0 +1,33 @@
+from src.core.task import Task
+
+
+class TaskChange:
+    """Latest entry of the task change feed for one task.
+
+    `op` is "upsert" when the task was created or updated, the current state
+    of the task is carried in `task`. It is "delete" when the task was removed,
+    in which case `task` is None.
+    """
+
+    __slots__ = ("seq", "task_id", "op", "task")
+
+    seq: int
+    task_id: int
+    op: str
+    task: Task | None
+
+    def __init__(
+        self, seq: int, task_id: int, op: str, task: Task | None = None
+    ) -> None:
+        """Initializes a TaskChange instance.
+
+        Args:
+            seq (int): Position of the change in the feed, increases with every write.
+            task_id (int): The ID of the changed task.
+            op (str): "upsert" or "delete".
+            task (Task | None): The current state of the task for upserts. Defaults to None.
+        """
+        self.seq = seq
+        self.task_id = task_id
+        self.op = op
+        self.task = task
@@ -0,0 +1,44 @@
+class TaskStats:
+    """Per-user task counts shown on the dashboard."""
+
+    __slots__ = (
+        "todo",
+        "in_progress",
+        "completed",
+        "overdue",
+        "due_this_week",
+    )
+
+    todo: int
+    in_progress: int
+    completed: int
+    overdue: int
+    due_this_week: int
+
+    def __init__(
+        self,
+        todo: int = 0,
+        in_progress: int = 0,
+        completed: int = 0,
+        overdue: int = 0,
+        due_this_week: int = 0,
+    ) -> None:
+        """Initializes a TaskStats instance.
+
+        Args:
+            todo (int): Number of tasks with status 'To Do'.
+            in_progress (int): Number of tasks with status 'In Progress'.
+            completed (int): Number of tasks with status 'Completed'.
+            overdue (int): Number of open tasks due before today.
+            due_this_week (int): Number of open tasks due from today until the end of the week (Sunday).
+        """
+        self.todo = todo
+        self.in_progress = in_progress
+        self.completed = completed
+        self.overdue = overdue
+        self.due_this_week = due_this_week
+
+    @property
+    def total(self) -> int:
+        """Total number of tasks regardless of status."""
+        return self.todo + self.in_progress + self.completed
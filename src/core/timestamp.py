@@ -0,0 +1,74 @@
+"""
+Timestamps of task changes.
+
+Changes are stamped with UTC ISO 8601 text of fixed width, e.g.
+"2030-01-02T03:04:05.678Z", the same format SQLite produces with
+`strftime('%Y-%m-%dT%H:%M:%fZ', 'now')`. Timestamps of this format compare
+chronologically as plain strings, in SQL and in Python alike.
+"""
+
+from datetime import datetime, timezone
+
+from src.core.errors import ValidationError
+from src.core.result import Result
+
+
+def format_timestamp(moment: datetime) -> str:
+    """Format a point in time as a change timestamp.
+
+    Args:
+        moment (datetime): The point in time, naive values are taken as UTC.
+
+    Returns:
+        str: The UTC timestamp with millisecond precision.
+    """
+    if moment.tzinfo is None:
+        moment = moment.replace(tzinfo=timezone.utc)
+    moment = moment.astimezone(timezone.utc)
+    return (
+        moment.strftime("%Y-%m-%dT%H:%M:%S.")
+        + f"{moment.microsecond // 1000:03d}Z"
+    )
+
+
+def now_timestamp() -> str:
+    """Return the current time as a change timestamp."""
+    return format_timestamp(datetime.now(timezone.utc))
+
+
+def parse_datetime(value: str) -> datetime:
+    """Parse ISO 8601 text into a datetime, also on Python versions whose
+    `datetime.fromisoformat` rejects a trailing "Z".
+
+    Args:
+        value (str): E.g. "2030-01-02", a change timestamp or a time with a UTC offset.
+
+    Returns:
+        datetime: The point in time, naive if the value has no offset.
+
+    Raises:
+        ValueError: If the value is not an ISO 8601 date.
+    """
+    if value.endswith(("Z", "z")):
+        value = value[:-1] + "+00:00"
+    return datetime.fromisoformat(value)
+
+
+def parse_timestamp(value: str) -> Result[str, ValidationError]:
+    """Parse an ISO 8601 date or date and time into a change timestamp.
+
+    Args:
+        value (str): E.g. "2030-01-02", "2030-01-02T03:04:05Z" or with a UTC offset. Values without an offset are taken as UTC.
+
+    Returns:
+        Result[str, ValidationError]: Ok with the normalized timestamp, Err if the value is not an ISO 8601 date.
+    """
+    try:
+        moment = parse_datetime(value.strip())
+    except ValueError:
+        return Result.Err(
+            ValidationError(
+                "Timestamp must be an ISO 8601 date, e.g. 2030-01-02T03:04:05Z."
+            )
+        )
+    return Result.Ok(format_timestamp(moment))
@@ -9,6 +9,8 @@ from src.core.result import Result
 
 
 class User:
+    __slots__ = ("id", "username", "email", "pw_hash", "is_admin")
+
     id: int
     username: str
     email: str
@@ -1,39 +1,763 @@
-import sqlite3
+from contextlib import contextmanager
+from functools import wraps
+from pathlib import Path
+from typing import Any, Callable, Iterator, TypeVar
 
 from flask import current_app, g
 from flask_bcrypt import Bcrypt
 
+import logging
+import os
+import queue
+import random
+import sqlite3
+import threading
+import time
+
+from src.core.errors import (
+    DatabaseBusyError,
+    DatabaseNotInitializedError,
+    ReadOnlyWriteError,
+    WritesOverloadedError,
+)
+from src.infra.migrations import MIGRATIONS, apply_migrations
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+# guards the lazy creation of the write coordinators and read pools
+_coordinator_lock = threading.Lock()
+# milliseconds SQLite waits for a lock before raising, on the connections of requests
+_BUSY_TIMEOUT_MS = 5000
+
+# authorizer actions that change the database or its schema
+_WRITE_ACTIONS = frozenset(
+    {
+        sqlite3.SQLITE_INSERT,
+        sqlite3.SQLITE_UPDATE,
+        sqlite3.SQLITE_DELETE,
+        sqlite3.SQLITE_CREATE_INDEX,
+        sqlite3.SQLITE_CREATE_TABLE,
+        sqlite3.SQLITE_CREATE_TRIGGER,
+        sqlite3.SQLITE_CREATE_VIEW,
+        sqlite3.SQLITE_DROP_INDEX,
+        sqlite3.SQLITE_DROP_TABLE,
+        sqlite3.SQLITE_DROP_TRIGGER,
+        sqlite3.SQLITE_DROP_VIEW,
+        sqlite3.SQLITE_ALTER_TABLE,
+    }
+)
 
-def get_connection():
+
+def get_connection(database: str | None = None):
     """Get a database connection from the Flask application context.
 
+    In requests routed with `read_only` this is the request's read-only connection.
+
+    Args:
+        database (str | None): Path of another database of the app, e.g. a task shard. Defaults to `DATABASE`.
+
+    Returns:
+        sqlite3.Connection: The database connection.
+    """
+    if g.get("read_only"):
+        return get_read_connection(database)
+    return _request_connection(database)
+
+
+def _request_connection(database: str | None = None) -> sqlite3.Connection:
+    """Get the request's read-write connection to a database, opened on first use."""
+    if _is_main(database):
+        if "db" not in g:
+            g.db = _connect()
+
+        return g.db
+    connections = g.setdefault("shard_dbs", {})
+    if database not in connections:
+        connections[database] = _connect(database)
+    return connections[database]
+
+
+def _is_main(database: str | None) -> bool:
+    """Whether a database is the app's main database, `DATABASE`."""
+    return database is None or database == current_app.config["DATABASE"]
+
+
+def get_job_connection():
+    """Get the job queue's own database connection from the Flask application context.
+
+    Job bookkeeping (leases, progress) commits on this connection, so it never ends a
+    transaction that the running job holds on the main connection, e.g. a read snapshot.
+    An in-memory database cannot be shared between connections, it uses the main one.
+
     Returns:
         sqlite3.Connection: The database connection.
     """
-    if "db" not in g:
-        g.db = sqlite3.connect(
-            current_app.config["DATABASE"], check_same_thread=True
+    if current_app.config["DATABASE"] == ":memory:":
+        return get_connection()
+    if "job_db" not in g:
+        g.job_db = _connect()
+
+    return g.job_db
+
+
+def _connect(database: str | None = None) -> sqlite3.Connection:
+    """Open a connection to a database of the app, the configured one by default, with the app's pragmas.
+
+    Foreign keys are only enforced in the main database, the others (task shards) do not
+    hold the users their rows refer to.
+    """
+    if _is_main(database):
+        return _open(current_app.config["DATABASE"])
+    return _open(database, foreign_keys=False)
+
+
+def _open(
+    database: str,
+    busy_timeout: int = _BUSY_TIMEOUT_MS,
+    foreign_keys: bool = True,
+    **kwargs: Any,
+) -> sqlite3.Connection:
+    """Open a connection to a database with the app's pragmas, `kwargs` go to `sqlite3.connect`."""
+    conn = sqlite3.connect(database, check_same_thread=True, **kwargs)
+    conn.row_factory = sqlite3.Row
+    for stmt in (
+        f"PRAGMA foreign_keys = {'ON' if foreign_keys else 'OFF'}",
+        "PRAGMA journal_mode = WAL",
+        "PRAGMA synchronous = NORMAL",
+        f"PRAGMA busy_timeout = {int(busy_timeout)}",
+    ):
+        conn.execute(f"{stmt};")
+    return conn
+
+
+def _open_read_only(
+    database: str, metrics: "WriteMetrics"
+) -> sqlite3.Connection:
+    """Open a read-only connection to a database file, whose writes are denied and counted."""
+    uri = f"{Path(database).resolve().as_uri()}?mode=ro"
+    # pooled connections serve one request thread at a time, but not always the same one
+    conn = sqlite3.connect(uri, uri=True, check_same_thread=False)
+    conn.row_factory = sqlite3.Row
+    conn.execute("PRAGMA query_only = ON;")
+    conn.execute("PRAGMA busy_timeout = 5000;")
+    conn.set_authorizer(_write_denier(metrics))
+    return conn
+
+
+def _write_denier(metrics: "WriteMetrics") -> Callable[..., int]:
+    """Create an authorizer that denies writes, logging and counting each attempt."""
+
+    def authorize(action: int, arg1, arg2, database, trigger) -> int:
+        if action not in _WRITE_ACTIONS:
+            return sqlite3.SQLITE_OK
+        metrics.add("read_only_writes")
+        logger.warning(
+            "Write to %s denied on a read-only connection", arg1 or arg2
+        )
+        return sqlite3.SQLITE_DENY
+
+    return authorize
+
+
+class WriteMetrics:
+    """Counters of the write path of one process: admission of writers and waits for the write lock."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._counts = {
+            "admitted": 0,
+            "rejected": 0,
+            "in_flight": 0,
+            "busy_retries": 0,
+            "busy_timeouts": 0,
+            "lock_waits": 0,
+            "read_only_writes": 0,
+        }
+        self._waits = {"admission_wait": [0.0, 0.0], "lock_wait": [0.0, 0.0]}
+
+    def add(self, name: str, amount: int = 1) -> None:
+        """Add to a counter, e.g. "busy_retries"."""
+        with self._lock:
+            self._counts[name] += amount
+
+    def record_wait(self, name: str, seconds: float) -> None:
+        """Record a wait ("admission_wait" or "lock_wait") in its total and maximum."""
+        with self._lock:
+            wait = self._waits[name]
+            wait[0] += seconds
+            wait[1] = max(wait[1], seconds)
+
+    def snapshot(self) -> dict[str, float]:
+        """Return the counters, and the total and maximum seconds of each wait."""
+        with self._lock:
+            metrics: dict[str, float] = dict(self._counts)
+            for name, (total, longest) in self._waits.items():
+                metrics[f"{name}_seconds"] = round(total, 6)
+                metrics[f"{name}_max_seconds"] = round(longest, 6)
+            return metrics
+
+
+class AdmissionController:
+    """
+    Caps the number of concurrent writers. A writer that waits longer than `max_wait` seconds for
+    a slot is rejected with WritesOverloadedError instead of queueing behind a backlog it cannot
+    beat, so overload turns into fast 503 responses rather than slow timeouts.
+    """
+
+    def __init__(
+        self,
+        max_writers: int,
+        max_wait: float,
+        retry_after: int = 1,
+        metrics: WriteMetrics | None = None,
+    ) -> None:
+        """
+        Initialize an AdmissionController.
+
+        Args:
+            max_writers (int): Most writers admitted at the same time.
+            max_wait (float): Seconds a writer may wait for a slot.
+            retry_after (int): Seconds rejected clients are told to wait. Defaults to 1.
+            metrics (WriteMetrics | None): Receives the admissions and waits. Defaults to new metrics.
+        """
+        self.max_writers = max_writers
+        self.max_wait = max_wait
+        self.retry_after = retry_after
+        self.metrics = metrics or WriteMetrics()
+        self._slots = threading.BoundedSemaphore(max_writers)
+
+    @contextmanager
+    def admit(self) -> Iterator[None]:
+        """
+        Hold a writer slot for the block.
+
+        Raises:
+            WritesOverloadedError: If no slot became free within `max_wait` seconds.
+        """
+        started = time.monotonic()
+        admitted = self._slots.acquire(timeout=self.max_wait)
+        self.metrics.record_wait("admission_wait", time.monotonic() - started)
+        if not admitted:
+            self.metrics.add("rejected")
+            raise WritesOverloadedError(self.retry_after)
+        self.metrics.add("admitted")
+        self.metrics.add("in_flight")
+        try:
+            yield
+        finally:
+            self.metrics.add("in_flight", -1)
+            self._slots.release()
+
+
+def _is_busy(error: sqlite3.OperationalError) -> bool:
+    """Whether an error means another connection holds the lock (SQLITE_BUSY or SQLITE_LOCKED)."""
+    code = getattr(error, "sqlite_errorcode", None)
+    if code is not None:
+        # extended codes keep the primary code in the low byte
+        return code & 0xFF in (sqlite3.SQLITE_BUSY, sqlite3.SQLITE_LOCKED)
+    return "locked" in str(error) or "busy" in str(error)
+
+
+def retry_busy(
+    action: Callable[[], T],
+    deadline: float,
+    metrics: WriteMetrics | None = None,
+    retry_after: int = 1,
+    base_delay: float = 0.005,
+    max_delay: float = 0.1,
+) -> T:
+    """
+    Run an action, retrying it with jittered exponential backoff while the database is busy.
+
+    Args:
+        action (Callable[[], T]): Takes the lock, e.g. executes BEGIN IMMEDIATE. Must be safe to repeat after a busy error.
+        deadline (float): Seconds after which to give up.
+        metrics (WriteMetrics | None): Receives the retries and lock waits. Defaults to None.
+        retry_after (int): Seconds clients are told to wait after giving up. Defaults to 1.
+        base_delay (float): Backoff of the first retry in seconds. Defaults to 0.005.
+        max_delay (float): Largest backoff in seconds. Defaults to 0.1.
+
+    Returns:
+        T: The return value of `action`.
+
+    Raises:
+        DatabaseBusyError: If the database was still busy at the deadline.
+    """
+    started = time.monotonic()
+    give_up = started + deadline
+    attempt = 0
+    while True:
+        try:
+            result = action()
+        except sqlite3.OperationalError as e:
+            now = time.monotonic()
+            if not _is_busy(e):
+                raise
+            if now >= give_up:
+                if metrics is not None:
+                    metrics.add("busy_timeouts")
+                    metrics.record_wait("lock_wait", now - started)
+                logger.warning(
+                    "Database still busy after %.2fs, giving up", now - started
+                )
+                raise DatabaseBusyError(retry_after) from e
+            if metrics is not None:
+                metrics.add("busy_retries")
+            # full jitter, so retrying writers do not collide again in lockstep
+            backoff = random.uniform(
+                0, min(max_delay, base_delay * 2**attempt)
+            )
+            time.sleep(min(backoff, give_up - now))
+            attempt += 1
+            continue
+        if metrics is not None:
+            if attempt:
+                metrics.add("lock_waits")
+            metrics.record_wait("lock_wait", time.monotonic() - started)
+        return result
+
+
+class _Write:
+    """A write queued on a WriteCoordinator, with its outcome once committed."""
+
+    __slots__ = ("operation", "result", "error", "done")
+
+    def __init__(self, operation: Callable[[sqlite3.Connection], Any]):
+        self.operation = operation
+        self.result: Any = None
+        self.error: BaseException | None = None
+        self.done = threading.Event()
+
+
+class WriteCoordinator:
+    """
+    Group commit for SQLite: a single writer thread runs the writes of all request threads on its
+    own connection and commits them in batches. While one batch commits, the next queues up, so
+    concurrent writers share one commit instead of queueing on SQLite's write lock one by one.
+
+    A batch holds at most `max_batch` writes and waits at most `max_delay` seconds for more
+    writes after the first. Each write runs in its own savepoint, so a failing write is rolled
+    back alone and its exception is raised to its caller only. Callers return once the batch is
+    committed, so a write is as durable as with its own commit.
+
+    The write lock is taken with a short `busy_timeout` and retried with jitter until
+    `busy_deadline`, after which the batch fails with DatabaseBusyError.
+    """
+
+    def __init__(
+        self,
+        database: str,
+        max_batch: int = 64,
+        max_delay: float = 0.001,
+        busy_timeout: int = 50,
+        busy_deadline: float = 2.0,
+        retry_after: int = 1,
+        metrics: WriteMetrics | None = None,
+        foreign_keys: bool = True,
+    ) -> None:
+        """
+        Initialize a WriteCoordinator and start its writer thread.
+
+        Args:
+            database (str): Path of the SQLite database file.
+            max_batch (int): Most writes committed together. Defaults to 64.
+            max_delay (float): Seconds a batch waits for more writes after its first. Defaults to 0.001.
+            busy_timeout (int): Milliseconds SQLite itself waits for the write lock per attempt. Defaults to 50.
+            busy_deadline (float): Seconds to retry taking the write lock. Defaults to 2.0.
+            retry_after (int): Seconds clients are told to wait when the lock was not taken. Defaults to 1.
+            metrics (WriteMetrics | None): Receives the lock waits. Defaults to new metrics.
+            foreign_keys (bool): Whether the writer connection enforces foreign keys. Defaults to True.
+        """
+        self.database = database
+        self.foreign_keys = foreign_keys
+        self.max_batch = max_batch
+        self.max_delay = max_delay
+        self.busy_timeout = busy_timeout
+        self.busy_deadline = busy_deadline
+        self.retry_after = retry_after
+        self.metrics = metrics or WriteMetrics()
+        self.pid = os.getpid()
+        self.commits = 0
+        self.writes = 0
+        self._queue: queue.SimpleQueue[_Write | None] = queue.SimpleQueue()
+        self._thread = threading.Thread(
+            target=self._run, name="sqlite-writer", daemon=True
         )
-        g.db.row_factory = sqlite3.Row
-        for stmt in (
-            "PRAGMA foreign_keys = ON",
-            "PRAGMA journal_mode = WAL",
-            "PRAGMA synchronous = NORMAL",
-            "PRAGMA busy_timeout = 5000",
-        ):
-            g.db.execute(f"{stmt};")
+        self._thread.start()
+
+    def execute(self, operation: Callable[[sqlite3.Connection], T]) -> T:
+        """
+        Run a write on the writer connection and wait until it is committed.
 
-    return g.db
+        Args:
+            operation (Callable[[sqlite3.Connection], T]): Executes the statements of the write on the given connection. Must not commit or roll back, it runs inside the batch's transaction.
+
+        Returns:
+            T: The return value of `operation`.
+
+        Raises:
+            Exception: The exception raised by `operation`, or the error of the batch's commit.
+        """
+        write = _Write(operation)
+        self._queue.put(write)
+        write.done.wait()
+        if write.error is not None:
+            raise write.error
+        return write.result
+
+    def close(self) -> None:
+        """Commit the queued writes and stop the writer thread."""
+        self._queue.put(None)
+        self._thread.join()
+
+    def _run(self) -> None:
+        """Writer thread: collect batches of queued writes and commit them until closed."""
+        # transactions are controlled explicitly with BEGIN and COMMIT
+        conn = _open(
+            self.database,
+            busy_timeout=self.busy_timeout,
+            foreign_keys=self.foreign_keys,
+            isolation_level=None,
+        )
+        try:
+            stopping = False
+            while not stopping:
+                write = self._queue.get()
+                if write is None:
+                    break
+                batch = [write]
+                deadline = time.monotonic() + self.max_delay
+                while len(batch) < self.max_batch:
+                    try:
+                        write = self._queue.get(
+                            timeout=max(deadline - time.monotonic(), 0)
+                        )
+                    except queue.Empty:
+                        break
+                    if write is None:
+                        stopping = True
+                        break
+                    batch.append(write)
+                self._commit(conn, batch)
+        finally:
+            conn.close()
+
+    def _commit(self, conn: sqlite3.Connection, batch: list[_Write]) -> None:
+        """Run a batch of writes in one transaction and hand every caller its outcome."""
+        try:
+            retry_busy(
+                lambda: conn.execute("BEGIN IMMEDIATE"),
+                self.busy_deadline,
+                self.metrics,
+                self.retry_after,
+            )
+            for write in batch:
+                conn.execute("SAVEPOINT write")
+                try:
+                    write.result = write.operation(conn)
+                except Exception as e:
+                    conn.execute("ROLLBACK TO write")
+                    write.error = e
+                conn.execute("RELEASE write")
+            conn.execute("COMMIT")
+            self.commits += 1
+            self.writes += len(batch)
+        except (sqlite3.Error, DatabaseBusyError) as e:
+            if conn.in_transaction:
+                conn.execute("ROLLBACK")
+            for write in batch:
+                write.result, write.error = None, e
+        finally:
+            for write in batch:
+                write.done.set()
+
+
+def get_write_coordinator(
+    database: str | None = None,
+) -> WriteCoordinator | None:
+    """Get the app's WriteCoordinator of a database, created on first use in each process.
+
+    Args:
+        database (str | None): Path of another database of the app, e.g. a task shard. Defaults to `DATABASE`.
+
+    Returns:
+        WriteCoordinator | None: The coordinator, None if it is disabled with `WRITE_COORDINATOR` or the database is in memory (other connections cannot see it).
+    """
+    config = current_app.config
+    database = database or config["DATABASE"]
+    if not config["WRITE_COORDINATOR"] or database == ":memory:":
+        return None
+    coordinators = current_app.extensions.setdefault("write_coordinators", {})
+    coordinator = coordinators.get(database)
+    # a forked process does not inherit the writer thread
+    if coordinator is None or coordinator.pid != os.getpid():
+        with _coordinator_lock:
+            coordinator = coordinators.get(database)
+            if coordinator is None or coordinator.pid != os.getpid():
+                coordinator = WriteCoordinator(
+                    database,
+                    max_batch=config["WRITE_BATCH_SIZE"],
+                    max_delay=config["WRITE_BATCH_DELAY"],
+                    busy_timeout=config["WRITE_BUSY_TIMEOUT_MS"],
+                    busy_deadline=config["WRITE_BUSY_DEADLINE"],
+                    retry_after=config["WRITE_RETRY_AFTER"],
+                    metrics=current_app.extensions["write_metrics"],
+                    foreign_keys=_is_main(database),
+                )
+                coordinators[database] = coordinator
+    return coordinator
+
+
+class ReadConnectionPool:
+    """
+    Read-only connections to a database file, shared by the read-only requests of a process.
+
+    Connections are opened with a `mode=ro` URI and `query_only`, so in WAL mode their reads
+    never take the write lock and never wait for writers. At most `size` connections are in use
+    at a time, a request waiting longer than `timeout` seconds for one gets DatabaseBusyError.
+    """
+
+    def __init__(
+        self,
+        database: str,
+        size: int,
+        timeout: float = 5.0,
+        retry_after: int = 1,
+        metrics: WriteMetrics | None = None,
+    ) -> None:
+        """
+        Initialize a ReadConnectionPool, connections are opened on demand.
+
+        Args:
+            database (str): Path of the SQLite database file.
+            size (int): Most connections in use at the same time.
+            timeout (float): Seconds to wait for a free connection. Defaults to 5.0.
+            retry_after (int): Seconds clients are told to wait when none became free. Defaults to 1.
+            metrics (WriteMetrics | None): Receives the denied writes. Defaults to new metrics.
+        """
+        self.database = database
+        self.size = size
+        self.timeout = timeout
+        self.retry_after = retry_after
+        self.metrics = metrics or WriteMetrics()
+        self.pid = os.getpid()
+        self._slots = threading.BoundedSemaphore(size)
+        # most recently used first, so idle connections keep a warm page cache
+        self._idle: queue.LifoQueue[sqlite3.Connection] = queue.LifoQueue()
+
+    def acquire(self) -> sqlite3.Connection:
+        """
+        Take a connection of the pool, to be given back with `release`.
+
+        Returns:
+            sqlite3.Connection: A read-only connection.
+
+        Raises:
+            DatabaseBusyError: If no connection became free within `timeout` seconds.
+        """
+        if not self._slots.acquire(timeout=self.timeout):
+            raise DatabaseBusyError(self.retry_after)
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+        try:
+            return _open_read_only(self.database, self.metrics)
+        except BaseException:
+            self._slots.release()
+            raise
+
+    def release(self, conn: sqlite3.Connection) -> None:
+        """Give a connection back to the pool, ending its read transaction if any."""
+        try:
+            if conn.in_transaction:
+                conn.rollback()
+        except sqlite3.Error:
+            conn.close()
+        else:
+            self._idle.put(conn)
+        finally:
+            self._slots.release()
+
+    def close(self) -> None:
+        """Close the idle connections."""
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                return
+
+
+def get_read_pool(database: str | None = None) -> ReadConnectionPool | None:
+    """Get the app's ReadConnectionPool of a database, created on first use in each process.
+
+    Args:
+        database (str | None): Path of another database of the app, e.g. a task shard. Defaults to `DATABASE`.
+
+    Returns:
+        ReadConnectionPool | None: The pool, None if it is disabled with `READ_POOL_SIZE = 0` or the database is in memory (other connections cannot see it).
+    """
+    config = current_app.config
+    database = database or config["DATABASE"]
+    if not config["READ_POOL_SIZE"] or database == ":memory:":
+        return None
+    pools = current_app.extensions.setdefault("read_pools", {})
+    pool = pools.get(database)
+    # connections must not be shared with a forked process
+    if pool is None or pool.pid != os.getpid():
+        with _coordinator_lock:
+            pool = pools.get(database)
+            if pool is None or pool.pid != os.getpid():
+                pool = ReadConnectionPool(
+                    database,
+                    config["READ_POOL_SIZE"],
+                    timeout=config["READ_POOL_TIMEOUT"],
+                    retry_after=config["WRITE_RETRY_AFTER"],
+                    metrics=current_app.extensions["write_metrics"],
+                )
+                pools[database] = pool
+    return pool
+
+
+def get_read_connection(database: str | None = None) -> sqlite3.Connection:
+    """Get the request's read-only connection to a database, taken from the app's ReadConnectionPool.
+
+    Without a pool the request connection is used, with writes denied until the request ends.
+    Either way the connection is released by `release_read_connection` at the end of the request.
+
+    Args:
+        database (str | None): Path of another database of the app, e.g. a task shard. Defaults to `DATABASE`.
+
+    Returns:
+        sqlite3.Connection: The read-only connection.
+    """
+    database = database or current_app.config["DATABASE"]
+    connections = g.setdefault("read_dbs", {})
+    if database not in connections:
+        pool = get_read_pool(database)
+        if pool is not None:
+            conn = pool.acquire()
+        else:
+            conn = _request_connection(database)
+            conn.set_authorizer(
+                _write_denier(current_app.extensions["write_metrics"])
+            )
+        connections[database] = (conn, pool)
+    return connections[database][0]
+
+
+def read_only(view: Callable[..., T]) -> Callable[..., T]:
+    """Route a view's database access to a read-only connection, see `get_read_connection`.
+
+    The connection is held until the response is sent, so streamed responses read with it too.
+    Writes through it are denied and logged, writes with `run_write` raise ReadOnlyWriteError.
+    """
+
+    @wraps(view)
+    def wrapper(*args: Any, **kwargs: Any) -> T:
+        g.read_only = True
+        return view(*args, **kwargs)
+
+    return wrapper
+
+
+def release_read_connection(e=None) -> None:
+    """Give the request's read-only connection back at the end of the request.
+
+    Args:
+        e (Exception, optional): An exception that may have occurred. Defaults to None.
+    """
+    g.pop("read_only", None)
+    for conn, pool in g.pop("read_dbs", {}).values():
+        if pool is not None:
+            pool.release(conn)
+        else:
+            conn.set_authorizer(None)
+
+
+def init_write_path(app) -> None:
+    """Set up the admission control and metrics of the app's writes, see `run_write`.
+
+    Args:
+        app (Flask): The Flask application instance.
+    """
+    metrics = WriteMetrics()
+    app.extensions["write_metrics"] = metrics
+    app.extensions["write_admission"] = AdmissionController(
+        app.config["WRITE_MAX_CONCURRENCY"],
+        app.config["WRITE_ADMISSION_TIMEOUT"],
+        retry_after=app.config["WRITE_RETRY_AFTER"],
+        metrics=metrics,
+    )
+
+
+def run_write(
+    operation: Callable[[sqlite3.Connection], T], database: str | None = None
+) -> T:
+    """Run a write and commit it, through the app's WriteCoordinator when it has one.
+
+    Without a coordinator the write runs on the request connection and is committed on its own.
+    Reads after the call see the write either way. Writers are admitted by the app's
+    AdmissionController first, and a busy database is retried until `WRITE_BUSY_DEADLINE`.
+
+    Args:
+        operation (Callable[[sqlite3.Connection], T]): Executes the statements of the write on the given connection. Must not commit or roll back.
+        database (str | None): Path of another database of the app, e.g. a task shard. Defaults to `DATABASE`.
+
+    Returns:
+        T: The return value of `operation`.
+
+    Raises:
+        DatabaseBusyError: If the write lock could not be taken in time, WritesOverloadedError if too many writers were waiting already.
+        ReadOnlyWriteError: If the request was routed with `read_only`.
+    """
+    if g.get("read_only"):
+        current_app.extensions["write_metrics"].add("read_only_writes")
+        logger.warning("Write attempted in a read-only request")
+        raise ReadOnlyWriteError()
+    with current_app.extensions["write_admission"].admit():
+        coordinator = get_write_coordinator(database)
+        if coordinator is not None:
+            return coordinator.execute(operation)
+        conn = get_connection(database)
+        deadline = current_app.config["WRITE_BUSY_DEADLINE"]
+        give_up = time.monotonic() + deadline
+
+        def attempt() -> T:
+            # SQLite's own wait for the lock must not outlast the deadline
+            remaining = max(int((give_up - time.monotonic()) * 1000), 0)
+            conn.execute(f"PRAGMA busy_timeout = {remaining};")
+            try:
+                return operation(conn)
+            except BaseException:
+                conn.rollback()
+                raise
+
+        try:
+            result = retry_busy(
+                attempt,
+                deadline,
+                current_app.extensions["write_metrics"],
+                current_app.config["WRITE_RETRY_AFTER"],
+            )
+        finally:
+            conn.execute(f"PRAGMA busy_timeout = {_BUSY_TIMEOUT_MS};")
+        conn.commit()
+        return result
 
 
 def close_db(e=None):
-    """Close the database connection if it exists in the Flask application context.
+    """Close the database connections if they exist in the Flask application context.
 
     Args:
         e (Exception, optional): An exception that may have occurred. Defaults to None.
     """
-    db = g.pop("db", None)
-    if db is not None:
+    for key in ("db", "job_db"):
+        db = g.pop(key, None)
+        if db is not None:
+            db.close()
+    for db in g.pop("shard_dbs", {}).values():
         db.close()
 
 
@@ -43,16 +767,21 @@ def init_db_teardown_handler(app):
     Args:
         app (Flask): The Flask application instance.
     """
+    app.teardown_request(release_read_connection)
     app.teardown_appcontext(close_db)
 
 
-def init_db():
+def init_db(database: str | None = None):
     """
     Initialize the database by creating necessary tables. This will typically be called with the Flask CLI
     command `flask init-db`.
+
+    Args:
+        database (str | None): Path of another database of the app, e.g. a task shard, which gets the same schema. Defaults to `DATABASE`.
     """
-    conn = get_connection()
-    conn.execute("PRAGMA foreign_keys = ON;")
+    conn = get_connection(database)
+    if _is_main(database):
+        conn.execute("PRAGMA foreign_keys = ON;")
     conn.execute("PRAGMA journal_mode = WAL;")
 
     conn.execute(
@@ -83,6 +812,42 @@ def init_db():
 
     conn.commit()
 
+    apply_migrations(conn)
+    # refresh the planner statistics so partial indexes are picked up
+    conn.execute("ANALYZE;")
+
+
+def apply_pending_migrations(database: str | None = None) -> int:
+    """Apply the schema migrations added since the database was last initialized.
+
+    Called when the app starts serving, so a database initialized by an older release does not
+    fail on tables or columns that only a re-run of `flask init-db` would have created.
+
+    Args:
+        database (str | None): Path of another database of the app, e.g. a task shard. Defaults to `DATABASE`.
+
+    Returns:
+        int: The schema version.
+
+    Raises:
+        DatabaseNotInitializedError: If the database has no tables yet.
+    """
+    conn = _request_connection(database)
+    version = conn.execute("PRAGMA user_version").fetchone()[0]
+    if version >= len(MIGRATIONS):
+        return version
+    tasks = conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'tasks'"
+    ).fetchone()
+    if tasks is None:
+        raise DatabaseNotInitializedError(
+            database or current_app.config["DATABASE"]
+        )
+    logger.info(
+        "Applying schema migrations %d to %d", version + 1, len(MIGRATIONS)
+    )
+    return apply_migrations(conn)
+
 
 def create_test_admin(
     bcrypt: Bcrypt, username: str, email: str, password: str
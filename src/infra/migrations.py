@@ -0,0 +1,319 @@
+"""
+Schema migrations applied on top of the base tables created by `init_db`.
+
+Each entry of `MIGRATIONS` is a SQL script. The index of the last applied
+script is stored in `PRAGMA user_version`, so `apply_migrations` is safe to
+run repeatedly. Never edit a released migration, append a new one instead.
+"""
+
+from sqlite3 import Connection
+
+# Rebuilds the materialized task statistics from the tasks table. Shared by
+# the migration that introduces them and by `flask rebuild-task-stats`.
+REBUILD_TASK_STATS = """
+DELETE FROM task_stats;
+DELETE FROM task_due_stats;
+INSERT INTO task_stats (user_id, todo, in_progress, completed)
+    SELECT
+        user_id,
+        SUM(status = 'To Do'),
+        SUM(status = 'In Progress'),
+        SUM(status = 'Completed')
+    FROM tasks
+    GROUP BY user_id;
+INSERT INTO task_due_stats (user_id, due_date, open_count)
+    SELECT user_id, due_date, COUNT(*)
+    FROM tasks
+    WHERE status != 'Completed'
+    GROUP BY user_id, due_date;
+"""
+
+# SQL expression of the current time as a change timestamp, see
+# `src.core.timestamp`. 'now' is fixed for the duration of a statement.
+NOW_TIMESTAMP = "strftime('%Y-%m-%dT%H:%M:%fZ', 'now')"
+
+MIGRATIONS: list[str] = [
+    # 1: per-user task statistics kept exact by triggers on tasks.
+    # task_stats holds the status counts. Overdue and due-this-week depend on
+    # the current date, so open tasks are counted per due date instead and
+    # summed over a short primary key range at read time.
+    """
+    CREATE TABLE IF NOT EXISTS task_stats (
+        user_id INTEGER PRIMARY KEY,
+        todo INTEGER NOT NULL DEFAULT 0,
+        in_progress INTEGER NOT NULL DEFAULT 0,
+        completed INTEGER NOT NULL DEFAULT 0,
+        FOREIGN KEY (user_id) REFERENCES users (id) ON DELETE CASCADE
+    );
+
+    CREATE TABLE IF NOT EXISTS task_due_stats (
+        user_id INTEGER NOT NULL,
+        due_date DATE NOT NULL,
+        open_count INTEGER NOT NULL,
+        PRIMARY KEY (user_id, due_date)
+    ) WITHOUT ROWID;
+
+    CREATE TRIGGER IF NOT EXISTS tasks_stats_insert AFTER INSERT ON tasks
+    BEGIN
+        INSERT INTO task_stats (user_id) VALUES (NEW.user_id)
+            ON CONFLICT (user_id) DO NOTHING;
+        UPDATE task_stats SET
+            todo = todo + (NEW.status = 'To Do'),
+            in_progress = in_progress + (NEW.status = 'In Progress'),
+            completed = completed + (NEW.status = 'Completed')
+        WHERE user_id = NEW.user_id;
+        INSERT INTO task_due_stats (user_id, due_date, open_count)
+            SELECT NEW.user_id, NEW.due_date, 1
+            WHERE NEW.status != 'Completed'
+            ON CONFLICT (user_id, due_date)
+            DO UPDATE SET open_count = open_count + 1;
+    END;
+
+    CREATE TRIGGER IF NOT EXISTS tasks_stats_delete AFTER DELETE ON tasks
+    BEGIN
+        UPDATE task_stats SET
+            todo = todo - (OLD.status = 'To Do'),
+            in_progress = in_progress - (OLD.status = 'In Progress'),
+            completed = completed - (OLD.status = 'Completed')
+        WHERE user_id = OLD.user_id;
+        UPDATE task_due_stats SET open_count = open_count - 1
+        WHERE user_id = OLD.user_id
+            AND due_date = OLD.due_date
+            AND OLD.status != 'Completed';
+        DELETE FROM task_due_stats
+        WHERE user_id = OLD.user_id
+            AND due_date = OLD.due_date
+            AND open_count <= 0;
+    END;
+
+    CREATE TRIGGER IF NOT EXISTS tasks_stats_update
+    AFTER UPDATE OF user_id, due_date, status ON tasks
+    BEGIN
+        UPDATE task_stats SET
+            todo = todo - (OLD.status = 'To Do'),
+            in_progress = in_progress - (OLD.status = 'In Progress'),
+            completed = completed - (OLD.status = 'Completed')
+        WHERE user_id = OLD.user_id;
+        UPDATE task_due_stats SET open_count = open_count - 1
+        WHERE user_id = OLD.user_id
+            AND due_date = OLD.due_date
+            AND OLD.status != 'Completed';
+        DELETE FROM task_due_stats
+        WHERE user_id = OLD.user_id
+            AND due_date = OLD.due_date
+            AND open_count <= 0;
+
+        INSERT INTO task_stats (user_id) VALUES (NEW.user_id)
+            ON CONFLICT (user_id) DO NOTHING;
+        UPDATE task_stats SET
+            todo = todo + (NEW.status = 'To Do'),
+            in_progress = in_progress + (NEW.status = 'In Progress'),
+            completed = completed + (NEW.status = 'Completed')
+        WHERE user_id = NEW.user_id;
+        INSERT INTO task_due_stats (user_id, due_date, open_count)
+            SELECT NEW.user_id, NEW.due_date, 1
+            WHERE NEW.status != 'Completed'
+            ON CONFLICT (user_id, due_date)
+            DO UPDATE SET open_count = open_count + 1;
+    END;
+    """
+    + REBUILD_TASK_STATS,
+    # 2: integer day key for due date range queries and sorting. The virtual
+    # column is computed from due_date, so writers do not need to maintain it.
+    # It equals `date.toordinal()` of the due date. Open tasks get their own
+    # partial index so upcoming/overdue queries skip completed tasks.
+    """
+    ALTER TABLE tasks ADD COLUMN due_day INTEGER
+        GENERATED ALWAYS AS (CAST(julianday(due_date) - 1721424.5 AS INTEGER))
+        VIRTUAL;
+
+    CREATE INDEX IF NOT EXISTS idx_tasks_user_due_day
+        ON tasks (user_id, due_day);
+
+    CREATE INDEX IF NOT EXISTS idx_tasks_open_user_due_day
+        ON tasks (user_id, due_day)
+        WHERE status != 'Completed';
+    """,
+    # 3: append-only change feed for incremental client sync. AUTOINCREMENT
+    # guarantees sequence numbers are never reused, even after the newest
+    # entries are compacted away. `compacted_through` is the highest sequence
+    # number whose tombstones may have been removed, clients that synced
+    # before it have to start over.
+    """
+    CREATE TABLE IF NOT EXISTS task_changes (
+        seq INTEGER PRIMARY KEY AUTOINCREMENT,
+        task_id INTEGER NOT NULL,
+        user_id INTEGER NOT NULL,
+        op TEXT NOT NULL CHECK (op IN ('upsert', 'delete'))
+    );
+
+    CREATE INDEX IF NOT EXISTS idx_task_changes_user_seq
+        ON task_changes (user_id, seq);
+
+    CREATE INDEX IF NOT EXISTS idx_task_changes_task_seq
+        ON task_changes (task_id, seq);
+
+    CREATE TABLE IF NOT EXISTS task_change_log (
+        id INTEGER PRIMARY KEY CHECK (id = 1),
+        compacted_through INTEGER NOT NULL DEFAULT 0
+    );
+
+    INSERT INTO task_change_log (id) VALUES (1) ON CONFLICT (id) DO NOTHING;
+
+    CREATE TRIGGER IF NOT EXISTS tasks_changes_insert AFTER INSERT ON tasks
+    BEGIN
+        INSERT INTO task_changes (task_id, user_id, op)
+            VALUES (NEW.id, NEW.user_id, 'upsert');
+    END;
+
+    CREATE TRIGGER IF NOT EXISTS tasks_changes_update AFTER UPDATE ON tasks
+    BEGIN
+        INSERT INTO task_changes (task_id, user_id, op)
+            SELECT OLD.id, OLD.user_id, 'delete'
+            WHERE OLD.user_id != NEW.user_id;
+        INSERT INTO task_changes (task_id, user_id, op)
+            VALUES (NEW.id, NEW.user_id, 'upsert');
+    END;
+
+    CREATE TRIGGER IF NOT EXISTS tasks_changes_delete AFTER DELETE ON tasks
+    BEGIN
+        INSERT INTO task_changes (task_id, user_id, op)
+            VALUES (OLD.id, OLD.user_id, 'delete');
+    END;
+
+    INSERT INTO task_changes (task_id, user_id, op)
+        SELECT id, user_id, 'upsert' FROM tasks ORDER BY id;
+    """,
+    # 4: per-task version, incremented by every update. Cached task cards are
+    # keyed by the task id, owner and rendered fields (`task_card_key`) rather
+    # than the version, the cards of deleted tasks are discarded after the
+    # delete and edited ones age out of the cache.
+    """
+    ALTER TABLE tasks ADD COLUMN version INTEGER NOT NULL DEFAULT 1;
+    """,
+    # 5: durable background job queue. Times are unix timestamps. A queued job
+    # becomes claimable at run_at, a running one again once locked_until has
+    # passed without the worker extending its lease (e.g. it crashed). The
+    # partial indexes keep claiming independent of the number of finished jobs.
+    """
+    CREATE TABLE IF NOT EXISTS jobs (
+        id INTEGER PRIMARY KEY,
+        kind TEXT NOT NULL,
+        payload TEXT NOT NULL DEFAULT '{}',
+        user_id INTEGER,
+        status TEXT NOT NULL DEFAULT 'queued'
+            CHECK (status IN ('queued', 'running', 'succeeded', 'failed')),
+        attempts INTEGER NOT NULL DEFAULT 0,
+        max_attempts INTEGER NOT NULL DEFAULT 3,
+        progress REAL NOT NULL DEFAULT 0,
+        result TEXT,
+        error TEXT,
+        run_at REAL NOT NULL,
+        locked_by TEXT,
+        locked_until REAL,
+        created_at REAL NOT NULL,
+        finished_at REAL,
+        FOREIGN KEY (user_id) REFERENCES users (id) ON DELETE CASCADE
+    );
+
+    CREATE INDEX IF NOT EXISTS idx_jobs_queued_run_at
+        ON jobs (run_at) WHERE status = 'queued';
+
+    CREATE INDEX IF NOT EXISTS idx_jobs_running_locked_until
+        ON jobs (locked_until) WHERE status = 'running';
+
+    CREATE INDEX IF NOT EXISTS idx_jobs_finished_at
+        ON jobs (finished_at) WHERE finished_at IS NOT NULL;
+    """,
+    # 6: change timestamps for incremental exports. Task timestamps are set by
+    # the repository's writes, change feed entries by the triggers, which are
+    # recreated to do so. The backfill runs without the update trigger, so it
+    # does not add an upsert per task to the change feed. Existing rows get the
+    # migration time, the next incremental export includes all of them once.
+    # `compacted_at` is the newest removed tombstone's time, exports of
+    # changes since an earlier time would miss deletions.
+    f"""
+    ALTER TABLE tasks ADD COLUMN created_at TEXT;
+    ALTER TABLE tasks ADD COLUMN updated_at TEXT;
+    ALTER TABLE task_changes ADD COLUMN changed_at TEXT;
+    ALTER TABLE task_change_log ADD COLUMN compacted_at TEXT;
+
+    DROP TRIGGER IF EXISTS tasks_changes_insert;
+    DROP TRIGGER IF EXISTS tasks_changes_update;
+    DROP TRIGGER IF EXISTS tasks_changes_delete;
+
+    UPDATE tasks SET
+        created_at = {NOW_TIMESTAMP},
+        updated_at = {NOW_TIMESTAMP};
+    UPDATE task_changes SET changed_at = {NOW_TIMESTAMP};
+
+    CREATE INDEX IF NOT EXISTS idx_tasks_user_updated_at
+        ON tasks (user_id, updated_at);
+
+    CREATE INDEX IF NOT EXISTS idx_task_changes_user_deleted_at
+        ON task_changes (user_id, changed_at) WHERE op = 'delete';
+
+    CREATE TRIGGER tasks_changes_insert AFTER INSERT ON tasks
+    BEGIN
+        INSERT INTO task_changes (task_id, user_id, op, changed_at)
+            VALUES (NEW.id, NEW.user_id, 'upsert', {NOW_TIMESTAMP});
+    END;
+
+    CREATE TRIGGER tasks_changes_update AFTER UPDATE ON tasks
+    BEGIN
+        INSERT INTO task_changes (task_id, user_id, op, changed_at)
+            SELECT OLD.id, OLD.user_id, 'delete', {NOW_TIMESTAMP}
+            WHERE OLD.user_id != NEW.user_id;
+        INSERT INTO task_changes (task_id, user_id, op, changed_at)
+            VALUES (NEW.id, NEW.user_id, 'upsert', {NOW_TIMESTAMP});
+    END;
+
+    CREATE TRIGGER tasks_changes_delete AFTER DELETE ON tasks
+    BEGIN
+        INSERT INTO task_changes (task_id, user_id, op, changed_at)
+            VALUES (OLD.id, OLD.user_id, 'delete', {NOW_TIMESTAMP});
+    END;
+    """,
+    # 7: shard of each user's tasks when they are sharded across several
+    # database files, see `ShardedTaskRepository`. An entry is added with a
+    # user's first task and changed only by rebalancing. Shards cannot enforce
+    # foreign keys to users, a deleted user's entry goes and their tasks are
+    # left to rebalancing.
+    """
+    CREATE TABLE IF NOT EXISTS task_shard_directory (
+        user_id INTEGER PRIMARY KEY,
+        shard INTEGER NOT NULL,
+        placed_at TEXT NOT NULL,
+        FOREIGN KEY (user_id) REFERENCES users (id) ON DELETE CASCADE
+    );
+
+    CREATE INDEX IF NOT EXISTS idx_task_shard_directory_shard
+        ON task_shard_directory (shard);
+    """,
+]
+
+
+def apply_migrations(conn: Connection) -> int:
+    """Apply every migration newer than the database's `user_version`.
+
+    Each migration runs in its own transaction together with the version bump,
+    so a failed migration leaves the database at the previous version.
+
+    Args:
+        conn (Connection): The SQLite database connection.
+
+    Returns:
+        int: The schema version after applying the migrations.
+    """
+    version = conn.execute("PRAGMA user_version").fetchone()[0]
+    for number, script in enumerate(MIGRATIONS[version:], start=version + 1):
+        try:
+            conn.executescript(
+                f"BEGIN;\n{script}\nPRAGMA user_version = {number};\nCOMMIT;"
+            )
+        except Exception:
+            if conn.in_transaction:
+                conn.rollback()
+            raise
+        version = number
+    return version
@@ -0,0 +1,272 @@
+"""
+PostgreSQL connection layer of the Postgres repositories, used with
+`USER_REPOSITORY = "postgres"` and `TASK_REPOSITORY = "postgres"`.
+
+psycopg 3 and psycopg_pool are optional dependencies
+(`pip install "psycopg[binary,pool]"`). This module imports them, so it is only
+imported once a Postgres repository is configured.
+
+Each process keeps one pool of `POSTGRES_POOL_MIN_SIZE` to
+`POSTGRES_POOL_MAX_SIZE` connections to `POSTGRES_DSN`. A request takes a
+connection on its first query and gives it back when its app context ends.
+Connections are in autocommit mode, writes run in a transaction of their own
+with `run_pg_write`.
+"""
+
+from contextlib import contextmanager
+from itertools import count
+from typing import Any, Callable, Iterator, TypeVar
+
+from flask import current_app, g
+from psycopg import Connection, Cursor
+from psycopg.conninfo import conninfo_to_dict, make_conninfo
+from psycopg.errors import LockNotAvailable
+from psycopg.pq import TransactionStatus
+from psycopg_pool import ConnectionPool, PoolTimeout
+
+import logging
+import os
+import threading
+
+from src.core.errors import DatabaseBusyError, ReadOnlyWriteError
+from src.infra.postgres_migrations import apply_postgres_migrations
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+# guards the lazy creation of the pool
+_pool_lock = threading.Lock()
+# names of server-side cursors, unique within a process
+_cursor_names = count(1)
+
+
+def get_pg_pool() -> ConnectionPool:
+    """Get the app's connection pool, created on first use in each process.
+
+    Returns:
+        ConnectionPool: The pool.
+    """
+    pid, pool = current_app.extensions.get("pg_pool", (None, None))
+    # connections must not be shared with a forked process
+    if pool is None or pid != os.getpid():
+        with _pool_lock:
+            pid, pool = current_app.extensions.get("pg_pool", (None, None))
+            if pool is None or pid != os.getpid():
+                pool = _create_pool(current_app.config)
+                current_app.extensions["pg_pool"] = (os.getpid(), pool)
+    return pool
+
+
+def _create_pool(config) -> ConnectionPool:
+    """Open a pool of autocommit connections with the app's lock timeout.
+
+    `lock_timeout` is passed as a connection option rather than set, so the `RESET ALL` run
+    on every connection given back keeps it.
+    """
+    options = conninfo_to_dict(config["POSTGRES_DSN"]).get("options", "")
+    lock_timeout = int(config["WRITE_BUSY_DEADLINE"] * 1000)
+    return ConnectionPool(
+        make_conninfo(
+            config["POSTGRES_DSN"],
+            options=f"{options} -c lock_timeout={lock_timeout}".strip(),
+        ),
+        min_size=config["POSTGRES_POOL_MIN_SIZE"],
+        max_size=config["POSTGRES_POOL_MAX_SIZE"],
+        timeout=config["POSTGRES_POOL_TIMEOUT"],
+        kwargs={"autocommit": True},
+        reset=_reset_session,
+        name="itol",
+        open=True,
+    )
+
+
+def _reset_session(conn: Connection) -> None:
+    """Undo the session settings of a request, e.g. read-only, before the pool reuses the connection."""
+    conn.execute("RESET ALL")
+
+
+def get_pg_connection() -> Connection:
+    """Get the request's pooled connection from the Flask application context.
+
+    In requests routed with `read_only` every transaction of the connection is read-only.
+
+    Returns:
+        psycopg.Connection: The connection, in autocommit mode.
+
+    Raises:
+        DatabaseBusyError: If no connection became free within `POSTGRES_POOL_TIMEOUT`.
+    """
+    conn = _pooled_connection("pg_db")
+    if g.get("read_only") and not g.get("pg_read_only"):
+        conn.execute("SET default_transaction_read_only = on")
+        g.pg_read_only = True
+    return conn
+
+
+def get_pg_job_connection() -> Connection:
+    """Get the job queue's own pooled connection from the Flask application context.
+
+    Job bookkeeping commits on this connection, so it never runs inside a transaction that the
+    running job holds on the request connection, e.g. a read-only snapshot.
+
+    Returns:
+        psycopg.Connection: The connection, in autocommit mode.
+    """
+    return _pooled_connection("pg_job_db")
+
+
+def _pooled_connection(key: str) -> Connection:
+    """Take a connection from the pool for the app context, kept in `g` under `key`."""
+    if key not in g:
+        pool = get_pg_pool()
+        try:
+            conn = pool.getconn()
+        except PoolTimeout:
+            raise DatabaseBusyError(current_app.config["WRITE_RETRY_AFTER"])
+        setattr(g, key, (conn, pool))
+    return getattr(g, key)[0]
+
+
+def release_pg_read_only(e=None) -> None:
+    """Make the request connection writable again at the end of a request routed with `read_only`.
+
+    Args:
+        e (Exception, optional): An exception that may have occurred. Defaults to None.
+    """
+    if g.pop("pg_read_only", None) and "pg_db" in g:
+        g.pg_db[0].execute("RESET default_transaction_read_only")
+
+
+def release_pg_connections(e=None) -> None:
+    """Give the connections of the app context back to the pool, rolling back what is left open.
+
+    Args:
+        e (Exception, optional): An exception that may have occurred. Defaults to None.
+    """
+    g.pop("pg_read_only", None)
+    for key in ("pg_db", "pg_job_db"):
+        held = g.pop(key, None)
+        if held is None:
+            continue
+        conn, pool = held
+        # a broken connection is discarded by the pool
+        if conn.info.transaction_status in (
+            TransactionStatus.INTRANS,
+            TransactionStatus.INERROR,
+        ):
+            conn.rollback()
+        pool.putconn(conn)
+
+
+def init_postgres(app) -> None:
+    """Register the teardown handlers that end read-only requests and give the pooled connections back.
+
+    Args:
+        app (Flask): The Flask application instance.
+    """
+    app.teardown_request(release_pg_read_only)
+    app.teardown_appcontext(release_pg_connections)
+
+
+def run_pg_write(operation: Callable[[Connection], T]) -> T:
+    """Run a write in a transaction on the request's connection and commit it.
+
+    Writers are admitted by the app's AdmissionController like those of `run_write`. A write
+    waiting for a row lock longer than `WRITE_BUSY_DEADLINE` is rolled back.
+
+    Args:
+        operation (Callable[[psycopg.Connection], T]): Executes the statements of the write on the given connection. Must not commit or roll back.
+
+    Returns:
+        T: The return value of `operation`.
+
+    Raises:
+        DatabaseBusyError: If a lock could not be taken in time, WritesOverloadedError if too many writers were waiting already.
+        ReadOnlyWriteError: If the request was routed with `read_only`.
+    """
+    if g.get("read_only"):
+        current_app.extensions["write_metrics"].add("read_only_writes")
+        logger.warning("Write attempted in a read-only request")
+        raise ReadOnlyWriteError()
+    with current_app.extensions["write_admission"].admit():
+        conn = get_pg_connection()
+        try:
+            with conn.transaction():
+                return operation(conn)
+        except LockNotAvailable:
+            current_app.extensions["write_metrics"].add("busy_timeouts")
+            raise DatabaseBusyError(current_app.config["WRITE_RETRY_AFTER"])
+
+
+@contextmanager
+def pg_snapshot(conn: Connection) -> Iterator[None]:
+    """Run the reads inside the block in one read-only repeatable read transaction.
+
+    Args:
+        conn (psycopg.Connection): A connection in autocommit mode, outside a transaction.
+
+    Yields:
+        None: Control, while the transaction is open.
+    """
+    conn.execute("BEGIN ISOLATION LEVEL REPEATABLE READ READ ONLY")
+    try:
+        yield
+    finally:
+        conn.execute("ROLLBACK")
+
+
+def iter_server_cursor(
+    conn: Connection,
+    sql: str,
+    params: Any,
+    row_factory: Any,
+    batch_size: int,
+) -> Iterator:
+    """Run a query on a server-side cursor and yield its mapped rows, fetching `batch_size` rows at a time.
+
+    The query is executed eagerly. Inside a transaction (e.g. a snapshot) the cursor belongs to
+    it and must be consumed before it ends. Outside one the cursor is declared `WITH HOLD`: the
+    server keeps the result after the statement commits, so the iterator may outlive other
+    transactions on the connection. Either way only one batch is held in memory here.
+
+    Args:
+        conn (psycopg.Connection): The connection.
+        sql (str): The query.
+        params (Any): Query parameters.
+        row_factory (Any): A psycopg row factory, e.g. `args_row(Task)`.
+        batch_size (int): Number of rows fetched per round trip.
+
+    Returns:
+        Iterator: The objects produced by the row factory.
+    """
+    cur = conn.cursor(
+        f"itol_stream_{next(_cursor_names)}",
+        row_factory=row_factory,
+        withhold=conn.info.transaction_status == TransactionStatus.IDLE,
+    )
+    cur.execute(sql, params)
+    return _fetch_batches(cur, batch_size)
+
+
+def _fetch_batches(cur: Cursor, batch_size: int) -> Iterator:
+    """Yield the rows of an executed cursor in batches and close it."""
+    try:
+        while rows := cur.fetchmany(batch_size):
+            yield from rows
+    finally:
+        cur.close()
+
+
+def init_postgres_db() -> int:
+    """Create the Postgres schema and apply any pending migrations, see `src.infra.postgres_migrations`.
+
+    Called by `flask init-db` when the repositories are configured for Postgres.
+
+    Returns:
+        int: The schema version.
+    """
+    conn = get_pg_connection()
+    version = apply_postgres_migrations(conn)
+    # refresh the planner statistics so partial indexes are picked up
+    conn.execute("ANALYZE")
+    return version
@@ -0,0 +1,328 @@
+"""
+PostgreSQL schema of the Postgres repositories, the base tables and the
+migrations on top of them.
+
+`POSTGRES_MIGRATIONS` holds the same migrations as `MIGRATIONS` in
+`src.infra.migrations`, translated to PostgreSQL: entry N changes the schema
+exactly like SQLite migration N, so both backends share schema versions. The
+triggers are plpgsql functions. The version is stored in the one-row
+`schema_version` table. Append a migration to both lists together.
+"""
+
+from typing import Any
+
+# Change timestamps in the format of `src.core.timestamp`. The statement's
+# start time, like SQLite's 'now', is fixed for the duration of a statement.
+NOW_TIMESTAMP = (
+    "to_char(statement_timestamp() AT TIME ZONE 'UTC', "
+    '\'YYYY-MM-DD"T"HH24:MI:SS.MS"Z"\')'
+)
+
+# Serializes the writers of the change feed, see migration 3.
+CHANGE_FEED_LOCK = 7_312_001
+# Serializes concurrent `init-db` runs.
+MIGRATION_LOCK = 7_312_000
+
+BASE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS users (
+    id BIGINT GENERATED BY DEFAULT AS IDENTITY PRIMARY KEY,
+    username TEXT NOT NULL UNIQUE,
+    email TEXT NOT NULL UNIQUE,
+    pw_hash TEXT NOT NULL,
+    is_admin BOOLEAN NOT NULL DEFAULT FALSE
+);
+
+CREATE TABLE IF NOT EXISTS tasks (
+    id BIGINT GENERATED BY DEFAULT AS IDENTITY PRIMARY KEY,
+    user_id BIGINT NOT NULL REFERENCES users (id) ON DELETE CASCADE,
+    title TEXT NOT NULL CHECK (LENGTH(title) <= 100),
+    description TEXT CHECK (LENGTH(description) <= 500),
+    due_date DATE NOT NULL,
+    status TEXT NOT NULL CHECK (status IN ('To Do', 'In Progress', 'Completed'))
+);
+
+CREATE TABLE IF NOT EXISTS schema_version (
+    id INTEGER PRIMARY KEY CHECK (id = 1),
+    version INTEGER NOT NULL DEFAULT 0
+);
+
+INSERT INTO schema_version (id) VALUES (1) ON CONFLICT (id) DO NOTHING;
+"""
+
+# Rebuilds the materialized task statistics from the tasks table. Shared by
+# the migration that introduces them and by `flask rebuild-task-stats`.
+REBUILD_TASK_STATS = """
+DELETE FROM task_stats;
+DELETE FROM task_due_stats;
+INSERT INTO task_stats (user_id, todo, in_progress, completed)
+    SELECT
+        user_id,
+        COUNT(*) FILTER (WHERE status = 'To Do'),
+        COUNT(*) FILTER (WHERE status = 'In Progress'),
+        COUNT(*) FILTER (WHERE status = 'Completed')
+    FROM tasks
+    GROUP BY user_id;
+INSERT INTO task_due_stats (user_id, due_date, open_count)
+    SELECT user_id, due_date, COUNT(*)
+    FROM tasks
+    WHERE status != 'Completed'
+    GROUP BY user_id, due_date;
+"""
+
+POSTGRES_MIGRATIONS: list[str] = [
+    # 1: per-user task statistics kept exact by a trigger on tasks. A removed
+    # task only decrements, so deleting a user, which cascades to task_stats
+    # and to the tasks, never inserts statistics for the deleted user.
+    """
+    CREATE TABLE IF NOT EXISTS task_stats (
+        user_id BIGINT PRIMARY KEY REFERENCES users (id) ON DELETE CASCADE,
+        todo INTEGER NOT NULL DEFAULT 0,
+        in_progress INTEGER NOT NULL DEFAULT 0,
+        completed INTEGER NOT NULL DEFAULT 0
+    );
+
+    CREATE TABLE IF NOT EXISTS task_due_stats (
+        user_id BIGINT NOT NULL,
+        due_date DATE NOT NULL,
+        open_count INTEGER NOT NULL,
+        PRIMARY KEY (user_id, due_date)
+    );
+
+    CREATE OR REPLACE FUNCTION task_stats_add(
+        p_user_id BIGINT, p_due_date DATE, p_status TEXT, p_delta INTEGER
+    ) RETURNS void AS $$
+    BEGIN
+        IF p_delta > 0 THEN
+            INSERT INTO task_stats (user_id) VALUES (p_user_id)
+                ON CONFLICT (user_id) DO NOTHING;
+        END IF;
+        UPDATE task_stats SET
+            todo = todo + CASE WHEN p_status = 'To Do' THEN p_delta ELSE 0 END,
+            in_progress = in_progress
+                + CASE WHEN p_status = 'In Progress' THEN p_delta ELSE 0 END,
+            completed = completed
+                + CASE WHEN p_status = 'Completed' THEN p_delta ELSE 0 END
+        WHERE user_id = p_user_id;
+
+        IF p_status = 'Completed' THEN
+            RETURN;
+        END IF;
+        IF p_delta > 0 THEN
+            INSERT INTO task_due_stats (user_id, due_date, open_count)
+                VALUES (p_user_id, p_due_date, 1)
+                ON CONFLICT (user_id, due_date)
+                DO UPDATE SET open_count = task_due_stats.open_count + 1;
+        ELSE
+            UPDATE task_due_stats SET open_count = open_count - 1
+            WHERE user_id = p_user_id AND due_date = p_due_date;
+            DELETE FROM task_due_stats
+            WHERE user_id = p_user_id
+                AND due_date = p_due_date
+                AND open_count <= 0;
+        END IF;
+    END;
+    $$ LANGUAGE plpgsql;
+
+    CREATE OR REPLACE FUNCTION tasks_stats_trigger() RETURNS trigger AS $$
+    BEGIN
+        IF TG_OP IN ('UPDATE', 'DELETE') THEN
+            PERFORM task_stats_add(OLD.user_id, OLD.due_date, OLD.status, -1);
+        END IF;
+        IF TG_OP IN ('INSERT', 'UPDATE') THEN
+            PERFORM task_stats_add(NEW.user_id, NEW.due_date, NEW.status, 1);
+        END IF;
+        RETURN NULL;
+    END;
+    $$ LANGUAGE plpgsql;
+
+    CREATE TRIGGER tasks_stats
+    AFTER INSERT OR DELETE OR UPDATE OF user_id, due_date, status ON tasks
+    FOR EACH ROW EXECUTE FUNCTION tasks_stats_trigger();
+    """
+    + REBUILD_TASK_STATS,
+    # 2: integer day key for due date range queries and sorting, equal to
+    # `date.toordinal()` of the due date. PostgreSQL only has stored
+    # generated columns.
+    """
+    ALTER TABLE tasks ADD COLUMN due_day INTEGER
+        GENERATED ALWAYS AS (due_date - DATE '0001-01-01' + 1) STORED;
+
+    CREATE INDEX IF NOT EXISTS idx_tasks_user_due_day
+        ON tasks (user_id, due_day);
+
+    CREATE INDEX IF NOT EXISTS idx_tasks_open_user_due_day
+        ON tasks (user_id, due_day)
+        WHERE status != 'Completed';
+    """,
+    # 3: append-only change feed for incremental client sync. Sequence numbers
+    # are handed out before commit, so concurrent transactions could commit
+    # them out of order and a client could sync past a change that is not
+    # visible yet. The trigger takes a transaction-level advisory lock before
+    # taking a number, which orders the feed's writers by commit like SQLite's
+    # single writer does.
+    f"""
+    CREATE TABLE IF NOT EXISTS task_changes (
+        seq BIGINT GENERATED ALWAYS AS IDENTITY PRIMARY KEY,
+        task_id BIGINT NOT NULL,
+        user_id BIGINT NOT NULL,
+        op TEXT NOT NULL CHECK (op IN ('upsert', 'delete'))
+    );
+
+    CREATE INDEX IF NOT EXISTS idx_task_changes_user_seq
+        ON task_changes (user_id, seq);
+
+    CREATE INDEX IF NOT EXISTS idx_task_changes_task_seq
+        ON task_changes (task_id, seq);
+
+    CREATE TABLE IF NOT EXISTS task_change_log (
+        id INTEGER PRIMARY KEY CHECK (id = 1),
+        compacted_through BIGINT NOT NULL DEFAULT 0
+    );
+
+    INSERT INTO task_change_log (id) VALUES (1) ON CONFLICT (id) DO NOTHING;
+
+    CREATE OR REPLACE FUNCTION tasks_changes_trigger() RETURNS trigger AS $$
+    BEGIN
+        PERFORM pg_advisory_xact_lock({CHANGE_FEED_LOCK});
+        IF TG_OP = 'DELETE' THEN
+            INSERT INTO task_changes (task_id, user_id, op)
+                VALUES (OLD.id, OLD.user_id, 'delete');
+            RETURN NULL;
+        END IF;
+        IF TG_OP = 'UPDATE' AND OLD.user_id != NEW.user_id THEN
+            INSERT INTO task_changes (task_id, user_id, op)
+                VALUES (OLD.id, OLD.user_id, 'delete');
+        END IF;
+        INSERT INTO task_changes (task_id, user_id, op)
+            VALUES (NEW.id, NEW.user_id, 'upsert');
+        RETURN NULL;
+    END;
+    $$ LANGUAGE plpgsql;
+
+    CREATE TRIGGER tasks_changes
+    AFTER INSERT OR UPDATE OR DELETE ON tasks
+    FOR EACH ROW EXECUTE FUNCTION tasks_changes_trigger();
+
+    INSERT INTO task_changes (task_id, user_id, op)
+        SELECT id, user_id, 'upsert' FROM tasks ORDER BY id;
+    """,
+    # 4: per-task version, incremented by every update.
+    """
+    ALTER TABLE tasks ADD COLUMN version INTEGER NOT NULL DEFAULT 1;
+    """,
+    # 5: durable background job queue, payload and result as JSONB.
+    """
+    CREATE TABLE IF NOT EXISTS jobs (
+        id BIGINT GENERATED BY DEFAULT AS IDENTITY PRIMARY KEY,
+        kind TEXT NOT NULL,
+        payload JSONB NOT NULL DEFAULT '{}',
+        user_id BIGINT REFERENCES users (id) ON DELETE CASCADE,
+        status TEXT NOT NULL DEFAULT 'queued'
+            CHECK (status IN ('queued', 'running', 'succeeded', 'failed')),
+        attempts INTEGER NOT NULL DEFAULT 0,
+        max_attempts INTEGER NOT NULL DEFAULT 3,
+        progress DOUBLE PRECISION NOT NULL DEFAULT 0,
+        result JSONB,
+        error TEXT,
+        run_at DOUBLE PRECISION NOT NULL,
+        locked_by TEXT,
+        locked_until DOUBLE PRECISION,
+        created_at DOUBLE PRECISION NOT NULL,
+        finished_at DOUBLE PRECISION
+    );
+
+    CREATE INDEX IF NOT EXISTS idx_jobs_queued_run_at
+        ON jobs (run_at) WHERE status = 'queued';
+
+    CREATE INDEX IF NOT EXISTS idx_jobs_running_locked_until
+        ON jobs (locked_until) WHERE status = 'running';
+
+    CREATE INDEX IF NOT EXISTS idx_jobs_finished_at
+        ON jobs (finished_at) WHERE finished_at IS NOT NULL;
+    """,
+    # 6: change timestamps for incremental exports. The backfill runs without
+    # the change feed trigger, which is recreated to stamp the entries.
+    f"""
+    ALTER TABLE tasks ADD COLUMN created_at TEXT;
+    ALTER TABLE tasks ADD COLUMN updated_at TEXT;
+    ALTER TABLE task_changes ADD COLUMN changed_at TEXT;
+    ALTER TABLE task_change_log ADD COLUMN compacted_at TEXT;
+
+    DROP TRIGGER IF EXISTS tasks_changes ON tasks;
+
+    UPDATE tasks SET
+        created_at = {NOW_TIMESTAMP},
+        updated_at = {NOW_TIMESTAMP};
+    UPDATE task_changes SET changed_at = {NOW_TIMESTAMP};
+
+    CREATE INDEX IF NOT EXISTS idx_tasks_user_updated_at
+        ON tasks (user_id, updated_at);
+
+    CREATE INDEX IF NOT EXISTS idx_task_changes_user_deleted_at
+        ON task_changes (user_id, changed_at) WHERE op = 'delete';
+
+    CREATE OR REPLACE FUNCTION tasks_changes_trigger() RETURNS trigger AS $$
+    BEGIN
+        PERFORM pg_advisory_xact_lock({CHANGE_FEED_LOCK});
+        IF TG_OP = 'DELETE' THEN
+            INSERT INTO task_changes (task_id, user_id, op, changed_at)
+                VALUES (OLD.id, OLD.user_id, 'delete', {NOW_TIMESTAMP});
+            RETURN NULL;
+        END IF;
+        IF TG_OP = 'UPDATE' AND OLD.user_id != NEW.user_id THEN
+            INSERT INTO task_changes (task_id, user_id, op, changed_at)
+                VALUES (OLD.id, OLD.user_id, 'delete', {NOW_TIMESTAMP});
+        END IF;
+        INSERT INTO task_changes (task_id, user_id, op, changed_at)
+            VALUES (NEW.id, NEW.user_id, 'upsert', {NOW_TIMESTAMP});
+        RETURN NULL;
+    END;
+    $$ LANGUAGE plpgsql;
+
+    CREATE TRIGGER tasks_changes
+    AFTER INSERT OR UPDATE OR DELETE ON tasks
+    FOR EACH ROW EXECUTE FUNCTION tasks_changes_trigger();
+    """,
+    # 7: shard directory of `ShardedTaskRepository`. One server holds all
+    # tasks here, the table stays empty and only keeps the versions aligned.
+    """
+    CREATE TABLE IF NOT EXISTS task_shard_directory (
+        user_id BIGINT PRIMARY KEY REFERENCES users (id) ON DELETE CASCADE,
+        shard INTEGER NOT NULL,
+        placed_at TEXT NOT NULL
+    );
+
+    CREATE INDEX IF NOT EXISTS idx_task_shard_directory_shard
+        ON task_shard_directory (shard);
+    """,
+]
+
+
+def apply_postgres_migrations(conn: Any) -> int:
+    """Create the base tables and apply every migration newer than the stored schema version.
+
+    Each migration runs in its own transaction together with the version bump, under an
+    advisory lock, so concurrent runs apply each migration once and a failed migration
+    leaves the database at the previous version.
+
+    Args:
+        conn (psycopg.Connection): A connection in autocommit mode.
+
+    Returns:
+        int: The schema version after applying the migrations.
+    """
+    with conn.transaction():
+        conn.execute("SELECT pg_advisory_xact_lock(%s)", (MIGRATION_LOCK,))
+        conn.execute(BASE_SCHEMA)
+    while True:
+        with conn.transaction():
+            conn.execute("SELECT pg_advisory_xact_lock(%s)", (MIGRATION_LOCK,))
+            version = conn.execute(
+                "SELECT version FROM schema_version"
+            ).fetchone()[0]
+            if version >= len(POSTGRES_MIGRATIONS):
+                return version
+            conn.execute(POSTGRES_MIGRATIONS[version])
+            conn.execute(
+                "UPDATE schema_version SET version = %s", (version + 1,)
+            )
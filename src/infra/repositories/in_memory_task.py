@@ -0,0 +1,742 @@
+from bisect import bisect_left, bisect_right, insort
+from contextlib import contextmanager
+from datetime import date, timedelta
+from threading import RLock
+from typing import Iterator
+
+import heapq
+
+from src.core.errors import TaskNotFoundError
+from src.core.ports.task_repository import RepositoryError, TaskRepository
+from src.core.result import Result
+from src.core.task import Task, TaskSummary
+from src.core.task_change import TaskChange
+from src.core.task_stats import TaskStats
+from src.core.timestamp import now_timestamp
+
+
+_ORDER_BY = {
+    "id": lambda task: task.id,
+    "due_date": lambda task: (task.due_date, task.id),
+    "title": lambda task: (task.title, task.id),
+    "status": lambda task: (task.status, task.id),
+}
+
+
+class InMemoryTaskRepository(TaskRepository):
+    """In-memory implementation of TaskRepository with secondary indexes by user, status and due date.
+
+    Stored tasks are never handed out directly, callers always receive copies so the indexes
+    cannot be invalidated by mutating a returned task.
+    """
+
+    def __init__(self) -> None:
+        """Initialize an empty in-memory task repository."""
+        self._lock = RLock()
+        self._current_id = 1
+        self.tasks: dict[int, Task] = {}
+        # user_id -> task ids in insertion (and therefore id) order
+        self._by_user: dict[int, dict[int, None]] = {}
+        self._by_status: dict[str, set[int]] = {}
+        # user_id -> sorted (due_date, task_id) pairs, ISO dates sort chronologically
+        self._by_due: dict[int, list[tuple[str, int]]] = {}
+        # user_id -> status -> number of tasks
+        self._status_counts: dict[int, dict[str, int]] = {}
+        # user_id -> task_id -> (seq, op, changed_at) of the latest change of
+        # each task, re-inserted on every change so iteration follows sequence order
+        self._changes: dict[int, dict[int, tuple[int, str, str]]] = {}
+        self._change_seq = 0
+        self._compacted_through = 0
+        self._compacted_at: str | None = None
+
+    def get_by_id(self, task_id: int) -> Task | None:
+        """Retrieves a task by its ID.
+
+        Args:
+            task_id (int): The ID of the task to retrieve.
+        Returns:
+            Task | None: The task with the specified ID, or None if not found.
+        """
+        task = self.tasks.get(task_id)
+        return self._copy(task) if task is not None else None
+
+    def list_all(self) -> list[Task]:
+        """Lists all tasks in the repository. WARNING: This method retrieves all tasks without filtering by user.
+
+        Returns:
+            list[Task]: A list of all tasks.
+        """
+        with self._lock:
+            return [self._copy(task) for task in self.tasks.values()]
+
+    def list_by_user(self, user_id: int) -> list[Task]:
+        """Lists all tasks for a specific user.
+
+        Args:
+            user_id (int): The ID of the user whose tasks to retrieve.
+
+        Returns:
+            list[Task]: A list of tasks for the specified user.
+        """
+        with self._lock:
+            return [self._copy(task) for task in self._user_tasks(user_id)]
+
+    def iter_all(self, batch_size: int | None = None) -> Iterator[Task]:
+        """Iterates over all tasks in the repository. WARNING: This method retrieves all tasks without filtering by user.
+
+        Args:
+            batch_size (int | None): Unused, all tasks are already in memory.
+
+        Returns:
+            Iterator[Task]: An iterator over a snapshot of all tasks.
+        """
+        return iter(self.list_all())
+
+    def iter_by_user(
+        self, user_id: int, batch_size: int | None = None
+    ) -> Iterator[Task]:
+        """Iterates over the tasks of a specific user.
+
+        Args:
+            user_id (int): The ID of the user whose tasks to retrieve.
+            batch_size (int | None): Unused, all tasks are already in memory.
+
+        Returns:
+            Iterator[Task]: An iterator over a snapshot of the user's tasks.
+        """
+        return iter(self.list_by_user(user_id))
+
+    def iter_changed_since(
+        self, user_id: int, since: str, batch_size: int | None = None
+    ) -> Iterator[Task]:
+        """Iterates over the tasks of a specific user created or updated at or after a time.
+
+        Args:
+            user_id (int): The ID of the user whose tasks to retrieve.
+            since (str): Timestamp of the earliest change to include, see `src.core.timestamp`.
+            batch_size (int | None): Unused, all tasks are already in memory.
+
+        Returns:
+            Iterator[Task]: An iterator over a snapshot of the changed tasks, ordered by update time.
+        """
+        with self._lock:
+            changed = [
+                self._copy(task)
+                for task in self._user_tasks(user_id)
+                if task.updated_at >= since
+            ]
+        return iter(
+            sorted(changed, key=lambda task: (task.updated_at, task.id))
+        )
+
+    def deleted_since(self, user_id: int, since: str) -> list[tuple[int, str]]:
+        """Lists the tasks a user lost at or after a time from the change feed's tombstones.
+
+        Args:
+            user_id (int): The ID of the user.
+            since (str): Timestamp of the earliest deletion to include.
+
+        Returns:
+            list[tuple[int, str]]: The task IDs and deletion times, oldest first.
+        """
+        with self._lock:
+            return [
+                (task_id, changed_at)
+                for task_id, (_, op, changed_at) in self._changes.get(
+                    user_id, {}
+                ).items()
+                if op == "delete" and changed_at >= since
+            ]
+
+    def compacted_at(self) -> str | None:
+        """Returns the time of the newest tombstone removed by `compact_changes`.
+
+        Returns:
+            str | None: The timestamp, None if no tombstone was removed yet.
+        """
+        with self._lock:
+            return self._compacted_at
+
+    @contextmanager
+    def snapshot(self) -> Iterator[None]:
+        """Holds the repository lock for the block, so its reads see no concurrent writes.
+
+        Yields:
+            None: Control, while the lock is held.
+        """
+        with self._lock:
+            yield
+
+    def list_by_status(self, status: str) -> list[Task]:
+        """Lists all tasks with the given status using the status index.
+
+        Args:
+            status (str): The status to filter by.
+
+        Returns:
+            list[Task]: The matching tasks ordered by ID.
+        """
+        with self._lock:
+            ids = sorted(self._by_status.get(status, ()))
+            return [self._copy(self.tasks[task_id]) for task_id in ids]
+
+    def list_due_between(self, start: str, end: str) -> list[Task]:
+        """Lists all tasks due within an inclusive ISO date range using the due date index.
+
+        Args:
+            start (str): First due date to include.
+            end (str): Last due date to include.
+
+        Returns:
+            list[Task]: The matching tasks ordered by due date, then ID.
+        """
+        with self._lock:
+            ranges = [
+                due[
+                    bisect_left(due, (start, 0)) : bisect_right(
+                        due, (end, float("inf"))
+                    )
+                ]
+                for due in self._by_due.values()
+            ]
+            return [
+                self._copy(self.tasks[task_id])
+                for _, task_id in heapq.merge(*ranges)
+            ]
+
+    def create(
+        self,
+        title: str,
+        description: str,
+        due_date: str,
+        status: str,
+        user_id: int,
+    ) -> Result[Task, RepositoryError]:
+        """Creates a new task in the repository.
+
+        Args:
+            title (str): The title of the task.
+            description (str): The description of the task.
+            due_date (str): The due date of the task.
+            status (str): The status of the task.
+            user_id (int): The ID of the user who owns the task.
+
+        Returns:
+            Result[Task, RepositoryError]: The created task or an error if creation failed.
+        """
+        with self._lock:
+            created_task_result = Task.create(
+                id=self._current_id,
+                title=title,
+                description=description,
+                due_date=due_date,
+                status=status,
+                user_id=user_id,
+            )
+            if created_task_result.is_err:
+                return Result.Err(created_task_result.unwrap_err())
+
+            task = created_task_result.unwrap()
+            task.created_at = task.updated_at = now_timestamp()
+            self._current_id += 1
+            self._index(task)
+            self._record_change(task, "upsert")
+            return Result.Ok(self._copy(task))
+
+    def update(
+        self,
+        task_id: int,
+        title: str,
+        description: str,
+        due_date: str,
+        status: str,
+        user_id: int,
+    ) -> Result[Task, RepositoryError]:
+        """Updates an existing task in the repository. The owner of the task is not changed.
+
+        Args:
+            task_id (int): The ID of the task to update.
+            title (str): The new title of the task.
+            description (str): The new description of the task.
+            due_date (str): The new due date of the task.
+            status (str): The new status of the task.
+            user_id (int): The ID of the user who owns the task.
+
+        Returns:
+            Result[Task, RepositoryError]: The updated task or an error if the update failed.
+        """
+        created_task_result = Task.create(
+            id=task_id,
+            title=title,
+            description=description,
+            due_date=due_date,
+            status=status,
+            user_id=user_id,
+        )
+        if created_task_result.is_err:
+            return Result.Err(created_task_result.unwrap_err())
+
+        with self._lock:
+            existing = self.tasks.get(task_id)
+            if existing is None:
+                return Result.Err(TaskNotFoundError(task_id))
+
+            task = created_task_result.unwrap()
+            task.user_id = existing.user_id
+            task.version = existing.version + 1
+            task.created_at = existing.created_at
+            task.updated_at = now_timestamp()
+            self._unindex(existing)
+            self._index(task)
+            self._record_change(task, "upsert")
+            return Result.Ok(self._copy(task))
+
+    def delete(self, task_id: int) -> None | TaskNotFoundError:
+        """Deletes a task by its ID.
+
+        Args:
+            task_id (int): The ID of the task to delete.
+
+        Returns:
+            None | DomainError: None if deletion was successful, DomainError if task was not found.
+        """
+        with self._lock:
+            task = self.tasks.get(task_id)
+            if task is None:
+                return TaskNotFoundError(task_id)
+            self._unindex(task)
+            self._record_change(task, "delete")
+
+    def search(
+        self,
+        user_id: int,
+        title: str | None = None,
+        description: str | None = None,
+        status: str | None = None,
+        open_only: bool = False,
+        due_from: date | None = None,
+        due_to: date | None = None,
+        sort: str | None = None,
+        limit: int | None = None,
+        offset: int = 0,
+    ) -> list[Task]:
+        """Searches for tasks by user_id, and optionally by title, description, status and due date range.
+        Text matching is a case-insensitive substring match, like SQLite's LIKE.
+
+        Args:
+            user_id (int): The ID of the user whose tasks to search.
+            title (str | None): Optional title substring to search for.
+            description (str | None): Optional description substring to search for.
+            status (str | None): Optional exact status to filter by.
+            open_only (bool): Only include tasks that are not completed. Defaults to False.
+            due_from (date | None): Optional first due date to include.
+            due_to (date | None): Optional last due date to include.
+            sort (str | None): Optional sort key, one of `sort_keys`. Defaults to ID order.
+            limit (int | None): Optional maximum number of tasks to return.
+            offset (int): Number of matching tasks to skip. Defaults to 0.
+
+        Returns:
+            list[Task]: A list of tasks matching the search criteria.
+        """
+        with self._lock:
+            return [
+                self._copy(task)
+                for task in self._search(
+                    user_id,
+                    title,
+                    description,
+                    status,
+                    open_only,
+                    due_from,
+                    due_to,
+                    sort,
+                    limit,
+                    offset,
+                )
+            ]
+
+    def list_all_summaries(self) -> list[TaskSummary]:
+        """Lists summaries of all tasks in the repository. WARNING: This method retrieves all tasks without filtering by user.
+
+        Returns:
+            list[TaskSummary]: A list of summaries of all tasks.
+        """
+        with self._lock:
+            return [self._summarize(task) for task in self.tasks.values()]
+
+    def list_summaries_by_user(self, user_id: int) -> list[TaskSummary]:
+        """Lists summaries of all tasks for a specific user.
+
+        Args:
+            user_id (int): The ID of the user whose tasks to retrieve.
+
+        Returns:
+            list[TaskSummary]: A list of task summaries for the specified user.
+        """
+        return self.search_summaries(user_id)
+
+    def search_summaries(
+        self,
+        user_id: int,
+        title: str | None = None,
+        description: str | None = None,
+        status: str | None = None,
+        open_only: bool = False,
+        due_from: date | None = None,
+        due_to: date | None = None,
+        sort: str | None = None,
+        limit: int | None = None,
+        offset: int = 0,
+    ) -> list[TaskSummary]:
+        """Searches like `search`, but returns summaries with a short description preview.
+
+        Args:
+            user_id (int): The ID of the user whose tasks to search.
+            title (str | None): Optional title substring to search for.
+            description (str | None): Optional description substring to search for.
+            status (str | None): Optional exact status to filter by.
+            open_only (bool): Only include tasks that are not completed. Defaults to False.
+            due_from (date | None): Optional first due date to include.
+            due_to (date | None): Optional last due date to include.
+            sort (str | None): Optional sort key, one of `sort_keys`. Defaults to ID order.
+            limit (int | None): Optional maximum number of tasks to return.
+            offset (int): Number of matching tasks to skip. Defaults to 0.
+
+        Returns:
+            list[TaskSummary]: Summaries of the tasks matching the search criteria.
+        """
+        with self._lock:
+            return [
+                self._summarize(task)
+                for task in self._search(
+                    user_id,
+                    title,
+                    description,
+                    status,
+                    open_only,
+                    due_from,
+                    due_to,
+                    sort,
+                    limit,
+                    offset,
+                )
+            ]
+
+    def get_stats(self, user_id: int, today: date) -> TaskStats:
+        """Computes the statistics of a user's tasks.
+
+        Status counts are maintained on every write, overdue and due-this-week
+        counts are computed from the user's open tasks.
+
+        Args:
+            user_id (int): The ID of the user.
+            today (date): The date that overdue and due-this-week are relative to.
+
+        Returns:
+            TaskStats: The user's task statistics.
+        """
+        today_iso = today.isoformat()
+        week_end = (today + timedelta(days=6 - today.weekday())).isoformat()
+        with self._lock:
+            counts = self._status_counts.get(user_id, {})
+            stats = TaskStats(
+                todo=counts.get("To Do", 0),
+                in_progress=counts.get("In Progress", 0),
+                completed=counts.get("Completed", 0),
+            )
+            for task in self._user_tasks(user_id):
+                if task.status == "Completed":
+                    continue
+                if task.due_date < today_iso:
+                    stats.overdue += 1
+                elif task.due_date <= week_end:
+                    stats.due_this_week += 1
+            return stats
+
+    def rebuild_stats(self) -> None:
+        """Recomputes the per-user status counts from the stored tasks."""
+        with self._lock:
+            self._status_counts = {}
+            for task in self.tasks.values():
+                self._count(task, 1)
+
+    def changes_since(
+        self, user_id: int, since: int, limit: int | None = None
+    ) -> list[TaskChange]:
+        """Lists the changes of a user's tasks after a sequence number, oldest first.
+
+        Only the latest change of each task is kept, so a task edited many times
+        since the last sync is sent once. Upserts carry the current task state.
+
+        Args:
+            user_id (int): The ID of the user.
+            since (int): The sequence number the client has already synced up to.
+            limit (int | None): Maximum number of changes to return. Defaults to no limit.
+
+        Returns:
+            list[TaskChange]: The changes ordered by sequence number.
+        """
+        with self._lock:
+            newer = []
+            for task_id, (seq, op, _) in reversed(
+                self._changes.get(user_id, {}).items()
+            ):
+                if seq <= since:
+                    break
+                newer.append((seq, task_id, op))
+
+            if limit is not None:
+                # keep the oldest `limit` changes, `newer` is newest first
+                newer = newer[max(len(newer) - limit, 0) :]
+
+            changes = []
+            for seq, task_id, op in reversed(newer):
+                task = self.tasks.get(task_id) if op == "upsert" else None
+                if task is None:
+                    changes.append(TaskChange(seq, task_id, "delete"))
+                else:
+                    changes.append(
+                        TaskChange(seq, task_id, op, self._copy(task))
+                    )
+            return changes
+
+    def change_feed_bounds(
+        self, user_id: int | None = None
+    ) -> tuple[int, int]:
+        """Returns the range of sequence numbers the change feed can still serve.
+
+        Args:
+            user_id (int | None): The user whose feed to read, all users share one feed here.
+
+        Returns:
+            tuple[int, int]: The highest compacted sequence number and the latest sequence number.
+        """
+        with self._lock:
+            return self._compacted_through, self._change_seq
+
+    def compact_changes(self, before_seq: int) -> int:
+        """Removes tombstones up to a sequence number. Superseded changes are never stored.
+
+        Args:
+            before_seq (int): Remove tombstones with a sequence number up to this one.
+
+        Returns:
+            int: The number of removed entries.
+        """
+        with self._lock:
+            before_seq = min(before_seq, self._change_seq)
+            removed = 0
+            for user_id, latest in list(self._changes.items()):
+                for task_id, (seq, op, changed_at) in list(latest.items()):
+                    if op == "delete" and seq <= before_seq:
+                        del latest[task_id]
+                        removed += 1
+                        self._compacted_at = max(
+                            self._compacted_at or changed_at, changed_at
+                        )
+                if not latest:
+                    del self._changes[user_id]
+            self._compacted_through = max(self._compacted_through, before_seq)
+            return removed
+
+    def compact_changes_retaining(self, retain: int) -> int:
+        """Removes change feed entries that are no longer needed, keeping the tombstones of the
+        last `retain` entries.
+
+        Args:
+            retain (int): Number of most recent entries to keep tombstones for.
+
+        Returns:
+            int: The number of removed entries.
+        """
+        return self.compact_changes(self.change_feed_bounds()[1] - retain)
+
+    def _record_change(self, task: Task, op: str) -> None:
+        """Append a change of a task to the change feed. Caller must hold the lock.
+
+        Args:
+            task (Task): The changed task.
+            op (str): "upsert" or "delete".
+        """
+        self._change_seq += 1
+        latest = self._changes.setdefault(task.user_id, {})
+        latest.pop(task.id, None)
+        latest[task.id] = (self._change_seq, op, now_timestamp())
+
+    def _count(self, task: Task, delta: int) -> None:
+        """Adjust the status count of a task's owner. Caller must hold the lock.
+
+        Args:
+            task (Task): The task being added or removed.
+            delta (int): 1 when the task is added, -1 when it is removed.
+        """
+        counts = self._status_counts.setdefault(task.user_id, {})
+        counts[task.status] = counts.get(task.status, 0) + delta
+
+    def _search(
+        self,
+        user_id: int,
+        title: str | None,
+        description: str | None,
+        status: str | None,
+        open_only: bool,
+        due_from: date | None,
+        due_to: date | None,
+        sort: str | None,
+        limit: int | None,
+        offset: int,
+    ) -> list[Task]:
+        """Collect the stored tasks of a user matching the search criteria. Caller must hold the lock.
+
+        A due date range is resolved through the user's due date index, otherwise the user
+        index is scanned.
+
+        Args:
+            user_id (int): The ID of the user whose tasks to search.
+            title (str | None): Optional title substring to search for.
+            description (str | None): Optional description substring to search for.
+            status (str | None): Optional exact status to filter by.
+            open_only (bool): Only include tasks that are not completed. Defaults to False.
+            due_from (date | None): Optional first due date to include.
+            due_to (date | None): Optional last due date to include.
+            sort (str | None): Optional sort key, one of `sort_keys`. Defaults to ID order.
+            limit (int | None): Optional maximum number of tasks to return.
+            offset (int): Number of matching tasks to skip. Defaults to 0.
+
+        Returns:
+            list[Task]: The stored (not copied) matching tasks.
+        """
+        if due_from is not None or due_to is not None:
+            due = self._by_due.get(user_id, [])
+            lo = bisect_left(
+                due, (due_from.isoformat() if due_from else "", 0)
+            )
+            hi = (
+                bisect_right(due, (due_to.isoformat(), float("inf")))
+                if due_to is not None
+                else len(due)
+            )
+            candidates = sorted(
+                (self.tasks[task_id] for _, task_id in due[lo:hi]),
+                key=_ORDER_BY["id"],
+            )
+        else:
+            candidates = list(self._user_tasks(user_id))
+
+        title_needle = title.lower() if title is not None else None
+        description_needle = (
+            description.lower() if description is not None else None
+        )
+        matches = []
+        for task in candidates:
+            if task.user_id != user_id:
+                continue
+            if status is not None and task.status != status:
+                continue
+            if open_only and task.status == "Completed":
+                continue
+            if title_needle is not None and (
+                title_needle not in task.title.lower()
+            ):
+                continue
+            if description_needle is not None and (
+                description_needle not in task.description.lower()
+            ):
+                continue
+            matches.append(task)
+
+        # the user index follows insertion order, which updates do not keep
+        matches.sort(key=_ORDER_BY.get(sort, _ORDER_BY["id"]))
+        if limit is not None:
+            return matches[offset : offset + limit]
+        return matches[offset:]
+
+    def _user_tasks(self, user_id: int) -> Iterator[Task]:
+        """Yield the stored tasks of a user from the user index. Caller must hold the lock.
+
+        Args:
+            user_id (int): The ID of the user.
+
+        Yields:
+            Task: The stored (not copied) tasks of the user.
+        """
+        for task_id in self._by_user.get(user_id, ()):
+            yield self.tasks[task_id]
+
+    def _index(self, task: Task) -> None:
+        """Store a task and add it to every secondary index. Caller must hold the lock.
+
+        Args:
+            task (Task): The task to store.
+        """
+        self.tasks[task.id] = task
+        self._by_user.setdefault(task.user_id, {})[task.id] = None
+        self._by_status.setdefault(task.status, set()).add(task.id)
+        insort(
+            self._by_due.setdefault(task.user_id, []),
+            (task.due_date, task.id),
+        )
+        self._count(task, 1)
+
+    def _unindex(self, task: Task) -> None:
+        """Remove a stored task and its entries from every secondary index. Caller must hold the lock.
+
+        Args:
+            task (Task): The stored task to remove.
+        """
+        del self.tasks[task.id]
+        user_ids = self._by_user[task.user_id]
+        del user_ids[task.id]
+        if not user_ids:
+            del self._by_user[task.user_id]
+        status_ids = self._by_status[task.status]
+        status_ids.discard(task.id)
+        if not status_ids:
+            del self._by_status[task.status]
+        due = self._by_due[task.user_id]
+        del due[bisect_left(due, (task.due_date, task.id))]
+        if not due:
+            del self._by_due[task.user_id]
+        self._count(task, -1)
+
+    def _copy(self, task: Task) -> Task:
+        """Return a detached copy of a stored task.
+
+        Args:
+            task (Task): The stored task.
+
+        Returns:
+            Task: A copy that can be mutated freely by the caller.
+        """
+        return Task(
+            task.id,
+            task.title,
+            task.description,
+            task.due_date,
+            task.status,
+            task.user_id,
+            task.version,
+            task.created_at,
+            task.updated_at,
+        )
+
+    def _summarize(self, task: Task) -> TaskSummary:
+        """Build a TaskSummary from a stored task.
+
+        Args:
+            task (Task): The stored task.
+
+        Returns:
+            TaskSummary: The summary with a description preview of `summary_preview_length` characters.
+        """
+        limit = self.summary_preview_length
+        return TaskSummary(
+            task.id,
+            task.title,
+            task.due_date,
+            task.status,
+            task.user_id,
+            task.description[:limit],
+            len(task.description) > limit,
+            task.version,
+        )
@@ -1,7 +1,11 @@
+from threading import RLock
+from typing import Iterator
+
 from flask_bcrypt import Bcrypt
 
 from src.core.errors import (
     DomainError,
+    EmailTaken,
     UsernameTaken,
     UserNotFoundError,
 )
@@ -11,7 +15,11 @@ from src.core.user import User
 
 
 class InMemoryUserRepository(UserRepository):
-    """In-memory implementation of UserRepository that stores users in memory and uses Flask-Bcrypt for password hashing."""
+    """In-memory implementation of UserRepository that stores users in memory and uses Flask-Bcrypt for password hashing.
+
+    Users are indexed by username, email and id, so every lookup is a single dict access.
+    Writes are serialized with a lock so the indexes stay consistent across threads.
+    """
 
     _current_id = 1
 
@@ -22,7 +30,10 @@ class InMemoryUserRepository(UserRepository):
             bcrypt (Bcrypt): The Flask-Bcrypt instance for hashing passwords.
         """
         self.bcrypt = bcrypt
+        self._lock = RLock()
         self.users: dict[str, User] = {}
+        self._by_email: dict[str, User] = {}
+        self._by_id: dict[int, User] = {}
 
     def find_by_username(self, username: str) -> User | None:
         """Find a user by username.
@@ -53,17 +64,16 @@ class InMemoryUserRepository(UserRepository):
         Returns:
             User | None: The User object if a match is found, otherwise None.
         """
-        for user in self.users.values():
-            if (
-                user.username == username_or_email
-                or user.email == username_or_email
-            ):
-                return User(
-                    id=user.id,
-                    username=user.username,
-                    email=user.email,
-                    pw_hash=None,
-                )
+        user = self._lookup(username_or_email)
+        if user is None:
+            return None
+
+        return User(
+            id=user.id,
+            username=user.username,
+            email=user.email,
+            pw_hash=None,
+        )
 
     def load_for_auth(self, username_or_email: str) -> User | None:
         """Load a user with password hash for authentication.
@@ -74,12 +84,7 @@ class InMemoryUserRepository(UserRepository):
         Returns:
             User | None: The User object with pw_hash if found, otherwise None.
         """
-        for user in self.users.values():
-            if (
-                user.username == username_or_email
-                or user.email == username_or_email
-            ):
-                return user
+        return self._lookup(username_or_email)
 
     def verify_password(self, user: User, password: str) -> bool:
         """Verify a user's password against the stored hash.
@@ -102,9 +107,7 @@ class InMemoryUserRepository(UserRepository):
         Returns:
             User | None: The User object if found, otherwise None.
         """
-        for user in self.users.values():
-            if user.id == user_id:
-                return user
+        return self._by_id.get(user_id)
 
     def list_all(self) -> list[User]:
         """List all users in the repository.
@@ -112,7 +115,19 @@ class InMemoryUserRepository(UserRepository):
         Returns:
             list[User]: A list of all users.
         """
-        return list(self.users.values())
+        with self._lock:
+            return list(self.users.values())
+
+    def iter_all(self, batch_size: int | None = None) -> Iterator[User]:
+        """Iterate over all users in the repository.
+
+        Args:
+            batch_size (int | None): Unused, all users are already in memory.
+
+        Returns:
+            Iterator[User]: An iterator over a snapshot of all users.
+        """
+        return iter(self.list_all())
 
     def register(
         self, username: str, email: str, password: str
@@ -131,22 +146,33 @@ class InMemoryUserRepository(UserRepository):
             return Result.Err(UsernameTaken(username))
 
         # NOTE: validation would go here but this is just a demo class
+        # Hash outside the lock since bcrypt is deliberately slow, the checks
+        # are repeated below in case another thread registered meanwhile
         pw_hash = self.bcrypt.generate_password_hash(password).decode()
-        user_result = User.create(
-            id=self._current_id,
-            username=username,
-            email=email,
-            pw_hash=pw_hash,
-        )
-        if user_result.is_err:
-            return Result.Err(user_result.unwrap_err())
 
-        user = user_result.unwrap()
-        if self._current_id == 1:
-            user.is_admin = True
-        self._current_id += 1
-        self.users[username] = user
-        return Result.Ok(user)
+        with self._lock:
+            if username in self.users:
+                return Result.Err(UsernameTaken(username))
+            if email in self._by_email:
+                return Result.Err(EmailTaken(email))
+
+            user_result = User.create(
+                id=self._current_id,
+                username=username,
+                email=email,
+                pw_hash=pw_hash,
+            )
+            if user_result.is_err:
+                return Result.Err(user_result.unwrap_err())
+
+            user = user_result.unwrap()
+            if self._current_id == 1:
+                user.is_admin = True
+            self._current_id += 1
+            self.users[username] = user
+            self._by_email[email] = user
+            self._by_id[user.id] = user
+            return Result.Ok(user)
 
     def delete(self, username_or_email: str) -> None | DomainError:
         """Delete a user by username or email.
@@ -157,8 +183,25 @@ class InMemoryUserRepository(UserRepository):
         Returns:
             None | DomainError: None if deletion is successful, UserNotFoundError if the user is not found.
         """
-        user = self.find_by_username_or_email(username_or_email)
-        if user is None:
-            return UserNotFoundError(username_or_email)
+        with self._lock:
+            user = self._lookup(username_or_email)
+            if user is None:
+                return UserNotFoundError(username_or_email)
+
+            del self.users[user.username]
+            del self._by_email[user.email]
+            del self._by_id[user.id]
+
+    def _lookup(self, username_or_email: str) -> User | None:
+        """Find the stored user by username, falling back to email.
 
-        del self.users[user.username]
+        Args:
+            username_or_email (str): The username or email to look up.
+
+        Returns:
+            User | None: The stored User object if found, otherwise None.
+        """
+        user = self.users.get(username_or_email)
+        if user is None:
+            user = self._by_email.get(username_or_email)
+        return user
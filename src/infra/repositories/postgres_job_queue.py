@@ -0,0 +1,284 @@
+from typing import Any, Callable
+
+from psycopg import Connection
+from psycopg.types.json import Jsonb
+
+import time
+
+from src.core.job import Job
+from src.core.ports.job_queue import JobQueue
+from src.infra.postgres import get_pg_job_connection
+from src.infra.repositories.postgres_row_mappers import JOB_COLUMNS, job_row
+
+# Only the worker holding the lease may finish or extend a running job. A
+# worker whose lease expired has lost the job to another worker, its writes
+# then match no row.
+_HELD_BY_WORKER = (
+    "id = %(id)s AND status = 'running' AND locked_by = %(worker)s"
+)
+
+
+class PostgresJobQueue(JobQueue):
+    """PostgreSQL implementation of JobQueue, used with the Postgres user repository.
+
+    Jobs refer to their users, so they are stored in the same database. Workers claim jobs with
+    `FOR UPDATE SKIP LOCKED`, so concurrent claims never wait for each other.
+    """
+
+    def __init__(self, clock: Callable[[], float] = time.time) -> None:
+        """Initialize a PostgresJobQueue.
+
+        Args:
+            clock (Callable[[], float]): Returns the current unix time. Defaults to `time.time`.
+        """
+        self.clock = clock
+
+    def enqueue(
+        self,
+        kind: str,
+        payload: dict[str, Any],
+        user_id: int | None = None,
+        max_attempts: int | None = None,
+        delay: float = 0.0,
+    ) -> Job:
+        """Adds a job to the queue.
+
+        Args:
+            kind (str): Name of the handler that runs the job.
+            payload (dict[str, Any]): JSON-serializable arguments of the handler.
+            user_id (int | None): The user who requested the job. Defaults to None.
+            max_attempts (int | None): Claims allowed before the job fails for good. Defaults to `default_max_attempts`.
+            delay (float): Seconds before the job becomes claimable. Defaults to 0.0.
+
+        Returns:
+            Job: The queued job.
+        """
+        now = self.clock()
+        return self._query(
+            f"""
+            INSERT INTO jobs (
+                kind, payload, user_id, max_attempts, run_at, created_at
+            )
+            VALUES (
+                %(kind)s, %(payload)s, %(user_id)s, %(max_attempts)s,
+                %(run_at)s, %(now)s
+            )
+            RETURNING {JOB_COLUMNS}
+            """,
+            {
+                "kind": kind,
+                "payload": Jsonb(payload),
+                "user_id": user_id,
+                "max_attempts": max_attempts or self.default_max_attempts,
+                "run_at": now + delay,
+                "now": now,
+            },
+        ).fetchone()
+
+    def get(self, job_id: int) -> Job | None:
+        """Retrieves a job by its ID.
+
+        Args:
+            job_id (int): The ID of the job.
+
+        Returns:
+            Job | None: The job, or None if it does not exist.
+        """
+        return self._query(
+            f"SELECT {JOB_COLUMNS} FROM jobs WHERE id = %(id)s",
+            {"id": job_id},
+        ).fetchone()
+
+    def claim(
+        self, worker_id: str, lease_seconds: float | None = None
+    ) -> Job | None:
+        """Claims the oldest claimable job: a queued job whose run_at has passed, or a running job
+        whose lease expired. Running jobs that expired on their last attempt are failed first.
+        Jobs locked by a concurrent claim are skipped, and the claim conditions are checked again
+        once the row is locked, so concurrent workers never claim the same job.
+
+        Args:
+            worker_id (str): Identifies the claiming worker.
+            lease_seconds (float | None): Lease length. Defaults to `lease_seconds`.
+
+        Returns:
+            Job | None: The claimed job with its attempts incremented, or None if no job is claimable.
+        """
+        now = self.clock()
+        params = {
+            "now": now,
+            "worker": worker_id,
+            "locked_until": now + (lease_seconds or self.lease_seconds),
+        }
+        conn = self._get_connection()
+        with conn.transaction():
+            conn.execute(
+                """
+                UPDATE jobs SET
+                    status = 'failed',
+                    error = COALESCE(error, 'Lease expired'),
+                    locked_by = NULL,
+                    locked_until = NULL,
+                    finished_at = %(now)s
+                WHERE status = 'running'
+                    AND locked_until <= %(now)s
+                    AND attempts >= max_attempts
+                """,
+                params,
+            )
+            return self._query(
+                f"""
+                UPDATE jobs SET
+                    status = 'running',
+                    attempts = attempts + 1,
+                    locked_by = %(worker)s,
+                    locked_until = %(locked_until)s
+                WHERE id = (
+                    SELECT id FROM jobs
+                    WHERE (status = 'queued' AND run_at <= %(now)s)
+                        OR (status = 'running' AND locked_until <= %(now)s)
+                    ORDER BY id
+                    LIMIT 1
+                    FOR UPDATE SKIP LOCKED
+                )
+                RETURNING {JOB_COLUMNS}
+                """,
+                params,
+            ).fetchone()
+
+    def extend_lease(
+        self,
+        job_id: int,
+        worker_id: str,
+        progress: float | None = None,
+        lease_seconds: float | None = None,
+    ) -> bool:
+        """Extends the lease of a running job and optionally records its progress.
+
+        Args:
+            job_id (int): The ID of the job.
+            worker_id (str): The worker holding the lease.
+            progress (float | None): Fraction of the work done, unchanged when None. Defaults to None.
+            lease_seconds (float | None): New lease length from now. Defaults to `lease_seconds`.
+
+        Returns:
+            bool: False if the worker no longer holds the job.
+        """
+        cur = self._get_connection().execute(
+            f"""
+            UPDATE jobs SET
+                locked_until = %(locked_until)s,
+                progress = COALESCE(%(progress)s, progress)
+            WHERE {_HELD_BY_WORKER}
+            """,
+            {
+                "id": job_id,
+                "worker": worker_id,
+                "progress": progress,
+                "locked_until": self.clock()
+                + (lease_seconds or self.lease_seconds),
+            },
+        )
+        return cur.rowcount == 1
+
+    def complete(
+        self,
+        job_id: int,
+        worker_id: str,
+        result: dict[str, Any] | None = None,
+    ) -> bool:
+        """Marks a running job as succeeded.
+
+        Args:
+            job_id (int): The ID of the job.
+            worker_id (str): The worker holding the lease.
+            result (dict[str, Any] | None): JSON-serializable output of the job. Defaults to None.
+
+        Returns:
+            bool: False if the worker no longer holds the job, the result is then discarded.
+        """
+        cur = self._get_connection().execute(
+            f"""
+            UPDATE jobs SET
+                status = 'succeeded',
+                progress = 1,
+                result = %(result)s,
+                error = NULL,
+                locked_by = NULL,
+                locked_until = NULL,
+                finished_at = %(now)s
+            WHERE {_HELD_BY_WORKER}
+            """,
+            {
+                "id": job_id,
+                "worker": worker_id,
+                "result": Jsonb(result) if result is not None else None,
+                "now": self.clock(),
+            },
+        )
+        return cur.rowcount == 1
+
+    def fail(
+        self, job_id: int, worker_id: str, error: str, retry: bool = True
+    ) -> bool:
+        """Records a failed attempt of a running job. The job is queued again after an exponential
+        backoff while attempts remain and `retry` is set, otherwise it fails for good.
+
+        Args:
+            job_id (int): The ID of the job.
+            worker_id (str): The worker holding the lease.
+            error (str): Description of the failure.
+            retry (bool): Whether the failure is worth retrying. Defaults to True.
+
+        Returns:
+            bool: False if the worker no longer holds the job.
+        """
+        cur = self._get_connection().execute(
+            f"""
+            UPDATE jobs SET
+                status = CASE WHEN %(retry)s AND attempts < max_attempts
+                    THEN 'queued' ELSE 'failed' END,
+                run_at = %(now)s + LEAST(
+                    %(base)s * (1 << (attempts - 1)), %(max)s
+                ),
+                finished_at = CASE WHEN %(retry)s AND attempts < max_attempts
+                    THEN NULL ELSE %(now)s END,
+                error = %(error)s,
+                locked_by = NULL,
+                locked_until = NULL
+            WHERE {_HELD_BY_WORKER}
+            """,
+            {
+                "id": job_id,
+                "worker": worker_id,
+                "error": error,
+                "retry": retry,
+                "now": self.clock(),
+                "base": self.backoff_base_seconds,
+                "max": self.backoff_max_seconds,
+            },
+        )
+        return cur.rowcount == 1
+
+    def purge_finished(self, older_than: float) -> int:
+        """Deletes succeeded and failed jobs that finished before a point in time.
+
+        Args:
+            older_than (float): Unix time, jobs finished earlier are deleted.
+
+        Returns:
+            int: The number of deleted jobs.
+        """
+        cur = self._get_connection().execute(
+            "DELETE FROM jobs WHERE finished_at < %(older_than)s",
+            {"older_than": older_than},
+        )
+        return cur.rowcount
+
+    def _get_connection(self) -> Connection:
+        return get_pg_job_connection()
+
+    def _query(self, sql: str, params: dict):
+        """Execute a job query on a cursor of the job connection that yields Job objects."""
+        cur = self._get_connection().cursor(row_factory=job_row)
+        return cur.execute(sql, params)
@@ -0,0 +1,51 @@
+"""
+Column lists and psycopg row factories of the Postgres repositories.
+
+The column orders match `src.infra.repositories.row_mappers`, so rows map
+straight onto the positional arguments of the domain constructors. Due dates
+are DATE columns and are selected as ISO text like SQLite stores them, JSONB
+columns arrive decoded and booleans as bool.
+"""
+
+from psycopg.rows import args_row
+
+from src.core.job import Job
+from src.core.task import Task, TaskSummary
+from src.core.task_change import TaskChange
+from src.core.user import User
+
+TASK_COLUMNS = (
+    "id, title, description, to_char(due_date, 'YYYY-MM-DD'), status, "
+    "user_id, version, created_at, updated_at"
+)
+SUMMARY_COLUMNS = (
+    "id, title, to_char(due_date, 'YYYY-MM-DD'), status, user_id, "
+    "substr(COALESCE(description, ''), 1, %(preview_length)s), "
+    "COALESCE(length(description) > %(preview_length)s, FALSE), version"
+)
+# `c` is task_changes, `t` the LEFT JOINed task, NULL once the task is gone
+CHANGE_COLUMNS = (
+    "c.seq, c.task_id, c.op, "
+    "t.id, t.title, t.description, to_char(t.due_date, 'YYYY-MM-DD'), "
+    "t.status, t.user_id, t.version, t.created_at, t.updated_at"
+)
+USER_COLUMNS = "id, username, email, NULL AS pw_hash, is_admin"
+AUTH_USER_COLUMNS = "id, username, email, pw_hash, is_admin"
+JOB_COLUMNS = (
+    "id, kind, payload, user_id, status, attempts, max_attempts, progress, "
+    "result, error"
+)
+
+
+def _change(seq: int, task_id: int, op: str, *task) -> TaskChange:
+    """Build a TaskChange, an upsert whose task no longer exists is reported as a delete."""
+    if task[0] is None:
+        return TaskChange(seq, task_id, "delete")
+    return TaskChange(seq, task_id, op, Task(*task))
+
+
+task_row = args_row(Task)
+summary_row = args_row(TaskSummary)
+change_row = args_row(_change)
+user_row = args_row(User)
+job_row = args_row(Job)
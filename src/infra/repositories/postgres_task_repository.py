@@ -0,0 +1,687 @@
+from contextlib import contextmanager
+from datetime import date, timedelta
+from typing import Iterator
+
+from psycopg import Connection
+from psycopg.errors import IntegrityError
+
+from src.core.errors import (
+    InfrastructureError,
+    TaskNotFoundError,
+)
+from src.core.ports.task_repository import RepositoryError, TaskRepository
+from src.core.result import Result
+from src.core.task import Task, TaskSummary
+from src.core.task_change import TaskChange
+from src.core.task_stats import TaskStats
+from src.infra.postgres import (
+    get_pg_connection,
+    iter_server_cursor,
+    pg_snapshot,
+    run_pg_write,
+)
+from src.infra.postgres_migrations import NOW_TIMESTAMP, REBUILD_TASK_STATS
+from src.infra.repositories.postgres_row_mappers import (
+    CHANGE_COLUMNS,
+    SUMMARY_COLUMNS,
+    TASK_COLUMNS,
+    change_row,
+    summary_row,
+    task_row,
+)
+
+_ORDER_BY = {
+    "due_date": "due_day, id",
+    "title": "title, id",
+    "status": "status, id",
+}
+
+
+class PostgresTaskRepository(TaskRepository):
+    """PostgreSQL implementation of TaskRepository, on the pooled connections of `src.infra.postgres`.
+
+    The schema, triggers and queries mirror SQLTaskRepository. Iterators stream through
+    server-side cursors, so exports hold one batch of rows in memory.
+    """
+
+    def get_by_id(self, task_id: int) -> Task | None:
+        """Retrieves a task by its ID.
+
+        Args:
+            task_id (int): The ID of the task to retrieve.
+        Returns:
+            Task | None: The task with the specified ID, or None if not found.
+        """
+        return self._query(
+            f"SELECT {TASK_COLUMNS} FROM tasks WHERE id = %s", (task_id,)
+        ).fetchone()
+
+    def list_all(self) -> list[Task]:
+        """Lists all tasks in the repository. WARNING: This method retrieves all tasks without filtering by user.
+
+        Returns:
+            list[Task]: A list of all tasks.
+        """
+        return self._query(f"SELECT {TASK_COLUMNS} FROM tasks").fetchall()
+
+    def list_by_user(self, user_id: int) -> list[Task]:
+        """Lists all tasks for a specific user.
+
+        Args:
+            user_id (int): The ID of the user whose tasks to retrieve.
+
+        Returns:
+            list[Task]: A list of tasks for the specified user.
+        """
+        return self._query(
+            f"SELECT {TASK_COLUMNS} FROM tasks WHERE user_id = %s", (user_id,)
+        ).fetchall()
+
+    def iter_all(self, batch_size: int | None = None) -> Iterator[Task]:
+        """Iterates over all tasks in the repository in batches of a server-side cursor. WARNING: This method retrieves all tasks without filtering by user.
+
+        The connection is acquired eagerly, so when the iterator is consumed by a
+        streaming response it must be wrapped with `stream_with_context`.
+
+        Args:
+            batch_size (int | None): Rows fetched per batch. Defaults to `iter_batch_size`.
+
+        Returns:
+            Iterator[Task]: An iterator over all tasks.
+        """
+        return iter_server_cursor(
+            self._get_connection(),
+            f"SELECT {TASK_COLUMNS} FROM tasks",
+            None,
+            task_row,
+            batch_size or self.iter_batch_size,
+        )
+
+    def iter_by_user(
+        self, user_id: int, batch_size: int | None = None
+    ) -> Iterator[Task]:
+        """Iterates over the tasks of a specific user in batches of a server-side cursor.
+
+        The connection is acquired eagerly, so when the iterator is consumed by a
+        streaming response it must be wrapped with `stream_with_context`.
+
+        Args:
+            user_id (int): The ID of the user whose tasks to retrieve.
+            batch_size (int | None): Rows fetched per batch. Defaults to `iter_batch_size`.
+
+        Returns:
+            Iterator[Task]: An iterator over the user's tasks.
+        """
+        return iter_server_cursor(
+            self._get_connection(),
+            f"SELECT {TASK_COLUMNS} FROM tasks WHERE user_id = %s",
+            (user_id,),
+            task_row,
+            batch_size or self.iter_batch_size,
+        )
+
+    def iter_changed_since(
+        self, user_id: int, since: str, batch_size: int | None = None
+    ) -> Iterator[Task]:
+        """Iterates over the tasks of a specific user created or updated at or after a time, in batches of a server-side cursor.
+
+        The connection is acquired eagerly, so when the iterator is consumed by a
+        streaming response it must be wrapped with `stream_with_context`.
+
+        Args:
+            user_id (int): The ID of the user whose tasks to retrieve.
+            since (str): Timestamp of the earliest change to include, see `src.core.timestamp`.
+            batch_size (int | None): Rows fetched per batch. Defaults to `iter_batch_size`.
+
+        Returns:
+            Iterator[Task]: An iterator over the changed tasks, ordered by update time.
+        """
+        return iter_server_cursor(
+            self._get_connection(),
+            f"SELECT {TASK_COLUMNS} FROM tasks "
+            "WHERE user_id = %s AND updated_at >= %s ORDER BY updated_at, id",
+            (user_id, since),
+            task_row,
+            batch_size or self.iter_batch_size,
+        )
+
+    def deleted_since(self, user_id: int, since: str) -> list[tuple[int, str]]:
+        """Lists the tasks a user lost at or after a time from the change feed's tombstones.
+
+        Tombstones older than `compacted_at` may have been removed.
+
+        Args:
+            user_id (int): The ID of the user.
+            since (str): Timestamp of the earliest deletion to include.
+
+        Returns:
+            list[tuple[int, str]]: The task IDs and deletion times, oldest first.
+        """
+        conn = self._get_connection()
+        return conn.execute(
+            """
+            SELECT c.task_id, MAX(c.changed_at)
+            FROM task_changes AS c
+            WHERE c.user_id = %(user_id)s
+                AND c.op = 'delete'
+                AND c.changed_at >= %(since)s
+                AND NOT EXISTS (
+                    SELECT 1 FROM tasks AS t
+                    WHERE t.id = c.task_id AND t.user_id = c.user_id
+                )
+            GROUP BY c.task_id
+            ORDER BY 2, 1
+            """,
+            {"user_id": user_id, "since": since},
+        ).fetchall()
+
+    def compacted_at(self) -> str | None:
+        """Reads the time of the newest tombstone removed by `compact_changes`.
+
+        Returns:
+            str | None: The timestamp, None if no tombstone was removed yet.
+        """
+        conn = self._get_connection()
+        return conn.execute(
+            "SELECT compacted_at FROM task_change_log"
+        ).fetchone()[0]
+
+    @contextmanager
+    def snapshot(self) -> Iterator[None]:
+        """Runs the reads inside the block in one read-only repeatable read transaction, so they all
+        see the database as of the first read, unaffected by concurrent writes. Only use it for reads,
+        writes in the block fail.
+
+        Yields:
+            None: Control, while the transaction is open.
+        """
+        with pg_snapshot(self._get_connection()):
+            yield
+
+    def create(
+        self,
+        title: str,
+        description: str,
+        due_date: str,
+        status: str,
+        user_id: int,
+    ) -> Result[Task, RepositoryError]:
+        """Creates a new task in the repository.
+
+        Args:
+            title (str): The title of the task.
+            description (str): The description of the task.
+            due_date (str): The due date of the task.
+            status (str): The status of the task.
+            user_id (int): The ID of the user who owns the task.
+
+        Returns:
+            Result[Task, RepositoryError]: The created task or an error if creation failed.
+        """
+        created_task_result = Task.create(
+            id=0,  # ID will be assigned by the database
+            title=title,
+            description=description,
+            due_date=due_date,
+            status=status,
+            user_id=user_id,
+        )
+        if created_task_result.is_err:
+            return Result.Err(created_task_result.unwrap_err())
+        task = created_task_result.unwrap()
+
+        try:
+            new_task = run_pg_write(
+                lambda conn: conn.cursor(row_factory=task_row)
+                .execute(
+                    "INSERT INTO tasks (user_id, title, description, due_date, status, created_at, updated_at) "
+                    f"VALUES (%s, %s, %s, %s, %s, {NOW_TIMESTAMP}, {NOW_TIMESTAMP}) "
+                    f"RETURNING {TASK_COLUMNS}",
+                    (
+                        task.user_id,
+                        task.title,
+                        task.description,
+                        task.due_date,
+                        task.status,
+                    ),
+                )
+                .fetchone()
+            )
+        except IntegrityError as e:
+            return Result.Err(InfrastructureError(str(e)))
+        if not new_task:
+            return Result.Err(
+                InfrastructureError("Failed to retrieve created task")
+            )
+        return Result.Ok(new_task)
+
+    def update(
+        self,
+        task_id: int,
+        title: str,
+        description: str,
+        due_date: str,
+        status: str,
+        user_id: int,
+    ) -> Result[Task, RepositoryError]:
+        """Updates an existing task in the repository.
+
+        Args:
+            task_id (int): The ID of the task to update.
+            title (str): The new title of the task.
+            description (str): The new description of the task.
+            due_date (str): The new due date of the task.
+            status (str): The new status of the task.
+            user_id (int): The ID of the user who owns the task.
+
+        Returns:
+            Result[Task, RepositoryError]: The updated task or an error if the update failed.
+        """
+        created_task_result = Task.create(
+            id=task_id,
+            title=title,
+            description=description,
+            due_date=due_date,
+            status=status,
+            user_id=user_id,
+        )
+        if created_task_result.is_err:
+            return Result.Err(created_task_result.unwrap_err())
+
+        task = created_task_result.unwrap()
+
+        try:
+            updated_task = run_pg_write(
+                lambda conn: conn.cursor(row_factory=task_row)
+                .execute(
+                    "UPDATE tasks SET title = %s, description = %s, due_date = %s, status = %s, version = version + 1, "
+                    f"updated_at = {NOW_TIMESTAMP} WHERE id = %s "
+                    f"RETURNING {TASK_COLUMNS}",
+                    (
+                        task.title,
+                        task.description,
+                        task.due_date,
+                        task.status,
+                        task.id,
+                    ),
+                )
+                .fetchone()
+            )
+        except IntegrityError as e:
+            return Result.Err(InfrastructureError(str(e)))
+        if updated_task is None:
+            return Result.Err(TaskNotFoundError(task.id))
+        return Result.Ok(updated_task)
+
+    def delete(self, task_id: int) -> None | TaskNotFoundError:
+        """Deletes a task by its ID.
+
+        Args:
+            task_id (int): The ID of the task to delete.
+
+        Returns:
+            None | DomainError: None if deletion was successful, DomainError if task was not found.
+        """
+        deleted = run_pg_write(
+            lambda conn: conn.execute(
+                "DELETE FROM tasks WHERE id = %s",
+                (task_id,),
+            ).rowcount
+        )
+        if deleted == 0:
+            return TaskNotFoundError(task_id)
+
+    def _get_connection(self) -> Connection:
+        return get_pg_connection()
+
+    def _query(self, sql: str, params=None, row_factory=task_row):
+        """Execute a query on a cursor of the request connection that yields mapped rows."""
+        cur = self._get_connection().cursor(row_factory=row_factory)
+        return cur.execute(sql, params)
+
+    def search(
+        self,
+        user_id: int,
+        title: str | None = None,
+        description: str | None = None,
+        status: str | None = None,
+        open_only: bool = False,
+        due_from: date | None = None,
+        due_to: date | None = None,
+        sort: str | None = None,
+        limit: int | None = None,
+        offset: int = 0,
+    ) -> list[Task]:
+        """Searches for tasks by user_id, and optionally by title, description, status and due date range.
+
+        Args:
+            user_id (int): The ID of the user whose tasks to search.
+            title (str | None): Optional title substring to search for.
+            description (str | None): Optional description substring to search for.
+            status (str | None): Optional exact status to filter by.
+            open_only (bool): Only include tasks that are not completed. Defaults to False.
+            due_from (date | None): Optional first due date to include.
+            due_to (date | None): Optional last due date to include.
+            sort (str | None): Optional sort key, one of `sort_keys`. Defaults to ID order.
+            limit (int | None): Optional maximum number of tasks to return.
+            offset (int): Number of matching tasks to skip. Defaults to 0.
+
+        Returns:
+            list[Task]: A list of tasks matching the search criteria.
+        """
+        where, params, order_by = self._search_filter(
+            user_id,
+            title,
+            description,
+            status,
+            open_only,
+            due_from,
+            due_to,
+            sort,
+            limit,
+            offset,
+        )
+        return self._query(
+            f"SELECT {TASK_COLUMNS} FROM tasks WHERE {where} ORDER BY {order_by} "
+            "LIMIT %(limit)s OFFSET %(offset)s",
+            params,
+        ).fetchall()
+
+    def list_all_summaries(self) -> list[TaskSummary]:
+        """Lists summaries of all tasks in the repository. WARNING: This method retrieves all tasks without filtering by user.
+
+        Returns:
+            list[TaskSummary]: A list of summaries of all tasks.
+        """
+        return self._query(
+            f"SELECT {SUMMARY_COLUMNS} FROM tasks",
+            {"preview_length": self.summary_preview_length},
+            summary_row,
+        ).fetchall()
+
+    def list_summaries_by_user(self, user_id: int) -> list[TaskSummary]:
+        """Lists summaries of all tasks for a specific user.
+
+        Args:
+            user_id (int): The ID of the user whose tasks to retrieve.
+
+        Returns:
+            list[TaskSummary]: A list of task summaries for the specified user.
+        """
+        return self.search_summaries(user_id)
+
+    def search_summaries(
+        self,
+        user_id: int,
+        title: str | None = None,
+        description: str | None = None,
+        status: str | None = None,
+        open_only: bool = False,
+        due_from: date | None = None,
+        due_to: date | None = None,
+        sort: str | None = None,
+        limit: int | None = None,
+        offset: int = 0,
+    ) -> list[TaskSummary]:
+        """Searches like `search`, but only fetches the summary columns and a short description preview.
+
+        Args:
+            user_id (int): The ID of the user whose tasks to search.
+            title (str | None): Optional title substring to search for.
+            description (str | None): Optional description substring to search for.
+            status (str | None): Optional exact status to filter by.
+            open_only (bool): Only include tasks that are not completed. Defaults to False.
+            due_from (date | None): Optional first due date to include.
+            due_to (date | None): Optional last due date to include.
+            sort (str | None): Optional sort key, one of `sort_keys`. Defaults to ID order.
+            limit (int | None): Optional maximum number of tasks to return.
+            offset (int): Number of matching tasks to skip. Defaults to 0.
+
+        Returns:
+            list[TaskSummary]: Summaries of the tasks matching the search criteria.
+        """
+        where, params, order_by = self._search_filter(
+            user_id,
+            title,
+            description,
+            status,
+            open_only,
+            due_from,
+            due_to,
+            sort,
+            limit,
+            offset,
+        )
+        params["preview_length"] = self.summary_preview_length
+        return self._query(
+            f"SELECT {SUMMARY_COLUMNS} FROM tasks WHERE {where} ORDER BY {order_by} "
+            "LIMIT %(limit)s OFFSET %(offset)s",
+            params,
+            summary_row,
+        ).fetchall()
+
+    def get_stats(self, user_id: int, today: date) -> TaskStats:
+        """Reads the materialized statistics of a user's tasks, see `SQLTaskRepository.get_stats`.
+
+        Args:
+            user_id (int): The ID of the user.
+            today (date): The date that overdue and due-this-week are relative to.
+
+        Returns:
+            TaskStats: The user's task statistics.
+        """
+        conn = self._get_connection()
+        row = conn.execute(
+            "SELECT todo, in_progress, completed FROM task_stats WHERE user_id = %s",
+            (user_id,),
+        ).fetchone()
+        due = conn.execute(
+            """
+            SELECT
+                COALESCE(SUM(open_count) FILTER (WHERE due_date < %(today)s), 0),
+                COALESCE(SUM(open_count) FILTER (WHERE due_date >= %(today)s), 0)
+            FROM task_due_stats
+            WHERE user_id = %(user_id)s AND due_date <= %(week_end)s
+            """,
+            {
+                "user_id": user_id,
+                "today": today,
+                "week_end": today + timedelta(days=6 - today.weekday()),
+            },
+        ).fetchone()
+        if row is None:
+            return TaskStats(overdue=due[0], due_this_week=due[1])
+
+        return TaskStats(
+            todo=row[0],
+            in_progress=row[1],
+            completed=row[2],
+            overdue=due[0],
+            due_this_week=due[1],
+        )
+
+    def rebuild_stats(self) -> None:
+        """Recomputes the materialized task statistics from the tasks table, to recover from drift."""
+        run_pg_write(lambda conn: conn.execute(REBUILD_TASK_STATS))
+
+    def changes_since(
+        self, user_id: int, since: int, limit: int | None = None
+    ) -> list[TaskChange]:
+        """Lists the changes of a user's tasks after a sequence number, oldest first.
+
+        Only the latest change of each task is returned, so a task edited many times
+        since the last sync is sent once. Upserts carry the current task state.
+
+        Args:
+            user_id (int): The ID of the user.
+            since (int): The sequence number the client has already synced up to.
+            limit (int | None): Maximum number of changes to return. Defaults to no limit.
+
+        Returns:
+            list[TaskChange]: The changes ordered by sequence number.
+        """
+        return self._query(
+            f"""
+            SELECT {CHANGE_COLUMNS}
+            FROM task_changes AS c
+            LEFT JOIN tasks AS t
+                ON c.op = 'upsert' AND t.id = c.task_id AND t.user_id = c.user_id
+            WHERE c.user_id = %(user_id)s AND c.seq > %(since)s
+                AND NOT EXISTS (
+                    SELECT 1 FROM task_changes AS n
+                    WHERE n.task_id = c.task_id
+                        AND n.user_id = c.user_id
+                        AND n.seq > c.seq
+                )
+            ORDER BY c.seq
+            LIMIT %(limit)s
+            """,
+            {"user_id": user_id, "since": since, "limit": limit},
+            change_row,
+        ).fetchall()
+
+    def change_feed_bounds(
+        self, user_id: int | None = None
+    ) -> tuple[int, int]:
+        """Reads the range of sequence numbers the change feed can still serve.
+
+        The latest sequence number is that of the newest committed entry, which the feed's
+        advisory lock keeps below every number a later commit takes. Compacted entries
+        count through `compacted_through`.
+
+        Args:
+            user_id (int | None): The user whose feed to read, all users share one feed here.
+
+        Returns:
+            tuple[int, int]: The highest compacted sequence number and the latest sequence number.
+        """
+        conn = self._get_connection()
+        row = conn.execute(
+            """
+            SELECT
+                compacted_through,
+                GREATEST(
+                    compacted_through,
+                    (SELECT MAX(seq) FROM task_changes)
+                )
+            FROM task_change_log
+            """
+        ).fetchone()
+        return row[0], row[1]
+
+    def compact_changes(self, before_seq: int) -> int:
+        """Removes change feed entries that are no longer needed.
+
+        Entries superseded by a later change of the same task are never returned and
+        are always removed. Tombstones up to `before_seq` are removed as well, clients
+        that synced before that point have to reset.
+
+        Args:
+            before_seq (int): Remove tombstones with a sequence number up to this one.
+
+        Returns:
+            int: The number of removed entries.
+        """
+        before_seq = min(before_seq, self.change_feed_bounds()[1])
+
+        def compact(conn: Connection) -> int:
+            # record the newest tombstone about to be removed, GREATEST skips NULLs
+            conn.execute(
+                """
+                UPDATE task_change_log SET
+                    compacted_through = GREATEST(compacted_through, %(before_seq)s),
+                    compacted_at = GREATEST(compacted_at, deleted.changed_at)
+                FROM (
+                    SELECT MAX(changed_at) AS changed_at FROM task_changes
+                    WHERE op = 'delete' AND seq <= %(before_seq)s
+                ) AS deleted
+                """,
+                {"before_seq": before_seq},
+            )
+            cur = conn.execute(
+                """
+                DELETE FROM task_changes AS c
+                WHERE (c.op = 'delete' AND c.seq <= %(before_seq)s)
+                    OR EXISTS (
+                        SELECT 1 FROM task_changes AS n
+                        WHERE n.task_id = c.task_id
+                            AND n.user_id = c.user_id
+                            AND n.seq > c.seq
+                    )
+                """,
+                {"before_seq": before_seq},
+            )
+            return cur.rowcount
+
+        return run_pg_write(compact)
+
+    def compact_changes_retaining(self, retain: int) -> int:
+        """Removes change feed entries that are no longer needed, keeping the tombstones of the
+        last `retain` entries.
+
+        Args:
+            retain (int): Number of most recent entries to keep tombstones for.
+
+        Returns:
+            int: The number of removed entries.
+        """
+        return self.compact_changes(self.change_feed_bounds()[1] - retain)
+
+    def _search_filter(
+        self,
+        user_id: int,
+        title: str | None,
+        description: str | None,
+        status: str | None,
+        open_only: bool,
+        due_from: date | None,
+        due_to: date | None,
+        sort: str | None,
+        limit: int | None,
+        offset: int,
+    ) -> tuple[str, dict, str]:
+        """Build the WHERE clause, named parameters and ORDER BY clause shared by the search methods.
+
+        Like `SQLTaskRepository._search_filter`, with ILIKE for SQLite's case-insensitive LIKE.
+
+        Args:
+            user_id (int): The ID of the user whose tasks to search.
+            title (str | None): Optional title substring to search for.
+            description (str | None): Optional description substring to search for.
+            status (str | None): Optional exact status to filter by.
+            open_only (bool): Only include tasks that are not completed. Defaults to False.
+            due_from (date | None): Optional first due date to include.
+            due_to (date | None): Optional last due date to include.
+            sort (str | None): Optional sort key, one of `sort_keys`. Defaults to ID order.
+            limit (int | None): Optional maximum number of tasks to return.
+            offset (int): Number of matching tasks to skip. Defaults to 0.
+
+        Returns:
+            tuple[str, dict, str]: The WHERE clause, its named parameters (including `limit` and
+                `offset`) and the ORDER BY clause.
+        """
+        where = "user_id = %(user_id)s"
+        params: dict = {"user_id": user_id}
+
+        if title is not None:
+            where += " AND title ILIKE %(title)s"
+            params["title"] = f"%{title}%"
+        if description is not None:
+            where += " AND description ILIKE %(description)s"
+            params["description"] = f"%{description}%"
+        if status is not None:
+            where += " AND status = %(status)s"
+            params["status"] = status
+        if open_only:
+            where += " AND status != 'Completed'"
+        if due_from is not None:
+            where += " AND due_day >= %(due_from)s"
+            params["due_from"] = due_from.toordinal()
+        if due_to is not None:
+            where += " AND due_day <= %(due_to)s"
+            params["due_to"] = due_to.toordinal()
+
+        # LIMIT NULL is no limit
+        params["limit"] = limit
+        params["offset"] = offset
+        return where, params, _ORDER_BY.get(sort, "id")
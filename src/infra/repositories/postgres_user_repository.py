@@ -0,0 +1,310 @@
+from typing import Iterator
+
+from flask_bcrypt import Bcrypt
+from psycopg import Connection
+from psycopg.errors import UniqueViolation
+
+from src.core.errors import (
+    DomainError,
+    EmailTaken,
+    InvalidPassword,
+    UserCreationError,
+    UsernameTaken,
+    UserNotFoundError,
+)
+from src.core.ports.user_repository import RepositoryError, UserRepository
+from src.core.result import Result
+from src.core.user import User
+from src.infra.postgres import (
+    get_pg_connection,
+    iter_server_cursor,
+    run_pg_write,
+)
+from src.infra.repositories.postgres_row_mappers import (
+    AUTH_USER_COLUMNS,
+    USER_COLUMNS,
+    user_row,
+)
+
+
+class PostgresUserRepository(UserRepository):
+    """PostgreSQL implementation of UserRepository using Flask-Bcrypt for password hashing."""
+
+    def __init__(self, bcrypt: Bcrypt):
+        """Initialize the Postgres user repository.
+
+        Args:
+            bcrypt (Bcrypt): The Flask-Bcrypt instance for password hashing.
+        """
+        self.bcrypt = bcrypt
+
+    def find_by_username(self, username: str) -> User | None:
+        """Find a user by username.
+
+        Args:
+            username (str): The username to search for.
+
+        Returns:
+            User | None: The User object if found, otherwise None.
+        """
+        return self._query(
+            f"SELECT {USER_COLUMNS} FROM users WHERE username = %s",
+            (username,),
+        ).fetchone()
+
+    def find_by_username_or_email(self, username_or_email: str) -> User | None:
+        """Find a user by username or email.
+
+        Args:
+            username_or_email (str): The username or email to search for.
+
+        Returns:
+            User | None: The User object if found, otherwise None.
+        """
+        return self._query(
+            f"SELECT {USER_COLUMNS} FROM users WHERE username = %(name)s OR email = %(name)s",
+            {"name": username_or_email},
+        ).fetchone()
+
+    def load_for_auth(self, username_or_email: str) -> User | None:
+        """Load a user with password hash for authentication.
+
+        Args:
+            username_or_email (str): The username or email of the user.
+
+        Returns:
+            User | None: The User object with pw_hash if found, otherwise None.
+        """
+        return self._query(
+            f"SELECT {AUTH_USER_COLUMNS} FROM users WHERE username = %(name)s OR email = %(name)s",
+            {"name": username_or_email},
+        ).fetchone()
+
+    def verify_password(self, user: User, password: str) -> bool:
+        """Verify a user's password against the stored hash.
+
+        Args:
+            user (User): The user whose password is to be verified.
+            password (str): The plaintext password to verify.
+
+        Returns:
+            bool: True if the password matches, False otherwise.
+        """
+        return self.bcrypt.check_password_hash(user.pw_hash, password)
+
+    def get_by_id(self, user_id: int) -> User | None:
+        """Retrieve a user by their ID.
+
+        Args:
+            user_id (int): The ID of the user.
+
+        Returns:
+            User | None: The User object if found, otherwise None.
+        """
+        return self._query(
+            f"SELECT {USER_COLUMNS} FROM users WHERE id = %s", (user_id,)
+        ).fetchone()
+
+    def list_all(self) -> list[User]:
+        """List all users in the repository.
+
+        Returns:
+            list[User]: A list of all users.
+        """
+        return self._query(f"SELECT {USER_COLUMNS} FROM users").fetchall()
+
+    def iter_all(self, batch_size: int | None = None) -> Iterator[User]:
+        """Iterate over all users in the repository in batches of a server-side cursor.
+
+        The connection is acquired eagerly, so when the iterator is consumed by a
+        streaming response it must be wrapped with `stream_with_context`.
+
+        Args:
+            batch_size (int | None): Rows fetched per batch. Defaults to `iter_batch_size`.
+
+        Returns:
+            Iterator[User]: An iterator over all users.
+        """
+        return iter_server_cursor(
+            self._get_connection(),
+            f"SELECT {USER_COLUMNS} FROM users",
+            None,
+            user_row,
+            batch_size or self.iter_batch_size,
+        )
+
+    def register(
+        self, username: str, email: str, password: str
+    ) -> Result[User, RepositoryError]:
+        """Register a new user in the repository.
+
+        Args:
+            username (str): The desired username.
+            email (str): The user's email address.
+            password (str): The plaintext password.
+
+        Returns:
+            Result[User, RepositoryError]: The created User or an error if registration failed.
+        """
+        conn = self._get_connection()
+        first_user = self._repo_is_empty(conn)
+
+        if not first_user and self._username_is_taken(conn, username):
+            return Result.Err(UsernameTaken(username))
+
+        if not first_user and self._email_is_taken(conn, email):
+            return Result.Err(EmailTaken(email))
+
+        if self._password_is_too_short(password):
+            return Result.Err(InvalidPassword(password))
+
+        created_user_result = self._create_user(
+            username=username,
+            email=email,
+            password=password,
+            is_admin=first_user,
+        )
+        if created_user_result.is_err:
+            return Result.Err(created_user_result.unwrap_err())
+
+        return Result.Ok(created_user_result.unwrap())
+
+    def _repo_is_empty(self, conn: Connection) -> bool:
+        """Check if the users repository is empty.
+
+        Args:
+            conn (Connection): The Postgres connection.
+
+        Returns:
+            bool: True if no users exist in the repository, False otherwise.
+        """
+        return conn.execute(
+            "SELECT NOT EXISTS (SELECT 1 FROM users)"
+        ).fetchone()[0]
+
+    def _username_is_taken(self, conn: Connection, username: str) -> bool:
+        """Check if a username is already taken.
+
+        Args:
+            conn (Connection): The Postgres connection.
+            username (str): The username to check.
+
+        Returns:
+            bool: True if the username exists, False otherwise.
+        """
+        return conn.execute(
+            "SELECT EXISTS (SELECT 1 FROM users WHERE username = %s)",
+            (username,),
+        ).fetchone()[0]
+
+    def _email_is_taken(self, conn: Connection, email: str) -> bool:
+        """Check if an email is already taken.
+
+        Args:
+            conn (Connection): The Postgres connection.
+            email (str): The email to check.
+
+        Returns:
+            bool: True if the email exists, False otherwise.
+        """
+        return conn.execute(
+            "SELECT EXISTS (SELECT 1 FROM users WHERE email = %s)",
+            (email,),
+        ).fetchone()[0]
+
+    def _create_user(
+        self, username: str, email: str, password: str, is_admin: bool
+    ) -> Result[User, DomainError | UserCreationError]:
+        """Insert a new user into the database and return the created user.
+
+        A concurrent registration of the same name or email is caught by the unique constraints.
+
+        Args:
+            username (str): The desired username.
+            email (str): The user's email address.
+            password (str): The plaintext password.
+            is_admin (bool): Whether the user should have admin privileges.
+
+        Returns:
+            Result[User, DomainError | UserCreationError]: Ok(User) if creation succeeded, Err on validation or insertion error.
+        """
+        pw_hash = self.bcrypt.generate_password_hash(password).decode()
+
+        created_user_result = User.create(
+            id=0,  # ID will be assigned by the database
+            username=username,
+            email=email,
+            pw_hash=pw_hash,
+            is_admin=is_admin,
+        )
+        if created_user_result.is_err:
+            return Result.Err(created_user_result.unwrap_err())
+
+        created_user = created_user_result.unwrap()
+
+        try:
+            user = run_pg_write(
+                lambda conn: conn.cursor(row_factory=user_row)
+                .execute(
+                    "INSERT INTO users (username, email, pw_hash, is_admin) VALUES (%s, %s, %s, %s) "
+                    f"RETURNING {USER_COLUMNS}",
+                    (
+                        created_user.username,
+                        created_user.email,
+                        pw_hash,
+                        is_admin,
+                    ),
+                )
+                .fetchone()
+            )
+        except UniqueViolation as e:
+            if e.diag.constraint_name == "users_email_key":
+                return Result.Err(EmailTaken(email))
+            return Result.Err(UsernameTaken(username))
+        if not user:
+            return Result.Err(UserCreationError())
+
+        return Result.Ok(user)
+
+    def delete(self, username_or_email: str) -> None | DomainError:
+        """Delete a user by username or email.
+
+        Args:
+            username_or_email (str): The username or email of the user to delete.
+
+        Returns:
+            None | DomainError: None if deletion was successful, UserNotFoundError if not found.
+        """
+        user = self.find_by_username_or_email(username_or_email)
+        if not user:
+            return UserNotFoundError(username_or_email)
+
+        run_pg_write(
+            lambda conn: conn.execute(
+                "DELETE FROM users WHERE id = %s", (user.id,)
+            )
+        )
+
+    def _get_connection(self) -> Connection:
+        """Get the request's pooled Postgres connection.
+
+        Returns:
+            Connection: The connection, in autocommit mode.
+        """
+        return get_pg_connection()
+
+    def _query(self, sql: str, params=None):
+        """Execute a user query on a cursor of the request connection that yields User objects."""
+        cur = self._get_connection().cursor(row_factory=user_row)
+        return cur.execute(sql, params)
+
+    def _password_is_too_short(self, password: str) -> bool:
+        """Determine if a password is shorter than the minimum allowed length.
+
+        Args:
+            password (str): The plaintext password to check.
+
+        Returns:
+            bool: True if the password length is less than the minimum, False otherwise.
+        """
+        return len(password) < self.min_password_length
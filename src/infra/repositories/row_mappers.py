@@ -0,0 +1,216 @@
+from sqlite3 import Connection, Cursor
+from typing import Iterator
+
+import json
+
+from src.core.job import Job
+from src.core.task import Task, TaskSummary
+from src.core.task_change import TaskChange
+from src.core.user import User
+
+# Column order matches the positional arguments of the domain constructors so
+# rows can be mapped without any per-column key lookups.
+TASK_COLUMNS = (
+    "id, title, description, due_date, status, user_id, version, "
+    "created_at, updated_at"
+)
+SUMMARY_COLUMNS = (
+    "id, title, due_date, status, user_id, "
+    "substr(COALESCE(description, ''), 1, :preview_length), "
+    "length(description) > :preview_length, version"
+)
+# `c` is task_changes, `t` the LEFT JOINed task, NULL once the task is gone
+CHANGE_COLUMNS = (
+    "c.seq, c.task_id, c.op, "
+    "t.id, t.title, t.description, t.due_date, t.status, t.user_id, t.version, "
+    "t.created_at, t.updated_at"
+)
+USER_COLUMNS = "id, username, email, NULL AS pw_hash, is_admin"
+AUTH_USER_COLUMNS = "id, username, email, pw_hash, is_admin"
+# payload and result are stored as JSON text
+JOB_COLUMNS = (
+    "id, kind, payload, user_id, status, attempts, max_attempts, progress, "
+    "result, error"
+)
+
+
+def task_row_factory(cursor: Cursor, row: tuple) -> Task:
+    """Cursor row factory that builds a Task straight from the raw row tuple.
+
+    Args:
+        cursor (Cursor): The cursor producing the row (unused).
+        row (tuple): Row selected with `TASK_COLUMNS`.
+
+    Returns:
+        Task: The mapped task.
+    """
+    return Task(*row)
+
+
+def summary_row_factory(cursor: Cursor, row: tuple) -> TaskSummary:
+    """Cursor row factory that builds a TaskSummary from the raw row tuple.
+
+    Args:
+        cursor (Cursor): The cursor producing the row (unused).
+        row (tuple): Row selected with `SUMMARY_COLUMNS`.
+
+    Returns:
+        TaskSummary: The mapped task summary.
+    """
+    return TaskSummary(
+        row[0], row[1], row[2], row[3], row[4], row[5], bool(row[6]), row[7]
+    )
+
+
+def change_row_factory(cursor: Cursor, row: tuple) -> TaskChange:
+    """Cursor row factory that builds a TaskChange from the raw row tuple.
+
+    An upsert whose task no longer exists is reported as a delete.
+
+    Args:
+        cursor (Cursor): The cursor producing the row (unused).
+        row (tuple): Row selected with `CHANGE_COLUMNS`.
+
+    Returns:
+        TaskChange: The mapped change.
+    """
+    if row[3] is None:
+        return TaskChange(row[0], row[1], "delete")
+    return TaskChange(row[0], row[1], row[2], Task(*row[3:]))
+
+
+def user_row_factory(cursor: Cursor, row: tuple) -> User:
+    """Cursor row factory that builds a User straight from the raw row tuple.
+
+    Args:
+        cursor (Cursor): The cursor producing the row (unused).
+        row (tuple): Row selected with `USER_COLUMNS` or `AUTH_USER_COLUMNS`.
+
+    Returns:
+        User: The mapped user.
+    """
+    return User(row[0], row[1], row[2], row[3], bool(row[4]))
+
+
+def job_row_factory(cursor: Cursor, row: tuple) -> Job:
+    """Cursor row factory that builds a Job from the raw row tuple, decoding its JSON columns.
+
+    Args:
+        cursor (Cursor): The cursor producing the row (unused).
+        row (tuple): Row selected with `JOB_COLUMNS`.
+
+    Returns:
+        Job: The mapped job.
+    """
+    return Job(
+        row[0],
+        row[1],
+        json.loads(row[2]),
+        row[3],
+        row[4],
+        row[5],
+        row[6],
+        row[7],
+        json.loads(row[8]) if row[8] is not None else None,
+        row[9],
+    )
+
+
+def query_tasks(conn: Connection, sql: str, params: tuple = ()) -> Cursor:
+    """Execute a task query on a cursor that yields Task objects.
+
+    Args:
+        conn (Connection): The SQLite database connection.
+        sql (str): A query selecting `TASK_COLUMNS`.
+        params (tuple): Query parameters.
+
+    Returns:
+        Cursor: A cursor whose rows are Task instances.
+    """
+    cur = conn.cursor()
+    cur.row_factory = task_row_factory
+    return cur.execute(sql, params)
+
+
+def query_summaries(conn: Connection, sql: str, params: dict) -> Cursor:
+    """Execute a summary query on a cursor that yields TaskSummary objects.
+
+    Args:
+        conn (Connection): The SQLite database connection.
+        sql (str): A query selecting `SUMMARY_COLUMNS`.
+        params (dict): Named query parameters, including `preview_length`.
+
+    Returns:
+        Cursor: A cursor whose rows are TaskSummary instances.
+    """
+    cur = conn.cursor()
+    cur.row_factory = summary_row_factory
+    return cur.execute(sql, params)
+
+
+def query_changes(conn: Connection, sql: str, params: dict) -> Cursor:
+    """Execute a change feed query on a cursor that yields TaskChange objects.
+
+    Args:
+        conn (Connection): The SQLite database connection.
+        sql (str): A query selecting `CHANGE_COLUMNS`.
+        params (dict): Named query parameters.
+
+    Returns:
+        Cursor: A cursor whose rows are TaskChange instances.
+    """
+    cur = conn.cursor()
+    cur.row_factory = change_row_factory
+    return cur.execute(sql, params)
+
+
+def query_users(conn: Connection, sql: str, params: tuple = ()) -> Cursor:
+    """Execute a user query on a cursor that yields User objects.
+
+    Args:
+        conn (Connection): The SQLite database connection.
+        sql (str): A query selecting `USER_COLUMNS` or `AUTH_USER_COLUMNS`.
+        params (tuple): Query parameters.
+
+    Returns:
+        Cursor: A cursor whose rows are User instances.
+    """
+    cur = conn.cursor()
+    cur.row_factory = user_row_factory
+    return cur.execute(sql, params)
+
+
+def query_jobs(conn: Connection, sql: str, params: dict) -> Cursor:
+    """Execute a job query on a cursor that yields Job objects.
+
+    Args:
+        conn (Connection): The SQLite database connection.
+        sql (str): A query selecting or returning `JOB_COLUMNS`.
+        params (dict): Named query parameters.
+
+    Returns:
+        Cursor: A cursor whose rows are Job instances.
+    """
+    cur = conn.cursor()
+    cur.row_factory = job_row_factory
+    return cur.execute(sql, params)
+
+
+def iter_cursor(cur: Cursor, batch_size: int) -> Iterator:
+    """Yield the mapped rows of a cursor, fetching `batch_size` rows at a time.
+
+    SQLite steps the statement lazily, so at most one batch of rows is held
+    in memory while the caller consumes the iterator.
+
+    Args:
+        cur (Cursor): An executed cursor.
+        batch_size (int): Number of rows fetched per round trip.
+
+    Yields:
+        The objects produced by the cursor's row factory.
+    """
+    try:
+        while rows := cur.fetchmany(batch_size):
+            yield from rows
+    finally:
+        cur.close()
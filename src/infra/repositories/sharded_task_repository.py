@@ -0,0 +1,782 @@
+"""
+Tasks partitioned across several SQLite database files by user, so that writes of different
+users do not queue on one database's write lock.
+
+Each shard is a database file with the app's schema and its own WriteCoordinator. The shard
+of a user is recorded in the main database's `task_shard_directory` when their first task is
+created, chosen by a hash of the user ID, and only changes when `rebalance` moves the user.
+Users without an entry have no tasks.
+
+Task IDs stay unique across shards: each shard creates IDs in its own range of
+`SHARD_ID_SPAN` IDs, below which lie the IDs of tasks created before sharding. Tasks keep
+their ID when their user is moved, lookups by ID try the shard that created the ID first.
+
+A user's change feed is served by their shard. Moving a user continues the target shard's
+sequence numbers above the source's, so the user's sync cursors stay valid.
+
+Writes check the directory again once they hold their shard's write lock. A write that picked
+the shard of a user who has moved since fails with TasksMovedError and is retried on the
+user's new shard.
+"""
+
+from contextlib import ExitStack, contextmanager
+from datetime import date
+from itertools import chain
+from pathlib import Path
+from sqlite3 import Connection, IntegrityError
+from typing import Callable, Iterator
+
+from flask import current_app
+
+import sqlite3
+import zlib
+
+from src.core.errors import (
+    InfrastructureError,
+    TaskNotFoundError,
+    TasksMovedError,
+)
+from src.core.ports.task_repository import RepositoryError, TaskRepository
+from src.core.result import Result
+from src.core.task import Task, TaskSummary
+from src.core.task_change import TaskChange
+from src.core.task_stats import TaskStats
+from src.core.timestamp import now_timestamp
+from src.infra.db import get_connection, init_db, run_write
+from src.infra.repositories.sql_task_repository import SQLTaskRepository
+
+# IDs created by one shard, enough for any single SQLite file while IDs of
+# thousands of shards stay exact in JavaScript clients
+SHARD_ID_SPAN = 2**40
+
+# columns copied when a user's tasks move, `due_day` is generated
+_MOVED_COLUMNS = (
+    "id, user_id, title, description, due_date, status, version, "
+    "created_at, updated_at"
+)
+
+
+def shard_of_user(user_id: int, count: int) -> int:
+    """Return the shard a user is placed on, by a hash of their ID that is stable across processes.
+
+    Args:
+        user_id (int): The ID of the user.
+        count (int): The number of shards.
+
+    Returns:
+        int: The index of the shard.
+    """
+    return zlib.crc32(user_id.to_bytes(8, "big")) % count
+
+
+def _remove_user(
+    conn: Connection, user_id: int, created_before: str | None = None
+) -> None:
+    """Delete a user's tasks, change feed entries and statistics from a database.
+
+    Args:
+        conn (Connection): The connection, inside the caller's transaction.
+        user_id (int): The ID of the user.
+        created_before (str | None): Only delete tasks created before this time, and the feed entries of tasks that are gone. Defaults to everything.
+    """
+    if created_before is None:
+        conn.execute("DELETE FROM tasks WHERE user_id = ?", (user_id,))
+        conn.execute("DELETE FROM task_changes WHERE user_id = ?", (user_id,))
+        conn.execute("DELETE FROM task_stats WHERE user_id = ?", (user_id,))
+        return
+    conn.execute(
+        "DELETE FROM tasks WHERE user_id = ? AND created_at < ?",
+        (user_id, created_before),
+    )
+    conn.execute(
+        """
+        DELETE FROM task_changes
+        WHERE user_id = :user_id
+            AND task_id NOT IN (SELECT id FROM tasks WHERE user_id = :user_id)
+        """,
+        {"user_id": user_id},
+    )
+
+
+def _set_shard(conn: Connection, user_id: int, index: int) -> int:
+    """Record the shard of a user in the directory, returns whether it was added or changed."""
+    return conn.execute(
+        """
+        INSERT INTO task_shard_directory (user_id, shard, placed_at)
+        VALUES (?, ?, ?)
+        ON CONFLICT (user_id) DO UPDATE SET shard = excluded.shard
+        WHERE shard != excluded.shard
+        """,
+        (user_id, index, now_timestamp()),
+    ).rowcount
+
+
+def _placed_on(database: str, user_id: int, index: int) -> bool:
+    """Whether the directory places a user on a shard. Read on a connection of its own, so that
+    it sees the latest committed move from any thread, e.g. a shard's writer thread.
+    """
+    conn = sqlite3.connect(database)
+    try:
+        row = conn.execute(
+            "SELECT shard FROM task_shard_directory WHERE user_id = ?",
+            (user_id,),
+        ).fetchone()
+    finally:
+        conn.close()
+    return row is not None and row[0] == index
+
+
+class ShardedTaskRepository(TaskRepository):
+    def __init__(self, directory: str, count: int) -> None:
+        """Initializes a ShardedTaskRepository.
+
+        Args:
+            directory (str): Directory of the shard files, `tasks-<index>.db`.
+            count (int): The number of shards new users are placed on.
+        """
+        self.directory = directory
+        self.count = count
+        self._shards: dict[int, SQLTaskRepository] = {}
+
+    def shard(self, index: int) -> SQLTaskRepository:
+        """Returns the repository of one shard, which may lie beyond `count` until rebalanced.
+
+        Args:
+            index (int): The index of the shard.
+
+        Returns:
+            SQLTaskRepository: The repository of the shard's database file.
+        """
+        repo = self._shards.get(index)
+        if repo is None:
+            low = (index + 1) * SHARD_ID_SPAN
+            main = current_app.config["DATABASE"]
+            repo = SQLTaskRepository(
+                str(Path(self.directory, f"tasks-{index}.db")),
+                id_range=(low, low + SHARD_ID_SPAN),
+                # an in-memory directory cannot be read from the writer threads
+                holds_user=(
+                    None
+                    if main == ":memory:"
+                    else lambda user_id: _placed_on(main, user_id, index)
+                ),
+            )
+            self._shards[index] = repo
+        return repo
+
+    def shard_indexes(self) -> list[int]:
+        """Lists the shards that hold tasks or receive new users.
+
+        Returns:
+            list[int]: The indexes of the shards, in order.
+        """
+        placed = get_connection().execute(
+            "SELECT DISTINCT shard FROM task_shard_directory"
+        )
+        return sorted(set(range(self.count)).union(row[0] for row in placed))
+
+    def init_shards(self) -> None:
+        """Creates the shard files of `count` shards and applies the schema and its migrations."""
+        Path(self.directory).mkdir(parents=True, exist_ok=True)
+        for index in range(self.count):
+            init_db(self.shard(index).database)
+
+    def _shards_in_use(self) -> list[SQLTaskRepository]:
+        return [self.shard(index) for index in self.shard_indexes()]
+
+    def _shard_index_of(self, user_id: int) -> int | None:
+        row = (
+            get_connection()
+            .execute(
+                "SELECT shard FROM task_shard_directory WHERE user_id = ?",
+                (user_id,),
+            )
+            .fetchone()
+        )
+        return None if row is None else row[0]
+
+    def _shard_of(self, user_id: int) -> SQLTaskRepository | None:
+        """The shard of a user, None while they never had a task."""
+        index = self._shard_index_of(user_id)
+        return None if index is None else self.shard(index)
+
+    def _place(self, user_id: int) -> SQLTaskRepository:
+        """The shard of a user, placing them on the shard of their hash if they have none yet."""
+        index = self._shard_index_of(user_id)
+        if index is not None:
+            return self.shard(index)
+        index = shard_of_user(user_id, self.count)
+        placed_at = now_timestamp()
+        placed = run_write(
+            lambda conn: conn.execute(
+                """
+                INSERT INTO task_shard_directory (user_id, shard, placed_at)
+                VALUES (?, ?, ?)
+                ON CONFLICT (user_id) DO NOTHING
+                """,
+                (user_id, index, placed_at),
+            ).rowcount
+        )
+        if not placed:
+            # placed by a concurrent request
+            return self._place(user_id)
+        shard = self.shard(index)
+        # the shard may hold tasks of a deleted user who had the same ID
+        run_write(
+            lambda conn: _remove_user(conn, user_id, created_before=placed_at),
+            shard.database,
+        )
+        return shard
+
+    def get_by_id(self, task_id: int) -> Task | None:
+        """Retrieves a task by its ID, from the shard that created it or the one its user moved to.
+
+        Args:
+            task_id (int): The ID of the task to retrieve.
+        Returns:
+            Task | None: The task with the specified ID, or None if not found.
+        """
+        home = (task_id - 1) // SHARD_ID_SPAN - 1
+        indexes = self.shard_indexes()
+        if home in indexes:
+            indexes.remove(home)
+            indexes.insert(0, home)
+        for index in indexes:
+            task = self.shard(index).get_by_id(task_id)
+            # copies left behind by an interrupted move are ignored
+            if (
+                task is not None
+                and self._shard_index_of(task.user_id) == index
+            ):
+                return task
+        return None
+
+    def list_all(self) -> list[Task]:
+        """Lists all tasks of all shards. WARNING: This method retrieves all tasks without filtering by user.
+
+        Returns:
+            list[Task]: A list of all tasks.
+        """
+        return list(self.iter_all())
+
+    def list_by_user(self, user_id: int) -> list[Task]:
+        """Lists all tasks for a specific user.
+
+        Args:
+            user_id (int): The ID of the user whose tasks to retrieve.
+
+        Returns:
+            list[Task]: A list of tasks for the specified user.
+        """
+        shard = self._shard_of(user_id)
+        return [] if shard is None else shard.list_by_user(user_id)
+
+    def iter_all(self, batch_size: int | None = None) -> Iterator[Task]:
+        """Iterates over all tasks of all shards in batches, shard by shard. WARNING: This method retrieves all tasks without filtering by user.
+
+        The connections are acquired eagerly, so when the iterator is consumed by a
+        streaming response it must be wrapped with `stream_with_context`.
+
+        Args:
+            batch_size (int | None): Rows fetched per batch. Defaults to `iter_batch_size`.
+
+        Returns:
+            Iterator[Task]: An iterator over all tasks.
+        """
+        return chain.from_iterable(
+            [shard.iter_all(batch_size) for shard in self._shards_in_use()]
+        )
+
+    def iter_by_user(
+        self, user_id: int, batch_size: int | None = None
+    ) -> Iterator[Task]:
+        """Iterates over the tasks of a specific user in batches.
+
+        Args:
+            user_id (int): The ID of the user whose tasks to retrieve.
+            batch_size (int | None): Rows fetched per batch. Defaults to `iter_batch_size`.
+
+        Returns:
+            Iterator[Task]: An iterator over the user's tasks.
+        """
+        shard = self._shard_of(user_id)
+        if shard is None:
+            return iter(())
+        return shard.iter_by_user(user_id, batch_size)
+
+    def iter_changed_since(
+        self, user_id: int, since: str, batch_size: int | None = None
+    ) -> Iterator[Task]:
+        """Iterates over the tasks of a specific user created or updated at or after a time, in batches.
+
+        Args:
+            user_id (int): The ID of the user whose tasks to retrieve.
+            since (str): Timestamp of the earliest change to include, see `src.core.timestamp`.
+            batch_size (int | None): Rows fetched per batch. Defaults to `iter_batch_size`.
+
+        Returns:
+            Iterator[Task]: An iterator over the changed tasks, ordered by update time.
+        """
+        shard = self._shard_of(user_id)
+        if shard is None:
+            return iter(())
+        return shard.iter_changed_since(user_id, since, batch_size)
+
+    def deleted_since(self, user_id: int, since: str) -> list[tuple[int, str]]:
+        """Lists the tasks a user lost at or after a time from the change feed's tombstones.
+
+        Args:
+            user_id (int): The ID of the user.
+            since (str): Timestamp of the earliest deletion to include.
+
+        Returns:
+            list[tuple[int, str]]: The task IDs and deletion times, oldest first.
+        """
+        shard = self._shard_of(user_id)
+        return [] if shard is None else shard.deleted_since(user_id, since)
+
+    def compacted_at(self) -> str | None:
+        """Reads the time of the newest tombstone removed by `compact_changes` on any shard.
+
+        Returns:
+            str | None: The timestamp, None if no tombstone was removed yet.
+        """
+        times = [shard.compacted_at() for shard in self._shards_in_use()]
+        return max((time for time in times if time is not None), default=None)
+
+    @contextmanager
+    def snapshot(self) -> Iterator[None]:
+        """Runs the reads inside the block in one read transaction per shard. A user's tasks live in
+        one shard, so reads of one user are consistent, reads across users need not be.
+
+        Yields:
+            None: Control, while the transactions are open.
+        """
+        with ExitStack() as stack:
+            for shard in self._shards_in_use():
+                stack.enter_context(shard.snapshot())
+            yield
+
+    def create(
+        self,
+        title: str,
+        description: str,
+        due_date: str,
+        status: str,
+        user_id: int,
+    ) -> Result[Task, RepositoryError]:
+        """Creates a new task in the user's shard, placing the user on a shard first if needed.
+
+        Args:
+            title (str): The title of the task.
+            description (str): The description of the task.
+            due_date (str): The due date of the task.
+            status (str): The status of the task.
+            user_id (int): The ID of the user who owns the task.
+
+        Returns:
+            Result[Task, RepositoryError]: The created task or an error if creation failed.
+        """
+        while True:
+            try:
+                shard = self._place(user_id)
+            except IntegrityError as e:
+                return Result.Err(InfrastructureError(str(e)))
+            try:
+                return shard.create(
+                    title, description, due_date, status, user_id
+                )
+            except TasksMovedError:
+                # moved by a rebalance while the write waited for the shard
+                continue
+
+    def update(
+        self,
+        task_id: int,
+        title: str,
+        description: str,
+        due_date: str,
+        status: str,
+        user_id: int,
+    ) -> Result[Task, RepositoryError]:
+        """Updates an existing task in the user's shard.
+
+        Args:
+            task_id (int): The ID of the task to update.
+            title (str): The new title of the task.
+            description (str): The new description of the task.
+            due_date (str): The new due date of the task.
+            status (str): The new status of the task.
+            user_id (int): The ID of the user who owns the task.
+
+        Returns:
+            Result[Task, RepositoryError]: The updated task or an error if the update failed.
+        """
+        while True:
+            shard = self._shard_of(user_id)
+            if shard is None:
+                return Result.Err(TaskNotFoundError(task_id))
+            try:
+                return shard.update(
+                    task_id, title, description, due_date, status, user_id
+                )
+            except TasksMovedError:
+                continue
+
+    def delete(self, task_id: int) -> None | TaskNotFoundError:
+        """Deletes a task by its ID.
+
+        Args:
+            task_id (int): The ID of the task to delete.
+
+        Returns:
+            None | DomainError: None if deletion was successful, DomainError if task was not found.
+        """
+        while True:
+            task = self.get_by_id(task_id)
+            if task is None:
+                return TaskNotFoundError(task_id)
+            shard = self._shard_of(task.user_id)
+            assert shard is not None
+            try:
+                return shard.delete(task_id)
+            except TasksMovedError:
+                continue
+
+    def search(
+        self,
+        user_id: int,
+        title: str | None = None,
+        description: str | None = None,
+        status: str | None = None,
+        open_only: bool = False,
+        due_from: date | None = None,
+        due_to: date | None = None,
+        sort: str | None = None,
+        limit: int | None = None,
+        offset: int = 0,
+    ) -> list[Task]:
+        """Searches the tasks of a user in their shard, see `SQLTaskRepository.search`.
+
+        Returns:
+            list[Task]: A list of tasks matching the search criteria.
+        """
+        shard = self._shard_of(user_id)
+        if shard is None:
+            return []
+        return shard.search(
+            user_id,
+            title,
+            description,
+            status,
+            open_only,
+            due_from,
+            due_to,
+            sort,
+            limit,
+            offset,
+        )
+
+    def list_all_summaries(self) -> list[TaskSummary]:
+        """Lists summaries of all tasks of all shards. WARNING: This method retrieves all tasks without filtering by user.
+
+        Returns:
+            list[TaskSummary]: A list of summaries of all tasks.
+        """
+        return [
+            summary
+            for shard in self._shards_in_use()
+            for summary in shard.list_all_summaries()
+        ]
+
+    def list_summaries_by_user(self, user_id: int) -> list[TaskSummary]:
+        """Lists summaries of all tasks for a specific user.
+
+        Args:
+            user_id (int): The ID of the user whose tasks to retrieve.
+
+        Returns:
+            list[TaskSummary]: A list of task summaries for the specified user.
+        """
+        return self.search_summaries(user_id)
+
+    def search_summaries(
+        self,
+        user_id: int,
+        title: str | None = None,
+        description: str | None = None,
+        status: str | None = None,
+        open_only: bool = False,
+        due_from: date | None = None,
+        due_to: date | None = None,
+        sort: str | None = None,
+        limit: int | None = None,
+        offset: int = 0,
+    ) -> list[TaskSummary]:
+        """Searches the task summaries of a user in their shard, see `SQLTaskRepository.search_summaries`.
+
+        Returns:
+            list[TaskSummary]: Summaries of the tasks matching the search criteria.
+        """
+        shard = self._shard_of(user_id)
+        if shard is None:
+            return []
+        return shard.search_summaries(
+            user_id,
+            title,
+            description,
+            status,
+            open_only,
+            due_from,
+            due_to,
+            sort,
+            limit,
+            offset,
+        )
+
+    def get_stats(self, user_id: int, today: date) -> TaskStats:
+        """Reads the materialized statistics of a user's tasks from their shard.
+
+        Args:
+            user_id (int): The ID of the user.
+            today (date): The date that overdue and due-this-week are relative to.
+
+        Returns:
+            TaskStats: The user's task statistics.
+        """
+        shard = self._shard_of(user_id)
+        return (
+            TaskStats() if shard is None else shard.get_stats(user_id, today)
+        )
+
+    def rebuild_stats(self) -> None:
+        """Recomputes the materialized task statistics of every shard."""
+        for shard in self._shards_in_use():
+            shard.rebuild_stats()
+
+    def changes_since(
+        self, user_id: int, since: int, limit: int | None = None
+    ) -> list[TaskChange]:
+        """Lists the changes of a user's tasks after a sequence number from their shard, oldest first.
+
+        Args:
+            user_id (int): The ID of the user.
+            since (int): The sequence number the client has already synced up to.
+            limit (int | None): Maximum number of changes to return. Defaults to no limit.
+
+        Returns:
+            list[TaskChange]: The changes ordered by sequence number.
+        """
+        shard = self._shard_of(user_id)
+        if shard is None:
+            return []
+        return shard.changes_since(user_id, since, limit)
+
+    def change_feed_bounds(
+        self, user_id: int | None = None
+    ) -> tuple[int, int]:
+        """Reads the range of sequence numbers a change feed can still serve.
+
+        Args:
+            user_id (int | None): The user whose feed to read, that of the shard they are or will be placed on. Defaults to the largest bounds of all shards.
+
+        Returns:
+            tuple[int, int]: The highest compacted sequence number and the latest sequence number.
+        """
+        if user_id is not None:
+            index = self._shard_index_of(user_id)
+            if index is None:
+                index = shard_of_user(user_id, self.count)
+            return self.shard(index).change_feed_bounds()
+        bounds = [
+            shard.change_feed_bounds() for shard in self._shards_in_use()
+        ]
+        return (
+            max(compacted for compacted, _ in bounds),
+            max(head for _, head in bounds),
+        )
+
+    def compact_changes(self, before_seq: int) -> int:
+        """Removes change feed entries that are no longer needed from every shard.
+
+        Args:
+            before_seq (int): Remove tombstones with a sequence number up to this one.
+
+        Returns:
+            int: The number of removed entries.
+        """
+        return sum(
+            shard.compact_changes(before_seq)
+            for shard in self._shards_in_use()
+        )
+
+    def compact_changes_retaining(self, retain: int) -> int:
+        """Removes change feed entries that are no longer needed from every shard. Each shard has a
+        sequence of its own, so each keeps the tombstones of its own last `retain` entries.
+
+        Args:
+            retain (int): Number of most recent entries of each shard to keep tombstones for.
+
+        Returns:
+            int: The number of removed entries.
+        """
+        return sum(
+            shard.compact_changes_retaining(retain)
+            for shard in self._shards_in_use()
+        )
+
+    def rebalance(
+        self, on_move: Callable[[int, int | None, int], None] | None = None
+    ) -> dict[str, int]:
+        """
+        Moves every user to the shard their ID hashes to among `count` shards, e.g. after adding
+        shards, and removes data left behind in other shards by deleted users or interrupted moves.
+        Tasks of the main database, created before sharding was enabled, are moved into the shards
+        too. Writes of a moving user's shard wait until the user has moved. Must be called inside an
+        app context, normally by `flask rebalance-task-shards`.
+
+        Args:
+            on_move (Callable[[int, int | None, int], None] | None): Called with the user ID, source shard (None for the main database) and target shard after each move. Defaults to None.
+
+        Returns:
+            dict[str, int]: The number of users moved and of users whose leftover data was removed.
+        """
+        self.init_shards()
+        main = get_connection()
+        moved = 0
+        legacy = [
+            row[0]
+            for row in main.execute("SELECT DISTINCT user_id FROM tasks")
+        ]
+        for user_id in legacy:
+            target = self._shard_index_of(user_id)
+            if target is None:
+                target = shard_of_user(user_id, self.count)
+            self._move(user_id, None, target, replace=False)
+            moved += 1
+            if on_move is not None:
+                on_move(user_id, None, target)
+
+        placed = main.execute(
+            "SELECT user_id, shard FROM task_shard_directory"
+        ).fetchall()
+        for user_id, index in placed:
+            target = shard_of_user(user_id, self.count)
+            if index != target:
+                self._move(user_id, index, target, replace=True)
+                moved += 1
+                if on_move is not None:
+                    on_move(user_id, index, target)
+
+        shards = dict(
+            main.execute("SELECT user_id, shard FROM task_shard_directory")
+        )
+        indexes = set(self.shard_indexes()).union(
+            int(path.stem.removeprefix("tasks-"))
+            for path in Path(self.directory).glob("tasks-*.db")
+        )
+        purged = 0
+        for index in sorted(indexes):
+            conn = get_connection(self.shard(index).database)
+            user_ids = [
+                row[0]
+                for row in conn.execute(
+                    "SELECT user_id FROM tasks UNION "
+                    "SELECT user_id FROM task_changes UNION "
+                    "SELECT user_id FROM task_stats"
+                )
+            ]
+            for user_id in user_ids:
+                if shards.get(user_id) != index:
+                    _remove_user(conn, user_id)
+                    purged += 1
+            conn.commit()
+        return {"moved": moved, "purged": purged}
+
+    def _move(
+        self, user_id: int, source: int | None, target: int, replace: bool
+    ) -> None:
+        """
+        Copy a user's tasks and tombstones from a shard, or the main database, into another, point the
+        directory at the target and delete them from the source. The source's write lock is held
+        until the directory points at the target, so writes of the user that picked the source
+        before find the user moved once they hold the lock, and are retried on the target. An
+        interrupted move leaves a copy that the directory does not point to, removed by the next
+        rebalance.
+        """
+        main = get_connection()
+        src = (
+            main
+            if source is None
+            else get_connection(self.shard(source).database)
+        )
+        dst = get_connection(self.shard(target).database)
+        src.execute("BEGIN IMMEDIATE")
+        try:
+            tasks = src.execute(
+                f"SELECT {_MOVED_COLUMNS} FROM tasks WHERE user_id = ? ORDER BY id",
+                (user_id,),
+            ).fetchall()
+            tombstones = src.execute(
+                "SELECT task_id, user_id, changed_at FROM task_changes "
+                "WHERE user_id = ? AND op = 'delete' ORDER BY seq",
+                (user_id,),
+            ).fetchall()
+            compacted_through, compacted_at = src.execute(
+                "SELECT compacted_through, compacted_at FROM task_change_log"
+            ).fetchone()
+            head = src.execute(
+                "SELECT COALESCE(MAX(seq), 0) FROM sqlite_sequence "
+                "WHERE name = 'task_changes'"
+            ).fetchone()[0]
+
+            dst.execute("BEGIN IMMEDIATE")
+            try:
+                if replace:
+                    _remove_user(dst, user_id)
+                # continue above the source's feed, so the user's cursors stay valid
+                dst.execute(
+                    "INSERT INTO sqlite_sequence (name, seq) "
+                    "SELECT 'task_changes', 0 WHERE NOT EXISTS "
+                    "(SELECT 1 FROM sqlite_sequence WHERE name = 'task_changes')"
+                )
+                dst.execute(
+                    "UPDATE sqlite_sequence SET seq = MAX(seq, ?) "
+                    "WHERE name = 'task_changes'",
+                    (head,),
+                )
+                dst.executemany(
+                    "INSERT INTO task_changes (task_id, user_id, op, changed_at) "
+                    "VALUES (?, ?, 'delete', ?)",
+                    tombstones,
+                )
+                # the insert triggers add the statistics and an upsert per task
+                dst.executemany(
+                    f"INSERT INTO tasks ({_MOVED_COLUMNS}) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    tasks,
+                )
+                # clients the source made reset must reset on the target too
+                dst.execute(
+                    """
+                    UPDATE task_change_log SET
+                        compacted_through = MAX(compacted_through, :through),
+                        compacted_at = MAX(
+                            COALESCE(compacted_at, :at), COALESCE(:at, compacted_at)
+                        )
+                    """,
+                    {"through": compacted_through, "at": compacted_at},
+                )
+                dst.commit()
+            except BaseException:
+                dst.rollback()
+                raise
+
+            _set_shard(main, user_id, target)
+            if main is not src:
+                main.commit()
+            _remove_user(src, user_id)
+            src.commit()
+        except BaseException:
+            src.rollback()
+            raise
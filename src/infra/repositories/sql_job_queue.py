@@ -0,0 +1,286 @@
+from sqlite3 import Connection
+from typing import Any, Callable
+
+import json
+import time
+
+from src.core.job import Job
+from src.core.ports.job_queue import JobQueue
+from src.infra.db import get_job_connection
+from src.infra.repositories.row_mappers import JOB_COLUMNS, query_jobs
+
+# Only the worker holding the lease may finish or extend a running job. A
+# worker whose lease expired has lost the job to another worker, its writes
+# then match no row.
+_HELD_BY_WORKER = "id = :id AND status = 'running' AND locked_by = :worker"
+
+
+class SQLJobQueue(JobQueue):
+    def __init__(self, clock: Callable[[], float] = time.time) -> None:
+        """Initialize a SQLJobQueue.
+
+        Args:
+            clock (Callable[[], float]): Returns the current unix time. Defaults to `time.time`.
+        """
+        self.clock = clock
+
+    def enqueue(
+        self,
+        kind: str,
+        payload: dict[str, Any],
+        user_id: int | None = None,
+        max_attempts: int | None = None,
+        delay: float = 0.0,
+    ) -> Job:
+        """Adds a job to the queue.
+
+        Args:
+            kind (str): Name of the handler that runs the job.
+            payload (dict[str, Any]): JSON-serializable arguments of the handler.
+            user_id (int | None): The user who requested the job. Defaults to None.
+            max_attempts (int | None): Claims allowed before the job fails for good. Defaults to `default_max_attempts`.
+            delay (float): Seconds before the job becomes claimable. Defaults to 0.0.
+
+        Returns:
+            Job: The queued job.
+        """
+        now = self.clock()
+        conn = self._get_connection()
+        job = query_jobs(
+            conn,
+            f"""
+            INSERT INTO jobs (
+                kind, payload, user_id, max_attempts, run_at, created_at
+            )
+            VALUES (
+                :kind, :payload, :user_id, :max_attempts, :run_at, :now
+            )
+            RETURNING {JOB_COLUMNS}
+            """,
+            {
+                "kind": kind,
+                "payload": json.dumps(payload),
+                "user_id": user_id,
+                "max_attempts": max_attempts or self.default_max_attempts,
+                "run_at": now + delay,
+                "now": now,
+            },
+        ).fetchone()
+        conn.commit()
+        return job
+
+    def get(self, job_id: int) -> Job | None:
+        """Retrieves a job by its ID.
+
+        Args:
+            job_id (int): The ID of the job.
+
+        Returns:
+            Job | None: The job, or None if it does not exist.
+        """
+        return query_jobs(
+            self._get_connection(),
+            f"SELECT {JOB_COLUMNS} FROM jobs WHERE id = :id",
+            {"id": job_id},
+        ).fetchone()
+
+    def claim(
+        self, worker_id: str, lease_seconds: float | None = None
+    ) -> Job | None:
+        """Claims the oldest claimable job: a queued job whose run_at has passed, or a running job
+        whose lease expired. Running jobs that expired on their last attempt are failed first.
+        Both statements run in one write transaction, so concurrent workers never claim the same job.
+
+        Args:
+            worker_id (str): Identifies the claiming worker.
+            lease_seconds (float | None): Lease length. Defaults to `lease_seconds`.
+
+        Returns:
+            Job | None: The claimed job with its attempts incremented, or None if no job is claimable.
+        """
+        now = self.clock()
+        params = {
+            "now": now,
+            "worker": worker_id,
+            "locked_until": now + (lease_seconds or self.lease_seconds),
+        }
+        conn = self._get_connection()
+        try:
+            conn.execute(
+                """
+                UPDATE jobs SET
+                    status = 'failed',
+                    error = COALESCE(error, 'Lease expired'),
+                    locked_by = NULL,
+                    locked_until = NULL,
+                    finished_at = :now
+                WHERE status = 'running'
+                    AND locked_until <= :now
+                    AND attempts >= max_attempts
+                """,
+                params,
+            )
+            job = query_jobs(
+                conn,
+                f"""
+                UPDATE jobs SET
+                    status = 'running',
+                    attempts = attempts + 1,
+                    locked_by = :worker,
+                    locked_until = :locked_until
+                WHERE id = (
+                    SELECT id FROM jobs
+                    WHERE status = 'queued' AND run_at <= :now
+                    UNION ALL
+                    SELECT id FROM jobs
+                    WHERE status = 'running' AND locked_until <= :now
+                    ORDER BY id
+                    LIMIT 1
+                )
+                RETURNING {JOB_COLUMNS}
+                """,
+                params,
+            ).fetchone()
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        return job
+
+    def extend_lease(
+        self,
+        job_id: int,
+        worker_id: str,
+        progress: float | None = None,
+        lease_seconds: float | None = None,
+    ) -> bool:
+        """Extends the lease of a running job and optionally records its progress.
+
+        Args:
+            job_id (int): The ID of the job.
+            worker_id (str): The worker holding the lease.
+            progress (float | None): Fraction of the work done, unchanged when None. Defaults to None.
+            lease_seconds (float | None): New lease length from now. Defaults to `lease_seconds`.
+
+        Returns:
+            bool: False if the worker no longer holds the job.
+        """
+        conn = self._get_connection()
+        cur = conn.execute(
+            f"""
+            UPDATE jobs SET
+                locked_until = :locked_until,
+                progress = COALESCE(:progress, progress)
+            WHERE {_HELD_BY_WORKER}
+            """,
+            {
+                "id": job_id,
+                "worker": worker_id,
+                "progress": progress,
+                "locked_until": self.clock()
+                + (lease_seconds or self.lease_seconds),
+            },
+        )
+        conn.commit()
+        return cur.rowcount == 1
+
+    def complete(
+        self,
+        job_id: int,
+        worker_id: str,
+        result: dict[str, Any] | None = None,
+    ) -> bool:
+        """Marks a running job as succeeded.
+
+        Args:
+            job_id (int): The ID of the job.
+            worker_id (str): The worker holding the lease.
+            result (dict[str, Any] | None): JSON-serializable output of the job. Defaults to None.
+
+        Returns:
+            bool: False if the worker no longer holds the job, the result is then discarded.
+        """
+        conn = self._get_connection()
+        cur = conn.execute(
+            f"""
+            UPDATE jobs SET
+                status = 'succeeded',
+                progress = 1,
+                result = :result,
+                error = NULL,
+                locked_by = NULL,
+                locked_until = NULL,
+                finished_at = :now
+            WHERE {_HELD_BY_WORKER}
+            """,
+            {
+                "id": job_id,
+                "worker": worker_id,
+                "result": json.dumps(result) if result is not None else None,
+                "now": self.clock(),
+            },
+        )
+        conn.commit()
+        return cur.rowcount == 1
+
+    def fail(
+        self, job_id: int, worker_id: str, error: str, retry: bool = True
+    ) -> bool:
+        """Records a failed attempt of a running job. The job is queued again after an exponential
+        backoff while attempts remain and `retry` is set, otherwise it fails for good.
+
+        Args:
+            job_id (int): The ID of the job.
+            worker_id (str): The worker holding the lease.
+            error (str): Description of the failure.
+            retry (bool): Whether the failure is worth retrying. Defaults to True.
+
+        Returns:
+            bool: False if the worker no longer holds the job.
+        """
+        conn = self._get_connection()
+        cur = conn.execute(
+            f"""
+            UPDATE jobs SET
+                status = CASE WHEN :retry AND attempts < max_attempts
+                    THEN 'queued' ELSE 'failed' END,
+                run_at = :now + min(:base * (1 << (attempts - 1)), :max),
+                finished_at = CASE WHEN :retry AND attempts < max_attempts
+                    THEN NULL ELSE :now END,
+                error = :error,
+                locked_by = NULL,
+                locked_until = NULL
+            WHERE {_HELD_BY_WORKER}
+            """,
+            {
+                "id": job_id,
+                "worker": worker_id,
+                "error": error,
+                "retry": retry,
+                "now": self.clock(),
+                "base": self.backoff_base_seconds,
+                "max": self.backoff_max_seconds,
+            },
+        )
+        conn.commit()
+        return cur.rowcount == 1
+
+    def purge_finished(self, older_than: float) -> int:
+        """Deletes succeeded and failed jobs that finished before a point in time.
+
+        Args:
+            older_than (float): Unix time, jobs finished earlier are deleted.
+
+        Returns:
+            int: The number of deleted jobs.
+        """
+        conn = self._get_connection()
+        cur = conn.execute(
+            "DELETE FROM jobs WHERE finished_at < :older_than",
+            {"older_than": older_than},
+        )
+        conn.commit()
+        return cur.rowcount
+
+    def _get_connection(self) -> Connection:
+        return get_job_connection()
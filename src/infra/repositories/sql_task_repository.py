@@ -1,16 +1,57 @@
+from contextlib import contextmanager
+from datetime import date, timedelta
 from sqlite3 import Connection, IntegrityError
+from typing import Callable, Iterator
 
 from src.core.errors import (
     InfrastructureError,
+    TaskIdRangeExhaustedError,
     TaskNotFoundError,
+    TasksMovedError,
 )
 from src.core.ports.task_repository import RepositoryError, TaskRepository
 from src.core.result import Result
-from src.core.task import Task
-from src.infra.db import get_connection
+from src.core.task import Task, TaskSummary
+from src.core.task_change import TaskChange
+from src.core.task_stats import TaskStats
+from src.infra.db import get_connection, run_write
+from src.infra.migrations import NOW_TIMESTAMP, REBUILD_TASK_STATS
+from src.infra.repositories.row_mappers import (
+    CHANGE_COLUMNS,
+    SUMMARY_COLUMNS,
+    TASK_COLUMNS,
+    iter_cursor,
+    query_changes,
+    query_summaries,
+    query_tasks,
+)
+
+
+_ORDER_BY = {
+    "due_date": "due_day, id",
+    "title": "title, id",
+    "status": "status, id",
+}
 
 
 class SQLTaskRepository(TaskRepository):
+    def __init__(
+        self,
+        database: str | None = None,
+        id_range: tuple[int, int] | None = None,
+        holds_user: Callable[[int], bool] | None = None,
+    ) -> None:
+        """Initializes a SQLTaskRepository.
+
+        Args:
+            database (str | None): Path of the database holding the tasks, e.g. a task shard. Defaults to `DATABASE`.
+            id_range (tuple[int, int] | None): Exclusive lower and inclusive upper bound of the IDs of created tasks, so that tasks of different databases never share an ID. Defaults to SQLite's choice.
+            holds_user (Callable[[int], bool] | None): Tells whether a user's tasks still belong to this database. Asked inside every write once the write lock is held, writes of users it denies raise TasksMovedError. Defaults to every user.
+        """
+        self.database = database
+        self.id_range = id_range
+        self.holds_user = holds_user
+
     def get_by_id(self, task_id: int) -> Task | None:
         """Retrieves a task by its ID.
 
@@ -20,23 +61,11 @@ class SQLTaskRepository(TaskRepository):
             Task | None: The task with the specified ID, or None if not found.
         """
         conn = self._get_connection()
-        cur = conn.execute(
-            "SELECT id, user_id, title, description, due_date, status FROM tasks WHERE id = ?",
+        return query_tasks(
+            conn,
+            f"SELECT {TASK_COLUMNS} FROM tasks WHERE id = ?",
             (task_id,),
-        )
-        row = cur.fetchone()
-        if not row:
-            return None
-
-        task = Task(
-            id=task_id,
-            title=row["title"],
-            description=row["description"],
-            due_date=row["due_date"],
-            status=row["status"],
-            user_id=row["user_id"],
-        )
-        return task
+        ).fetchone()
 
     def list_all(self) -> list[Task]:
         """Lists all tasks in the repository. WARNING: This method retrieves all tasks without filtering by user.
@@ -45,21 +74,9 @@ class SQLTaskRepository(TaskRepository):
             list[Task]: A list of all tasks.
         """
         conn = self._get_connection()
-        cur = conn.execute(
-            "SELECT id, user_id, title, description, due_date, status FROM tasks"
-        )
-        tasks: list[Task] = []
-        for row in cur.fetchall():
-            task = Task(
-                id=row["id"],
-                title=row["title"],
-                description=row["description"],
-                due_date=row["due_date"],
-                status=row["status"],
-                user_id=row["user_id"],
-            )
-            tasks.append(task)
-        return tasks
+        return query_tasks(
+            conn, f"SELECT {TASK_COLUMNS} FROM tasks"
+        ).fetchall()
 
     def list_by_user(self, user_id: int) -> list[Task]:
         """Lists all tasks for a specific user.
@@ -71,22 +88,133 @@ class SQLTaskRepository(TaskRepository):
             list[Task]: A list of tasks for the specified user.
         """
         conn = self._get_connection()
-        cur = conn.execute(
-            "SELECT id, user_id, title, description, due_date, status FROM tasks WHERE user_id = ?",
+        return query_tasks(
+            conn,
+            f"SELECT {TASK_COLUMNS} FROM tasks WHERE user_id = ?",
+            (user_id,),
+        ).fetchall()
+
+    def iter_all(self, batch_size: int | None = None) -> Iterator[Task]:
+        """Iterates over all tasks in the repository in batches. WARNING: This method retrieves all tasks without filtering by user.
+
+        The connection is acquired eagerly, so when the iterator is consumed by a
+        streaming response it must be wrapped with `stream_with_context`.
+
+        Args:
+            batch_size (int | None): Rows fetched per batch. Defaults to `iter_batch_size`.
+
+        Returns:
+            Iterator[Task]: An iterator over all tasks.
+        """
+        conn = self._get_connection()
+        cur = query_tasks(conn, f"SELECT {TASK_COLUMNS} FROM tasks")
+        return iter_cursor(cur, batch_size or self.iter_batch_size)
+
+    def iter_by_user(
+        self, user_id: int, batch_size: int | None = None
+    ) -> Iterator[Task]:
+        """Iterates over the tasks of a specific user in batches.
+
+        The connection is acquired eagerly, so when the iterator is consumed by a
+        streaming response it must be wrapped with `stream_with_context`.
+
+        Args:
+            user_id (int): The ID of the user whose tasks to retrieve.
+            batch_size (int | None): Rows fetched per batch. Defaults to `iter_batch_size`.
+
+        Returns:
+            Iterator[Task]: An iterator over the user's tasks.
+        """
+        conn = self._get_connection()
+        cur = query_tasks(
+            conn,
+            f"SELECT {TASK_COLUMNS} FROM tasks WHERE user_id = ?",
             (user_id,),
         )
-        tasks: list[Task] = []
-        for row in cur.fetchall():
-            task = Task(
-                id=row["id"],
-                title=row["title"],
-                description=row["description"],
-                due_date=row["due_date"],
-                status=row["status"],
-                user_id=row["user_id"],
-            )
-            tasks.append(task)
-        return tasks
+        return iter_cursor(cur, batch_size or self.iter_batch_size)
+
+    def iter_changed_since(
+        self, user_id: int, since: str, batch_size: int | None = None
+    ) -> Iterator[Task]:
+        """Iterates over the tasks of a specific user created or updated at or after a time, in batches.
+
+        The connection is acquired eagerly, so when the iterator is consumed by a
+        streaming response it must be wrapped with `stream_with_context`.
+
+        Args:
+            user_id (int): The ID of the user whose tasks to retrieve.
+            since (str): Timestamp of the earliest change to include, see `src.core.timestamp`.
+            batch_size (int | None): Rows fetched per batch. Defaults to `iter_batch_size`.
+
+        Returns:
+            Iterator[Task]: An iterator over the changed tasks, ordered by update time.
+        """
+        conn = self._get_connection()
+        cur = query_tasks(
+            conn,
+            f"SELECT {TASK_COLUMNS} FROM tasks "
+            "WHERE user_id = ? AND updated_at >= ? ORDER BY updated_at, id",
+            (user_id, since),
+        )
+        return iter_cursor(cur, batch_size or self.iter_batch_size)
+
+    def deleted_since(self, user_id: int, since: str) -> list[tuple[int, str]]:
+        """Lists the tasks a user lost at or after a time from the change feed's tombstones.
+
+        Tasks that exist again for the user (a reused ID) are left out. Tombstones older
+        than `compacted_at` may have been removed.
+
+        Args:
+            user_id (int): The ID of the user.
+            since (str): Timestamp of the earliest deletion to include.
+
+        Returns:
+            list[tuple[int, str]]: The task IDs and deletion times, oldest first.
+        """
+        conn = self._get_connection()
+        return conn.execute(
+            """
+            SELECT c.task_id, MAX(c.changed_at)
+            FROM task_changes AS c
+            WHERE c.user_id = :user_id
+                AND c.op = 'delete'
+                AND c.changed_at >= :since
+                AND NOT EXISTS (
+                    SELECT 1 FROM tasks AS t
+                    WHERE t.id = c.task_id AND t.user_id = c.user_id
+                )
+            GROUP BY c.task_id
+            ORDER BY 2, 1
+            """,
+            {"user_id": user_id, "since": since},
+        ).fetchall()
+
+    def compacted_at(self) -> str | None:
+        """Reads the time of the newest tombstone removed by `compact_changes`.
+
+        Returns:
+            str | None: The timestamp, None if no tombstone was removed yet.
+        """
+        conn = self._get_connection()
+        return conn.execute(
+            "SELECT compacted_at FROM task_change_log"
+        ).fetchone()[0]
+
+    @contextmanager
+    def snapshot(self) -> Iterator[None]:
+        """Runs the reads inside the block in one read transaction, so they all see the database as
+        of the first read, unaffected by concurrent writes. In WAL mode the snapshot does not block
+        writers. Only use it for reads, the write methods commit and would end the snapshot.
+
+        Yields:
+            None: Control, while the transaction is open.
+        """
+        conn = self._get_connection()
+        conn.execute("BEGIN")
+        try:
+            yield
+        finally:
+            conn.rollback()
 
     def create(
         self,
@@ -106,7 +234,8 @@ class SQLTaskRepository(TaskRepository):
             user_id (int): The ID of the user who owns the task.
 
         Returns:
-            Result[Task, RepositoryError]: The created task or an error if creation failed."""
+            Result[Task, RepositoryError]: The created task or an error if creation failed.
+        """
         created_task_result = Task.create(
             id=0,  # ID will be assigned by the database
             title=title,
@@ -119,20 +248,34 @@ class SQLTaskRepository(TaskRepository):
             return Result.Err(created_task_result.unwrap_err())
         task = created_task_result.unwrap()
 
-        conn = self._get_connection()
-        try:
-            cur = conn.execute(
-                "INSERT INTO tasks (user_id, title, description, due_date, status) VALUES (?, ?, ?, ?, ?)",
+        def insert(conn: Connection) -> int | None:
+            self._check_holds(task.user_id)
+            # None lets SQLite pick the next ID
+            new_id = None
+            if self.id_range is not None:
+                low, high = self.id_range
+                new_id = conn.execute(
+                    "SELECT COALESCE(MAX(id), ?) + 1 FROM tasks WHERE id > ? AND id <= ?",
+                    (low, low, high),
+                ).fetchone()[0]
+                # beyond `high` lie the IDs of another database
+                if new_id > high:
+                    raise TaskIdRangeExhaustedError(low, high)
+            return conn.execute(
+                "INSERT INTO tasks (id, user_id, title, description, due_date, status, created_at, updated_at) "
+                f"VALUES (?, ?, ?, ?, ?, ?, {NOW_TIMESTAMP}, {NOW_TIMESTAMP})",
                 (
+                    new_id,
                     task.user_id,
                     task.title,
                     task.description,
                     task.due_date,
                     task.status,
                 ),
-            )
-            conn.commit()
-            task_id = cur.lastrowid
+            ).lastrowid
+
+        try:
+            task_id = run_write(insert, self.database)
             if task_id is None:
                 return Result.Err(
                     InfrastructureError("Failed to retrieve created task id")
@@ -143,6 +286,8 @@ class SQLTaskRepository(TaskRepository):
                     InfrastructureError("Failed to retrieve created task")
                 )
             return Result.Ok(new_task)
+        except TaskIdRangeExhaustedError as e:
+            return Result.Err(e)
         except IntegrityError as e:
             return Result.Err(InfrastructureError(str(e)))
 
@@ -182,10 +327,11 @@ class SQLTaskRepository(TaskRepository):
 
         task = created_task_result.unwrap()
 
-        conn = self._get_connection()
-        try:
-            cur = conn.execute(
-                "UPDATE tasks SET title = ?, description = ?, due_date = ?, status = ? WHERE id = ?",
+        def update(conn: Connection) -> int:
+            self._check_holds(task.user_id)
+            return conn.execute(
+                "UPDATE tasks SET title = ?, description = ?, due_date = ?, status = ?, version = version + 1, "
+                f"updated_at = {NOW_TIMESTAMP} WHERE id = ?",
                 (
                     task.title,
                     task.description,
@@ -193,9 +339,11 @@ class SQLTaskRepository(TaskRepository):
                     task.status,
                     task.id,
                 ),
-            )
-            conn.commit()
-            if cur.rowcount == 0:
+            ).rowcount
+
+        try:
+            updated = run_write(update, self.database)
+            if updated == 0:
                 return Result.Err(TaskNotFoundError(task.id))
             updated_task = self.get_by_id(task.id)
             if not updated_task:
@@ -215,55 +363,393 @@ class SQLTaskRepository(TaskRepository):
         Returns:
             None | DomainError: None if deletion was successful, DomainError if task was not found.
         """
-        conn = self._get_connection()
-        if not self.get_by_id(task_id):
+
+        def delete(conn: Connection) -> int:
+            if self.holds_user is not None:
+                row = conn.execute(
+                    "SELECT user_id FROM tasks WHERE id = ?", (task_id,)
+                ).fetchone()
+                if row is not None:
+                    self._check_holds(row[0])
+            return conn.execute(
+                "DELETE FROM tasks WHERE id = ?",
+                (task_id,),
+            ).rowcount
+
+        deleted = run_write(delete, self.database)
+        if deleted == 0:
             return TaskNotFoundError(task_id)
-        conn.execute(
-            "DELETE FROM tasks WHERE id = ?",
-            (task_id,),
-        )
-        conn.commit()
+
+    def _check_holds(self, user_id: int) -> None:
+        """Raise TasksMovedError inside a write of a user whose tasks moved to another database."""
+        if self.holds_user is not None and not self.holds_user(user_id):
+            raise TasksMovedError(user_id)
 
     def _get_connection(self) -> Connection:
-        return get_connection()
+        return get_connection(self.database)
 
     def search(
         self,
         user_id: int,
         title: str | None = None,
         description: str | None = None,
+        status: str | None = None,
+        open_only: bool = False,
+        due_from: date | None = None,
+        due_to: date | None = None,
+        sort: str | None = None,
+        limit: int | None = None,
+        offset: int = 0,
     ) -> list[Task]:
-        """Searches for tasks by user_id, and optionally by title and/or description.
+        """Searches for tasks by user_id, and optionally by title, description, status and due date range.
 
         Args:
             user_id (int): The ID of the user whose tasks to search.
             title (str | None): Optional title substring to search for.
             description (str | None): Optional description substring to search for.
+            status (str | None): Optional exact status to filter by.
+            open_only (bool): Only include tasks that are not completed. Defaults to False.
+            due_from (date | None): Optional first due date to include.
+            due_to (date | None): Optional last due date to include.
+            sort (str | None): Optional sort key, one of `sort_keys`. Defaults to ID order.
+            limit (int | None): Optional maximum number of tasks to return.
+            offset (int): Number of matching tasks to skip. Defaults to 0.
 
         Returns:
             list[Task]: A list of tasks matching the search criteria.
         """
         conn = self._get_connection()
-        query = "SELECT id, user_id, title, description, due_date, status FROM tasks WHERE user_id = ?"
-        params: list = [user_id]
+        where, params, order_by = self._search_filter(
+            user_id,
+            title,
+            description,
+            status,
+            open_only,
+            due_from,
+            due_to,
+            sort,
+            limit,
+            offset,
+        )
+        return query_tasks(
+            conn,
+            f"SELECT {TASK_COLUMNS} FROM tasks WHERE {where} ORDER BY {order_by} LIMIT :limit OFFSET :offset",
+            params,
+        ).fetchall()
+
+    def list_all_summaries(self) -> list[TaskSummary]:
+        """Lists summaries of all tasks in the repository. WARNING: This method retrieves all tasks without filtering by user.
+
+        Returns:
+            list[TaskSummary]: A list of summaries of all tasks.
+        """
+        conn = self._get_connection()
+        return query_summaries(
+            conn,
+            f"SELECT {SUMMARY_COLUMNS} FROM tasks",
+            {"preview_length": self.summary_preview_length},
+        ).fetchall()
+
+    def list_summaries_by_user(self, user_id: int) -> list[TaskSummary]:
+        """Lists summaries of all tasks for a specific user.
+
+        Args:
+            user_id (int): The ID of the user whose tasks to retrieve.
+
+        Returns:
+            list[TaskSummary]: A list of task summaries for the specified user.
+        """
+        return self.search_summaries(user_id)
+
+    def search_summaries(
+        self,
+        user_id: int,
+        title: str | None = None,
+        description: str | None = None,
+        status: str | None = None,
+        open_only: bool = False,
+        due_from: date | None = None,
+        due_to: date | None = None,
+        sort: str | None = None,
+        limit: int | None = None,
+        offset: int = 0,
+    ) -> list[TaskSummary]:
+        """Searches like `search`, but only fetches the summary columns and a short description preview.
+
+        Args:
+            user_id (int): The ID of the user whose tasks to search.
+            title (str | None): Optional title substring to search for.
+            description (str | None): Optional description substring to search for.
+            status (str | None): Optional exact status to filter by.
+            open_only (bool): Only include tasks that are not completed. Defaults to False.
+            due_from (date | None): Optional first due date to include.
+            due_to (date | None): Optional last due date to include.
+            sort (str | None): Optional sort key, one of `sort_keys`. Defaults to ID order.
+            limit (int | None): Optional maximum number of tasks to return.
+            offset (int): Number of matching tasks to skip. Defaults to 0.
+
+        Returns:
+            list[TaskSummary]: Summaries of the tasks matching the search criteria.
+        """
+        conn = self._get_connection()
+        where, params, order_by = self._search_filter(
+            user_id,
+            title,
+            description,
+            status,
+            open_only,
+            due_from,
+            due_to,
+            sort,
+            limit,
+            offset,
+        )
+        params["preview_length"] = self.summary_preview_length
+        return query_summaries(
+            conn,
+            f"SELECT {SUMMARY_COLUMNS} FROM tasks WHERE {where} ORDER BY {order_by} LIMIT :limit OFFSET :offset",
+            params,
+        ).fetchall()
+
+    def get_stats(self, user_id: int, today: date) -> TaskStats:
+        """Reads the materialized statistics of a user's tasks.
+
+        Status counts are a single primary key lookup in `task_stats`. Overdue and
+        due-this-week counts sum the per-day open task counts in `task_due_stats`,
+        which are kept up to date by triggers on `tasks`.
+
+        Args:
+            user_id (int): The ID of the user.
+            today (date): The date that overdue and due-this-week are relative to.
+
+        Returns:
+            TaskStats: The user's task statistics.
+        """
+        conn = self._get_connection()
+        row = conn.execute(
+            "SELECT todo, in_progress, completed FROM task_stats WHERE user_id = ?",
+            (user_id,),
+        ).fetchone()
+        week_end = today + timedelta(days=6 - today.weekday())
+        due = conn.execute(
+            """
+            SELECT
+                COALESCE(SUM(open_count) FILTER (WHERE due_date < :today), 0),
+                COALESCE(SUM(open_count) FILTER (WHERE due_date >= :today), 0)
+            FROM task_due_stats
+            WHERE user_id = :user_id AND due_date <= :week_end
+            """,
+            {
+                "user_id": user_id,
+                "today": today.isoformat(),
+                "week_end": week_end.isoformat(),
+            },
+        ).fetchone()
+        if row is None:
+            return TaskStats(overdue=due[0], due_this_week=due[1])
+
+        return TaskStats(
+            todo=row["todo"],
+            in_progress=row["in_progress"],
+            completed=row["completed"],
+            overdue=due[0],
+            due_this_week=due[1],
+        )
+
+    def rebuild_stats(self) -> None:
+        """Recomputes the materialized task statistics from the tasks table, to recover from drift."""
+
+        def rebuild(conn: Connection) -> None:
+            # executescript would commit on its own, outside the write path
+            for statement in REBUILD_TASK_STATS.split(";"):
+                if statement.strip():
+                    conn.execute(statement)
+
+        run_write(rebuild, self.database)
+
+    def changes_since(
+        self, user_id: int, since: int, limit: int | None = None
+    ) -> list[TaskChange]:
+        """Lists the changes of a user's tasks after a sequence number, oldest first.
+
+        Only the latest change of each task is returned, so a task edited many times
+        since the last sync is sent once. Upserts carry the current task state.
+
+        Args:
+            user_id (int): The ID of the user.
+            since (int): The sequence number the client has already synced up to.
+            limit (int | None): Maximum number of changes to return. Defaults to no limit.
+
+        Returns:
+            list[TaskChange]: The changes ordered by sequence number.
+        """
+        conn = self._get_connection()
+        return query_changes(
+            conn,
+            f"""
+            SELECT {CHANGE_COLUMNS}
+            FROM task_changes AS c
+            LEFT JOIN tasks AS t
+                ON c.op = 'upsert' AND t.id = c.task_id AND t.user_id = c.user_id
+            WHERE c.user_id = :user_id AND c.seq > :since
+                AND NOT EXISTS (
+                    SELECT 1 FROM task_changes AS n
+                    WHERE n.task_id = c.task_id
+                        AND n.user_id = c.user_id
+                        AND n.seq > c.seq
+                )
+            ORDER BY c.seq
+            LIMIT :limit
+            """,
+            {
+                "user_id": user_id,
+                "since": since,
+                "limit": -1 if limit is None else limit,
+            },
+        ).fetchall()
+
+    def change_feed_bounds(
+        self, user_id: int | None = None
+    ) -> tuple[int, int]:
+        """Reads the range of sequence numbers the change feed can still serve.
+
+        Args:
+            user_id (int | None): The user whose feed to read, all users share one feed here.
+
+        Returns:
+            tuple[int, int]: The highest compacted sequence number and the latest sequence number.
+        """
+        conn = self._get_connection()
+        row = conn.execute(
+            """
+            SELECT
+                compacted_through,
+                COALESCE(
+                    (SELECT seq FROM sqlite_sequence WHERE name = 'task_changes'),
+                    0
+                )
+            FROM task_change_log
+            """
+        ).fetchone()
+        return row[0], row[1]
+
+    def compact_changes(self, before_seq: int) -> int:
+        """Removes change feed entries that are no longer needed.
+
+        Entries superseded by a later change of the same task are never returned and
+        are always removed. Tombstones up to `before_seq` are removed as well, clients
+        that synced before that point have to reset.
+
+        Args:
+            before_seq (int): Remove tombstones with a sequence number up to this one.
+
+        Returns:
+            int: The number of removed entries.
+        """
+        before_seq = min(before_seq, self.change_feed_bounds()[1])
+
+        def compact(conn: Connection) -> int:
+            # record the newest tombstone about to be removed, NULL while none was
+            conn.execute(
+                """
+                UPDATE task_change_log SET
+                    compacted_through = MAX(compacted_through, :before_seq),
+                    compacted_at = MAX(
+                        COALESCE(deleted.changed_at, compacted_at),
+                        COALESCE(compacted_at, deleted.changed_at)
+                    )
+                FROM (
+                    SELECT MAX(changed_at) AS changed_at FROM task_changes
+                    WHERE op = 'delete' AND seq <= :before_seq
+                ) AS deleted
+                """,
+                {"before_seq": before_seq},
+            )
+            cur = conn.execute(
+                """
+                DELETE FROM task_changes AS c
+                WHERE (c.op = 'delete' AND c.seq <= :before_seq)
+                    OR EXISTS (
+                        SELECT 1 FROM task_changes AS n
+                        WHERE n.task_id = c.task_id
+                            AND n.user_id = c.user_id
+                            AND n.seq > c.seq
+                    )
+                """,
+                {"before_seq": before_seq},
+            )
+            return cur.rowcount
+
+        return run_write(compact, self.database)
+
+    def compact_changes_retaining(self, retain: int) -> int:
+        """Removes change feed entries that are no longer needed, keeping the tombstones of the
+        last `retain` entries.
+
+        Args:
+            retain (int): Number of most recent entries to keep tombstones for.
+
+        Returns:
+            int: The number of removed entries.
+        """
+        return self.compact_changes(self.change_feed_bounds()[1] - retain)
+
+    def _search_filter(
+        self,
+        user_id: int,
+        title: str | None,
+        description: str | None,
+        status: str | None,
+        open_only: bool,
+        due_from: date | None,
+        due_to: date | None,
+        sort: str | None,
+        limit: int | None,
+        offset: int,
+    ) -> tuple[str, dict, str]:
+        """Build the WHERE clause, named parameters and ORDER BY clause shared by the search methods.
+
+        Due dates are compared on the integer `due_day` key so ranges and sorting use
+        the `(user_id, due_day)` indexes. `open_only` is spelled exactly like the
+        partial index predicate so SQLite can use the open tasks index.
+
+        Args:
+            user_id (int): The ID of the user whose tasks to search.
+            title (str | None): Optional title substring to search for.
+            description (str | None): Optional description substring to search for.
+            status (str | None): Optional exact status to filter by.
+            open_only (bool): Only include tasks that are not completed. Defaults to False.
+            due_from (date | None): Optional first due date to include.
+            due_to (date | None): Optional last due date to include.
+            sort (str | None): Optional sort key, one of `sort_keys`. Defaults to ID order.
+            limit (int | None): Optional maximum number of tasks to return.
+            offset (int): Number of matching tasks to skip. Defaults to 0.
+
+        Returns:
+            tuple[str, dict, str]: The WHERE clause, its named parameters (including `limit` and
+                `offset`) and the ORDER BY clause.
+        """
+        where = "user_id = :user_id"
+        params: dict = {"user_id": user_id}
 
         if title is not None:
-            query += " AND title LIKE ?"
-            params.append(f"%{title}%")
+            where += " AND title LIKE :title"
+            params["title"] = f"%{title}%"
         if description is not None:
-            query += " AND description LIKE ?"
-            params.append(f"%{description}%")
-
-        cur = conn.execute(query, tuple(params))
-        tasks: list[Task] = []
-        for row in cur.fetchall():
-            task = Task(
-                id=row["id"],
-                title=row["title"],
-                description=row["description"],
-                due_date=row["due_date"],
-                status=row["status"],
-                user_id=row["user_id"],
-            )
-            tasks.append(task)
-        return tasks
+            where += " AND description LIKE :description"
+            params["description"] = f"%{description}%"
+        if status is not None:
+            where += " AND status = :status"
+            params["status"] = status
+        if open_only:
+            where += " AND status != 'Completed'"
+        if due_from is not None:
+            where += " AND due_day >= :due_from"
+            params["due_from"] = due_from.toordinal()
+        if due_to is not None:
+            where += " AND due_day <= :due_to"
+            params["due_to"] = due_to.toordinal()
+
+        params["limit"] = -1 if limit is None else limit
+        params["offset"] = offset
+        return where, params, _ORDER_BY.get(sort, "id")
@@ -1,4 +1,5 @@
 from sqlite3 import Connection
+from typing import Iterator
 
 from flask_bcrypt import Bcrypt
 
@@ -13,7 +14,13 @@ from src.core.errors import (
 from src.core.ports.user_repository import RepositoryError, UserRepository
 from src.core.result import Result
 from src.core.user import User
-from src.infra.db import get_connection
+from src.infra.db import get_connection, run_write
+from src.infra.repositories.row_mappers import (
+    AUTH_USER_COLUMNS,
+    USER_COLUMNS,
+    iter_cursor,
+    query_users,
+)
 
 
 class SQLUserRepository(UserRepository):
@@ -37,23 +44,11 @@ class SQLUserRepository(UserRepository):
             User | None: The User object if found, otherwise None.
         """
         conn = self._get_connection()
-        cur = conn.execute(
-            "SELECT id, username, email, is_admin FROM users WHERE username = ?",
+        return query_users(
+            conn,
+            f"SELECT {USER_COLUMNS} FROM users WHERE username = ?",
             (username,),
-        )
-
-        row = cur.fetchone()
-
-        if not row:
-            return None
-
-        return User(
-            id=row["id"],
-            username=row["username"],
-            email=row["email"],
-            pw_hash=None,
-            is_admin=bool(row["is_admin"]),
-        )
+        ).fetchone()
 
     def find_by_username_or_email(self, username_or_email: str) -> User | None:
         """Find a user by username or email.
@@ -65,23 +60,11 @@ class SQLUserRepository(UserRepository):
             User | None: The User object if found, otherwise None.
         """
         conn = self._get_connection()
-        cur = conn.execute(
-            "SELECT id, username, email, is_admin FROM users WHERE username = ? OR email = ?",
+        return query_users(
+            conn,
+            f"SELECT {USER_COLUMNS} FROM users WHERE username = ? OR email = ?",
             (username_or_email, username_or_email),
-        )
-
-        row = cur.fetchone()
-
-        if not row:
-            return None
-
-        return User(
-            id=row["id"],
-            username=row["username"],
-            email=row["email"],
-            pw_hash=None,
-            is_admin=bool(row["is_admin"]),
-        )
+        ).fetchone()
 
     def load_for_auth(self, username_or_email: str) -> User | None:
         """Load a user with password hash for authentication.
@@ -93,23 +76,11 @@ class SQLUserRepository(UserRepository):
             User | None: The User object with pw_hash if found, otherwise None.
         """
         conn = self._get_connection()
-        cur = conn.execute(
-            "SELECT id, username, email, pw_hash, is_admin FROM users WHERE username = ? OR email = ?",
+        return query_users(
+            conn,
+            f"SELECT {AUTH_USER_COLUMNS} FROM users WHERE username = ? OR email = ?",
             (username_or_email, username_or_email),
-        )
-
-        row = cur.fetchone()
-
-        if not row:
-            return None
-
-        return User(
-            id=row["id"],
-            username=row["username"],
-            email=row["email"],
-            pw_hash=row["pw_hash"],
-            is_admin=bool(row["is_admin"]),
-        )
+        ).fetchone()
 
     def verify_password(self, user: User, password: str) -> bool:
         """Verify a user's password against the stored hash.
@@ -133,23 +104,11 @@ class SQLUserRepository(UserRepository):
             User | None: The User object if found, otherwise None.
         """
         conn = self._get_connection()
-        cur = conn.execute(
-            "SELECT id, username, email, is_admin FROM users WHERE id = ?",
+        return query_users(
+            conn,
+            f"SELECT {USER_COLUMNS} FROM users WHERE id = ?",
             (user_id,),
-        )
-
-        row = cur.fetchone()
-
-        if not row:
-            return None
-
-        return User(
-            id=row["id"],
-            username=row["username"],
-            email=row["email"],
-            pw_hash=None,
-            is_admin=bool(row["is_admin"]),
-        )
+        ).fetchone()
 
     def list_all(self) -> list[User]:
         """List all users in the repository.
@@ -158,17 +117,25 @@ class SQLUserRepository(UserRepository):
             list[User]: A list of all users.
         """
         conn = self._get_connection()
-        cur = conn.execute("SELECT id, username, email, is_admin FROM users")
-        return [
-            User(
-                id=row["id"],
-                username=row["username"],
-                email=row["email"],
-                pw_hash=None,
-                is_admin=bool(row["is_admin"]),
-            )
-            for row in cur.fetchall()
-        ]
+        return query_users(
+            conn, f"SELECT {USER_COLUMNS} FROM users"
+        ).fetchall()
+
+    def iter_all(self, batch_size: int | None = None) -> Iterator[User]:
+        """Iterate over all users in the repository in batches.
+
+        The connection is acquired eagerly, so when the iterator is consumed by a
+        streaming response it must be wrapped with `stream_with_context`.
+
+        Args:
+            batch_size (int | None): Rows fetched per batch. Defaults to `iter_batch_size`.
+
+        Returns:
+            Iterator[User]: An iterator over all users.
+        """
+        conn = self._get_connection()
+        cur = query_users(conn, f"SELECT {USER_COLUMNS} FROM users")
+        return iter_cursor(cur, batch_size or self.iter_batch_size)
 
     def register(
         self, username: str, email: str, password: str
@@ -285,30 +252,22 @@ class SQLUserRepository(UserRepository):
 
         created_user = created_user_result.unwrap()
 
-        conn.execute(
-            "INSERT INTO users (username, email, pw_hash, is_admin) VALUES (?, ?, ?, ?)",
-            (created_user.username, created_user.email, pw_hash, is_admin),
+        run_write(
+            lambda conn: conn.execute(
+                "INSERT INTO users (username, email, pw_hash, is_admin) VALUES (?, ?, ?, ?)",
+                (created_user.username, created_user.email, pw_hash, is_admin),
+            )
         )
-        conn.commit()
 
-        cur = conn.execute(
-            "SELECT id, username, email, is_admin FROM users WHERE username = ?",
+        user = query_users(
+            conn,
+            f"SELECT {USER_COLUMNS} FROM users WHERE username = ?",
             (username,),
-        )
-
-        row = cur.fetchone()
-        if not row:
+        ).fetchone()
+        if not user:
             return Result.Err(UserCreationError())
 
-        return Result.Ok(
-            User(
-                id=row["id"],
-                username=row["username"],
-                email=row["email"],
-                pw_hash=None,
-                is_admin=bool(row["is_admin"]),
-            )
-        )
+        return Result.Ok(user)
 
     def delete(self, username_or_email: str) -> None | DomainError:
         """Delete a user by username or email.
@@ -319,16 +278,16 @@ class SQLUserRepository(UserRepository):
         Returns:
             None | DomainError: None if deletion was successful, UserNotFoundError if not found.
         """
-        conn = self._get_connection()
         user = self.find_by_username_or_email(username_or_email)
         if not user:
             return UserNotFoundError(username_or_email)
 
-        conn.execute(
-            "DELETE FROM users WHERE id = ?",
-            (user.id,),
+        run_write(
+            lambda conn: conn.execute(
+                "DELETE FROM users WHERE id = ?",
+                (user.id,),
+            )
         )
-        conn.commit()
 
     def _get_connection(self) -> Connection:
         """Get a new SQLite database connection.
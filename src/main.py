@@ -15,7 +15,7 @@ if str(BASE_DIR) not in sys.path:
 
 
 from src.config import Config  # noqa: E402
-from src.web.app import create_app  # noqa: E402
+from src.web.app import create_app, warm_up  # noqa: E402
 
 if __name__ == "__main__":
     load_dotenv()
@@ -23,6 +23,7 @@ if __name__ == "__main__":
     if secret:
         Config.inject_secret(secret)
     app = create_app(Config)
+    warm_up(app)
     use_reloader = os.environ.get("USE_RELOADER") == "1"
     debug = os.environ.get("DEBUG") == "1"
     app.run(
@@ -1,12 +1,43 @@
-from flask import jsonify
+from functools import cache
+from operator import attrgetter
+from typing import Any, Callable
+
 from flask.wrappers import Response
 
+import json
+
+from src.core.task import Task, TaskSummary
+
+
+@cache
+def _orjson_dumps() -> Callable[[Any], bytes] | None:
+    """Import orjson on first use, it is optional and not needed to start the app."""
+    try:
+        import orjson
+    except ImportError:
+        return None
+    return orjson.dumps
+
 
 class ApiResponseService:
     """
-    Service for creating consistent JSON responses for API endpoints. This response format has to match what the frontend expects
+    Service for creating consistent JSON responses for API endpoints. This response format has to match what the frontend expects.
+    Payloads are serialized with orjson when it is installed and with the standard library otherwise.
     """
 
+    task_fields = ("id", "title", "description", "due_date", "status")
+    summary_fields = (
+        "id",
+        "title",
+        "due_date",
+        "status",
+        "preview",
+        "truncated",
+    )
+    # fetch every field of a task with a single call instead of one getattr per field
+    _task_values = attrgetter(*task_fields)
+    _summary_values = attrgetter(*summary_fields)
+
     @classmethod
     def to_response(
         cls,
@@ -17,7 +48,7 @@ class ApiResponseService:
         data: dict | None = None,
         error: str | None = None,
     ) -> Response:
-        """Jsonify the values
+        """Serialize the values into a JSON response
 
         Args:
             ok (bool): Indicates whether the operation was successful.
@@ -30,11 +61,71 @@ class ApiResponseService:
         Returns:
             Response: Flask Response object containing the standardized JSON payload.
         """
-        return jsonify(
-            ok=ok,
-            status=status,
-            redirect=redirect,
-            message=message,
-            data=data,
-            error=error,
+        return Response(
+            cls.dumps(
+                {
+                    "ok": ok,
+                    "status": status,
+                    "redirect": redirect,
+                    "message": message,
+                    "data": data,
+                    "error": error,
+                }
+            ),
+            mimetype="application/json",
         )
+
+    @staticmethod
+    def dumps(payload: dict) -> bytes:
+        """Serialize a JSON payload to UTF-8 bytes.
+
+        Args:
+            payload (dict): JSON serializable payload of plain Python types.
+
+        Returns:
+            bytes: The compact JSON document.
+        """
+        fast_dumps = _orjson_dumps()
+        if fast_dumps is not None:
+            return fast_dumps(payload)
+        return json.dumps(
+            payload, ensure_ascii=False, separators=(",", ":")
+        ).encode()
+
+    @classmethod
+    def encode_task(cls, task: Task) -> dict:
+        """Convert a task into its JSON object.
+
+        Args:
+            task (Task): The task to encode.
+
+        Returns:
+            dict: The fields of `task_fields` mapped to their values.
+        """
+        return dict(zip(cls.task_fields, cls._task_values(task)))
+
+    @classmethod
+    def encode_tasks(cls, tasks: list[Task]) -> list[dict]:
+        """Convert tasks into JSON objects.
+
+        Args:
+            tasks (list[Task]): The tasks to encode.
+
+        Returns:
+            list[dict]: One object per task, see `encode_task`.
+        """
+        fields, values = cls.task_fields, cls._task_values
+        return [dict(zip(fields, values(task))) for task in tasks]
+
+    @classmethod
+    def encode_summaries(cls, summaries: list[TaskSummary]) -> list[dict]:
+        """Convert task summaries into JSON objects.
+
+        Args:
+            summaries (list[TaskSummary]): The summaries to encode.
+
+        Returns:
+            list[dict]: The fields of `summary_fields` mapped to their values, one object per summary.
+        """
+        fields, values = cls.summary_fields, cls._summary_values
+        return [dict(zip(fields, values(summary))) for summary in summaries]
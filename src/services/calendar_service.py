@@ -0,0 +1,87 @@
+from calendar import monthrange
+from collections import OrderedDict
+from datetime import date
+from threading import Lock
+
+from src.core.ports.task_repository import TaskRepository
+
+CalendarMonth = dict[str, list[dict]]
+
+
+class CalendarService:
+    """
+    Service responsible for the month calendar view of a user's tasks. Months are cached per user
+    in a bounded LRU. The head of the user's change feed, read from the database, is part of the
+    cache key: every task write advances it, so a write committed by any process (another WSGI
+    worker, the job worker) invalidates the months cached here. Each process keeps its own copy.
+    """
+
+    def __init__(self, task_repo: TaskRepository, max_entries: int = 1024):
+        """
+        Initialize CalendarService with a task repository.
+
+        Args:
+            task_repo (TaskRepository): Repository for task data operations.
+            max_entries (int): Maximum number of cached months across all users. Defaults to 1024.
+        """
+        self.task_repo = task_repo
+        self.max_entries = max_entries
+        self._lock = Lock()
+        self._cache: OrderedDict[tuple[int, int, int, int], CalendarMonth] = (
+            OrderedDict()
+        )
+
+    def get_month(self, user_id: int, year: int, month: int) -> CalendarMonth:
+        """
+        Return a user's tasks due in a month, bucketed by due date.
+
+        Args:
+            user_id (int): The ID of the user.
+            year (int): The year of the month.
+            month (int): The month, 1 to 12.
+
+        Returns:
+            CalendarMonth: ISO due dates mapped to the tasks due that day, ordered by due date.
+        """
+        # read before loading, a write committed meanwhile advances the head
+        # past this key, so a month loaded with it is never looked up again
+        head = self.task_repo.change_feed_bounds(user_id)[1]
+        key = (user_id, head, year, month)
+        with self._lock:
+            cached = self._cache.get(key)
+            if cached is not None:
+                self._cache.move_to_end(key)
+                return cached
+
+        days = self._load_month(user_id, year, month)
+
+        with self._lock:
+            self._cache[key] = days
+            while len(self._cache) > self.max_entries:
+                self._cache.popitem(last=False)
+        return days
+
+    def _load_month(
+        self, user_id: int, year: int, month: int
+    ) -> CalendarMonth:
+        """
+        Query the tasks due in a month with an index-backed due date range search.
+
+        Args:
+            user_id (int): The ID of the user.
+            year (int): The year of the month.
+            month (int): The month, 1 to 12.
+
+        Returns:
+            CalendarMonth: ISO due dates mapped to the tasks due that day.
+        """
+        first = date(year, month, 1)
+        last = date(year, month, monthrange(year, month)[1])
+        days: CalendarMonth = {}
+        for task in self.task_repo.search_summaries(
+            user_id, due_from=first, due_to=last, sort="due_date"
+        ):
+            days.setdefault(task.due_date, []).append(
+                {"id": task.id, "title": task.title, "status": task.status}
+            )
+        return days
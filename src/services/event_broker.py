@@ -0,0 +1,200 @@
+from collections import deque
+from threading import Condition, Lock
+from typing import Iterator
+
+import json
+
+
+class Subscription:
+    """
+    One open event stream of a user. Events are buffered in a bounded queue, a subscriber that falls
+    `buffer_size` events behind is dropped with a final `resync` event instead of blocking publishers.
+    """
+
+    __slots__ = ("user_id", "buffer_size", "overflowed", "_frames", "_cond")
+
+    def __init__(self, user_id: int, buffer_size: int):
+        """
+        Initialize an empty subscription.
+
+        Args:
+            user_id (int): The ID of the user the events are for.
+            buffer_size (int): Maximum number of undelivered events.
+        """
+        self.user_id = user_id
+        self.buffer_size = buffer_size
+        self.overflowed = False
+        self._frames: deque[str] = deque()
+        self._cond = Condition()
+
+    def push(self, frame: str) -> None:
+        """
+        Queue a formatted event, or switch to a single `resync` event once the buffer is full.
+
+        Args:
+            frame (str): The formatted server-sent event.
+        """
+        with self._cond:
+            if self.overflowed:
+                return
+            if len(self._frames) >= self.buffer_size:
+                self.overflowed = True
+                self._frames.clear()
+                self._frames.append(format_event("resync", {}))
+            else:
+                self._frames.append(frame)
+            self._cond.notify()
+
+    def pop(self, timeout: float) -> tuple[str, bool] | None:
+        """
+        Wait for the next queued event.
+
+        Args:
+            timeout (float): Maximum number of seconds to wait.
+
+        Returns:
+            tuple[str, bool] | None: The next formatted event and whether it is the final `resync` event, or None if nothing arrived in time.
+        """
+        with self._cond:
+            if not self._frames:
+                self._cond.wait(timeout)
+            if not self._frames:
+                return None
+            frame = self._frames.popleft()
+            # nothing is queued after the resync event
+            return frame, self.overflowed and not self._frames
+
+
+class EventBroker:
+    """
+    In-process fan-out of task events to the server-sent event streams of each user. Events are
+    serialized once per publish and handed to every open stream of the user. Streams hold no
+    request context or database connection. Only streams served by the same process receive the
+    events, which matches the single process deployment of the app.
+    """
+
+    def __init__(
+        self, buffer_size: int = 64, heartbeat_interval: float = 15.0
+    ):
+        """
+        Initialize EventBroker.
+
+        Args:
+            buffer_size (int): Maximum number of undelivered events per stream. Defaults to 64.
+            heartbeat_interval (float): Seconds of silence before a heartbeat comment is sent. Defaults to 15.
+        """
+        self.buffer_size = buffer_size
+        self.heartbeat_interval = heartbeat_interval
+        self._lock = Lock()
+        self._subscriptions: dict[int, set[Subscription]] = {}
+
+    def subscribe(self, user_id: int) -> Subscription:
+        """
+        Open a subscription to the events of a user.
+
+        Args:
+            user_id (int): The ID of the user.
+
+        Returns:
+            Subscription: The new subscription, close it with `unsubscribe`.
+        """
+        subscription = Subscription(user_id, self.buffer_size)
+        with self._lock:
+            self._subscriptions.setdefault(user_id, set()).add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        """
+        Close a subscription. Safe to call more than once.
+
+        Args:
+            subscription (Subscription): The subscription to close.
+        """
+        with self._lock:
+            subscriptions = self._subscriptions.get(subscription.user_id)
+            if subscriptions is None:
+                return
+            subscriptions.discard(subscription)
+            if not subscriptions:
+                del self._subscriptions[subscription.user_id]
+
+    def subscriber_count(self, user_id: int) -> int:
+        """
+        Count the open subscriptions of a user.
+
+        Args:
+            user_id (int): The ID of the user.
+
+        Returns:
+            int: The number of open subscriptions.
+        """
+        with self._lock:
+            return len(self._subscriptions.get(user_id, ()))
+
+    def publish(self, user_id: int, event: str, data: dict) -> int:
+        """
+        Send an event to every open subscription of a user.
+
+        Args:
+            user_id (int): The ID of the user.
+            event (str): The event name.
+            data (dict): JSON serializable event payload.
+
+        Returns:
+            int: The number of subscriptions the event was queued for.
+        """
+        with self._lock:
+            subscriptions = list(self._subscriptions.get(user_id, ()))
+        if not subscriptions:
+            return 0
+
+        frame = format_event(event, data)
+        for subscription in subscriptions:
+            subscription.push(frame)
+        return len(subscriptions)
+
+    def stream(self, user_id: int) -> Iterator[str]:
+        """
+        Subscribe to the events of a user and yield them as server-sent events, with heartbeat
+        comments while idle so proxies keep the connection open and disconnected clients are noticed.
+        The subscription only exists while the stream is iterated, it is closed when the client
+        disconnects or after it overflowed.
+
+        Args:
+            user_id (int): The ID of the user.
+
+        Yields:
+            str: Formatted server-sent event frames.
+        """
+        subscription = self.subscribe(user_id)
+        try:
+            yield ": connected\n\n"
+            while True:
+                popped = subscription.pop(self.heartbeat_interval)
+                if popped is None:
+                    yield ": heartbeat\n\n"
+                    continue
+                frame, final = popped
+                yield frame
+                # the subscription may overflow while the frame is sent, it ends
+                # only once the resync event itself went out
+                if final:
+                    return
+        finally:
+            self.unsubscribe(subscription)
+
+
+def format_event(event: str, data: dict) -> str:
+    """
+    Format a server-sent event frame.
+
+    Args:
+        event (str): The event name.
+        data (dict): JSON serializable event payload.
+
+    Returns:
+        str: The event frame, terminated by a blank line.
+    """
+    return (
+        f"event: {event}\ndata: {json.dumps(data, separators=(',', ':'))}\n\n"
+    )
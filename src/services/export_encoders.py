@@ -0,0 +1,295 @@
+"""
+Encoders of the task export formats.
+
+Every encoder consumes the same row source: batches of task rows, each row a
+tuple of `EXPORT_COLUMNS` values, or of `INCREMENTAL_COLUMNS` values for
+exports of the changes since a point in time, where deleted tasks are
+tombstone rows with only an ID, the deletion time and `deleted` set.
+Encoders yield one chunk of bytes per batch
+(plus header and footer chunks), so exports stream with bounded memory no
+matter the format. The columnar formats need pyarrow, an optional dependency;
+they are only offered when it is installed.
+"""
+
+from abc import ABC, abstractmethod
+from datetime import date
+from functools import cache
+from typing import Iterable, Iterator, Sequence
+
+import csv
+import io
+import zlib
+
+from src.core.timestamp import parse_datetime
+from src.services.api_response_service import ApiResponseService
+
+EXPORT_COLUMNS = ("id", "title", "description", "due_date", "status")
+INCREMENTAL_COLUMNS = EXPORT_COLUMNS + ("updated_at", "deleted")
+
+RowBatch = list[tuple]
+
+
+@cache
+def _load_pyarrow():
+    """Import pyarrow on first use, it is optional and slow to import."""
+    try:
+        import pyarrow
+        import pyarrow.ipc
+        import pyarrow.parquet
+    except ImportError:
+        return None
+    return pyarrow
+
+
+class ExportEncoder(ABC):
+    """Encodes batches of export rows into one file format."""
+
+    name: str
+    mimetype: str
+    extension: str
+    # rows per batch requested from the row source, None for its default
+    batch_size: int | None = None
+    # whether the output is compressed already, archives store it as is
+    compressed = False
+
+    def is_available(self) -> bool:
+        """Whether the dependencies of the format are installed."""
+        return True
+
+    @abstractmethod
+    def encode(
+        self,
+        batches: Iterable[RowBatch],
+        columns: Sequence[str] = EXPORT_COLUMNS,
+    ) -> Iterator[bytes]:
+        """
+        Encode row batches, yielding the file in chunks.
+
+        Args:
+            batches (Iterable[RowBatch]): Rows in `columns` order, in batches.
+            columns (Sequence[str]): Names of the row values, `EXPORT_COLUMNS` or `INCREMENTAL_COLUMNS`. Defaults to `EXPORT_COLUMNS`.
+
+        Yields:
+            bytes: Consecutive chunks of the encoded file.
+        """
+
+
+class CsvEncoder(ExportEncoder):
+    name = "csv"
+    mimetype = "text/csv"
+    extension = "csv"
+
+    def encode(
+        self,
+        batches: Iterable[RowBatch],
+        columns: Sequence[str] = EXPORT_COLUMNS,
+    ) -> Iterator[bytes]:
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(columns)
+        for batch in batches:
+            writer.writerows(batch)
+            yield buffer.getvalue().encode()
+            buffer.seek(0)
+            buffer.truncate()
+        # the header of an export without rows
+        yield buffer.getvalue().encode()
+
+
+class NdjsonEncoder(ExportEncoder):
+    """One JSON object per line, so consumers can parse the export as it streams in."""
+
+    name = "ndjson"
+    mimetype = "application/x-ndjson"
+    extension = "ndjson"
+
+    def encode(
+        self,
+        batches: Iterable[RowBatch],
+        columns: Sequence[str] = EXPORT_COLUMNS,
+    ) -> Iterator[bytes]:
+        dumps = ApiResponseService.dumps
+        for batch in batches:
+            yield b"".join(
+                dumps(dict(zip(columns, row))) + b"\n" for row in batch
+            )
+
+
+class JsonEncoder(ExportEncoder):
+    """A single JSON array of task objects, written incrementally."""
+
+    name = "json"
+    mimetype = "application/json"
+    extension = "json"
+
+    def encode(
+        self,
+        batches: Iterable[RowBatch],
+        columns: Sequence[str] = EXPORT_COLUMNS,
+    ) -> Iterator[bytes]:
+        dumps = ApiResponseService.dumps
+        separator = b"["
+        for batch in batches:
+            chunk = b",".join(dumps(dict(zip(columns, row))) for row in batch)
+            if chunk:
+                yield separator + chunk
+                separator = b","
+        yield b"]" if separator == b"," else b"[]"
+
+
+class GzipEncoder(ExportEncoder):
+    """Compresses the output of another encoder with gzip."""
+
+    mimetype = "application/gzip"
+    compressed = True
+
+    def __init__(self, inner: ExportEncoder, level: int = 6):
+        """
+        Initialize a GzipEncoder around another encoder.
+
+        Args:
+            inner (ExportEncoder): The encoder whose output is compressed.
+            level (int): zlib compression level. Defaults to 6.
+        """
+        self.inner = inner
+        self.level = level
+        self.name = f"{inner.name}.gz"
+        self.extension = f"{inner.extension}.gz"
+        self.batch_size = inner.batch_size
+
+    def encode(
+        self,
+        batches: Iterable[RowBatch],
+        columns: Sequence[str] = EXPORT_COLUMNS,
+    ) -> Iterator[bytes]:
+        # wbits=31 writes a gzip header and trailer around the deflate stream
+        compressor = zlib.compressobj(self.level, zlib.DEFLATED, 31)
+        for chunk in self.inner.encode(batches, columns):
+            compressed = compressor.compress(chunk)
+            if compressed:
+                yield compressed
+        yield compressor.flush()
+
+
+class _ChunkSink(io.RawIOBase):
+    """Write-only file that collects what pyarrow writes until it is drained.
+
+    `tell` keeps counting across drains, pyarrow relies on it for the offsets
+    in the file footer.
+    """
+
+    def __init__(self) -> None:
+        self._chunks: list[bytes] = []
+        self._position = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        self._chunks.append(bytes(data))
+        self._position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._position
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+class _ArrowEncoder(ExportEncoder):
+    """Base of the pyarrow based columnar formats, converts each batch to a record batch."""
+
+    batch_size = 16384
+
+    def is_available(self) -> bool:
+        return _load_pyarrow() is not None
+
+    def _fields(self, pa) -> dict:
+        """Arrow type and value conversion of every export column."""
+
+        def parse(parser):
+            return lambda value: None if value is None else parser(value)
+
+        return {
+            "id": (pa.int64(), None),
+            "title": (pa.string(), None),
+            "description": (pa.string(), None),
+            "due_date": (pa.date32(), parse(date.fromisoformat)),
+            "status": (pa.string(), None),
+            "updated_at": (
+                pa.timestamp("ms", tz="UTC"),
+                parse(parse_datetime),
+            ),
+            "deleted": (pa.bool_(), None),
+        }
+
+    def _record_batch(self, pa, schema, converters, batch: RowBatch):
+        arrays = []
+        for field, convert, values in zip(schema, converters, zip(*batch)):
+            if convert is not None:
+                values = [convert(value) for value in values]
+            arrays.append(pa.array(values, field.type))
+        return pa.record_batch(arrays, schema=schema)
+
+    def encode(
+        self,
+        batches: Iterable[RowBatch],
+        columns: Sequence[str] = EXPORT_COLUMNS,
+    ) -> Iterator[bytes]:
+        pa = _load_pyarrow()
+        fields = self._fields(pa)
+        schema = pa.schema([(name, fields[name][0]) for name in columns])
+        converters = [fields[name][1] for name in columns]
+        sink = _ChunkSink()
+        writer = self._open_writer(pa, pa.PythonFile(sink, mode="w"), schema)
+        for batch in batches:
+            if batch:
+                writer.write_batch(
+                    self._record_batch(pa, schema, converters, batch)
+                )
+                yield sink.drain()
+        writer.close()
+        yield sink.drain()
+
+    @abstractmethod
+    def _open_writer(self, pa, file, schema): ...
+
+
+class ArrowEncoder(_ArrowEncoder):
+    """Arrow IPC stream, cheap to read straight into dataframes."""
+
+    name = "arrow"
+    mimetype = "application/vnd.apache.arrow.stream"
+    extension = "arrows"
+
+    def _open_writer(self, pa, file, schema):
+        return pa.ipc.new_stream(file, schema)
+
+
+class ParquetEncoder(_ArrowEncoder):
+    """Parquet with zstd compression, one row group per batch."""
+
+    name = "parquet"
+    mimetype = "application/vnd.apache.parquet"
+    extension = "parquet"
+    compressed = True
+
+    def _open_writer(self, pa, file, schema):
+        return pa.parquet.ParquetWriter(file, schema, compression="zstd")
+
+
+def default_encoders() -> dict[str, ExportEncoder]:
+    """Return the export encoders by format name, including those whose dependencies are missing."""
+    csv_encoder = CsvEncoder()
+    encoders = [
+        csv_encoder,
+        GzipEncoder(csv_encoder),
+        NdjsonEncoder(),
+        JsonEncoder(),
+        ArrowEncoder(),
+        ParquetEncoder(),
+    ]
+    return {encoder.name: encoder for encoder in encoders}
@@ -0,0 +1,185 @@
+from typing import Any, Callable
+
+import logging
+
+from src.core.errors import (
+    InfrastructureError,
+    JobLeaseLostError,
+    UnknownJobKindError,
+)
+from src.core.job import Job
+from src.core.ports.job_queue import JobQueue
+from src.core.result import Result
+
+logger = logging.getLogger(__name__)
+
+
+class JobContext:
+    """
+    Handed to a job handler while it runs. Reporting progress also extends the job's lease, so
+    long running handlers should report regularly.
+    """
+
+    def __init__(self, job_queue: JobQueue, job: Job, worker_id: str):
+        """
+        Initialize a JobContext for a claimed job.
+
+        Args:
+            job_queue (JobQueue): The queue the job was claimed from.
+            job (Job): The running job.
+            worker_id (str): The worker holding the job's lease.
+        """
+        self.job_queue = job_queue
+        self.job = job
+        self.worker_id = worker_id
+
+    def report_progress(self, done: float, total: float = 1.0) -> None:
+        """
+        Record the progress of the job and extend its lease.
+
+        Args:
+            done (float): Units of work done.
+            total (float): Units of work in total. Defaults to 1.0, so `done` can be a fraction.
+
+        Raises:
+            JobLeaseLostError: If the lease expired and the job may run elsewhere, the handler
+                should stop without side effects.
+        """
+        progress = min(done / total, 1.0) if total else 1.0
+        if not self.job_queue.extend_lease(
+            self.job.id, self.worker_id, progress=progress
+        ):
+            raise JobLeaseLostError(self.job.id)
+        self.job.progress = progress
+
+
+JobHandler = Callable[[Job, JobContext], Result[dict[str, Any], Any]]
+
+
+class JobService:
+    """
+    Service responsible for background jobs. Services register a handler per job kind and enqueue
+    jobs, workers (`flask worker`) claim them and run the handlers. A handler returns Ok with a
+    JSON-serializable result dict, or Err. An Err with an InfrastructureError and unexpected
+    exceptions are retried with backoff, any other Err fails the job for good.
+    """
+
+    def __init__(self, job_queue: JobQueue) -> None:
+        """
+        Initialize JobService with a job queue.
+
+        Args:
+            job_queue (JobQueue): Queue the jobs are stored in.
+        """
+        self.job_queue = job_queue
+        self._handlers: dict[str, tuple[JobHandler, int | None]] = {}
+
+    def register(
+        self, kind: str, handler: JobHandler, max_attempts: int | None = None
+    ) -> None:
+        """
+        Register the handler of a job kind.
+
+        Args:
+            kind (str): Name of the job kind.
+            handler (JobHandler): Runs a job of this kind.
+            max_attempts (int | None): Attempts per job. Defaults to the queue's default.
+        """
+        self._handlers[kind] = (handler, max_attempts)
+
+    @property
+    def kinds(self) -> list[str]:
+        """The registered job kinds."""
+        return sorted(self._handlers)
+
+    def enqueue(
+        self,
+        kind: str,
+        payload: dict[str, Any],
+        user_id: int | None = None,
+        delay: float = 0.0,
+    ) -> Result[Job, UnknownJobKindError]:
+        """
+        Queue a job of a registered kind.
+
+        Args:
+            kind (str): Name of the job kind.
+            payload (dict[str, Any]): JSON-serializable arguments of the handler.
+            user_id (int | None): The user who requested the job. Defaults to None.
+            delay (float): Seconds before the job may run. Defaults to 0.0.
+
+        Returns:
+            Result[Job, UnknownJobKindError]: Ok with the queued job, Err if no handler is registered for the kind.
+        """
+        registered = self._handlers.get(kind)
+        if registered is None:
+            return Result.Err(UnknownJobKindError(kind))
+        return Result.Ok(
+            self.job_queue.enqueue(
+                kind,
+                payload,
+                user_id=user_id,
+                max_attempts=registered[1],
+                delay=delay,
+            )
+        )
+
+    def get_job(self, job_id: int, user_id: int | None = None) -> Job | None:
+        """
+        Return a job, optionally only if it belongs to a user.
+
+        Args:
+            job_id (int): The ID of the job.
+            user_id (int | None): When given, jobs of other users are not returned. Defaults to None.
+
+        Returns:
+            Job | None: The job, or None if it does not exist or belongs to another user.
+        """
+        job = self.job_queue.get(job_id)
+        if job is None or (user_id is not None and job.user_id != user_id):
+            return None
+        return job
+
+    def run_next(self, worker_id: str) -> Job | None:
+        """
+        Claim the next job and run its handler, recording the outcome in the queue.
+
+        Args:
+            worker_id (str): Identifies the worker, must be unique across processes.
+
+        Returns:
+            Job | None: The job that ran, or None if no job was claimable.
+        """
+        job = self.job_queue.claim(worker_id)
+        if job is None:
+            return None
+
+        registered = self._handlers.get(job.kind)
+        if registered is None:
+            self.job_queue.fail(
+                job.id, worker_id, str(UnknownJobKindError(job.kind)), False
+            )
+            return job
+
+        context = JobContext(self.job_queue, job, worker_id)
+        try:
+            result = registered[0](job, context)
+        except JobLeaseLostError:
+            logger.warning("Lost the lease of job %s", job.id)
+            return job
+        except Exception as e:
+            logger.exception("Job %s (%s) raised", job.id, job.kind)
+            self.job_queue.fail(job.id, worker_id, f"{type(e).__name__}: {e}")
+            return job
+
+        if result.is_ok:
+            self.job_queue.complete(job.id, worker_id, result.unwrap())
+        else:
+            error = result.unwrap_err()
+            self.job_queue.fail(
+                job.id,
+                worker_id,
+                str(error),
+                retry=isinstance(error, InfrastructureError),
+            )
+        return job
@@ -1,24 +1,248 @@
+from datetime import date, datetime, timedelta, timezone
+from pathlib import Path
+from typing import TYPE_CHECKING, Iterator
+
 import csv
 import io
+import os
+import shutil
+import time
+import uuid
 
-from src.core.errors import InfrastructureError
+from src.core.errors import (
+    ExportSinceCompactedError,
+    InfrastructureError,
+    UnsupportedExportFormatError,
+    ValidationError,
+)
+from src.core.job import Job
 from src.core.ports.task_repository import TaskRepository
 from src.core.result import Result
+from src.core.timestamp import format_timestamp, parse_timestamp
+from src.services.export_encoders import (
+    EXPORT_COLUMNS,
+    INCREMENTAL_COLUMNS,
+    ExportEncoder,
+    RowBatch,
+    default_encoders,
+)
+
+if TYPE_CHECKING:
+    from src.services.job_service import JobContext, JobService
 
 
 class TaskExportService:
     """
-    Service responsible for exporting tasks in CSV format.
+    Service responsible for exporting tasks, either streamed in the response or as a background job
+    that writes the file to `export_dir` for later download. Every format is produced by an
+    `ExportEncoder` from the same batched row source, see `src.services.export_encoders`.
+
+    Exports are either complete or incremental: given `since`, only the tasks created or updated
+    since then are exported, followed by tombstones of the tasks deleted since then. Consumers
+    keep the watermark of each export as the `since` of the next. Writes are stamped when they
+    run, not when they commit, so the watermark is taken before the first read and moved back by
+    `watermark_overlap`: a write stamped earlier but committed after the export started reading
+    is exported again by the next one.
     """
 
-    def __init__(self, task_repo: TaskRepository) -> None:
+    header = list(EXPORT_COLUMNS)
+    rows_per_chunk = 500
+    default_format = "csv"
+    default_job_format = "csv.gz"
+    job_kind = "export_tasks"
+    # admin export of every user's tasks into one archive, see `src.web.archive_export`
+    archive_job_kind = "export_all_tasks"
+    cleanup_job_kind = "cleanup_exports"
+    artifact_prefix = "tasks-"
+
+    def __init__(
+        self,
+        task_repo: TaskRepository,
+        job_service: "JobService | None" = None,
+        export_dir: str | Path = "db/exports",
+        artifact_ttl: float = 86400.0,
+        watermark_overlap: float = 60.0,
+    ) -> None:
         """
         Initialize TaskExportService with a task repository.
 
         Args:
             task_repo (TaskRepository): Repository for task data operations.
+            job_service (JobService | None): Runs background exports, required by `start_export`. Defaults to None.
+            export_dir (str | Path): Directory of the export files. Defaults to "db/exports".
+            artifact_ttl (float): Seconds an export file can be downloaded. Defaults to one day.
+            watermark_overlap (float): Seconds watermarks are moved back, longer than any write takes from stamp to commit. Defaults to 60.0.
         """
         self.task_repo = task_repo
+        self.job_service = job_service
+        self.export_dir = Path(export_dir)
+        self.artifact_ttl = artifact_ttl
+        self.watermark_overlap = watermark_overlap
+        self.encoders = default_encoders()
+
+    @property
+    def available_formats(self) -> list[str]:
+        """Names of the export formats whose dependencies are installed."""
+        return [
+            name
+            for name, encoder in self.encoders.items()
+            if encoder.is_available()
+        ]
+
+    def get_encoder(
+        self, format: str
+    ) -> Result[ExportEncoder, UnsupportedExportFormatError]:
+        """
+        Look up the encoder of an export format.
+
+        Args:
+            format (str): Name of the format, e.g. "csv", "ndjson" or "parquet".
+
+        Returns:
+            Result[ExportEncoder, UnsupportedExportFormatError]: Ok with the encoder, Err if the format is unknown or its optional dependency is not installed.
+        """
+        encoder = self.encoders.get(format)
+        if encoder is None or not encoder.is_available():
+            return Result.Err(
+                UnsupportedExportFormatError(format, self.available_formats)
+            )
+        return Result.Ok(encoder)
+
+    def parse_since(self, since: str) -> Result[str, ValidationError]:
+        """
+        Validate the start of an incremental export. Exports of the changes since a time before
+        the newest compacted tombstone would miss deletions and are refused.
+
+        Args:
+            since (str): An ISO 8601 date or date and time, UTC unless it has an offset.
+
+        Returns:
+            Result[str, ValidationError]: Ok with the normalized timestamp, Err if it is invalid or too old.
+        """
+        result = parse_timestamp(since)
+        if result.is_err:
+            return result
+        since = result.unwrap()
+        compacted_at = self.task_repo.compacted_at()
+        if compacted_at is not None and since <= compacted_at:
+            return Result.Err(ExportSinceCompactedError(since, compacted_at))
+        return Result.Ok(since)
+
+    def watermark(self) -> str:
+        """Return the `since` of the export after one that starts reading now: the current time
+        less `watermark_overlap`, so writes still in flight are exported again next time.
+        """
+        return format_timestamp(
+            datetime.now(timezone.utc)
+            - timedelta(seconds=self.watermark_overlap)
+        )
+
+    @staticmethod
+    def columns(since: str | None = None) -> tuple[str, ...]:
+        """Return the columns of a complete export, or of an incremental one when `since` is given."""
+        return EXPORT_COLUMNS if since is None else INCREMENTAL_COLUMNS
+
+    def iter_row_batches(
+        self,
+        user_id: int,
+        batch_size: int | None = None,
+        since: str | None = None,
+    ) -> Iterator[RowBatch]:
+        """
+        The row source of every export format: a user's tasks as tuples of `EXPORT_COLUMNS` values.
+        With `since`, the tasks changed since then as tuples of `INCREMENTAL_COLUMNS` values,
+        followed by the tombstones of the tasks deleted since then.
+
+        Args:
+            user_id (int): The ID of the user whose tasks to export.
+            batch_size (int | None): Rows per batch. Defaults to `rows_per_chunk`.
+            since (str | None): Timestamp returned by `parse_since`. Defaults to None for all tasks.
+
+        Yields:
+            RowBatch: Consecutive batches of rows, none of them empty.
+        """
+        batch_size = batch_size or self.rows_per_chunk
+        if since is None:
+            rows = (
+                (
+                    task.id,
+                    task.title,
+                    task.description,
+                    task.due_date,
+                    task.status,
+                )
+                for task in self.task_repo.iter_by_user(user_id, batch_size)
+            )
+        else:
+            rows = self._iter_changed_rows(user_id, since, batch_size)
+        batch: RowBatch = []
+        for row in rows:
+            batch.append(row)
+            if len(batch) >= batch_size:
+                yield batch
+                batch = []
+        if batch:
+            yield batch
+
+    def _iter_changed_rows(
+        self, user_id: int, since: str, batch_size: int
+    ) -> Iterator[tuple]:
+        """Rows of `INCREMENTAL_COLUMNS` of a user's tasks changed since a time, then tombstones."""
+        for task in self.task_repo.iter_changed_since(
+            user_id, since, batch_size
+        ):
+            yield (
+                task.id,
+                task.title,
+                task.description,
+                task.due_date,
+                task.status,
+                task.updated_at,
+                False,
+            )
+        for task_id, deleted_at in self.task_repo.deleted_since(
+            user_id, since
+        ):
+            yield (task_id, None, None, None, None, deleted_at, True)
+
+    def export_shard(
+        self, user_ids: list[int], directory: str | Path, format: str
+    ) -> Result[
+        list[tuple[int, str, int]], ValidationError | InfrastructureError
+    ]:
+        """
+        Write the export of each user of a shard to its own file in `directory`, named
+        `user-<id>.<extension>`. The whole shard is read in one snapshot.
+
+        Args:
+            user_ids (list[int]): The IDs of the users of the shard.
+            directory (str | Path): Existing directory the files are written to.
+            format (str): Name of the export format.
+
+        Returns:
+            Result[list[tuple[int, str, int]], ValidationError | InfrastructureError]: Ok with the user ID, file name and row count of each file, Err if the format is not supported or a file could not be written.
+        """
+        encoder_result = self.get_encoder(format)
+        if encoder_result.is_err:
+            return Result.Err(encoder_result.unwrap_err())
+        encoder = encoder_result.unwrap()
+
+        files = []
+        today = date.today()
+        try:
+            with self.task_repo.snapshot():
+                for user_id in user_ids:
+                    filename = f"user-{user_id}.{encoder.extension}"
+                    with open(Path(directory, filename), "wb") as file:
+                        for chunk in self.stream_user_tasks(user_id, encoder):
+                            file.write(chunk)
+                    # the counts are read in the same snapshot as the rows
+                    stats = self.task_repo.get_stats(user_id, today)
+                    rows = stats.todo + stats.in_progress + stats.completed
+                    files.append((user_id, filename, rows))
+        except OSError as e:
+            return Result.Err(InfrastructureError(str(e)))
+        return Result.Ok(files)
 
     def export_user_tasks(
         self, user_id: int
@@ -36,9 +260,7 @@ class TaskExportService:
         try:
             buffer = io.StringIO()
             writer = csv.writer(buffer)
-            writer.writerow(
-                ["id", "title", "description", "due_date", "status"]
-            )
+            writer.writerow(self.header)
             for task in tasks:
                 writer.writerow(
                     [
@@ -54,3 +276,208 @@ class TaskExportService:
             return Result.Ok(csv_content)
         except Exception as e:
             return Result.Err(InfrastructureError(str(e)))
+
+    def stream_user_tasks(
+        self,
+        user_id: int,
+        encoder: ExportEncoder | None = None,
+        since: str | None = None,
+    ) -> Iterator[bytes]:
+        """
+        Generate the export of a specified user's tasks in chunks, one per batch of rows.
+        Tasks are read through `iter_by_user`, so memory use does not grow with the number of tasks.
+        Must be consumed inside an app context (e.g. wrapped with `stream_with_context`).
+
+        Args:
+            user_id (int): The ID of the user whose tasks to export.
+            encoder (ExportEncoder | None): Encoder of the export format. Defaults to CSV.
+            since (str | None): Timestamp returned by `parse_since`, only export the changes since then. Defaults to None.
+
+        Yields:
+            bytes: Consecutive chunks of the encoded export.
+        """
+        encoder = encoder or self.encoders[self.default_format]
+        yield from encoder.encode(
+            self.iter_row_batches(user_id, encoder.batch_size, since),
+            self.columns(since),
+        )
+
+    def start_export(
+        self,
+        user_id: int,
+        format: str | None = None,
+        since: str | None = None,
+    ) -> Result[Job, ValidationError | InfrastructureError]:
+        """
+        Queue a background export of a user's tasks. The request returns immediately, the export
+        file is written by a worker.
+
+        Args:
+            user_id (int): The ID of the user whose tasks to export.
+            format (str | None): Name of the export format. Defaults to `default_job_format`.
+            since (str | None): Only export the changes since this ISO 8601 time, see `parse_since`. Defaults to None.
+
+        Returns:
+            Result[Job, ValidationError | InfrastructureError]: Ok with the queued job, Err if the format is not supported, `since` is invalid or background exports are not set up.
+        """
+        format = format or self.default_job_format
+        encoder_result = self.get_encoder(format)
+        if encoder_result.is_err:
+            return Result.Err(encoder_result.unwrap_err())
+        payload = {"format": format}
+        if since is not None:
+            since_result = self.parse_since(since)
+            if since_result.is_err:
+                return Result.Err(since_result.unwrap_err())
+            payload["since"] = since_result.unwrap()
+        if self.job_service is None:
+            return Result.Err(
+                InfrastructureError("Background exports are not configured.")
+            )
+        return self.job_service.enqueue(
+            self.job_kind, payload, user_id=user_id
+        )
+
+    def run_export_job(
+        self, job: Job, context: "JobContext"
+    ) -> Result[dict, ValidationError | InfrastructureError]:
+        """
+        Job handler that writes the export of the job's user to a file. All tasks are read in one
+        read snapshot, so the file is consistent even while the user keeps editing. The file is
+        written under a temporary name and renamed when complete, and a cleanup job is queued for
+        when it expires.
+
+        Args:
+            job (Job): The export job, `user_id` is the user whose tasks are exported, the payload's `format` the export format and its optional `since` the start of an incremental export.
+            context (JobContext): Receives the progress of the export.
+
+        Returns:
+            Result[dict, ValidationError | InfrastructureError]: Ok with the file name, format, row count, watermark and expiry time, Err if the format is not supported, the tombstones since `since` were compacted meanwhile or the file could not be written.
+        """
+        format = job.payload.get("format", self.default_job_format)
+        encoder_result = self.get_encoder(format)
+        if encoder_result.is_err:
+            return Result.Err(encoder_result.unwrap_err())
+        encoder = encoder_result.unwrap()
+        since = job.payload.get("since")
+        if since is not None:
+            since_result = self.parse_since(since)
+            if since_result.is_err:
+                return Result.Err(since_result.unwrap_err())
+
+        self.export_dir.mkdir(parents=True, exist_ok=True)
+        # random names, so export files cannot be guessed from job ids
+        filename = (
+            f"{self.artifact_prefix}{job.id}-{uuid.uuid4().hex}"
+            f".{encoder.extension}"
+        )
+        path = self.export_dir / filename
+        partial = path.with_name(f".{filename}.partial")
+        rows = 0
+
+        def batches(total: int) -> Iterator[RowBatch]:
+            nonlocal rows
+            for batch in self.iter_row_batches(
+                job.user_id, encoder.batch_size, since
+            ):
+                yield batch
+                rows += len(batch)
+                context.report_progress(rows, total)
+
+        watermark = self.watermark()
+        try:
+            with self.task_repo.snapshot():
+                # an upper bound for incremental exports, progress is capped at 1
+                stats = self.task_repo.get_stats(job.user_id, date.today())
+                total = stats.todo + stats.in_progress + stats.completed
+                with open(partial, "wb") as file:
+                    for chunk in encoder.encode(
+                        batches(total), self.columns(since)
+                    ):
+                        file.write(chunk)
+            os.replace(partial, path)
+        except OSError as e:
+            partial.unlink(missing_ok=True)
+            return Result.Err(InfrastructureError(str(e)))
+        except BaseException:
+            partial.unlink(missing_ok=True)
+            raise
+
+        self.schedule_cleanup()
+        return Result.Ok(
+            {
+                "filename": filename,
+                "format": format,
+                "rows": rows,
+                "since": since,
+                "watermark": watermark,
+                "expires_at": time.time() + self.artifact_ttl,
+            }
+        )
+
+    def schedule_cleanup(self) -> None:
+        """Queue a cleanup job for when an export file written now expires."""
+        if self.job_service is not None:
+            self.job_service.enqueue(
+                self.cleanup_job_kind, {}, delay=self.artifact_ttl
+            )
+
+    def is_export_job(self, job: Job) -> bool:
+        """Whether a job writes a downloadable export file, of one user or the admin archive."""
+        return job.kind in (self.job_kind, self.archive_job_kind)
+
+    def artifact_path(self, job: Job) -> Path | None:
+        """
+        Return the export file of a succeeded export job, unless it has expired. The job
+        result's `format` names its encoder.
+
+        Args:
+            job (Job): An export job.
+
+        Returns:
+            Path | None: The file, or None if the job has no downloadable file.
+        """
+        if (
+            not self.is_export_job(job)
+            or job.status != "succeeded"
+            or not job.result
+            or job.result["expires_at"] <= time.time()
+        ):
+            return None
+        path = self.export_dir / job.result["filename"]
+        return path if path.is_file() else None
+
+    def cleanup_expired(
+        self, job: Job | None = None, context: "JobContext | None" = None
+    ) -> Result[dict, InfrastructureError]:
+        """
+        Delete export files older than `artifact_ttl`, leftovers of interrupted exports (including
+        scratch directories of archive exports) and finished jobs older than `artifact_ttl`. Also
+        usable as the handler of the cleanup job.
+
+        Args:
+            job (Job | None): The cleanup job when run as a handler, unused. Defaults to None.
+            context (JobContext | None): Unused. Defaults to None.
+
+        Returns:
+            Result[dict, InfrastructureError]: Ok with the number of removed files and purged jobs, Err if a file could not be removed.
+        """
+        cutoff = time.time() - self.artifact_ttl
+        removed = 0
+        try:
+            # also matches the hidden partial files of interrupted exports
+            for path in self.export_dir.glob(f"*{self.artifact_prefix}*"):
+                if path.stat().st_mtime <= cutoff:
+                    if path.is_dir():
+                        shutil.rmtree(path)
+                    else:
+                        path.unlink(missing_ok=True)
+                    removed += 1
+        except OSError as e:
+            return Result.Err(InfrastructureError(str(e)))
+        purged = (
+            self.job_service.job_queue.purge_finished(cutoff)
+            if self.job_service is not None
+            else 0
+        )
+        return Result.Ok({"removed": removed, "purged_jobs": purged})
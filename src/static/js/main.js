@@ -1 +1,484 @@
-"use strict";(()=>{var d=class{constructor({formId:t,errorBoxId:r,errorMessageId:a,endpoint:i,method:n}){this.validators=[];this.method="POST";let s=document.getElementById(r),c=document.getElementById(a);if(!s||!c)throw new Error(`Error box or message element not found. ${r}, ${a}`);this.formId=t,this.errorBox=s,this.errorMessage=c,this._endpoint=i,n&&(this.method=n)}static formExists(t){let r=document.getElementById(t);return r!==null&&r instanceof HTMLFormElement}tryAttach(){let t=document.getElementById(this.formId);t&&t.addEventListener("submit",async r=>{r.preventDefault();let a=new FormData(t),i={};a.forEach((n,s)=>{typeof n=="string"&&(i[s]=n.trim())});for(let n of this.validators){let s=n(i);if(s){this.showError(s);return}}this.hideError();try{let s=await(await fetch(this.endpoint,{method:this.method,body:a})).json();if(s.error){this.showError(s.error);return}s.redirect&&(window.location.href=s.redirect)}catch{this.showError("Something went wrong \u{1F615}")}})}addValidator(t){this.validators.push(t)}get endpoint(){if(this.method==="POST")return this._endpoint;let t=window.location.href.split("/");return`${this._endpoint}/${t[t.length-1]}`}showError(t){this.errorBox.classList.contains("flex")||(this.errorBox.classList.remove("hidden"),this.errorBox.classList.add("flex")),this.errorMessage.textContent=t}hideError(){this.errorBox.classList.contains("hidden")||(this.errorBox.classList.add("hidden"),this.errorBox.classList.remove("flex"))}},o={required:e=>t=>t[e]?"":`${e} cannot be empty`,minLength:(e,t)=>r=>r[e]&&r[e].length<t?`${e} must be at least ${t} characters long`:"",pattern:(e,t,r)=>a=>a[e]&&!t.test(a[e])?r:"",passwordMatch:(e,t)=>r=>r[e]&&r[t]&&r[e]!==r[t]?"Passwords do not match":"",custom:e=>e};function f(){let e="create-task-form";if(!d.formExists(e))return;let t=new d({formId:e,errorBoxId:"create-task-error",errorMessageId:"create-task-error-message",endpoint:"/task"});t.addValidator(o.required("title")),t.addValidator(o.required("due_date")),t.addValidator(o.required("status")),t.tryAttach()}function p(){let e=document.querySelectorAll("[data-task-status]");if(e.length===0)return;let t=document.getElementById("task-status-filter");t&&t.addEventListener("change",a=>{let i=a.target.value;e.forEach(n=>{let s=n.dataset.taskStatus;i==="All"||s===i?x(n):k(n)})});let r=document.getElementById("task-sorter");r&&r.addEventListener("change",a=>{let i=a.target.value;if(!i)return;let n=e[0].parentElement;if(!n)return;let s=Array.from(e);s.sort((c,u)=>{let l="",m="";switch(i){case"title":return l=c.dataset.taskTitle||"",m=u.dataset.taskTitle||"",l.localeCompare(m);case"status":return l=c.dataset.taskStatus||"",m=u.dataset.taskStatus||"",l.localeCompare(m);case"due_date":return l=c.dataset.taskDueDate||"",m=u.dataset.taskDueDate||"",new Date(l).getTime()-new Date(m).getTime();default:return 0}}),s.forEach(c=>n.appendChild(c))})}function k(e){e.classList.contains("flex")&&(e.classList.add("hidden"),e.classList.remove("flex"))}function x(e){e.classList.contains("hidden")&&(e.classList.remove("hidden"),e.classList.add("flex"))}function g(){let e=document.querySelectorAll("[data-delete-task-id]");e.length!==0&&e.forEach(t=>{t.addEventListener("click",async r=>{r.preventDefault();let a=t.dataset.deleteTaskId;if(!a||!window.confirm("Are you sure you want to delete this task?"))return;let s=await(await fetch(`/task/${a}`,{method:"DELETE"})).json();if(s.error){alert(`Error deleting task: ${s.error}`);return}window.location.reload()})})}function h(){let e="edit-task-form";if(!d.formExists(e))return;let t=new d({formId:e,errorBoxId:"edit-task-error",errorMessageId:"edit-task-error-message",endpoint:"/task",method:"PUT"});t.addValidator(o.required("title")),t.addValidator(o.required("due_date")),t.addValidator(o.required("status")),t.tryAttach()}function E(){let e="login-form";if(!d.formExists(e))return;let t=new d({formId:e,errorBoxId:"login-error",errorMessageId:"login-error-message",endpoint:"/login"});t.addValidator(o.required("username")),t.addValidator(o.required("password")),t.addValidator(o.minLength("password",8)),t.addValidator(o.pattern("username",/^[a-zA-Z0-9_-]+$/,"Username can only contain letters, numbers, hyphens, and underscores")),t.tryAttach()}function w(){let e="registration-form";if(!d.formExists(e))return;let t=new d({formId:e,errorBoxId:"register-error",errorMessageId:"register-error-message",endpoint:"/register"});t.addValidator(o.required("username")),t.addValidator(o.required("email")),t.addValidator(o.required("password")),t.addValidator(o.required("password2")),t.addValidator(o.minLength("password",8)),t.addValidator(o.pattern("username",/^[a-zA-Z0-9_-]+$/,"Username can only contain letters, numbers, hyphens, and underscores")),t.addValidator(o.pattern("email",/^[^\s@]+@[^\s@]+\.[^\s@]+$/,"Please enter a valid email address")),t.addValidator(o.passwordMatch("password","password2")),t.tryAttach()}function L(){let e=document.getElementById("task-search-form");if(!e)return;console.log(e),e.addEventListener("submit",r=>{r.preventDefault();let a=new FormData(e),i=a.get("title")||"",n=a.get("description")||"",s=new URLSearchParams;i&&s.append("title",i),n&&s.append("description",n),window.location.search=s.toString()});let t=document.getElementById("reset-task-search-button");t&&t.addEventListener("click",()=>{e.reset(),window.location.href=window.location.pathname})}async function y(){console.log("\u{1F913}"),E(),w(),f(),h(),g(),p(),L()}y();})();
+"use strict";
+(() => {
+  // form-listener.ts
+  const __form_listener = (() => {
+
+class FormListener {
+    formId;
+    validators = [];
+    errorBox;
+    errorMessage;
+    _endpoint;
+    method = 'POST';
+    constructor({ formId, errorBoxId, errorMessageId, endpoint, method }){
+        const errorBox = document.getElementById(errorBoxId);
+        const errorMessage = document.getElementById(errorMessageId);
+        if (!errorBox || !errorMessage) {
+            throw new Error(`Error box or message element not found. ${errorBoxId}, ${errorMessageId}`);
+        }
+        this.formId = formId;
+        this.errorBox = errorBox;
+        this.errorMessage = errorMessage;
+        this._endpoint = endpoint;
+        if (method) {
+            this.method = method;
+        }
+    }
+    static formExists(formId) {
+        const form = document.getElementById(formId);
+        return form !== null && form instanceof HTMLFormElement;
+    }
+    tryAttach() {
+        const form = document.getElementById(this.formId);
+        if (!form) {
+            return;
+        }
+        form.addEventListener('submit', async (event)=>{
+            event.preventDefault();
+            const formData = new FormData(form);
+            const data = {};
+            formData.forEach((value, key)=>{
+                if (typeof value === 'string') {
+                    data[key] = value.trim();
+                }
+            });
+            for (const validator of this.validators){
+                const error = validator(data);
+                if (error) {
+                    this.showError(error);
+                    return;
+                }
+            }
+            this.hideError();
+            try {
+                const response = await fetch(this.endpoint, {
+                    method: this.method,
+                    body: formData
+                });
+                const json = await response.json();
+                if (json.error) {
+                    this.showError(json.error);
+                    return;
+                }
+                if (json.redirect) {
+                    window.location.href = json.redirect;
+                }
+            } catch (error) {
+                this.showError('Something went wrong 😕');
+            }
+        });
+    }
+    addValidator(validator) {
+        this.validators.push(validator);
+    }
+    get endpoint() {
+        if (this.method === 'POST') {
+            return this._endpoint;
+        }
+        const parts = window.location.href.split('/');
+        return `${this._endpoint}/${parts[parts.length - 1]}`;
+    }
+    showError(message) {
+        if (!this.errorBox.classList.contains('flex')) {
+            this.errorBox.classList.remove('hidden');
+            this.errorBox.classList.add('flex');
+        }
+        this.errorMessage.textContent = message;
+    }
+    hideError() {
+        if (this.errorBox.classList.contains('hidden')) return;
+        this.errorBox.classList.add('hidden');
+        this.errorBox.classList.remove('flex');
+    }
+}
+const ValidationHelpers = {
+    required: (fieldName)=>(data)=>{
+            if (!data[fieldName]) {
+                return `${fieldName} cannot be empty`;
+            }
+            return '';
+        },
+    minLength: (fieldName, minLen)=>(data)=>{
+            if (data[fieldName] && data[fieldName].length < minLen) {
+                return `${fieldName} must be at least ${minLen} characters long`;
+            }
+            return '';
+        },
+    pattern: (fieldName, regex, message)=>(data)=>{
+            if (data[fieldName] && !regex.test(data[fieldName])) {
+                return message;
+            }
+            return '';
+        },
+    passwordMatch: (password1, password2)=>(data)=>{
+            if (data[password1] && data[password2] && data[password1] !== data[password2]) {
+                return 'Passwords do not match';
+            }
+            return '';
+        },
+    custom: (validator)=>validator
+};
+
+  return { FormListener, ValidationHelpers };
+  })();
+  // create-task-form.ts
+  const __create_task_form = (() => {
+const { FormListener, ValidationHelpers } = __form_listener;
+
+function setupCreateTaskForm() {
+    const formId = 'create-task-form';
+    if (!FormListener.formExists(formId)) return;
+    const formListener = new FormListener({
+        formId,
+        errorBoxId: 'create-task-error',
+        errorMessageId: 'create-task-error-message',
+        endpoint: '/task'
+    });
+    formListener.addValidator(ValidationHelpers.required('title'));
+    formListener.addValidator(ValidationHelpers.required('due_date'));
+    formListener.addValidator(ValidationHelpers.required('status'));
+    formListener.tryAttach();
+}
+
+  return { setupCreateTaskForm };
+  })();
+  // dashboard.ts
+  const __dashboard = (() => {
+function setupDashboard() {
+    const taskCards = document.querySelectorAll('[data-task-status]');
+    if (taskCards.length === 0) return;
+    const taskStatusFilter = document.getElementById('task-status-filter');
+    if (taskStatusFilter) {
+        taskStatusFilter.addEventListener('change', (event)=>{
+            const selectedStatus = event.target.value;
+            taskCards.forEach((card)=>{
+                const cardStatus = card.dataset.taskStatus;
+                if (selectedStatus === 'All' || cardStatus === selectedStatus) {
+                    tryShow(card);
+                } else {
+                    tryHide(card);
+                }
+            });
+        });
+    }
+    const taskSorter = document.getElementById('task-sorter');
+    if (!taskSorter) return;
+    taskSorter.addEventListener('change', (event)=>{
+        const selectedKey = event.target.value;
+        if (!selectedKey) return;
+        const container = taskCards[0].parentElement;
+        if (!container) return;
+        const cardsArray = Array.from(taskCards);
+        cardsArray.sort((a, b)=>{
+            let valA = '';
+            let valB = '';
+            switch(selectedKey){
+                case 'title':
+                    valA = a.dataset.taskTitle || '';
+                    valB = b.dataset.taskTitle || '';
+                    return valA.localeCompare(valB);
+                case 'status':
+                    valA = a.dataset.taskStatus || '';
+                    valB = b.dataset.taskStatus || '';
+                    return valA.localeCompare(valB);
+                case 'due_date':
+                    valA = a.dataset.taskDueDate || '';
+                    valB = b.dataset.taskDueDate || '';
+                    return new Date(valA).getTime() - new Date(valB).getTime();
+                default:
+                    return 0;
+            }
+        });
+        cardsArray.forEach((card)=>container.appendChild(card));
+    });
+}
+function tryHide(card) {
+    if (card.classList.contains('flex')) {
+        card.classList.add('hidden');
+        card.classList.remove('flex');
+    }
+}
+function tryShow(card) {
+    if (card.classList.contains('hidden')) {
+        card.classList.remove('hidden');
+        card.classList.add('flex');
+    }
+}
+
+  return { setupDashboard };
+  })();
+  // delete-task-handler.ts
+  const __delete_task_handler = (() => {
+function setupDeleteTaskHandler() {
+    const deleteButtons = document.querySelectorAll('[data-delete-task-id]');
+    if (deleteButtons.length === 0) return;
+    deleteButtons.forEach((button)=>{
+        button.addEventListener('click', async (event)=>{
+            event.preventDefault();
+            const taskId = button.dataset.deleteTaskId;
+            if (!taskId) return;
+            const confirm = window.confirm('Are you sure you want to delete this task?');
+            if (!confirm) return;
+            const response = await fetch(`/task/${taskId}`, {
+                method: 'DELETE'
+            });
+            const json = await response.json();
+            if (json.error) {
+                alert(`Error deleting task: ${json.error}`);
+                return;
+            }
+            window.location.reload();
+        });
+    });
+}
+
+  return { setupDeleteTaskHandler };
+  })();
+  // edit-task-form.ts
+  const __edit_task_form = (() => {
+const { FormListener, ValidationHelpers } = __form_listener;
+
+function setupEditTaskForm() {
+    const formId = 'edit-task-form';
+    if (!FormListener.formExists(formId)) return;
+    const formListener = new FormListener({
+        formId,
+        errorBoxId: 'edit-task-error',
+        errorMessageId: 'edit-task-error-message',
+        endpoint: '/task',
+        method: 'PUT'
+    });
+    formListener.addValidator(ValidationHelpers.required('title'));
+    formListener.addValidator(ValidationHelpers.required('due_date'));
+    formListener.addValidator(ValidationHelpers.required('status'));
+    formListener.tryAttach();
+}
+
+  return { setupEditTaskForm };
+  })();
+  // export-job.ts
+  const __export_job = (() => {
+
+const POLL_INTERVAL_MS = 1000;
+function setupExportJob() {
+    const button = document.getElementById('export-job-button');
+    const status = document.getElementById('export-job-status');
+    if (!button || !status) return;
+    button.addEventListener('click', async (event)=>{
+        event.preventDefault();
+        button.setAttribute('disabled', '');
+        status.textContent = 'Export queued…';
+        const response = await fetch('/task/export/jobs', {
+            method: 'POST'
+        });
+        const json = await response.json();
+        if (!json.ok || !json.data) {
+            status.textContent = `Export failed: ${json.error}`;
+            button.removeAttribute('disabled');
+            return;
+        }
+        const statusUrl = json.data.status_url;
+        const poll = async ()=>{
+            const response = await fetch(statusUrl);
+            const json = await response.json();
+            const job = json.data;
+            if (!json.ok || !job || job.status === 'failed') {
+                status.textContent = `Export failed: ${job?.error ?? json.error}`;
+                button.removeAttribute('disabled');
+                return;
+            }
+            if (job.download_url) {
+                status.textContent = 'Export ready.';
+                button.removeAttribute('disabled');
+                window.location.href = job.download_url;
+                return;
+            }
+            status.textContent = `Exporting… ${Math.round(job.progress * 100)}%`;
+            window.setTimeout(poll, POLL_INTERVAL_MS);
+        };
+        window.setTimeout(poll, POLL_INTERVAL_MS);
+    });
+}
+
+  return { setupExportJob };
+  })();
+  // live-updates.ts
+  const __live_updates = (() => {
+
+function setupLiveUpdates() {
+    const grid = document.getElementById('task-grid');
+    if (!grid || !('EventSource' in window)) return;
+    let cursor = Number(grid.dataset.changeCursor || 0);
+    const previewLength = Number(grid.dataset.previewLength || 100);
+    let syncing = null;
+    let pending = false;
+    const sync = ()=>{
+        if (syncing) {
+            pending = true;
+            return;
+        }
+        syncing = (async ()=>{
+            do {
+                pending = false;
+                let hasMore = true;
+                while(hasMore){
+                    const response = await fetch(`/task/changes?since=${cursor}`);
+                    const json = await response.json();
+                    if (!json.ok || !json.data) return;
+                    const page = json.data;
+                    if (page.reset) {
+                        window.location.reload();
+                        return;
+                    }
+                    page.changes.forEach((change)=>applyChange(grid, change, previewLength));
+                    cursor = page.cursor;
+                    hasMore = page.has_more;
+                }
+            }while (pending)
+        })().finally(()=>{
+            syncing = null;
+        });
+    };
+    const source = new EventSource('/task/events');
+    source.addEventListener('task', sync);
+    source.addEventListener('resync', sync);
+    source.addEventListener('open', sync);
+}
+function applyChange(grid, change, previewLength) {
+    const card = grid.querySelector(`[data-task-id="${change.task_id}"]`);
+    if (change.op === 'delete' || !change.task) {
+        card?.remove();
+        return;
+    }
+    if (!card) {
+        document.getElementById('task-live-notice')?.classList.remove('hidden');
+        return;
+    }
+    const task = change.task;
+    card.dataset.taskStatus = task.status;
+    card.dataset.taskTitle = task.title;
+    card.dataset.taskDueDate = task.due_date;
+    setField(card, 'status', task.status);
+    setField(card, 'title', task.title);
+    setField(card, 'due_date', `Due: ${task.due_date}`);
+    setField(card, 'preview', task.description.length > previewLength ? `${task.description.slice(0, previewLength)}…` : task.description);
+}
+function setField(card, field, text) {
+    const element = card.querySelector(`[data-task-field="${field}"]`);
+    if (element) element.textContent = text;
+}
+
+  return { setupLiveUpdates };
+  })();
+  // login-form.ts
+  const __login_form = (() => {
+const { FormListener, ValidationHelpers } = __form_listener;
+
+function setupLoginForm() {
+    const formId = 'login-form';
+    if (!FormListener.formExists(formId)) return;
+    const formListener = new FormListener({
+        formId,
+        errorBoxId: 'login-error',
+        errorMessageId: 'login-error-message',
+        endpoint: '/login'
+    });
+    formListener.addValidator(ValidationHelpers.required('username'));
+    formListener.addValidator(ValidationHelpers.required('password'));
+    formListener.addValidator(ValidationHelpers.minLength('password', 8));
+    formListener.addValidator(ValidationHelpers.pattern('username', /^[a-zA-Z0-9_-]+$/, 'Username can only contain letters, numbers, hyphens, and underscores'));
+    formListener.tryAttach();
+}
+
+  return { setupLoginForm };
+  })();
+  // registration-form.ts
+  const __registration_form = (() => {
+const { FormListener, ValidationHelpers } = __form_listener;
+
+function setupRegistrationForm() {
+    const formId = 'registration-form';
+    if (!FormListener.formExists(formId)) return;
+    const formListener = new FormListener({
+        formId,
+        errorBoxId: 'register-error',
+        errorMessageId: 'register-error-message',
+        endpoint: '/register'
+    });
+    formListener.addValidator(ValidationHelpers.required('username'));
+    formListener.addValidator(ValidationHelpers.required('email'));
+    formListener.addValidator(ValidationHelpers.required('password'));
+    formListener.addValidator(ValidationHelpers.required('password2'));
+    formListener.addValidator(ValidationHelpers.minLength('password', 8));
+    formListener.addValidator(ValidationHelpers.pattern('username', /^[a-zA-Z0-9_-]+$/, 'Username can only contain letters, numbers, hyphens, and underscores'));
+    formListener.addValidator(ValidationHelpers.pattern('email', /^[^\s@]+@[^\s@]+\.[^\s@]+$/, 'Please enter a valid email address'));
+    formListener.addValidator(ValidationHelpers.passwordMatch('password', 'password2'));
+    formListener.tryAttach();
+}
+
+  return { setupRegistrationForm };
+  })();
+  // task-search-form.ts
+  const __task_search_form = (() => {
+function setupTaskSearchForm() {
+    const form = document.getElementById('task-search-form');
+    if (!form) return;
+    console.log(form);
+    form.addEventListener('submit', (event)=>{
+        event.preventDefault();
+        const formData = new FormData(form);
+        const title = formData.get('title') || '';
+        const description = formData.get('description') || '';
+        const searchParams = new URLSearchParams();
+        if (title) {
+            searchParams.append('title', title);
+        }
+        if (description) {
+            searchParams.append('description', description);
+        }
+        window.location.search = searchParams.toString();
+    });
+    const resetTaskSearchButton = document.getElementById('reset-task-search-button');
+    if (!resetTaskSearchButton) return;
+    resetTaskSearchButton.addEventListener('click', ()=>{
+        form.reset();
+        window.location.href = window.location.pathname;
+    });
+}
+
+  return { setupTaskSearchForm };
+  })();
+  // main.ts
+const { setupCreateTaskForm } = __create_task_form;
+const { setupDashboard } = __dashboard;
+const { setupDeleteTaskHandler } = __delete_task_handler;
+const { setupEditTaskForm } = __edit_task_form;
+const { setupExportJob } = __export_job;
+const { setupLiveUpdates } = __live_updates;
+const { setupLoginForm } = __login_form;
+const { setupRegistrationForm } = __registration_form;
+const { setupTaskSearchForm } = __task_search_form;
+
+
+
+
+
+
+
+
+
+async function main() {
+    console.log('🤓');
+    setupLoginForm();
+    setupRegistrationForm();
+    setupCreateTaskForm();
+    setupEditTaskForm();
+    setupDeleteTaskHandler();
+    setupDashboard();
+    setupExportJob();
+    setupLiveUpdates();
+    setupTaskSearchForm();
+}
+main();
+
+})();
@@ -0,0 +1,59 @@
+import { ApiResponse } from './types';
+
+type ExportJobStatus = {
+  job_id: number;
+  status: 'queued' | 'running' | 'succeeded' | 'failed';
+  progress: number;
+  error: string | null;
+  download_url: string | null;
+};
+
+const POLL_INTERVAL_MS = 1000;
+
+/**
+ * setupExportJob starts a background export when the export job button is clicked,
+ * shows its progress and downloads the file once it is ready. Unlike the streamed
+ * export the request returns immediately, so large exports never hit proxy timeouts.
+ *
+ * @returns {void}
+ */
+export function setupExportJob() {
+  const button = document.getElementById('export-job-button');
+  const status = document.getElementById('export-job-status');
+  if (!button || !status) return;
+
+  button.addEventListener('click', async (event) => {
+    event.preventDefault();
+    button.setAttribute('disabled', '');
+    status.textContent = 'Export queued…';
+
+    const response = await fetch('/task/export/jobs', { method: 'POST' });
+    const json: ApiResponse = await response.json();
+    if (!json.ok || !json.data) {
+      status.textContent = `Export failed: ${json.error}`;
+      button.removeAttribute('disabled');
+      return;
+    }
+
+    const statusUrl = (json.data as { status_url: string }).status_url;
+    const poll = async () => {
+      const response = await fetch(statusUrl);
+      const json: ApiResponse = await response.json();
+      const job = json.data as ExportJobStatus | undefined;
+      if (!json.ok || !job || job.status === 'failed') {
+        status.textContent = `Export failed: ${job?.error ?? json.error}`;
+        button.removeAttribute('disabled');
+        return;
+      }
+      if (job.download_url) {
+        status.textContent = 'Export ready.';
+        button.removeAttribute('disabled');
+        window.location.href = job.download_url;
+        return;
+      }
+      status.textContent = `Exporting… ${Math.round(job.progress * 100)}%`;
+      window.setTimeout(poll, POLL_INTERVAL_MS);
+    };
+    window.setTimeout(poll, POLL_INTERVAL_MS);
+  });
+}
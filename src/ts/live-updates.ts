@@ -0,0 +1,130 @@
+import { ApiResponse } from './types';
+
+type TaskChange = {
+  seq: number;
+  op: 'upsert' | 'delete';
+  task_id: number;
+  task: {
+    id: number;
+    title: string;
+    description: string;
+    due_date: string;
+    status: string;
+  } | null;
+};
+
+type ChangeFeedPage = {
+  reset: boolean;
+  cursor: number;
+  has_more: boolean;
+  changes: TaskChange[];
+};
+
+/**
+ * setupLiveUpdates keeps the dashboard in sync with changes made in other sessions.
+ * A server-sent event stream notifies about task writes, the changes themselves are
+ * fetched from the change feed starting at the cursor rendered with the dashboard.
+ *
+ * @returns {void}
+ */
+export function setupLiveUpdates() {
+  const grid = document.getElementById('task-grid');
+  if (!grid || !('EventSource' in window)) return;
+
+  let cursor = Number(grid.dataset.changeCursor || 0);
+  const previewLength = Number(grid.dataset.previewLength || 100);
+  let syncing: Promise<void> | null = null;
+  let pending = false;
+
+  const sync = () => {
+    if (syncing) {
+      pending = true;
+      return;
+    }
+    syncing = (async () => {
+      do {
+        pending = false;
+        let hasMore = true;
+        while (hasMore) {
+          const response = await fetch(`/task/changes?since=${cursor}`);
+          const json: ApiResponse = await response.json();
+          if (!json.ok || !json.data) return;
+
+          const page = json.data as ChangeFeedPage;
+          if (page.reset) {
+            // deletions we have not seen were compacted away
+            window.location.reload();
+            return;
+          }
+          page.changes.forEach((change) =>
+            applyChange(grid, change, previewLength)
+          );
+          cursor = page.cursor;
+          hasMore = page.has_more;
+        }
+      } while (pending);
+    })().finally(() => {
+      syncing = null;
+    });
+  };
+
+  const source = new EventSource('/task/events');
+  source.addEventListener('task', sync);
+  // the server dropped us for falling behind, catch up from the cursor
+  source.addEventListener('resync', sync);
+  // (re)connected, pick up anything missed while disconnected
+  source.addEventListener('open', sync);
+}
+
+/**
+ * applyChange updates, removes or announces the task card of a single change.
+ *
+ * @param {HTMLElement} grid - The task grid element.
+ * @param {TaskChange} change - The change to apply.
+ * @param {number} previewLength - Number of description characters shown on a card.
+ */
+function applyChange(
+  grid: HTMLElement,
+  change: TaskChange,
+  previewLength: number
+) {
+  const card = grid.querySelector<HTMLElement>(
+    `[data-task-id="${change.task_id}"]`
+  );
+  if (change.op === 'delete' || !change.task) {
+    card?.remove();
+    return;
+  }
+  if (!card) {
+    // new cards need the server template, offer a reload instead
+    document.getElementById('task-live-notice')?.classList.remove('hidden');
+    return;
+  }
+
+  const task = change.task;
+  card.dataset.taskStatus = task.status;
+  card.dataset.taskTitle = task.title;
+  card.dataset.taskDueDate = task.due_date;
+  setField(card, 'status', task.status);
+  setField(card, 'title', task.title);
+  setField(card, 'due_date', `Due: ${task.due_date}`);
+  setField(
+    card,
+    'preview',
+    task.description.length > previewLength
+      ? `${task.description.slice(0, previewLength)}…`
+      : task.description
+  );
+}
+
+/**
+ * setField replaces the text of a field element of a task card.
+ *
+ * @param {HTMLElement} card - The task card element.
+ * @param {string} field - The value of the field's data-task-field attribute.
+ * @param {string} text - The new text.
+ */
+function setField(card: HTMLElement, field: string, text: string) {
+  const element = card.querySelector(`[data-task-field="${field}"]`);
+  if (element) element.textContent = text;
+}
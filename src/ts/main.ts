@@ -2,6 +2,8 @@ import { setupCreateTaskForm } from './create-task-form';
 import { setupDashboard } from './dashboard';
 import { setupDeleteTaskHandler } from './delete-task-handler';
 import { setupEditTaskForm } from './edit-task-form';
+import { setupExportJob } from './export-job';
+import { setupLiveUpdates } from './live-updates';
 import { setupLoginForm } from './login-form';
 import { setupRegistrationForm } from './registration-form';
 import { setupTaskSearchForm } from './task-search-form';
@@ -17,6 +19,8 @@ async function main() {
   setupEditTaskForm();
   setupDeleteTaskHandler();
   setupDashboard();
+  setupExportJob();
+  setupLiveUpdates();
   setupTaskSearchForm();
 }
 
@@ -1,3 +1,4 @@
+from collections.abc import Mapping
 from pathlib import Path
 
 from flask import Flask, current_app
@@ -6,14 +7,13 @@ from flask_bcrypt import Bcrypt
 from flask_login import LoginManager
 
 import click
+import time
 
 from src.config import Config
-from src.infra.repositories.in_memory_user import InMemoryUserRepository
-from src.infra.repositories.sql_task_repository import SQLTaskRepository
-from src.infra.repositories.sql_user_repository import SQLUserRepository
-from src.services.account_service import AccountService
-from src.services.api_response_service import ApiResponseService
-from src.services.task_export_service import TaskExportService
+
+# Only what every process needs is imported at module level. Repositories,
+# services and blueprints are imported inside `create_app`, so CLI commands,
+# workers and recycled processes do not pay for code they never use.
 
 bcrypt = Bcrypt()
 login_manager = LoginManager()
@@ -27,30 +27,81 @@ def create_app(config_class=Config):
         template_folder=str(Path(base_dir, "templates")),
         static_folder=str(Path(base_dir, "static")),
     )
-    # app config
-    app.config.from_object(config_class)
+    # app config, worker processes receive their parent's config as a mapping
+    if isinstance(config_class, Mapping):
+        app.config.from_mapping(config_class)
+    else:
+        app.config.from_object(config_class)
+
+    from src.web.assets import init_assets
+    from src.web.compression import init_compression
+    from src.web.templating import configure_templates
+
+    configure_templates(app)
+    init_assets(app)
+    init_compression(app)
 
     # extensions
     bcrypt.init_app(app)
     login_manager.init_app(app)
     login_manager.login_view = "auth.login"  # type: ignore
+    # the JSON API answers 401 instead of redirecting to the login page
+    login_manager.blueprint_login_views["api"] = None  # type: ignore
 
     # db setup
-    from src.infra.db import init_db_teardown_handler
+    from src.infra.db import init_db_teardown_handler, init_write_path
 
     init_db_teardown_handler(app)
+    init_write_path(app)
+    if _uses_postgres(app.config):
+        from src.infra.postgres import init_postgres
+
+        init_postgres(app)
 
     app.cli.add_command(init_db_command)
+    app.cli.add_command(rebuild_task_stats_command)
+    app.cli.add_command(compact_task_changes_command)
+    app.cli.add_command(rebalance_task_shards_command)
+    app.cli.add_command(compile_templates_command)
+    app.cli.add_command(build_assets_command)
+    app.cli.add_command(worker_command)
+    app.cli.add_command(enqueue_job_command)
+    app.cli.add_command(cleanup_exports_command)
+    app.cli.add_command(export_all_tasks_command)
 
     # ports and services
-    user_repo = SQLUserRepository(bcrypt=bcrypt)
-    task_repo = SQLTaskRepository()
+    from src.services.account_service import AccountService
+    from src.services.api_response_service import ApiResponseService
+    from src.services.calendar_service import CalendarService
+    from src.services.event_broker import EventBroker
+    from src.services.job_service import JobService
+    from src.services.task_export_service import TaskExportService
+
+    user_repo, job_queue = _create_user_repository(app.config)
+    task_repo = _create_task_repository(app.config)
     app.extensions["user_repo"] = user_repo
     app.extensions["task_repo"] = task_repo
 
+    job_service = JobService(job_queue)
+    app.extensions["job_service"] = job_service
     app.extensions["account_service"] = AccountService(user_repo)
-    app.extensions["task_export_service"] = TaskExportService(task_repo)
+    app.extensions["task_export_service"] = TaskExportService(
+        task_repo,
+        job_service,
+        export_dir=app.config["EXPORT_DIR"],
+        artifact_ttl=app.config["EXPORT_TTL_SECONDS"],
+        watermark_overlap=app.config["EXPORT_WATERMARK_OVERLAP"],
+    )
     app.extensions["api_response_service"] = ApiResponseService()
+    app.extensions["calendar_service"] = CalendarService(task_repo)
+    app.extensions["event_broker"] = EventBroker(
+        buffer_size=app.config["EVENT_BUFFER_SIZE"],
+        heartbeat_interval=app.config["EVENT_HEARTBEAT_SECONDS"],
+    )
+
+    from src.web.worker import register_jobs
+
+    register_jobs(app)
 
     # user loader
     @login_manager.user_loader
@@ -58,6 +109,7 @@ def create_app(config_class=Config):
         return user_repo.get_by_id(user_id)
 
     # register blueprints
+    from src.web.routes.api import api_bp
     from src.web.routes.auth import auth_bp
     from src.web.routes.main import main_bp
     from src.web.routes.task import task_bp
@@ -65,14 +117,300 @@ def create_app(config_class=Config):
     app.register_blueprint(main_bp)
     app.register_blueprint(auth_bp)
     app.register_blueprint(task_bp)
+    app.register_blueprint(api_bp)
+
+    from src.core.errors import DatabaseBusyError
+
+    app.register_error_handler(DatabaseBusyError, _database_busy)
 
     return app
 
 
+def _uses_postgres(config: Mapping) -> bool:
+    """Whether the configured repositories are stored in Postgres.
+
+    Raises:
+        ValueError: If only one of users and tasks is, tasks must be stored with their users.
+    """
+    users = config["USER_REPOSITORY"] == "postgres"
+    tasks = config["TASK_REPOSITORY"] == "postgres"
+    if users != tasks and config["TASK_REPOSITORY"] != "memory":
+        raise ValueError(
+            'USER_REPOSITORY and TASK_REPOSITORY must both be "postgres", '
+            "tasks are stored with their users."
+        )
+    return users or tasks
+
+
+def _database_busy(error):
+    """Answer writes that could not be admitted or lock the database with a 503 to retry."""
+    response = current_app.extensions["api_response_service"].to_response(
+        ok=False,
+        status=503,
+        message="Service temporarily unavailable",
+        error=str(error),
+    )
+    response.status_code = 503
+    response.headers["Retry-After"] = str(error.retry_after)
+    return response
+
+
+def _create_user_repository(config: Mapping):
+    """Import and create the configured user repository ("sql" or "postgres") and the job queue stored next to it."""
+    if config["USER_REPOSITORY"] == "postgres":
+        from src.infra.repositories.postgres_job_queue import (
+            PostgresJobQueue,
+        )
+        from src.infra.repositories.postgres_user_repository import (
+            PostgresUserRepository,
+        )
+
+        return PostgresUserRepository(bcrypt=bcrypt), PostgresJobQueue()
+
+    from src.infra.repositories.sql_job_queue import SQLJobQueue
+    from src.infra.repositories.sql_user_repository import SQLUserRepository
+
+    return SQLUserRepository(bcrypt=bcrypt), SQLJobQueue()
+
+
+def _create_task_repository(config: Mapping):
+    """Import and create the configured task repository ("sql", "postgres", "sharded" or "memory")."""
+    kind = config["TASK_REPOSITORY"]
+    if kind == "memory":
+        from src.infra.repositories.in_memory_task import (
+            InMemoryTaskRepository,
+        )
+
+        return InMemoryTaskRepository()
+
+    if kind == "sharded":
+        from src.infra.repositories.sharded_task_repository import (
+            ShardedTaskRepository,
+        )
+
+        return ShardedTaskRepository(
+            config["TASK_SHARD_DIR"], config["TASK_SHARDS"]
+        )
+
+    if kind == "postgres":
+        from src.infra.repositories.postgres_task_repository import (
+            PostgresTaskRepository,
+        )
+
+        return PostgresTaskRepository()
+
+    from src.infra.repositories.sql_task_repository import SQLTaskRepository
+
+    return SQLTaskRepository()
+
+
+def warm_up(app: Flask) -> None:
+    """
+    Pay one-off startup costs before the first request instead of during it: compile the templates
+    (or load their cached bytecode), load the JSON serializer and refresh the SQLite planner
+    statistics with `PRAGMA optimize`. Call it from the process that serves requests, CLI commands
+    and workers skip it. Schema migrations added since `flask init-db` last ran are applied first.
+    Other failures are logged and do not prevent startup.
+
+    Args:
+        app (Flask): The application created by `create_app`.
+
+    Raises:
+        DatabaseNotInitializedError: If `flask init-db` never ran on the database.
+    """
+    from src.web.templating import precompile_templates
+
+    start = time.perf_counter()
+    if app.config["PRECOMPILE_TEMPLATES"]:
+        precompile_templates(app.jinja_env)
+    app.extensions["api_response_service"].dumps({})
+
+    if app.config["DATABASE"] != ":memory:" and not _uses_postgres(app.config):
+        from src.infra.db import apply_pending_migrations, get_connection
+
+        with app.app_context():
+            apply_pending_migrations()
+            if app.config["TASK_REPOSITORY"] == "sharded":
+                task_repo = app.extensions["task_repo"]
+                for index in task_repo.shard_indexes():
+                    apply_pending_migrations(task_repo.shard(index).database)
+        try:
+            with app.app_context():
+                get_connection().execute("PRAGMA optimize;")
+        except Exception as e:
+            app.logger.warning("Skipped database warm-up: %s", e)
+
+    app.logger.info(
+        "Warm-up took %.1f ms", (time.perf_counter() - start) * 1000
+    )
+
+
 @click.command("init-db")
 @with_appcontext
 def init_db_command():
+    if _uses_postgres(current_app.config):
+        from src.infra.postgres import init_postgres_db
+
+        init_postgres_db()
+        click.echo("Initialized the Postgres database.")
+        return
+
     from src.infra.db import init_db
 
     init_db()
+    if current_app.config["TASK_REPOSITORY"] == "sharded":
+        current_app.extensions["task_repo"].init_shards()
     click.echo("Initialized the database.")
+
+
+@click.command("rebuild-task-stats")
+@with_appcontext
+def rebuild_task_stats_command():
+    current_app.extensions["task_repo"].rebuild_stats()
+    click.echo("Rebuilt the task statistics.")
+
+
+@click.command("compact-task-changes")
+@click.option(
+    "--retain",
+    type=int,
+    default=None,
+    help="Number of most recent change feed entries to keep tombstones for.",
+)
+@with_appcontext
+def compact_task_changes_command(retain: int | None):
+    task_repo = current_app.extensions["task_repo"]
+    if retain is None:
+        retain = current_app.config["TASK_CHANGES_RETAIN"]
+    removed = task_repo.compact_changes_retaining(retain)
+    click.echo(f"Removed {removed} task change entries.")
+
+
+@click.command("rebalance-task-shards")
+@with_appcontext
+def rebalance_task_shards_command():
+    if current_app.config["TASK_REPOSITORY"] != "sharded":
+        raise click.ClickException(
+            'Task shards are only used with TASK_REPOSITORY = "sharded".'
+        )
+    task_repo = current_app.extensions["task_repo"]
+    result = task_repo.rebalance(
+        on_move=lambda user_id, source, target: click.echo(
+            f"Moved the tasks of user {user_id} from "
+            f"{'the main database' if source is None else f'shard {source}'} "
+            f"to shard {target}."
+        )
+    )
+    click.echo(
+        f"Moved {result['moved']} users across {task_repo.count} shards, "
+        f"removed leftover tasks of {result['purged']} users."
+    )
+
+
+@click.command("compile-templates")
+@with_appcontext
+def compile_templates_command():
+    from src.web.templating import precompile_templates
+
+    count = precompile_templates(current_app.jinja_env)
+    click.echo(f"Compiled {count} templates.")
+
+
+@click.command("build-assets")
+@with_appcontext
+def build_assets_command():
+    from src.web.assets import build_assets
+
+    manifest = build_assets(current_app.static_folder)
+    click.echo(f"Fingerprinted {len(manifest)} static files.")
+
+
+@click.command("worker")
+@click.option(
+    "--processes",
+    type=click.IntRange(min=1),
+    default=1,
+    help="Number of worker processes.",
+)
+@click.option(
+    "--burst",
+    is_flag=True,
+    help="Exit once the job queue is empty instead of waiting for jobs.",
+)
+@with_appcontext
+def worker_command(processes: int, burst: bool):
+    from src.web.worker import start_workers
+
+    click.echo(f"Starting {processes} job worker(s).")
+    start_workers(current_app._get_current_object(), processes, burst=burst)  # type: ignore
+    click.echo("Job workers stopped.")
+
+
+@click.command("enqueue-job")
+@click.argument("kind")
+@click.option(
+    "--payload",
+    default="{}",
+    help="JSON object with the arguments of the job.",
+)
+@with_appcontext
+def enqueue_job_command(kind: str, payload: str):
+    import json
+
+    try:
+        arguments = json.loads(payload)
+    except ValueError as e:
+        raise click.BadParameter(str(e), param_hint="--payload")
+    result = current_app.extensions["job_service"].enqueue(kind, arguments)
+    if result.is_err:
+        raise click.ClickException(str(result.unwrap_err()))
+    click.echo(f"Queued job {result.unwrap().id}.")
+
+
+@click.command("cleanup-exports")
+@with_appcontext
+def cleanup_exports_command():
+    result = current_app.extensions["task_export_service"].cleanup_expired()
+    if result.is_err:
+        raise click.ClickException(str(result.unwrap_err()))
+    removed = result.unwrap()
+    click.echo(
+        f"Removed {removed['removed']} export files and "
+        f"{removed['purged_jobs']} finished jobs."
+    )
+
+
+@click.command("export-all-tasks")
+@click.argument("output", type=click.Path(dir_okay=False, writable=True))
+@click.option("--format", "format", help="Export format of the files.")
+@click.option(
+    "--processes",
+    type=click.IntRange(min=1),
+    default=1,
+    help="Number of export processes.",
+)
+@click.option(
+    "--shard-size",
+    type=click.IntRange(min=1),
+    help="Users exported per shard.",
+)
+@with_appcontext
+def export_all_tasks_command(
+    output: str, format: str | None, processes: int, shard_size: int | None
+):
+    from src.web.archive_export import export_all_tasks
+
+    result = export_all_tasks(
+        current_app._get_current_object(),  # type: ignore
+        output,
+        format,
+        processes=processes,
+        shard_size=shard_size,
+    )
+    if result.is_err:
+        raise click.ClickException(str(result.unwrap_err()))
+    counts = result.unwrap()
+    click.echo(
+        f"Exported {counts['rows']} tasks of {counts['users']} users "
+        f"in {counts['shards']} shards to {output}."
+    )
@@ -0,0 +1,267 @@
+"""
+Admin export of every user's tasks into one zip archive.
+
+Users are split into shards of consecutive ids. Each shard is exported by a
+process of a pool, with its own app and database connection, and read in one
+snapshot, see `TaskExportService.export_shard`. Shards write one file per user
+to a scratch directory next to the archive; the parent moves the files into
+the archive in shard order as shards complete. Only a few shards are in
+flight at a time, so memory stays bounded by the export batch size and the
+scratch space by the shards in flight, whatever the size of the dataset.
+"""
+
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Callable, Iterator, Mapping
+
+from flask import Flask
+
+import multiprocessing
+import os
+import signal
+import tempfile
+import time
+import uuid
+import zipfile
+
+from src.core.errors import InfrastructureError, ValidationError
+from src.core.result import Result
+
+if TYPE_CHECKING:
+    from src.core.job import Job
+    from src.services.job_service import JobContext
+
+# the app of a pool process, created once by `_init_process`
+_process_app: Flask | None = None
+# seconds between progress reports while waiting for a shard, well within a
+# job's lease, so the lease never expires while shards are being exported
+PROGRESS_INTERVAL = 10.0
+
+
+def _init_process(config: Mapping[str, Any]) -> None:
+    """Initializer of the pool processes, builds their own app from the parent's config."""
+    global _process_app
+    # Ctrl+C reaches the whole process group, the parent shuts the pool down
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    from src.web.app import create_app
+
+    _process_app = create_app(config)
+
+
+def _export_shard(
+    user_ids: list[int], directory: str, format: str
+) -> list[tuple[int, str, int]]:
+    """Export a shard in a pool process. Errors are raised, Results do not cross processes."""
+    assert _process_app is not None
+    with _process_app.app_context():
+        result = _process_app.extensions["task_export_service"].export_shard(
+            user_ids, directory, format
+        )
+    if result.is_err:
+        raise InfrastructureError(str(result.unwrap_err()))
+    return result.unwrap()
+
+
+def _shares_database(app: Flask) -> bool:
+    """Whether other processes see the app's data. In-memory stores are private to a process."""
+    kind = app.config["TASK_REPOSITORY"]
+    return kind == "postgres" or (
+        app.config["DATABASE"] != ":memory:" and kind in ("sql", "sharded")
+    )
+
+
+def shard_user_ids(app: Flask, shard_size: int) -> list[list[int]]:
+    """
+    Split the IDs of all users into shards of consecutive IDs. Must be called inside an app context.
+
+    Args:
+        app (Flask): The application.
+        shard_size (int): Users per shard.
+
+    Returns:
+        list[list[int]]: The shards in ID order.
+    """
+    user_ids = sorted(
+        user.id for user in app.extensions["user_repo"].iter_all()
+    )
+    return [
+        user_ids[start : start + shard_size]
+        for start in range(0, len(user_ids), shard_size)
+    ]
+
+
+def _iter_shard_files(
+    app: Flask,
+    shards: list[list[int]],
+    directory: str,
+    format: str,
+    processes: int,
+    on_wait: Callable[[], None] | None = None,
+) -> Iterator[list[tuple[int, str, int]]]:
+    """Export the shards, yielding the files of each in shard order. `on_wait` is called every
+    `PROGRESS_INTERVAL` seconds while waiting for the next shard of the pool.
+    """
+    if processes == 1:
+        export_service = app.extensions["task_export_service"]
+        for shard in shards:
+            result = export_service.export_shard(shard, directory, format)
+            if result.is_err:
+                raise InfrastructureError(str(result.unwrap_err()))
+            yield result.unwrap()
+        return
+
+    # spawn works everywhere and does not share the parent's SQLite handles
+    with ProcessPoolExecutor(
+        max_workers=processes,
+        mp_context=multiprocessing.get_context("spawn"),
+        initializer=_init_process,
+        initargs=(dict(app.config),),
+    ) as pool:
+        pending: deque[Future] = deque()
+        remaining = iter(shards)
+        try:
+            # two shards per process keep every process busy while the
+            # parent archives, without exporting ahead of the archive
+            for shard in remaining:
+                pending.append(
+                    pool.submit(_export_shard, shard, directory, format)
+                )
+                if len(pending) >= 2 * processes:
+                    break
+            while pending:
+                future = pending.popleft()
+                while not wait([future], timeout=PROGRESS_INTERVAL).done:
+                    if on_wait is not None:
+                        on_wait()
+                files = future.result()
+                shard = next(remaining, None)
+                if shard is not None:
+                    pending.append(
+                        pool.submit(_export_shard, shard, directory, format)
+                    )
+                yield files
+        finally:
+            for future in pending:
+                future.cancel()
+
+
+def export_all_tasks(
+    app: Flask,
+    output: str | Path,
+    format: str | None = None,
+    processes: int = 1,
+    shard_size: int | None = None,
+    on_progress: Callable[[int, int], None] | None = None,
+) -> Result[dict, ValidationError | InfrastructureError]:
+    """
+    Write the tasks of every user into a zip archive with one export file per user, named
+    `tasks/user-<id>.<extension>`. The archive is written under a temporary name and renamed
+    when complete. Must be called inside an app context.
+
+    Args:
+        app (Flask): The application.
+        output (str | Path): Path of the archive.
+        format (str | None): Name of the export format of the files. Defaults to `default_format`.
+        processes (int): Number of export processes. Defaults to 1, which exports in the current process, as do apps whose data other processes cannot see.
+        shard_size (int | None): Users per shard. Defaults to `EXPORT_ARCHIVE_SHARD_SIZE`.
+        on_progress (Callable[[int, int], None] | None): Called with the number of archived and all users after every shard, and every `PROGRESS_INTERVAL` seconds while waiting for one. Defaults to None.
+
+    Returns:
+        Result[dict, ValidationError | InfrastructureError]: Ok with the number of users, rows and shards, Err if the format is not supported or the export failed.
+    """
+    export_service = app.extensions["task_export_service"]
+    format = format or export_service.default_format
+    encoder_result = export_service.get_encoder(format)
+    if encoder_result.is_err:
+        return Result.Err(encoder_result.unwrap_err())
+    encoder = encoder_result.unwrap()
+    if not _shares_database(app):
+        processes = 1
+
+    shards = shard_user_ids(
+        app, shard_size or app.config["EXPORT_ARCHIVE_SHARD_SIZE"]
+    )
+    total = sum(len(shard) for shard in shards)
+    output = Path(output)
+    partial = output.with_name(f".{output.name}.partial")
+    users = rows = 0
+    try:
+        with tempfile.TemporaryDirectory(
+            prefix=f".{output.stem}-shards-", dir=output.parent
+        ) as scratch, zipfile.ZipFile(
+            partial,
+            "w",
+            zipfile.ZIP_STORED if encoder.compressed else zipfile.ZIP_DEFLATED,
+        ) as archive:
+            for files in _iter_shard_files(
+                app,
+                shards,
+                scratch,
+                format,
+                processes,
+                on_wait=(
+                    (lambda: on_progress(users, total))
+                    if on_progress is not None
+                    else None
+                ),
+            ):
+                for _, filename, count in files:
+                    path = Path(scratch, filename)
+                    archive.write(path, f"tasks/{filename}")
+                    path.unlink()
+                    rows += count
+                users += len(files)
+                if on_progress is not None:
+                    on_progress(users, total)
+        os.replace(partial, output)
+    except (OSError, InfrastructureError, BrokenProcessPool) as e:
+        partial.unlink(missing_ok=True)
+        return Result.Err(InfrastructureError(str(e)))
+    except BaseException:
+        partial.unlink(missing_ok=True)
+        raise
+    return Result.Ok({"users": users, "rows": rows, "shards": len(shards)})
+
+
+def run_archive_job(
+    app: Flask, job: "Job", context: "JobContext"
+) -> Result[dict, ValidationError | InfrastructureError]:
+    """
+    Job handler of the admin export: writes the archive to the export directory for download
+    and queues its cleanup, like a user's export job.
+
+    Args:
+        app (Flask): The application, `EXPORT_ARCHIVE_PROCESSES` sets the number of export processes.
+        job (Job): The export job, the payload's optional `format` is the format of the files.
+        context (JobContext): Receives the progress of the export.
+
+    Returns:
+        Result[dict, ValidationError | InfrastructureError]: Ok with the file name, format, user and row counts and expiry time, Err if the format is not supported or the export failed.
+    """
+    export_service = app.extensions["task_export_service"]
+    format = job.payload.get("format", export_service.default_format)
+    export_service.export_dir.mkdir(parents=True, exist_ok=True)
+    # random names, so export files cannot be guessed from job ids
+    filename = (
+        f"{export_service.artifact_prefix}all-{job.id}-{uuid.uuid4().hex}.zip"
+    )
+    result = export_all_tasks(
+        app,
+        export_service.export_dir / filename,
+        format,
+        processes=app.config["EXPORT_ARCHIVE_PROCESSES"],
+        on_progress=context.report_progress,
+    )
+    if result.is_err:
+        return result
+    export_service.schedule_cleanup()
+    return Result.Ok(
+        {
+            "filename": filename,
+            "format": format,
+            **result.unwrap(),
+            "expires_at": time.time() + export_service.artifact_ttl,
+        }
+    )
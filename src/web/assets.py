@@ -0,0 +1,135 @@
+"""
+Fingerprinted static assets.
+
+`flask build-assets` copies every static file to `dist/` under a name that
+contains a hash of its content (e.g. `dist/js/main.3f9c2a1b7d.js`), writes
+precompressed `.gz` (and `.br` when the brotli package is installed) siblings
+of text assets and records the mapping in `dist/manifest.json`. Templates
+resolve asset URLs with `asset_url`, so a changed file always gets a new URL
+and fingerprinted files can be cached forever. The files of the previous build
+are kept, so pages rendered before a deploy still load their assets while the
+new release rolls out.
+"""
+
+from pathlib import Path
+
+from flask import Flask, Response, request, url_for
+
+import gzip
+import hashlib
+import json
+
+DIST_DIR = "dist"
+MANIFEST = "manifest.json"
+# sources of the build pipeline that are never referenced by templates
+SOURCE_FILES = {"css/input.css"}
+COMPRESSIBLE_SUFFIXES = {".css", ".js", ".svg", ".json", ".txt"}
+HASH_LENGTH = 10
+# one year, the longest lifetime browsers honor
+IMMUTABLE_MAX_AGE = 31536000
+
+
+def build_assets(static_dir: str | Path) -> dict[str, str]:
+    """
+    Fingerprint and precompress the static assets into `dist/`. Files of the previous build are
+    kept, older ones removed.
+
+    Args:
+        static_dir (str | Path): The static folder of the app.
+
+    Returns:
+        dict[str, str]: Static file names mapped to their fingerprinted names, as written to the manifest.
+    """
+    static_dir = Path(static_dir)
+    dist_dir = static_dir / DIST_DIR
+    manifest_path = dist_dir / MANIFEST
+    previous: dict[str, str] = (
+        json.loads(manifest_path.read_text())
+        if manifest_path.is_file()
+        else {}
+    )
+
+    manifest: dict[str, str] = {}
+    for path in sorted(static_dir.rglob("*")):
+        name = path.relative_to(static_dir).as_posix()
+        if (
+            not path.is_file()
+            or name.startswith(f"{DIST_DIR}/")
+            or name in SOURCE_FILES
+        ):
+            continue
+
+        data = path.read_bytes()
+        digest = hashlib.sha256(data).hexdigest()[:HASH_LENGTH]
+        hashed = Path(DIST_DIR, name).with_suffix(f".{digest}{path.suffix}")
+        target = static_dir / hashed
+        target.parent.mkdir(parents=True, exist_ok=True)
+        target.write_bytes(data)
+        if path.suffix in COMPRESSIBLE_SUFFIXES:
+            _write_compressed(target, data)
+        manifest[name] = hashed.as_posix()
+
+    manifest_path.write_text(json.dumps(manifest, indent=2))
+    _remove_outdated(dist_dir, {*manifest.values(), *previous.values()})
+    return manifest
+
+
+def _remove_outdated(dist_dir: Path, kept: set[str]) -> None:
+    """Remove the fingerprinted files, and their compressed siblings, of builds older than `kept`."""
+    for path in dist_dir.rglob("*"):
+        if not path.is_file() or path.name == MANIFEST:
+            continue
+        name = path.relative_to(dist_dir.parent).as_posix()
+        if name.endswith((".gz", ".br")):
+            name = name[:-3]
+        if name not in kept:
+            path.unlink()
+
+
+def _write_compressed(target: Path, data: bytes) -> None:
+    """Write the precompressed siblings of an asset, skipping those that do not shrink it."""
+    # mtime=0 keeps the output identical between builds of the same content
+    variants = {".gz": gzip.compress(data, compresslevel=9, mtime=0)}
+    try:
+        import brotli
+    except ImportError:
+        pass
+    else:
+        variants[".br"] = brotli.compress(data, quality=11)
+    for suffix, compressed in variants.items():
+        if len(compressed) < len(data):
+            target.with_name(target.name + suffix).write_bytes(compressed)
+
+
+def init_assets(app: Flask) -> None:
+    """
+    Load the asset manifest of the app, register the `asset_url` template helper and serve
+    fingerprinted files with an immutable cache lifetime. Without a manifest `asset_url` falls
+    back to the plain static URL.
+
+    Args:
+        app (Flask): The application.
+    """
+    manifest_path = Path(app.static_folder or "", DIST_DIR, MANIFEST)
+    manifest: dict[str, str] = (
+        json.loads(manifest_path.read_text())
+        if manifest_path.is_file()
+        else {}
+    )
+    app.extensions["asset_manifest"] = manifest
+
+    def asset_url(filename: str) -> str:
+        return url_for("static", filename=manifest.get(filename, filename))
+
+    app.jinja_env.globals["asset_url"] = asset_url
+
+    @app.after_request
+    def cache_fingerprinted_assets(response: Response) -> Response:
+        filename = (request.view_args or {}).get("filename", "")
+        if request.endpoint == "static" and filename.startswith(
+            f"{DIST_DIR}/"
+        ):
+            response.cache_control.public = True
+            response.cache_control.max_age = IMMUTABLE_MAX_AGE
+            response.cache_control.immutable = True
+        return response
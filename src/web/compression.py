@@ -0,0 +1,137 @@
+"""
+Transparent response compression for when the app is not behind a
+compressing proxy.
+
+Compressible responses are encoded with brotli (when the brotli package is
+installed) or gzip, whichever the client prefers in `Accept-Encoding`.
+Buffered responses below `COMPRESSION_MIN_SIZE` are sent as is, streamed
+responses (e.g. the CSV export) are compressed chunk by chunk as they are
+produced. Server-sent events are never compressed so every event reaches the
+client immediately.
+"""
+
+from typing import Callable, Iterable, Iterator
+
+from flask import Flask, Response, request
+
+import zlib
+
+COMPRESSIBLE_MIMETYPES = {
+    "application/javascript",
+    "application/json",
+    "application/x-ndjson",
+    "image/svg+xml",
+    "text/css",
+    "text/csv",
+    "text/html",
+    "text/javascript",
+    "text/plain",
+}
+
+
+def _load_brotli():
+    """Import brotli if it is installed, it is an optional dependency."""
+    try:
+        import brotli
+    except ImportError:
+        return None
+    return brotli
+
+
+def choose_encoding(accept_encodings, brotli_available: bool) -> str | None:
+    """
+    Pick the content encoding for a response.
+
+    Args:
+        accept_encodings: The request's parsed `Accept-Encoding` header.
+        brotli_available (bool): Whether brotli can be used.
+
+    Returns:
+        str | None: "br", "gzip" or None to send the response uncompressed.
+    """
+    candidates = ["br", "gzip"] if brotli_available else ["gzip"]
+    best, best_quality = None, 0.0
+    for encoding in candidates:
+        quality = accept_encodings[encoding]
+        if quality > best_quality:
+            best, best_quality = encoding, quality
+    return best
+
+
+def _compressor(
+    encoding: str, level: int, brotli
+) -> tuple[Callable[[bytes], bytes], Callable[[], bytes]]:
+    """Return the incremental compress and finish functions for an encoding."""
+    if encoding == "br":
+        compressor = brotli.Compressor(quality=min(level, 11))
+        return compressor.process, compressor.finish
+    # wbits=31 writes a gzip header and trailer around the deflate stream
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+    return compressor.compress, compressor.flush
+
+
+def _compress_stream(
+    body: Iterable[bytes | str], encoding: str, level: int, brotli
+) -> Iterator[bytes]:
+    """Compress a streamed body chunk by chunk, closing the original body when done."""
+    compress, finish = _compressor(encoding, level, brotli)
+    try:
+        for chunk in body:
+            if isinstance(chunk, str):
+                chunk = chunk.encode()
+            compressed = compress(chunk)
+            if compressed:
+                yield compressed
+        yield finish()
+    finally:
+        close = getattr(body, "close", None)
+        if close is not None:
+            close()
+
+
+def init_compression(app: Flask) -> None:
+    """
+    Register the compression hook of the app. Disabled when `COMPRESS_RESPONSES` is false.
+
+    Args:
+        app (Flask): The application.
+    """
+    if not app.config["COMPRESS_RESPONSES"]:
+        return
+
+    min_size = app.config["COMPRESSION_MIN_SIZE"]
+    level = app.config["COMPRESSION_LEVEL"]
+    brotli = _load_brotli()
+
+    @app.after_request
+    def compress_response(response: Response) -> Response:
+        if (
+            response.mimetype not in COMPRESSIBLE_MIMETYPES
+            or response.direct_passthrough
+            or response.status_code < 200
+            or response.status_code in (204, 206, 304)
+            or "Content-Encoding" in response.headers
+        ):
+            return response
+
+        response.vary.add("Accept-Encoding")
+        encoding = choose_encoding(
+            request.accept_encodings, brotli is not None
+        )
+        if encoding is None:
+            return response
+
+        if response.is_streamed:
+            response.response = _compress_stream(
+                response.response, encoding, level, brotli
+            )
+            response.headers.pop("Content-Length", None)
+        else:
+            data = response.get_data()
+            if len(data) < min_size:
+                return response
+            compress, finish = _compressor(encoding, level, brotli)
+            response.set_data(compress(data) + finish())
+
+        response.headers["Content-Encoding"] = encoding
+        return response
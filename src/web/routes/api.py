@@ -0,0 +1,148 @@
+from datetime import date
+from typing import TYPE_CHECKING
+
+from flask import Blueprint, current_app, request
+from flask_login import current_user, login_required
+
+from src.infra.db import read_only
+from src.services.api_response_service import ApiResponseService
+
+if TYPE_CHECKING:
+    from src.infra.repositories.sql_task_repository import SQLTaskRepository
+
+# Versioned JSON API for scripts and the frontend. Unlike the page routes it
+# never renders templates or redirects, unauthenticated requests get a 401.
+api_bp = Blueprint("api", __name__, url_prefix="/api/v1")
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 500
+
+
+def _parse_date(value: str | None) -> date | None:
+    """Parse an optional ISO date query parameter, raising ValueError for invalid values."""
+    return date.fromisoformat(value) if value else None
+
+
+@api_bp.errorhandler(401)
+def unauthorized(error):
+    api_response_service: ApiResponseService = current_app.extensions[
+        "api_response_service"
+    ]
+    response = api_response_service.to_response(
+        ok=False,
+        status=401,
+        message="Authentication required",
+        error="Log in to use the API.",
+    )
+    response.status_code = 401
+    return response
+
+
+@api_bp.route("/tasks", methods=["GET"])
+@login_required
+@read_only
+def list_tasks():
+    """
+    List or search the current user's tasks, one page at a time. Accepts the dashboard filters
+    (`title`, `description`, `status`, `open=1`, `due_from`, `due_to`, `sort`) plus `limit` and
+    `offset`. With `view=summary` only a description preview is returned per task.
+    """
+    task_repository: SQLTaskRepository = current_app.extensions["task_repo"]
+    api_response_service: ApiResponseService = current_app.extensions[
+        "api_response_service"
+    ]
+    args = request.args
+    sort = args.get("sort") or None
+    try:
+        limit = int(args.get("limit", DEFAULT_PAGE_SIZE))
+        offset = int(args.get("offset", 0))
+        due_from = _parse_date(args.get("due_from"))
+        due_to = _parse_date(args.get("due_to"))
+    except ValueError as e:
+        return _bad_request(api_response_service, str(e))
+    if not 1 <= limit <= MAX_PAGE_SIZE or offset < 0:
+        return _bad_request(
+            api_response_service,
+            f"limit must be between 1 and {MAX_PAGE_SIZE} and offset non-negative.",
+        )
+    if sort is not None and sort not in task_repository.sort_keys:
+        return _bad_request(
+            api_response_service,
+            f"sort must be one of {', '.join(task_repository.sort_keys)}.",
+        )
+
+    summary = args.get("view") == "summary"
+    search = (
+        task_repository.search_summaries if summary else task_repository.search
+    )
+    # one extra row tells whether another page exists
+    tasks = search(
+        current_user.id,
+        title=args.get("title") or None,
+        description=args.get("description") or None,
+        status=args.get("status") or None,
+        open_only=args.get("open") == "1",
+        due_from=due_from,
+        due_to=due_to,
+        sort=sort,
+        limit=limit + 1,
+        offset=offset,
+    )
+    has_more = len(tasks) > limit
+    tasks = tasks[:limit]
+
+    return api_response_service.to_response(
+        ok=True,
+        status=200,
+        data={
+            "tasks": (
+                api_response_service.encode_summaries(tasks)
+                if summary
+                else api_response_service.encode_tasks(tasks)
+            ),
+            "limit": limit,
+            "offset": offset,
+            "next_offset": offset + limit if has_more else None,
+        },
+    )
+
+
+@api_bp.route("/tasks/<int:task_id>", methods=["GET"])
+@login_required
+@read_only
+def get_task(task_id: int):
+    """
+    Return a single task of the current user.
+    """
+    task_repository: SQLTaskRepository = current_app.extensions["task_repo"]
+    api_response_service: ApiResponseService = current_app.extensions[
+        "api_response_service"
+    ]
+    task = task_repository.get_by_id(task_id)
+    if task is None or task.user_id != current_user.id:
+        response = api_response_service.to_response(
+            ok=False,
+            status=404,
+            message="Task not found",
+            error=f"Task with ID {task_id} not found.",
+        )
+        response.status_code = 404
+        return response
+
+    return api_response_service.to_response(
+        ok=True,
+        status=200,
+        data={"task": api_response_service.encode_task(task)},
+    )
+
+
+def _bad_request(api_response_service: ApiResponseService, error: str):
+    """Build a 400 response for invalid query parameters."""
+    response = api_response_service.to_response(
+        ok=False,
+        status=400,
+        message="Invalid query parameters",
+        error=error,
+    )
+    response.status_code = 400
+    return response
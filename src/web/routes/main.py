@@ -1,5 +1,14 @@
-from flask import Blueprint, render_template, render_template_string
+from flask import (
+    Blueprint,
+    current_app,
+    render_template,
+    render_template_string,
+)
 from flask.helpers import redirect, url_for
+from flask_login import current_user, login_required
+
+from src.infra.db import get_write_coordinator
+from src.services.api_response_service import ApiResponseService
 
 main_bp = Blueprint("main", __name__)
 
@@ -14,3 +23,33 @@ def hello_world():
 @main_bp.route("/hello/<name>")
 def hello(name=None):
     return render_template("hello.html", name=name)
+
+
+@main_bp.route("/metrics/writes")
+@login_required
+def write_metrics():
+    """
+    Metrics of the write path for admins: admitted, rejected and in-flight writers, busy
+    retries and timeouts, the time spent waiting for admission and for the write lock, and the
+    group commits of the WriteCoordinator if one is running.
+    """
+    api_response_service: ApiResponseService = current_app.extensions[
+        "api_response_service"
+    ]
+    if not current_user.is_admin:
+        return api_response_service.to_response(
+            ok=False,
+            status=403,
+            message="Metrics are not available",
+            error="Only admins can see the metrics.",
+        )
+    data = current_app.extensions["write_metrics"].snapshot()
+    coordinator = get_write_coordinator()
+    if coordinator is not None:
+        # every database with a coordinator, e.g. task shards
+        coordinators = current_app.extensions["write_coordinators"].values()
+        data["commits"] = sum(c.commits for c in coordinators)
+        data["writes"] = sum(c.writes for c in coordinators)
+    return api_response_service.to_response(
+        ok=True, status=200, message="Write metrics", data=data
+    )
@@ -1,24 +1,56 @@
+from datetime import date
+from typing import TYPE_CHECKING
+
 from flask import (
     Blueprint,
     Response,
+    abort,
     current_app,
     redirect,
     render_template,
     request,
+    send_file,
+    stream_with_context,
     url_for,
 )
 from flask_login import current_user, login_required
 
-from src.core.errors import TaskNotFoundError
-from src.infra.repositories.sql_task_repository import SQLTaskRepository
+from src.core.errors import TaskNotFoundError, ValidationError
+from src.infra.db import read_only
 from src.infra.repositories.sql_user_repository import SQLUserRepository
 from src.services.api_response_service import ApiResponseService
+from src.services.calendar_service import CalendarService
+from src.services.event_broker import EventBroker
+from src.services.job_service import JobService
+from src.services.task_export_service import TaskExportService
+
+if TYPE_CHECKING:
+    from src.infra.repositories.sql_task_repository import SQLTaskRepository
 
 task_bp = Blueprint("task", __name__)
 
 
+def _after_task_write(user_id: int, task_id: int, op: str) -> None:
+    """Drop the cached cards of a deleted task and notify the user's open dashboards after a successful write."""
+    if op == "delete":
+        current_app.extensions["fragment_cache"].discard(
+            lambda key: key[0] == task_id
+        )
+    event_broker: EventBroker = current_app.extensions["event_broker"]
+    event_broker.publish(user_id, "task", {"task_id": task_id, "op": op})
+
+
+def _parse_date(value: str | None) -> date | None:
+    """Parse an optional ISO date query parameter, ignoring invalid values."""
+    try:
+        return date.fromisoformat(value.strip()) if value else None
+    except ValueError:
+        return None
+
+
 @task_bp.route("/dashboard", methods=["GET"])
 @login_required
+@read_only
 def dashboard():
     user_id = current_user.id if current_user.is_authenticated else None
     if not user_id:
@@ -35,12 +67,179 @@ def dashboard():
 
     title = request.args.get("title", "").strip() or None
     description = request.args.get("description", "").strip() or None
+    status = request.args.get("status", "").strip() or None
+    sort = request.args.get("sort", "").strip() or None
+
+    # read before the search so live updates never skip a change
+    change_cursor = task_repository.change_feed_bounds(user.id)[1]
+    # Listings only need summaries, the full task is loaded by `task_edit`
+    tasks = task_repository.search_summaries(
+        user.id,
+        title=title,
+        description=description,
+        status=status,
+        open_only=request.args.get("open") == "1",
+        due_from=_parse_date(request.args.get("due_from")),
+        due_to=_parse_date(request.args.get("due_to")),
+        sort=sort if sort in task_repository.sort_keys else None,
+    )
+
+    stats = task_repository.get_stats(user.id, date.today())
+
+    return render_template(
+        "tasks/dashboard.html",
+        tasks=tasks,
+        stats=stats,
+        change_cursor=change_cursor,
+        preview_length=task_repository.summary_preview_length,
+    )
+
+
+@task_bp.route("/task/stats", methods=["GET"])
+@login_required
+@read_only
+def task_stats():
+    """
+    Return the current user's task counts per status, overdue and due this week as JSON.
+    """
+    task_repository: SQLTaskRepository = current_app.extensions["task_repo"]
+    api_response_service: ApiResponseService = current_app.extensions[
+        "api_response_service"
+    ]
+    stats = task_repository.get_stats(current_user.id, date.today())
+    return api_response_service.to_response(
+        ok=True,
+        status=200,
+        data={
+            "todo": stats.todo,
+            "in_progress": stats.in_progress,
+            "completed": stats.completed,
+            "total": stats.total,
+            "overdue": stats.overdue,
+            "due_this_week": stats.due_this_week,
+        },
+    )
+
+
+@task_bp.route("/task/calendar", methods=["GET"])
+@login_required
+@read_only
+def task_calendar():
+    """
+    Return the current user's tasks due in a month (`?month=YYYY-MM`, defaults to the current month)
+    as JSON, bucketed by due date.
+    """
+    calendar_service: CalendarService = current_app.extensions[
+        "calendar_service"
+    ]
+    api_response_service: ApiResponseService = current_app.extensions[
+        "api_response_service"
+    ]
+    month_param = request.args.get("month", "").strip()
+    try:
+        first = (
+            date.fromisoformat(f"{month_param}-01")
+            if month_param
+            else date.today().replace(day=1)
+        )
+    except ValueError:
+        return api_response_service.to_response(
+            ok=False,
+            status=400,
+            message="Invalid month",
+            error="month must be formatted as YYYY-MM.",
+        )
 
-    tasks = task_repository.search(
-        user.id, title=title, description=description
+    days = calendar_service.get_month(current_user.id, first.year, first.month)
+    return api_response_service.to_response(
+        ok=True,
+        status=200,
+        data={"month": first.strftime("%Y-%m"), "days": days},
     )
 
-    return render_template("tasks/dashboard.html", tasks=tasks)
+
+@task_bp.route("/task/changes", methods=["GET"])
+@login_required
+@read_only
+def task_changes():
+    """
+    Return the changes of the current user's tasks after the `since` sequence number as JSON.
+    Follow `cursor` until `has_more` is false. When `reset` is true the client missed compacted
+    deletions and must drop its local copy, the changes then start from the beginning of the feed.
+    """
+    task_repository: SQLTaskRepository = current_app.extensions["task_repo"]
+    api_response_service: ApiResponseService = current_app.extensions[
+        "api_response_service"
+    ]
+    try:
+        since = int(request.args.get("since", 0))
+        limit = int(
+            request.args.get("limit", task_repository.change_batch_size)
+        )
+    except ValueError:
+        since = limit = -1
+    if since < 0 or limit < 1:
+        return api_response_service.to_response(
+            ok=False,
+            status=400,
+            message="Invalid change feed position",
+            error="since must be a non-negative and limit a positive integer.",
+        )
+
+    compacted_through, head = task_repository.change_feed_bounds(
+        current_user.id
+    )
+    reset = 0 < since < compacted_through
+    if reset:
+        since = 0
+    limit = min(limit, task_repository.change_batch_size)
+    changes = task_repository.changes_since(current_user.id, since, limit + 1)
+    has_more = len(changes) > limit
+    changes = changes[:limit]
+    # without more pages the client is up to date with the whole feed
+    cursor = changes[-1].seq if changes else since
+    if not has_more:
+        cursor = max(cursor, head)
+
+    return api_response_service.to_response(
+        ok=True,
+        status=200,
+        data={
+            "reset": reset,
+            "cursor": cursor,
+            "has_more": has_more,
+            "changes": [
+                {
+                    "seq": change.seq,
+                    "op": change.op,
+                    "task_id": change.task_id,
+                    "task": (
+                        api_response_service.encode_task(change.task)
+                        if change.task is not None
+                        else None
+                    ),
+                }
+                for change in changes
+            ],
+        },
+    )
+
+
+@task_bp.route("/task/events", methods=["GET"])
+@login_required
+def task_events():
+    """
+    Stream change notifications for the current user's tasks as server-sent events. The client
+    fetches the changes themselves from `/task/changes`. The stream does not use
+    `stream_with_context`, so the request context and its database connection are released as
+    soon as the response starts.
+    """
+    event_broker: EventBroker = current_app.extensions["event_broker"]
+    return Response(
+        event_broker.stream(current_user.id),
+        mimetype="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
 
 
 @task_bp.route("/task", methods=["GET", "POST"])
@@ -79,6 +278,7 @@ def task_create():
         )
 
     created = result.unwrap()
+    _after_task_write(user_id, created.id, "upsert")
     return api_response_service.to_response(
         ok=True,
         status=201,
@@ -90,6 +290,7 @@ def task_create():
 
 @task_bp.route("/task/<int:task_id>", methods=["GET"])
 @login_required
+@read_only
 def task_edit(task_id: int):
     task_repository: SQLTaskRepository = current_app.extensions["task_repo"]
     user_id = current_user.id
@@ -130,6 +331,7 @@ def task_update(task_id: int):
             error=str(result.unwrap_err()),
         )
     updated = result.unwrap()
+    _after_task_write(user_id, updated.id, "upsert")
     return api_response_service.to_response(
         ok=True,
         status=200,
@@ -156,6 +358,7 @@ def task_delete(task_id: int):
             status=404,
             error=str(error),
         )
+    _after_task_write(user_id, task_id, "delete")
     return api_response_service.to_response(
         ok=True,
         status=200,
@@ -166,30 +369,218 @@ def task_delete(task_id: int):
 
 @task_bp.route("/task/export", methods=["GET"])
 @login_required
+@read_only
 def export_tasks():
     """
-    Export the current user's tasks as a downloadable CSV file.
+    Export the current user's tasks as a downloadable file, streamed in chunks. `format` selects
+    the encoder (csv by default, csv.gz, ndjson, json, and arrow or parquet when pyarrow is
+    installed). With `since` (ISO 8601) only the tasks changed since then are exported, with
+    `updated_at` and `deleted` columns and tombstone rows for deleted tasks. The
+    `X-Export-Watermark` header is the `since` of the next incremental export.
     """
     user_id = current_user.id if current_user.is_authenticated else None
     if not user_id:
         return redirect(url_for("auth.login"))
 
-    export_service = current_app.extensions["task_export_service"]
+    export_service: TaskExportService = current_app.extensions[
+        "task_export_service"
+    ]
     api_response_service: ApiResponseService = current_app.extensions[
         "api_response_service"
     ]
-    result = export_service.export_user_tasks(user_id)
+    result = export_service.get_encoder(
+        request.args.get("format", export_service.default_format)
+    )
     if result.is_err:
         return api_response_service.to_response(
             ok=False,
-            status=500,
-            message="Task export failed",
+            status=400,
+            message="Invalid export format",
             error=str(result.unwrap_err()),
         )
-
-    csv_content = result.unwrap()
+    encoder = result.unwrap()
+    since = request.args.get("since") or None
+    if since is not None:
+        since_result = export_service.parse_since(since)
+        if since_result.is_err:
+            return api_response_service.to_response(
+                ok=False,
+                status=400,
+                message="Invalid export start",
+                error=str(since_result.unwrap_err()),
+            )
+        since = since_result.unwrap()
+    # taken before the first read and moved back by the longest write, changes
+    # racing the export are exported again next time
+    watermark = export_service.watermark()
     return Response(
-        csv_content,
-        mimetype="text/csv",
-        headers={"Content-Disposition": "attachment; filename=tasks.csv"},
+        stream_with_context(
+            export_service.stream_user_tasks(user_id, encoder, since)
+        ),
+        mimetype=encoder.mimetype,
+        headers={
+            "Content-Disposition": f"attachment; filename=tasks.{encoder.extension}",
+            "X-Export-Watermark": watermark,
+        },
+    )
+
+
+@task_bp.route("/task/export/jobs", methods=["POST"])
+@login_required
+def start_export_job():
+    """
+    Queue a background export of the current user's tasks and return the job's status URL
+    immediately. Meant for accounts whose export takes too long to stream within a request.
+    `format` selects the export format, gzip-compressed CSV by default, and `since` makes it an
+    incremental export like `/task/export`.
+    """
+    export_service: TaskExportService = current_app.extensions[
+        "task_export_service"
+    ]
+    api_response_service: ApiResponseService = current_app.extensions[
+        "api_response_service"
+    ]
+    result = export_service.start_export(
+        current_user.id,
+        request.values.get("format"),
+        request.values.get("since") or None,
+    )
+    if result.is_err:
+        error = result.unwrap_err()
+        return api_response_service.to_response(
+            ok=False,
+            status=400 if isinstance(error, ValidationError) else 503,
+            message="Export could not be started",
+            error=str(error),
+        )
+    job = result.unwrap()
+    return api_response_service.to_response(
+        ok=True,
+        status=202,
+        message="Export started",
+        data={
+            "job_id": job.id,
+            "status_url": url_for("task.export_job_status", job_id=job.id),
+        },
+    )
+
+
+@task_bp.route("/task/export/all/jobs", methods=["POST"])
+@login_required
+def start_archive_export_job():
+    """
+    Queue an export of every user's tasks into one zip archive, one file per user, for admins.
+    `format` selects the format of the files, CSV by default. Progress and download work like a
+    user's export job.
+    """
+    job_service: JobService = current_app.extensions["job_service"]
+    export_service: TaskExportService = current_app.extensions[
+        "task_export_service"
+    ]
+    api_response_service: ApiResponseService = current_app.extensions[
+        "api_response_service"
+    ]
+    if not current_user.is_admin:
+        return api_response_service.to_response(
+            ok=False,
+            status=403,
+            message="Export could not be started",
+            error="Only admins can export the tasks of all users.",
+        )
+    format = request.values.get("format") or export_service.default_format
+    encoder_result = export_service.get_encoder(format)
+    if encoder_result.is_err:
+        return api_response_service.to_response(
+            ok=False,
+            status=400,
+            message="Export could not be started",
+            error=str(encoder_result.unwrap_err()),
+        )
+    job = job_service.enqueue(
+        export_service.archive_job_kind,
+        {"format": format},
+        user_id=current_user.id,
+    ).unwrap()
+    return api_response_service.to_response(
+        ok=True,
+        status=202,
+        message="Export started",
+        data={
+            "job_id": job.id,
+            "status_url": url_for("task.export_job_status", job_id=job.id),
+        },
+    )
+
+
+@task_bp.route("/task/export/jobs/<int:job_id>", methods=["GET"])
+@login_required
+def export_job_status(job_id: int):
+    """
+    Return the status and progress of one of the current user's export jobs. Once the export
+    succeeded the response contains its download URL until the file expires.
+    """
+    job_service: JobService = current_app.extensions["job_service"]
+    export_service: TaskExportService = current_app.extensions[
+        "task_export_service"
+    ]
+    api_response_service: ApiResponseService = current_app.extensions[
+        "api_response_service"
+    ]
+    job = job_service.get_job(job_id, user_id=current_user.id)
+    if job is None or not export_service.is_export_job(job):
+        return api_response_service.to_response(
+            ok=False,
+            status=404,
+            error=f"Export job {job_id} not found.",
+        )
+    downloadable = export_service.artifact_path(job) is not None
+    return api_response_service.to_response(
+        ok=True,
+        status=200,
+        data={
+            "job_id": job.id,
+            "status": job.status,
+            "progress": job.progress,
+            "error": job.error if job.status == "failed" else None,
+            "rows": job.result["rows"] if job.result else None,
+            "expires_at": job.result["expires_at"] if job.result else None,
+            "watermark": job.result.get("watermark") if job.result else None,
+            "download_url": (
+                url_for("task.download_export", job_id=job.id)
+                if downloadable
+                else None
+            ),
+        },
+    )
+
+
+@task_bp.route("/task/export/jobs/<int:job_id>/download", methods=["GET"])
+@login_required
+def download_export(job_id: int):
+    """
+    Download the file of one of the current user's finished export jobs.
+    """
+    job_service: JobService = current_app.extensions["job_service"]
+    export_service: TaskExportService = current_app.extensions[
+        "task_export_service"
+    ]
+    job = job_service.get_job(job_id, user_id=current_user.id)
+    path = export_service.artifact_path(job) if job is not None else None
+    if path is None:
+        abort(404)
+    if job.kind == export_service.archive_job_kind:
+        return send_file(
+            path.resolve(),
+            mimetype="application/zip",
+            as_attachment=True,
+            download_name="tasks-all.zip",
+        )
+    encoder = export_service.encoders[
+        job.result.get("format", export_service.default_job_format)
+    ]
+    return send_file(
+        path.resolve(),
+        mimetype=encoder.mimetype,
+        as_attachment=True,
+        download_name=f"tasks.{encoder.extension}",
     )
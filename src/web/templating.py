@@ -0,0 +1,144 @@
+from collections import OrderedDict
+from pathlib import Path
+from threading import Lock
+from typing import Callable, Hashable
+
+from flask import Flask
+from jinja2 import Environment, FileSystemBytecodeCache
+from markupsafe import Markup
+
+TASK_CARD_TEMPLATE = "tasks/_task_card.html"
+
+
+class FragmentCache:
+    """
+    Bounded LRU of rendered HTML fragments. Keys must change whenever the rendered data changes,
+    e.g. by consisting of the rendered fields, so that stale entries simply age out. Entries that
+    must not be served again, e.g. the cards of deleted tasks, are dropped with `discard`. The
+    cache is shared by all users of the process.
+    """
+
+    def __init__(self, max_entries: int = 4096):
+        """
+        Initialize an empty FragmentCache.
+
+        Args:
+            max_entries (int): Maximum number of cached fragments. Defaults to 4096.
+        """
+        self.max_entries = max_entries
+        self._lock = Lock()
+        self._fragments: OrderedDict[Hashable, Markup] = OrderedDict()
+
+    def get_or_render(
+        self, key: Hashable, render: Callable[[], str]
+    ) -> Markup:
+        """
+        Return the cached fragment for a key, rendering and caching it on a miss.
+
+        Args:
+            key (Hashable): Identifies the fragment and the version of its data.
+            render (Callable[[], str]): Renders the fragment, called outside the lock.
+
+        Returns:
+            Markup: The rendered fragment, safe to insert into a template.
+        """
+        with self._lock:
+            fragment = self._fragments.get(key)
+            if fragment is not None:
+                self._fragments.move_to_end(key)
+                return fragment
+
+        fragment = Markup(render())
+        with self._lock:
+            self._fragments[key] = fragment
+            while len(self._fragments) > self.max_entries:
+                self._fragments.popitem(last=False)
+        return fragment
+
+    def discard(self, match: Callable[[Hashable], bool]) -> int:
+        """
+        Drop the fragments whose keys match, e.g. those of a deleted task.
+
+        Args:
+            match (Callable[[Hashable], bool]): Returns True for the keys to drop.
+
+        Returns:
+            int: The number of dropped fragments.
+        """
+        with self._lock:
+            keys = [key for key in self._fragments if match(key)]
+            for key in keys:
+                del self._fragments[key]
+        return len(keys)
+
+    def __len__(self) -> int:
+        return len(self._fragments)
+
+
+def configure_templates(app: Flask) -> None:
+    """
+    Set up the bytecode cache and the cached task card helper of the app's Jinja environment. Must
+    run before the first template is loaded.
+
+    Args:
+        app (Flask): The application.
+    """
+    cache_dir = app.config.get("JINJA_BYTECODE_CACHE_DIR")
+    if cache_dir:
+        Path(cache_dir).mkdir(parents=True, exist_ok=True)
+        app.jinja_env.bytecode_cache = FileSystemBytecodeCache(cache_dir)
+
+    fragment_cache = FragmentCache(app.config["FRAGMENT_CACHE_SIZE"])
+    app.extensions["fragment_cache"] = fragment_cache
+    env = app.jinja_env
+
+    def task_card(task) -> Markup:
+        # the card only depends on the task, so it is rendered without the
+        # request context. It is keyed on the fields it renders and the owner:
+        # task ids of deleted tasks can be reused by another user's task, so
+        # (id, version) alone could serve that user someone else's card
+        return fragment_cache.get_or_render(
+            task_card_key(task),
+            lambda: env.get_template(TASK_CARD_TEMPLATE).render(task=task),
+        )
+
+    env.globals["task_card"] = task_card
+
+
+def task_card_key(task) -> tuple:
+    """
+    Build the fragment cache key of a task card from the task's owner and every field the card
+    renders. The key starts with the task ID.
+
+    Args:
+        task (TaskSummary): The task of the card.
+
+    Returns:
+        tuple: The key.
+    """
+    return (
+        task.id,
+        task.user_id,
+        task.title,
+        task.status,
+        task.due_date,
+        task.preview,
+        task.truncated,
+    )
+
+
+def precompile_templates(env: Environment) -> int:
+    """
+    Compile every template of an environment. Compiled templates are kept in the environment's
+    template cache and, when a bytecode cache is configured, written to it for the next start.
+
+    Args:
+        env (Environment): The Jinja environment.
+
+    Returns:
+        int: The number of compiled templates.
+    """
+    names = env.list_templates(extensions=["html"])
+    for name in names:
+        env.get_template(name)
+    return len(names)
@@ -0,0 +1,166 @@
+"""
+Background job workers.
+
+`flask worker` runs the jobs of the app's SQLite job queue. With
+`--processes N` it starts N worker processes, each with its own app and
+database connections, so CPU bound jobs run in parallel. Every worker claims
+one job at a time under a lease; a worker that dies loses its lease and the
+job is retried by another worker.
+"""
+
+from multiprocessing.synchronize import Event as ProcessEvent
+from threading import Event
+from typing import Any, Mapping
+
+from flask import Flask
+
+import logging
+import multiprocessing
+import os
+import signal
+import socket
+
+logger = logging.getLogger(__name__)
+
+
+def register_jobs(app: Flask) -> None:
+    """
+    Register the handlers of the app's own job kinds with its JobService.
+
+    Args:
+        app (Flask): The application.
+    """
+    from src.core.result import Result
+
+    job_service = app.extensions["job_service"]
+    task_repo = app.extensions["task_repo"]
+
+    def compact_task_changes(job, context):
+        retain = job.payload.get("retain", app.config["TASK_CHANGES_RETAIN"])
+        return Result.Ok(
+            {"removed": task_repo.compact_changes_retaining(retain)}
+        )
+
+    job_service.register("compact_task_changes", compact_task_changes)
+
+    export_service = app.extensions["task_export_service"]
+    job_service.register(
+        export_service.job_kind, export_service.run_export_job
+    )
+    job_service.register(
+        export_service.cleanup_job_kind, export_service.cleanup_expired
+    )
+
+    def export_all_tasks(job, context):
+        from src.web.archive_export import run_archive_job
+
+        return run_archive_job(app, job, context)
+
+    job_service.register(export_service.archive_job_kind, export_all_tasks)
+
+
+def run_worker(
+    app: Flask,
+    stop: Event | ProcessEvent,
+    poll_interval: float | None = None,
+    burst: bool = False,
+) -> int:
+    """
+    Run jobs until `stop` is set. Every job runs in its own app context, so it gets a fresh
+    database connection that is closed once the job is done. Errors of the queue itself, e.g. a
+    locked database while claiming, are logged and retried after `poll_interval`, the job's lease
+    recovers a job whose bookkeeping failed.
+
+    Args:
+        app (Flask): The application.
+        stop (Event | ProcessEvent): Set to stop the worker after its current job.
+        poll_interval (float | None): Seconds to wait when the queue is empty. Defaults to `JOB_POLL_INTERVAL`.
+        burst (bool): Return as soon as the queue is empty instead of polling. Defaults to False.
+
+    Returns:
+        int: The number of jobs run.
+    """
+    job_service = app.extensions["job_service"]
+    worker_id = f"{socket.gethostname()}:{os.getpid()}"
+    poll_interval = poll_interval or app.config["JOB_POLL_INTERVAL"]
+    processed = 0
+    while not stop.is_set():
+        try:
+            with app.app_context():
+                job = job_service.run_next(worker_id)
+        except Exception:
+            logger.exception("Worker %s failed to run the next job", worker_id)
+            stop.wait(poll_interval)
+            continue
+        if job is not None:
+            processed += 1
+        elif burst:
+            break
+        else:
+            stop.wait(poll_interval)
+    return processed
+
+
+def _worker_process(
+    config: Mapping[str, Any],
+    stop: ProcessEvent,
+    poll_interval: float | None,
+    burst: bool,
+) -> None:
+    """Entry point of a worker process, builds its own app from the parent's config."""
+    # Ctrl+C reaches the whole process group, the parent sets `stop` instead
+    # so the current job is finished rather than interrupted
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    from src.web.app import create_app
+
+    run_worker(create_app(config), stop, poll_interval, burst)
+
+
+def start_workers(
+    app: Flask,
+    processes: int,
+    poll_interval: float | None = None,
+    burst: bool = False,
+) -> None:
+    """
+    Run `processes` worker processes until they finish (with `burst`) or the parent receives
+    SIGINT or SIGTERM. A single worker runs in the current process.
+
+    Args:
+        app (Flask): The application, its config is passed on to the worker processes.
+        processes (int): Number of worker processes.
+        poll_interval (float | None): Seconds to wait when the queue is empty. Defaults to `JOB_POLL_INTERVAL`.
+        burst (bool): Stop the workers once the queue is empty. Defaults to False.
+    """
+    # spawn works everywhere and does not share the parent's SQLite handles
+    context = multiprocessing.get_context("spawn")
+    stop = Event() if processes == 1 else context.Event()
+
+    def request_stop(signum, frame):
+        stop.set()
+
+    previous = {
+        signum: signal.signal(signum, request_stop)
+        for signum in (signal.SIGINT, signal.SIGTERM)
+    }
+    try:
+        if processes == 1:
+            run_worker(app, stop, poll_interval, burst)
+            return
+
+        config = dict(app.config)
+        workers = [
+            context.Process(
+                target=_worker_process,
+                args=(config, stop, poll_interval, burst),
+                name=f"worker-{number}",
+            )
+            for number in range(processes)
+        ]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+    finally:
+        for signum, handler in previous.items():
+            signal.signal(signum, handler)
@@ -65,6 +65,17 @@ def db(app, bcrypt, test_admin):
         close_db()
 
 
+@pytest.fixture(params=["sql", "memory"])
+def task_repo(request, db):
+    """Every TaskRepository implementation, so each test runs against all of them."""
+    from src.infra.repositories.in_memory_task import InMemoryTaskRepository
+    from src.infra.repositories.sql_task_repository import SQLTaskRepository
+
+    if request.param == "memory":
+        return InMemoryTaskRepository()
+    return SQLTaskRepository()
+
+
 @pytest.fixture
 def test_admin(app) -> dict[str, str]:
     return {
@@ -0,0 +1,113 @@
+from datetime import date
+
+from src.core.task import Task
+from src.services import api_response_service
+from src.services.api_response_service import ApiResponseService
+
+
+def login(client, test_admin):
+    return client.post(
+        "/login",
+        data={
+            "username": test_admin["username"],
+            "password": test_admin["password"],
+        },
+    )
+
+
+def create_task(client, title, due_date, status="To Do"):
+    return client.post(
+        "/task",
+        data={
+            "title": title,
+            "description": f"About {title}",
+            "due_date": due_date,
+            "status": status,
+        },
+    ).get_json()["data"]["task_id"]
+
+
+def test_api_requires_login(client, db):
+    """Test that the API answers 401 JSON instead of redirecting."""
+    resp = client.get("/api/v1/tasks")
+    assert resp.status_code == 401
+    assert resp.get_json()["ok"] is False
+
+
+def test_list_tasks_paginates(client, test_admin):
+    """Test that /api/v1/tasks pages through the user's tasks."""
+    login(client, test_admin)
+    for i in range(5):
+        create_task(client, f"Task {i}", f"2030-01-0{5 - i}")
+
+    first = client.get("/api/v1/tasks?limit=2&sort=due_date").get_json()
+    assert first["ok"] is True
+    assert [t["title"] for t in first["data"]["tasks"]] == [
+        "Task 4",
+        "Task 3",
+    ]
+    assert first["data"]["next_offset"] == 2
+    assert set(first["data"]["tasks"][0]) == {
+        "id",
+        "title",
+        "description",
+        "due_date",
+        "status",
+    }
+
+    last = client.get("/api/v1/tasks?limit=2&offset=4&sort=due_date")
+    data = last.get_json()["data"]
+    assert [t["title"] for t in data["tasks"]] == ["Task 0"]
+    assert data["next_offset"] is None
+
+
+def test_search_tasks_with_filters_and_summary_view(client, test_admin):
+    """Test that /api/v1/tasks applies the search filters and the summary view."""
+    login(client, test_admin)
+    create_task(client, "Write report", "2030-02-01")
+    create_task(client, "Read report", "2030-02-02", status="Completed")
+    create_task(client, "Shopping", "2030-02-03")
+
+    data = client.get(
+        "/api/v1/tasks?title=report&open=1&view=summary"
+    ).get_json()["data"]
+    assert [t["title"] for t in data["tasks"]] == ["Write report"]
+    assert data["tasks"][0]["preview"] == "About Write report"
+    assert "description" not in data["tasks"][0]
+
+    bad = client.get("/api/v1/tasks?limit=0")
+    assert bad.status_code == 400
+    assert client.get("/api/v1/tasks?due_from=nope").status_code == 400
+
+
+def test_get_task(client, test_admin):
+    """Test that /api/v1/tasks/<id> returns the task or 404."""
+    login(client, test_admin)
+    task_id = create_task(client, "Single", str(date.today()))
+
+    resp = client.get(f"/api/v1/tasks/{task_id}")
+    assert resp.get_json()["data"]["task"]["title"] == "Single"
+    assert client.get("/api/v1/tasks/9999").status_code == 404
+
+
+def test_encoders_match_fields():
+    """Test that the precomputed encoders produce the declared fields."""
+    task = Task(1, "T", "D", "2030-01-01", "To Do", 3)
+    assert ApiResponseService.encode_task(task) == {
+        "id": 1,
+        "title": "T",
+        "description": "D",
+        "due_date": "2030-01-01",
+        "status": "To Do",
+    }
+    assert ApiResponseService.dumps({"a": [1, "é"]}) == (
+        '{"a":[1,"é"]}'.encode()
+    )
+
+
+def test_dumps_without_orjson(monkeypatch):
+    """Test that the standard library fallback produces the same document."""
+    payload = {"ok": True, "data": {"tasks": [{"title": "é"}]}}
+    fast = ApiResponseService.dumps(payload)
+    monkeypatch.setattr(api_response_service, "_orjson_dumps", lambda: None)
+    assert ApiResponseService.dumps(payload) == fast
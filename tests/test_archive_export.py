@@ -0,0 +1,176 @@
+from datetime import date
+
+import csv
+import io
+import zipfile
+
+import pytest
+
+from src.config import TestConfig
+
+
+def login(client, username, password):
+    return client.post(
+        "/login", data={"username": username, "password": password}
+    )
+
+
+def create_user_tasks(app, users):
+    """Create users with the given numbers of tasks, returns their IDs."""
+    conn = app.extensions["task_repo"]._get_connection()
+    task_repo = app.extensions["task_repo"]
+    user_ids = []
+    for number, count in enumerate(users):
+        cur = conn.execute(
+            "INSERT INTO users (username, email, pw_hash) VALUES (?, ?, 'x')",
+            (f"user{number}", f"user{number}@example.com"),
+        )
+        conn.commit()
+        user_ids.append(cur.lastrowid)
+        for i in range(count):
+            task_repo.create(
+                f"Task {i}", "", str(date.today()), "To Do", cur.lastrowid
+            )
+    return user_ids
+
+
+def read_archive(path):
+    with zipfile.ZipFile(path) as archive:
+        return {
+            name: list(csv.reader(io.StringIO(archive.read(name).decode())))
+            for name in archive.namelist()
+        }
+
+
+@pytest.fixture
+def file_app(tmp_path):
+    """An app with a database file, so export processes see its data."""
+    from src.infra.db import init_db
+    from src.web.app import create_app
+
+    class FileConfig(TestConfig):
+        DATABASE = str(tmp_path / "archive.db")
+        EXPORT_DIR = str(tmp_path / "exports")
+
+    app = create_app(FileConfig)
+    with app.app_context():
+        init_db()
+        yield app
+
+
+def test_export_all_tasks_writes_one_file_per_user(file_app, tmp_path):
+    """Test that the archive holds every user's tasks, sharded in the current process."""
+    from src.web.archive_export import export_all_tasks
+
+    user_ids = create_user_tasks(file_app, [2, 0, 3])
+    output = tmp_path / "all.zip"
+    progress = []
+
+    result = export_all_tasks(
+        file_app,
+        output,
+        shard_size=2,
+        on_progress=lambda done, total: progress.append((done, total)),
+    )
+    assert result.unwrap() == {"users": 3, "rows": 5, "shards": 2}
+    assert progress == [(2, 3), (3, 3)]
+
+    files = read_archive(output)
+    assert sorted(files) == [
+        f"tasks/user-{user_id}.csv" for user_id in user_ids
+    ]
+    assert len(files[f"tasks/user-{user_ids[0]}.csv"]) == 3
+    assert files[f"tasks/user-{user_ids[1]}.csv"] == [
+        ["id", "title", "description", "due_date", "status"]
+    ]
+    # the scratch directory and partial archive are gone
+    assert sorted(path.name for path in tmp_path.iterdir()) == [
+        "all.zip",
+        "archive.db",
+        "archive.db-shm",
+        "archive.db-wal",
+    ]
+
+    assert export_all_tasks(file_app, output, "xml").is_err
+
+
+@pytest.mark.slow
+def test_export_all_tasks_command_uses_processes(file_app, tmp_path):
+    """Test that `flask export-all-tasks` exports the shards in several processes."""
+    create_user_tasks(file_app, [1, 2, 3, 4])
+    output = tmp_path / "all.zip"
+
+    result = file_app.test_cli_runner().invoke(
+        args=[
+            "export-all-tasks",
+            str(output),
+            "--processes",
+            "2",
+            "--shard-size",
+            "1",
+        ]
+    )
+    assert result.exit_code == 0, result.output
+    assert "Exported 10 tasks of 4 users in 4 shards" in result.output
+    assert sum(len(rows) - 1 for rows in read_archive(output).values()) == 10
+
+
+@pytest.mark.slow
+def test_export_all_tasks_reports_progress_while_waiting(
+    file_app, tmp_path, monkeypatch
+):
+    """Test that progress, which extends a job's lease, is reported while waiting for pool shards."""
+    from src.web import archive_export
+
+    monkeypatch.setattr(archive_export, "PROGRESS_INTERVAL", 0.01)
+    create_user_tasks(file_app, [1, 1])
+    progress = []
+
+    result = archive_export.export_all_tasks(
+        file_app,
+        tmp_path / "all.zip",
+        processes=2,
+        shard_size=1,
+        on_progress=lambda done, total: progress.append((done, total)),
+    )
+    assert result.unwrap()["users"] == 2
+    # starting the pool processes takes far longer than the interval
+    assert progress[0] == (0, 2)
+    assert progress[-1] == (2, 2)
+
+
+def test_archive_export_job_for_admins(
+    client, app, test_admin, tmp_path, monkeypatch
+):
+    """Test that only admins can start the archive export and download its zip."""
+    export_service = app.extensions["task_export_service"]
+    monkeypatch.setattr(export_service, "export_dir", tmp_path)
+    client.post(
+        "/register",
+        data={
+            "username": "regular",
+            "email": "regular@example.com",
+            "password": "password123",
+            "password2": "password123",
+        },
+    )
+    login(client, "regular", "password123")
+    assert client.post("/task/export/all/jobs").get_json()["status"] == 403
+    client.get("/logout")
+
+    login(client, test_admin["username"], test_admin["password"])
+    data = client.post("/task/export/all/jobs").get_json()
+    assert data["status"] == 202
+    job = app.extensions["job_service"].run_next("test-worker")
+    assert job.kind == export_service.archive_job_kind
+
+    status = client.get(data["data"]["status_url"]).get_json()["data"]
+    assert status["status"] == "succeeded"
+    resp = client.get(status["download_url"])
+    assert resp.mimetype == "application/zip"
+    assert "tasks-all.zip" in resp.headers["Content-Disposition"]
+    with zipfile.ZipFile(io.BytesIO(resp.get_data())) as archive:
+        assert all(
+            name.startswith("tasks/user-") for name in archive.namelist()
+        )
+    resp.close()
@@ -0,0 +1,79 @@
+from pathlib import Path
+
+from src.web.assets import build_assets
+
+import gzip
+import json
+import shutil
+
+
+def test_build_assets_fingerprints_and_compresses(tmp_path):
+    """Test that build_assets writes hashed copies, gzip siblings and a manifest."""
+    (tmp_path / "js").mkdir()
+    (tmp_path / "css").mkdir()
+    script = b"console.log('hello');\n" * 50
+    (tmp_path / "js" / "main.js").write_bytes(script)
+    (tmp_path / "css" / "input.css").write_text("@import 'tailwindcss';")
+
+    manifest = build_assets(tmp_path)
+    hashed = manifest["js/main.js"]
+    assert hashed.startswith("dist/js/main.") and hashed.endswith(".js")
+    assert "css/input.css" not in manifest
+    assert (tmp_path / hashed).read_bytes() == script
+    assert gzip.decompress((tmp_path / f"{hashed}.gz").read_bytes()) == script
+    assert json.loads((tmp_path / "dist" / "manifest.json").read_text()) == (
+        manifest
+    )
+
+    # same content, same name
+    assert build_assets(tmp_path) == manifest
+    # pages rendered before a rebuild still load the previous build's files,
+    # those of older builds are removed
+    (tmp_path / "js" / "main.js").write_bytes(script + b"//")
+    rebuilt = build_assets(tmp_path)["js/main.js"]
+    assert rebuilt != hashed
+    assert (tmp_path / hashed).exists()
+    assert (tmp_path / f"{hashed}.gz").exists()
+    (tmp_path / "js" / "main.js").write_bytes(script + b"///")
+    assert build_assets(tmp_path)["js/main.js"] not in (hashed, rebuilt)
+    assert (tmp_path / rebuilt).exists()
+    assert not (tmp_path / hashed).exists()
+    assert not (tmp_path / f"{hashed}.gz").exists()
+
+
+def test_asset_url_and_immutable_headers(app, client, tmp_path, monkeypatch):
+    """Test that asset_url resolves fingerprinted names and they are served as immutable."""
+    static_dir = tmp_path / "static"
+    shutil.copytree(app.static_folder, static_dir)
+    monkeypatch.setattr(app, "static_folder", str(static_dir))
+    manifest = build_assets(static_dir)
+    app.extensions["asset_manifest"].update(manifest)
+    try:
+        with app.test_request_context():
+            url = app.jinja_env.globals["asset_url"]("js/main.js")
+        assert url == f"/static/{manifest['js/main.js']}"
+
+        resp = client.get(url)
+        assert resp.status_code == 200
+        assert resp.cache_control.immutable
+        assert resp.cache_control.max_age == 31536000
+        resp.close()
+        plain = client.get("/static/js/main.js")
+        assert not plain.cache_control.immutable
+        plain.close()
+    finally:
+        app.extensions["asset_manifest"].clear()
+
+
+def test_shipped_bundle_includes_live_updates(app):
+    """Test that the committed main.js was rebuilt with the live update code the dashboard relies on."""
+    bundle = Path(app.static_folder, "js", "main.js").read_text()
+    assert "/task/events" in bundle
+    assert "task-live-notice" in bundle
+
+
+def test_shipped_bundle_handles_export_job_button(app):
+    """Test that the committed main.js wires up the "Export in Background" button the dashboard renders."""
+    bundle = Path(app.static_folder, "js", "main.js").read_text()
+    assert "export-job-button" in bundle
+    assert "/task/export/jobs" in bundle
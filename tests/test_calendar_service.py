@@ -0,0 +1,39 @@
+from src.infra.repositories.sql_user_repository import SQLUserRepository
+from src.services.calendar_service import CalendarService
+
+
+def test_calendar_cache_lru_and_invalidation(
+    db, bcrypt, test_admin, task_repo, monkeypatch
+):
+    """Test that CalendarService caches months, evicts the oldest and reloads after any write."""
+    user = SQLUserRepository(bcrypt=bcrypt).find_by_username(
+        test_admin["username"]
+    )
+    task_repo.create("T", "", "2030-01-10", "To Do", user.id)
+    calls = []
+    original = task_repo.search_summaries
+
+    def counting(*args, **kwargs):
+        calls.append(kwargs["due_from"])
+        return original(*args, **kwargs)
+
+    monkeypatch.setattr(task_repo, "search_summaries", counting)
+    service = CalendarService(task_repo, max_entries=2)
+
+    assert list(service.get_month(user.id, 2030, 1)) == ["2030-01-10"]
+    service.get_month(user.id, 2030, 1)
+    assert len(calls) == 1
+
+    service.get_month(user.id, 2030, 2)
+    service.get_month(user.id, 2030, 3)
+    service.get_month(user.id, 2030, 1)
+    assert len(calls) == 4
+
+    # a write committed elsewhere, e.g. by another process, advances the
+    # change feed head in the database and invalidates the cached months
+    task_repo.create("U", "", "2030-01-11", "To Do", user.id)
+    assert list(service.get_month(user.id, 2030, 1)) == [
+        "2030-01-10",
+        "2030-01-11",
+    ]
+    assert len(calls) == 5
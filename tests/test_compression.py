@@ -0,0 +1,84 @@
+from datetime import date
+
+from werkzeug.http import parse_accept_header
+
+from src.web.compression import choose_encoding
+
+import gzip
+
+
+def login(client, test_admin):
+    return client.post(
+        "/login",
+        data={
+            "username": test_admin["username"],
+            "password": test_admin["password"],
+        },
+    )
+
+
+def create_tasks(client, count):
+    for i in range(count):
+        client.post(
+            "/task",
+            data={
+                "title": f"Compressed {i}",
+                "description": "Some repeated description text. " * 5,
+                "due_date": str(date.today()),
+                "status": "To Do",
+            },
+        )
+
+
+def test_choose_encoding_negotiates():
+    """Test that the encoding follows Accept-Encoding qualities and availability."""
+
+    def accept(header):
+        return parse_accept_header(header)
+
+    assert choose_encoding(accept("gzip, br"), True) == "br"
+    assert choose_encoding(accept("gzip, br;q=0.5"), True) == "gzip"
+    assert choose_encoding(accept("gzip, br"), False) == "gzip"
+    assert choose_encoding(accept("gzip;q=0"), False) is None
+    assert choose_encoding(accept(""), False) is None
+
+
+def test_large_json_is_gzipped(client, test_admin):
+    """Test that a large buffered response is gzipped and a small one is not."""
+    login(client, test_admin)
+    create_tasks(client, 20)
+
+    headers = {"Accept-Encoding": "gzip"}
+    plain = client.get("/api/v1/tasks").get_data()
+    resp = client.get("/api/v1/tasks", headers=headers)
+    assert resp.headers["Content-Encoding"] == "gzip"
+    assert "Accept-Encoding" in resp.headers["Vary"]
+    assert int(resp.headers["Content-Length"]) < len(plain)
+    assert gzip.decompress(resp.get_data()) == plain
+
+    small = client.get("/task/stats", headers=headers)
+    assert "Content-Encoding" not in small.headers
+    assert "Accept-Encoding" in small.headers["Vary"]
+
+
+def test_streamed_export_is_gzipped(client, test_admin):
+    """Test that the streamed CSV export is compressed chunk by chunk."""
+    login(client, test_admin)
+    create_tasks(client, 5)
+
+    plain = client.get("/task/export").get_data()
+    resp = client.get("/task/export", headers={"Accept-Encoding": "gzip"})
+    assert resp.is_streamed
+    assert resp.headers["Content-Encoding"] == "gzip"
+    assert "Content-Length" not in resp.headers
+    assert gzip.decompress(resp.get_data()) == plain
+
+
+def test_event_stream_is_not_compressed(client, test_admin):
+    """Test that server-sent events bypass compression."""
+    login(client, test_admin)
+    resp = client.get(
+        "/task/events", headers={"Accept-Encoding": "gzip"}, buffered=False
+    )
+    assert "Content-Encoding" not in resp.headers
+    resp.close()
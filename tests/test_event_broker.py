@@ -0,0 +1,45 @@
+from src.services.event_broker import EventBroker
+
+
+def test_publish_fans_out_to_user_streams():
+    """Test that an event reaches every stream of the user and no one else."""
+    broker = EventBroker(heartbeat_interval=0.01)
+    first, second, other = broker.stream(1), broker.stream(1), broker.stream(2)
+    for stream in (first, second, other):
+        assert next(stream) == ": connected\n\n"
+
+    assert broker.publish(1, "task", {"task_id": 7, "op": "upsert"}) == 2
+    expected = 'event: task\ndata: {"task_id":7,"op":"upsert"}\n\n'
+    assert next(first) == expected
+    assert next(second) == expected
+    assert next(other) == ": heartbeat\n\n"
+
+    first.close()
+    assert broker.subscriber_count(1) == 1
+
+
+def test_slow_stream_is_dropped_with_resync():
+    """Test that a stream falling behind its buffer gets a single resync event and ends."""
+    broker = EventBroker(buffer_size=2, heartbeat_interval=0.01)
+    stream = broker.stream(1)
+    next(stream)
+    for task_id in range(5):
+        broker.publish(1, "task", {"task_id": task_id, "op": "upsert"})
+
+    assert list(stream) == ["event: resync\ndata: {}\n\n"]
+    assert broker.subscriber_count(1) == 0
+
+
+def test_overflow_while_a_frame_is_sent_still_delivers_resync():
+    """Test that a stream overflowing while it sends a frame delivers the resync event before ending."""
+    broker = EventBroker(buffer_size=2, heartbeat_interval=0.01)
+    stream = broker.stream(1)
+    next(stream)
+    broker.publish(1, "task", {"task_id": 0, "op": "upsert"})
+    assert next(stream) == 'event: task\ndata: {"task_id":0,"op":"upsert"}\n\n'
+    # the stream is suspended at the yield while the overflow happens
+    for task_id in range(1, 5):
+        broker.publish(1, "task", {"task_id": task_id, "op": "upsert"})
+
+    assert list(stream) == ["event: resync\ndata: {}\n\n"]
+    assert broker.subscriber_count(1) == 0
@@ -0,0 +1,265 @@
+from datetime import date, datetime
+
+import csv
+import gzip
+import io
+import json
+import time
+
+import pytest
+
+from src.core.timestamp import parse_datetime
+from src.services.export_encoders import (
+    EXPORT_COLUMNS,
+    INCREMENTAL_COLUMNS,
+    default_encoders,
+)
+
+ROWS = [
+    (1, "First", "desc, with comma", "2030-01-02", "To Do"),
+    (2, "Zweite “Aufgabe”", None, "2030-02-03", "Completed"),
+    (3, "Third", "line\nbreak", "2030-03-04", "In Progress"),
+]
+
+
+def encode(name, batches):
+    return b"".join(default_encoders()[name].encode(batches))
+
+
+def as_dicts(rows):
+    return [dict(zip(EXPORT_COLUMNS, row)) for row in rows]
+
+
+@pytest.mark.parametrize("batches", [[ROWS], [ROWS[:2], ROWS[2:]]])
+def test_text_encoders_round_trip(batches):
+    """Test that CSV, gzip CSV, NDJSON and JSON encode the same rows regardless of batching."""
+    data = encode("csv", batches)
+    rows = list(csv.reader(io.StringIO(data.decode(), newline="")))
+    assert rows[0] == list(EXPORT_COLUMNS)
+    assert rows[1][2] == "desc, with comma"
+    assert rows[3][2] == "line\nbreak"
+    assert len(rows) == 4
+
+    assert gzip.decompress(encode("csv.gz", batches)) == data
+
+    lines = encode("ndjson", batches).decode().splitlines()
+    assert [json.loads(line) for line in lines] == as_dicts(ROWS)
+
+    assert json.loads(encode("json", batches)) == as_dicts(ROWS)
+
+
+def test_text_encoders_without_rows():
+    """Test that exports without rows are still valid documents."""
+    assert encode("csv", []).decode().strip() == ",".join(EXPORT_COLUMNS)
+    assert encode("ndjson", []) == b""
+    assert json.loads(encode("json", [])) == []
+
+
+def test_columnar_encoders_round_trip():
+    """Test that the Arrow and Parquet exports read back with typed columns."""
+    pa = pytest.importorskip("pyarrow")
+    import pyarrow.ipc
+    import pyarrow.parquet
+
+    batches = [ROWS[:2], ROWS[2:]]
+    table = pyarrow.ipc.open_stream(encode("arrow", batches)).read_all()
+    assert table.column("id").to_pylist() == [1, 2, 3]
+    assert table.column("due_date").type == pa.date32()
+    assert table.column("due_date")[0].as_py() == date(2030, 1, 2)
+
+    table = pyarrow.parquet.read_table(
+        pa.BufferReader(encode("parquet", batches))
+    )
+    assert table.column("description").to_pylist() == [row[2] for row in ROWS]
+
+
+def login(client, test_admin):
+    return client.post(
+        "/login",
+        data={
+            "username": test_admin["username"],
+            "password": test_admin["password"],
+        },
+    )
+
+
+def test_export_route_formats(client, app, test_admin, monkeypatch):
+    """Test that /task/export streams the requested format and rejects unavailable ones."""
+    login(client, test_admin)
+    client.post(
+        "/task",
+        data={
+            "title": "Exported",
+            "description": "",
+            "due_date": str(date.today()),
+            "status": "To Do",
+        },
+    )
+
+    resp = client.get("/task/export?format=ndjson")
+    assert resp.mimetype == "application/x-ndjson"
+    assert "tasks.ndjson" in resp.headers["Content-Disposition"]
+    assert [
+        json.loads(line)["title"] for line in resp.get_data().splitlines()
+    ] == ["Exported"]
+
+    resp = client.get("/task/export?format=csv.gz")
+    assert resp.mimetype == "application/gzip"
+    assert b"Exported" in gzip.decompress(resp.get_data())
+
+    assert client.get("/task/export?format=xml").get_json()["status"] == 400
+
+    export_service = app.extensions["task_export_service"]
+    monkeypatch.setattr(
+        export_service.encoders["parquet"], "is_available", lambda: False
+    )
+    assert "parquet" not in export_service.available_formats
+    data = client.get("/task/export?format=parquet").get_json()
+    assert data["status"] == 400
+    assert "csv" in data["error"]
+
+
+def test_export_job_format(client, app, test_admin, tmp_path, monkeypatch):
+    """Test that background exports write and serve the requested format."""
+    login(client, test_admin)
+    export_service = app.extensions["task_export_service"]
+    monkeypatch.setattr(export_service, "export_dir", tmp_path)
+
+    assert (
+        client.post("/task/export/jobs?format=xml").get_json()["status"] == 400
+    )
+    data = client.post("/task/export/jobs?format=json").get_json()["data"]
+    app.extensions["job_service"].run_next("test-worker")
+
+    status = client.get(data["status_url"]).get_json()["data"]
+    resp = client.get(status["download_url"])
+    assert resp.mimetype == "application/json"
+    assert "tasks.json" in resp.headers["Content-Disposition"]
+    assert json.loads(resp.get_data()) == []
+    resp.close()
+
+
+def test_incremental_export(client, app, test_admin, monkeypatch):
+    """Test that exports since a watermark contain only the changed tasks and tombstones."""
+    monkeypatch.setattr(
+        app.extensions["task_export_service"], "watermark_overlap", 0
+    )
+    login(client, test_admin)
+    for title in ("Unchanged", "Edited", "Deleted"):
+        client.post(
+            "/task",
+            data={
+                "title": title,
+                "description": "",
+                "due_date": str(date.today()),
+                "status": "To Do",
+            },
+        )
+    full = client.get("/task/export?format=ndjson")
+    tasks = {
+        task["title"]: task["id"]
+        for task in map(json.loads, full.get_data().splitlines())
+    }
+    watermark = full.headers["X-Export-Watermark"]
+    time.sleep(0.005)
+
+    client.put(
+        f"/task/{tasks['Edited']}",
+        data={
+            "title": "Edited 2",
+            "description": "",
+            "due_date": str(date.today()),
+            "status": "Completed",
+        },
+    )
+    client.delete(f"/task/{tasks['Deleted']}")
+
+    resp = client.get(f"/task/export?format=ndjson&since={watermark}")
+    rows = [json.loads(line) for line in resp.get_data().splitlines()]
+    assert [(row["id"], row["title"], row["deleted"]) for row in rows] == [
+        (tasks["Edited"], "Edited 2", False),
+        (tasks["Deleted"], None, True),
+    ]
+    assert all(row["updated_at"] >= watermark for row in rows)
+    assert resp.headers["X-Export-Watermark"] > watermark
+
+    header = client.get(f"/task/export?since={watermark}").get_data()
+    assert header.decode().splitlines()[0] == ",".join(INCREMENTAL_COLUMNS)
+
+    data = client.get("/task/export?since=yesterday").get_json()
+    assert data["status"] == 400
+
+    task_repo = app.extensions["task_repo"]
+    task_repo.compact_changes(task_repo.change_feed_bounds()[1])
+    data = client.get(f"/task/export?since={watermark}").get_json()
+    assert data["status"] == 400
+    assert "Export all tasks" in data["error"]
+
+
+class StrictDatetime(datetime):
+    """`datetime` with the `fromisoformat` of Python 3.10, which rejects a trailing "Z"."""
+
+    @classmethod
+    def fromisoformat(cls, value):
+        if value.endswith("Z"):
+            raise ValueError(f"Invalid isoformat string: {value!r}")
+        return super().fromisoformat(value)
+
+
+def test_watermark_is_accepted_as_since(client, test_admin, monkeypatch):
+    """Test that an export's watermark is accepted as `since` where `fromisoformat` rejects "Z"."""
+    monkeypatch.setattr("src.core.timestamp.datetime", StrictDatetime)
+    login(client, test_admin)
+    client.post(
+        "/task",
+        data={
+            "title": "Synced",
+            "description": "",
+            "due_date": str(date.today()),
+            "status": "To Do",
+        },
+    )
+    watermark = client.get("/task/export").headers["X-Export-Watermark"]
+    assert watermark.endswith("Z")
+
+    resp = client.get(f"/task/export?format=ndjson&since={watermark}")
+    assert resp.status_code == 200
+    assert [
+        json.loads(line)["title"] for line in resp.get_data().splitlines()
+    ] == ["Synced"]
+    assert parse_datetime(watermark) == datetime.fromisoformat(
+        watermark[:-1] + "+00:00"
+    )
+
+
+def test_incremental_export_overlaps_writes_in_flight(client, test_admin, db):
+    """Test that a write stamped before an export started but committed after it read is exported next time."""
+    login(client, test_admin)
+    task_id = client.post(
+        "/task",
+        data={
+            "title": "Slow",
+            "description": "",
+            "due_date": str(date.today()),
+            "status": "To Do",
+        },
+    ).get_json()["data"]["task_id"]
+    stamped_at = db.execute(
+        "SELECT updated_at FROM tasks WHERE id = ?", (task_id,)
+    ).fetchone()[0]
+    # a write stamped now is still uncommitted when the export starts
+    watermark = client.get("/task/export").headers["X-Export-Watermark"]
+    time.sleep(0.005)
+    # the write commits afterwards with the stamp taken when it ran
+    db.execute(
+        "UPDATE tasks SET title = 'Committed late', updated_at = ? WHERE id = ?",
+        (stamped_at, task_id),
+    )
+    db.commit()
+
+    resp = client.get(f"/task/export?format=ndjson&since={watermark}")
+    rows = [json.loads(line) for line in resp.get_data().splitlines()]
+    assert watermark < stamped_at
+    assert [(row["id"], row["title"]) for row in rows] == [
+        (task_id, "Committed late")
+    ]
@@ -0,0 +1,134 @@
+from datetime import date
+
+import gzip
+import sqlite3
+
+import pytest
+
+
+def login(client, test_admin):
+    return client.post(
+        "/login",
+        data={
+            "username": test_admin["username"],
+            "password": test_admin["password"],
+        },
+    )
+
+
+@pytest.fixture
+def export_service(app, tmp_path, monkeypatch):
+    service = app.extensions["task_export_service"]
+    monkeypatch.setattr(service, "export_dir", tmp_path / "exports")
+    monkeypatch.setattr(service, "rows_per_chunk", 2)
+    return service
+
+
+def create_tasks(client, count):
+    for i in range(count):
+        client.post(
+            "/task",
+            data={
+                "title": f"Background {i}",
+                "description": "desc, with comma",
+                "due_date": str(date.today()),
+                "status": "To Do",
+            },
+        )
+
+
+def test_export_job_produces_download(client, app, test_admin, export_service):
+    """Test that an export job reports progress and its file matches the streamed export."""
+    login(client, test_admin)
+    create_tasks(client, 5)
+
+    data = client.post("/task/export/jobs").get_json()
+    assert data["status"] == 202
+    status_url = data["data"]["status_url"]
+    queued = client.get(status_url).get_json()["data"]
+    assert queued["status"] == "queued"
+    assert queued["download_url"] is None
+
+    job_service = app.extensions["job_service"]
+    job = job_service.run_next("test-worker")
+    assert job.kind == export_service.job_kind
+
+    done = client.get(status_url).get_json()["data"]
+    assert done["status"] == "succeeded"
+    assert done["progress"] == 1
+    assert done["rows"] == 5
+
+    resp = client.get(done["download_url"])
+    assert resp.status_code == 200
+    assert resp.mimetype == "application/gzip"
+    assert "Content-Encoding" not in resp.headers
+    streamed = client.get("/task/export").get_data()
+    assert gzip.decompress(resp.get_data()) == streamed
+    resp.close()
+
+    # the cleanup of the file was scheduled for its expiry
+    assert job_service.run_next("test-worker") is None
+
+
+def test_export_job_expires(client, app, test_admin, export_service):
+    """Test that expired exports cannot be downloaded and are removed by the cleanup."""
+    login(client, test_admin)
+    create_tasks(client, 1)
+    export_service.artifact_ttl = 0
+
+    job_id = client.post("/task/export/jobs").get_json()["data"]["job_id"]
+    job_service = app.extensions["job_service"]
+    job_service.run_next("test-worker")
+
+    status = client.get(f"/task/export/jobs/{job_id}").get_json()["data"]
+    assert status["status"] == "succeeded"
+    assert status["download_url"] is None
+    resp = client.get(f"/task/export/jobs/{job_id}/download")
+    assert resp.status_code == 404
+
+    assert len(list(export_service.export_dir.iterdir())) == 1
+    cleanup = job_service.run_next("test-worker")
+    assert cleanup.kind == export_service.cleanup_job_kind
+    assert list(export_service.export_dir.iterdir()) == []
+
+
+def test_export_job_of_unknown_id(client, test_admin, export_service):
+    """Test that unknown export jobs are reported as not found."""
+    login(client, test_admin)
+    data = client.get("/task/export/jobs/999").get_json()
+    assert data["status"] == 404
+    assert client.get("/task/export/jobs/999/download").status_code == 404
+
+
+def test_sql_snapshot_ignores_concurrent_writes(tmp_path):
+    """Test that reads inside a snapshot do not see writes committed by other connections."""
+    from src.config import TestConfig
+    from src.infra.db import init_db
+    from src.infra.repositories.sql_task_repository import SQLTaskRepository
+    from src.web.app import create_app
+
+    class FileConfig(TestConfig):
+        DATABASE = str(tmp_path / "snapshot.db")
+
+    app = create_app(FileConfig)
+    with app.app_context():
+        init_db()
+        conn = app.extensions["task_repo"]._get_connection()
+        conn.execute(
+            "INSERT INTO users (username, email, pw_hash) VALUES ('u', 'u@u.u', 'x')"
+        )
+        conn.commit()
+        repo = SQLTaskRepository()
+        repo.create("First", "", "2030-01-01", "To Do", 1)
+
+        other = sqlite3.connect(FileConfig.DATABASE)
+        with repo.snapshot():
+            assert len(repo.list_by_user(1)) == 1
+            other.execute(
+                "INSERT INTO tasks (user_id, title, due_date, status) "
+                "VALUES (1, 'Second', '2030-01-02', 'To Do')"
+            )
+            other.commit()
+            assert len(repo.list_by_user(1)) == 1
+        other.close()
+        assert len(repo.list_by_user(1)) == 2
@@ -0,0 +1,240 @@
+from src.config import TestConfig
+from src.core.errors import InfrastructureError, ValidationError
+from src.core.result import Result
+from src.infra.repositories.sql_job_queue import SQLJobQueue
+from src.services.job_service import JobService
+
+import pytest
+
+
+class Clock:
+    def __init__(self, now: float = 1000.0):
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock():
+    return Clock()
+
+
+@pytest.fixture
+def job_queue(db, clock):
+    return SQLJobQueue(clock=clock)
+
+
+def test_claim_and_complete(job_queue):
+    """Test that a job is claimed by one worker only and completed with its result."""
+    queued = job_queue.enqueue("noop", {"n": 1})
+    assert queued.status == "queued"
+    assert queued.payload == {"n": 1}
+
+    job = job_queue.claim("w1")
+    assert job.id == queued.id
+    assert job.status == "running"
+    assert job.attempts == 1
+    assert job_queue.claim("w2") is None
+
+    assert job_queue.extend_lease(job.id, "w1", progress=0.5)
+    assert not job_queue.extend_lease(job.id, "w2", progress=0.9)
+    assert job_queue.get(job.id).progress == 0.5
+
+    assert job_queue.complete(job.id, "w1", {"done": True})
+    finished = job_queue.get(job.id)
+    assert finished.status == "succeeded"
+    assert finished.is_finished
+    assert finished.result == {"done": True}
+    assert finished.progress == 1
+
+
+def test_delayed_job_is_not_claimed_early(job_queue, clock):
+    """Test that a job only becomes claimable once its delay has passed."""
+    job_queue.enqueue("noop", {}, delay=30)
+    assert job_queue.claim("w1") is None
+    clock.now += 30
+    assert job_queue.claim("w1") is not None
+
+
+def test_failed_job_is_retried_with_backoff(job_queue, clock):
+    """Test that failures are retried after an exponential backoff until attempts run out."""
+    queued = job_queue.enqueue("flaky", {}, max_attempts=2)
+
+    job = job_queue.claim("w1")
+    assert job_queue.fail(job.id, "w1", "boom")
+    retried = job_queue.get(job.id)
+    assert retried.status == "queued"
+    assert retried.error == "boom"
+    assert job_queue.claim("w1") is None
+
+    clock.now += job_queue.backoff_base_seconds
+    job = job_queue.claim("w1")
+    assert job.attempts == 2
+    assert job_queue.fail(job.id, "w1", "boom again")
+    assert job_queue.get(queued.id).status == "failed"
+
+    clock.now += job_queue.backoff_max_seconds
+    assert job_queue.claim("w1") is None
+
+
+def test_fail_without_retry_is_final(job_queue):
+    """Test that a non-retryable failure fails the job on its first attempt."""
+    job_queue.enqueue("bad", {})
+    job = job_queue.claim("w1")
+    assert job_queue.fail(job.id, "w1", "invalid", retry=False)
+    assert job_queue.get(job.id).status == "failed"
+
+
+def test_expired_lease_is_reclaimed(job_queue, clock):
+    """Test that a job whose worker stopped renewing its lease moves to another worker."""
+    job_queue.enqueue("slow", {}, max_attempts=2)
+    job = job_queue.claim("w1", lease_seconds=10)
+
+    clock.now += 10
+    reclaimed = job_queue.claim("w2", lease_seconds=10)
+    assert reclaimed.id == job.id
+    assert reclaimed.attempts == 2
+    # the first worker lost the job, its result is discarded
+    assert not job_queue.complete(job.id, "w1", {"stale": True})
+
+    clock.now += 10
+    assert job_queue.claim("w3") is None
+    expired = job_queue.get(job.id)
+    assert expired.status == "failed"
+    assert expired.error == "Lease expired"
+
+
+def test_purge_finished(job_queue, clock):
+    """Test that only jobs finished before the cut-off are purged."""
+    job_queue.enqueue("noop", {})
+    job = job_queue.claim("w1")
+    job_queue.complete(job.id, "w1")
+    pending = job_queue.enqueue("noop", {})
+
+    assert job_queue.purge_finished(clock.now) == 0
+    assert job_queue.purge_finished(clock.now + 1) == 1
+    assert job_queue.get(job.id) is None
+    assert job_queue.get(pending.id) is not None
+
+
+def test_job_service_runs_handlers(job_queue):
+    """Test that JobService reports progress, records results and retries only infrastructure errors."""
+    service = JobService(job_queue)
+    progress = []
+
+    def count(job, context):
+        for i in range(job.payload["n"]):
+            context.report_progress(i + 1, job.payload["n"])
+            progress.append(context.job.progress)
+        return Result.Ok({"counted": job.payload["n"]})
+
+    def invalid(job, context):
+        return Result.Err(ValidationError("bad payload"))
+
+    def unavailable(job, context):
+        return Result.Err(InfrastructureError("disk full"))
+
+    def crash(job, context):
+        raise RuntimeError("crash")
+
+    service.register("count", count)
+    service.register("invalid", invalid)
+    service.register("unavailable", unavailable)
+    service.register("crash", crash)
+    assert service.enqueue("missing", {}).is_err
+
+    count_job = service.enqueue("count", {"n": 4}, user_id=1).unwrap()
+    invalid_job = service.enqueue("invalid", {}).unwrap()
+    unavailable_job = service.enqueue("unavailable", {}).unwrap()
+    crash_job = service.enqueue("crash", {}).unwrap()
+    while service.run_next("w1") is not None:
+        pass
+
+    assert progress == [0.25, 0.5, 0.75, 1.0]
+    assert service.get_job(count_job.id, user_id=1).result == {"counted": 4}
+    assert service.get_job(count_job.id, user_id=2) is None
+    assert job_queue.get(invalid_job.id).status == "failed"
+    assert job_queue.get(unavailable_job.id).status == "queued"
+    crashed = job_queue.get(crash_job.id)
+    assert crashed.status == "queued"
+    assert crashed.error == "RuntimeError: crash"
+
+
+@pytest.fixture
+def file_app(tmp_path):
+    """An app with a database file, so worker app contexts and processes share its data."""
+    from src.infra.db import init_db
+    from src.web.app import create_app
+
+    class FileConfig(TestConfig):
+        DATABASE = str(tmp_path / "jobs.db")
+        JOB_POLL_INTERVAL = 0.05
+
+    app = create_app(FileConfig)
+    # pytest-flask keeps the session app's context pushed, CLI commands would
+    # run against it without a context of their own
+    with app.app_context():
+        init_db()
+        yield app
+
+
+def test_worker_command_runs_queued_jobs(file_app):
+    """Test that `flask enqueue-job` and `flask worker --burst` run a job to completion."""
+    runner = file_app.test_cli_runner()
+    result = runner.invoke(args=["enqueue-job", "compact_task_changes"])
+    assert result.exit_code == 0, result.output
+    assert runner.invoke(args=["enqueue-job", "missing"]).exit_code != 0
+
+    result = runner.invoke(args=["worker", "--burst"])
+    assert result.exit_code == 0, result.output
+
+    with file_app.app_context():
+        job = file_app.extensions["job_service"].get_job(1)
+    assert job.status == "succeeded"
+    assert job.result == {"removed": 0}
+
+
+def test_worker_survives_queue_errors(file_app, monkeypatch):
+    """Test that a failing claim is logged and retried instead of ending the worker."""
+    import sqlite3
+    import threading
+
+    from src.web.worker import run_worker
+
+    job_service = file_app.extensions["job_service"]
+    with file_app.app_context():
+        job = job_service.enqueue("compact_task_changes", {}).unwrap()
+    run_next = job_service.run_next
+    errors = [sqlite3.OperationalError("database is locked")]
+
+    def flaky(worker_id):
+        if errors:
+            raise errors.pop()
+        return run_next(worker_id)
+
+    monkeypatch.setattr(job_service, "run_next", flaky)
+    assert run_worker(file_app, threading.Event(), burst=True) == 1
+    with file_app.app_context():
+        assert job_service.get_job(job.id).status == "succeeded"
+
+
+@pytest.mark.slow
+def test_worker_processes_share_the_queue(file_app):
+    """Test that several worker processes drain the queue without running a job twice."""
+    job_service = file_app.extensions["job_service"]
+    with file_app.app_context():
+        ids = [
+            job_service.enqueue("compact_task_changes", {}).unwrap().id
+            for _ in range(6)
+        ]
+
+    result = file_app.test_cli_runner().invoke(
+        args=["worker", "--processes", "2", "--burst"]
+    )
+    assert result.exit_code == 0, result.output
+
+    with file_app.app_context():
+        jobs = [job_service.get_job(job_id) for job_id in ids]
+    assert all(job.status == "succeeded" for job in jobs)
+    assert all(job.attempts == 1 for job in jobs)
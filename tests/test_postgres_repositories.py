@@ -0,0 +1,159 @@
+from datetime import date
+
+import os
+import uuid
+
+import pytest
+
+from src.config import TestConfig
+from src.infra.migrations import MIGRATIONS
+from src.infra.postgres_migrations import POSTGRES_MIGRATIONS
+
+TODAY = str(date.today())
+
+
+@pytest.fixture
+def pg_app():
+    """An app on Postgres, in a schema of its own that is dropped afterwards.
+
+    Needs psycopg and a throwaway database in `TEST_POSTGRES_DSN`, e.g.
+    `postgresql://postgres@localhost/itol_test`.
+    """
+    psycopg = pytest.importorskip("psycopg")
+    pytest.importorskip("psycopg_pool")
+    dsn = os.environ.get("TEST_POSTGRES_DSN")
+    if not dsn:
+        pytest.skip("TEST_POSTGRES_DSN is not set")
+    from psycopg.conninfo import make_conninfo
+
+    from src.infra.postgres import init_postgres_db
+    from src.web.app import create_app
+
+    schema = f"test_{uuid.uuid4().hex}"
+    with psycopg.connect(dsn, autocommit=True) as conn:
+        conn.execute(f"CREATE SCHEMA {schema}")
+
+    class PostgresConfig(TestConfig):
+        USER_REPOSITORY = "postgres"
+        TASK_REPOSITORY = "postgres"
+        POSTGRES_DSN = make_conninfo(dsn, options=f"-c search_path={schema}")
+        POSTGRES_POOL_MIN_SIZE = 1
+        POSTGRES_POOL_MAX_SIZE = 4
+
+    app = create_app(PostgresConfig)
+    try:
+        with app.app_context():
+            assert init_postgres_db() == len(POSTGRES_MIGRATIONS)
+            # re-running applies nothing
+            assert init_postgres_db() == len(POSTGRES_MIGRATIONS)
+            yield app
+    finally:
+        pool = app.extensions.get("pg_pool")
+        if pool is not None:
+            pool[1].close()
+        with psycopg.connect(dsn, autocommit=True) as conn:
+            conn.execute(f"DROP SCHEMA {schema} CASCADE")
+
+
+def test_postgres_migrations_mirror_sqlite():
+    """Test that both backends have the same migrations, so they share schema versions."""
+    assert len(POSTGRES_MIGRATIONS) == len(MIGRATIONS)
+
+
+def test_tasks_must_be_stored_with_their_users():
+    """Test that Postgres tasks with SQLite users are rejected when the app is created."""
+    from src.web.app import create_app
+
+    class MixedConfig(TestConfig):
+        TASK_REPOSITORY = "postgres"
+
+    with pytest.raises(ValueError, match="USER_REPOSITORY"):
+        create_app(MixedConfig)
+
+
+def test_postgres_repositories(pg_app):
+    """Test that users, tasks, statistics, the change feed and streaming work on Postgres."""
+    user_repo = pg_app.extensions["user_repo"]
+    task_repo = pg_app.extensions["task_repo"]
+    admin = user_repo.register("admin", "admin@example.com", "password123")
+    assert admin.unwrap().is_admin
+    user = user_repo.register("bob", "bob@example.com", "password123").unwrap()
+    assert not user.is_admin
+    assert user_repo.register("bob", "b@example.com", "password123").is_err
+    auth = user_repo.load_for_auth("bob@example.com")
+    assert user_repo.verify_password(auth, "password123")
+    assert [u.username for u in user_repo.iter_all(batch_size=1)] == [
+        "admin",
+        "bob",
+    ]
+
+    created = [
+        task_repo.create(
+            f"Task {i}", "x" * 150, TODAY, "To Do", user.id
+        ).unwrap()
+        for i in range(3)
+    ]
+    assert created[0].due_date == TODAY
+    assert task_repo.get_stats(user.id, date.today()).todo == 3
+    assert task_repo.get_stats(user.id, date.today()).due_this_week == 3
+    updated = task_repo.update(
+        created[0].id, "Done", "", TODAY, "Completed", user.id
+    ).unwrap()
+    assert updated.version == 2
+    assert task_repo.get_stats(user.id, date.today()).completed == 1
+    assert task_repo.search(user.id, title="task 1")[0].id == created[1].id
+    summaries = task_repo.search_summaries(user.id, open_only=True)
+    assert [s.truncated for s in summaries] == [True, True]
+    assert task_repo.update(999, "X", "", TODAY, "To Do", user.id).is_err
+
+    with task_repo.snapshot():
+        streamed = list(task_repo.iter_by_user(user.id, batch_size=2))
+    assert [t.id for t in streamed] == [t.id for t in created]
+    assert len(list(task_repo.iter_all(batch_size=1))) == 3
+
+    _, head = task_repo.change_feed_bounds(user.id)
+    assert task_repo.delete(created[1].id) is None
+    assert task_repo.delete(created[1].id) is not None
+    changes = task_repo.changes_since(user.id, head)
+    assert [(c.task_id, c.op) for c in changes] == [(created[1].id, "delete")]
+    assert task_repo.deleted_since(user.id, TODAY)[0][0] == created[1].id
+    assert task_repo.compact_changes(task_repo.change_feed_bounds()[1]) > 0
+    assert task_repo.compacted_at() is not None
+    task_repo.rebuild_stats()
+    assert task_repo.get_stats(user.id, date.today()).todo == 1
+
+    job_service = pg_app.extensions["job_service"]
+    job = job_service.enqueue("compact_task_changes", {"retain": 0}).unwrap()
+    assert job_service.run_next("test-worker").id == job.id
+    assert job_service.get_job(job.id).status == "succeeded"
+
+    assert user_repo.delete("bob") is None
+    assert task_repo.list_by_user(user.id) == []
+
+
+def test_read_only_requests_deny_writes(pg_app):
+    """Test that writes in requests routed with `read_only` are rejected."""
+    from src.core.errors import ReadOnlyWriteError
+    from src.infra.db import read_only
+    from src.infra.postgres import get_pg_connection
+
+    user = (
+        pg_app.extensions["user_repo"]
+        .register("reader", "reader@example.com", "password123")
+        .unwrap()
+    )
+    task_repo = pg_app.extensions["task_repo"]
+
+    @read_only
+    def view():
+        with pytest.raises(ReadOnlyWriteError):
+            task_repo.create("Denied", "", TODAY, "To Do", user.id)
+        return (
+            get_pg_connection()
+            .execute("SHOW default_transaction_read_only")
+            .fetchone()[0]
+        )
+
+    with pg_app.test_request_context():
+        assert view() == "on"
+    assert task_repo.create("Allowed", "", TODAY, "To Do", user.id).is_ok
@@ -0,0 +1,106 @@
+from datetime import date
+
+import sqlite3
+
+import pytest
+
+from src.config import TestConfig
+from src.core.errors import DatabaseBusyError, ReadOnlyWriteError
+from src.infra.db import get_connection, get_read_pool, read_only
+
+
+@pytest.fixture
+def file_app(tmp_path):
+    """An app with a database file, so reads go through the read-only pool."""
+    from src.infra.db import init_db
+    from src.web.app import create_app
+
+    class FileConfig(TestConfig):
+        DATABASE = str(tmp_path / "reads.db")
+        READ_POOL_SIZE = 2
+        READ_POOL_TIMEOUT = 0.01
+
+    app = create_app(FileConfig)
+    with app.app_context():
+        init_db()
+        conn = get_connection()
+        conn.execute(
+            "INSERT INTO users (username, email, pw_hash) VALUES ('u', 'u@u.u', 'x')"
+        )
+        conn.commit()
+    return app
+
+
+def test_read_only_requests_use_pooled_connections(file_app):
+    """Test that routed requests read committed data on read-only connections and writes are denied."""
+    task_repo = file_app.extensions["task_repo"]
+    with file_app.app_context():
+        task_repo.create("Written", "", str(date.today()), "To Do", 1)
+
+    @read_only
+    def view():
+        conn = get_connection()
+        assert conn.execute("PRAGMA query_only").fetchone()[0] == 1
+        assert [task.title for task in task_repo.list_by_user(1)] == [
+            "Written"
+        ]
+        with pytest.raises(sqlite3.DatabaseError):
+            conn.execute("DELETE FROM tasks")
+        with pytest.raises(ReadOnlyWriteError):
+            task_repo.create("Denied", "", str(date.today()), "To Do", 1)
+        return conn
+
+    with file_app.test_request_context():
+        conn = view()
+        assert get_connection() is conn
+    with file_app.test_request_context():
+        # the connection went back to the pool and is reused
+        assert view() is conn
+        assert get_connection() is conn
+
+    with file_app.test_request_context():
+        pool = get_read_pool()
+        assert get_connection() is not conn
+        held = [pool.acquire(), pool.acquire()]
+        with pytest.raises(DatabaseBusyError):
+            view()
+        for other in held:
+            pool.release(other)
+    assert (
+        file_app.extensions["write_metrics"].snapshot()["read_only_writes"]
+        == 4
+    )
+
+
+def test_read_only_routes_with_in_memory_database(client, app, test_admin):
+    """Test that routed GET requests deny writes on a shared connection and later writes work."""
+    client.post(
+        "/login",
+        data={
+            "username": test_admin["username"],
+            "password": test_admin["password"],
+        },
+    )
+    assert client.get("/dashboard").status_code == 200
+    resp = client.post(
+        "/task",
+        data={
+            "title": "After a read",
+            "description": "",
+            "due_date": str(date.today()),
+            "status": "To Do",
+        },
+    )
+    assert resp.get_json()["status"] == 201
+    resp = client.get("/task/export")
+    assert b"After a read" in resp.get_data()
+    resp.close()
+
+    @read_only
+    def view():
+        with pytest.raises(sqlite3.DatabaseError):
+            get_connection().execute("DELETE FROM tasks")
+
+    with app.test_request_context():
+        view()
+    assert get_connection().execute("SELECT COUNT(*) FROM tasks").fetchone()[0]
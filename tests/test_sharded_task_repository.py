@@ -0,0 +1,243 @@
+from datetime import date
+
+import threading
+import time
+
+import pytest
+
+from src.config import TestConfig
+from src.infra.repositories.sharded_task_repository import (
+    SHARD_ID_SPAN,
+    shard_of_user,
+)
+
+TODAY = str(date.today())
+
+
+def create_app_with_shards(tmp_path, shards):
+    from src.web.app import create_app
+
+    class ShardedConfig(TestConfig):
+        DATABASE = str(tmp_path / "app.db")
+        TASK_REPOSITORY = "sharded"
+        TASK_SHARDS = shards
+        TASK_SHARD_DIR = str(tmp_path / "shards")
+
+    return create_app(ShardedConfig)
+
+
+def create_users(conn, count):
+    for number in range(1, count + 1):
+        conn.execute(
+            "INSERT INTO users (id, username, email, pw_hash) VALUES (?, ?, ?, 'x')",
+            (number, f"user{number}", f"user{number}@example.com"),
+        )
+    conn.commit()
+    return list(range(1, count + 1))
+
+
+@pytest.fixture
+def sharded_app(tmp_path):
+    from src.infra.db import get_connection, init_db
+
+    app = create_app_with_shards(tmp_path, 3)
+    with app.app_context():
+        init_db()
+        app.extensions["task_repo"].init_shards()
+        create_users(get_connection(), 6)
+        yield app
+
+
+def test_tasks_are_routed_to_the_users_shard(sharded_app):
+    """Test that every user's tasks live in the shard of their hash and all operations find them."""
+    repo = sharded_app.extensions["task_repo"]
+    assert repo.list_by_user(1) == []
+    assert repo.get_stats(1, date.today()).todo == 0
+
+    tasks = {}
+    for user_id in range(1, 7):
+        tasks[user_id] = [
+            repo.create(f"Task {i}", "", TODAY, "To Do", user_id).unwrap()
+            for i in range(2)
+        ]
+    for user_id, created in tasks.items():
+        index = shard_of_user(user_id, 3)
+        shard = repo.shard(index)
+        assert {t.id for t in shard.list_by_user(user_id)} == {
+            t.id for t in created
+        }
+        assert all((index + 1) * SHARD_ID_SPAN < t.id for t in created)
+        assert repo.get_by_id(created[0].id).title == "Task 0"
+        assert repo.get_stats(user_id, date.today()).todo == 2
+        assert [c.task_id for c in repo.changes_since(user_id, 0)] == [
+            t.id for t in created
+        ]
+    assert len(repo.list_all()) == len(list(repo.iter_all())) == 12
+
+    task = tasks[1][0]
+    updated = repo.update(task.id, "Done", "", TODAY, "Completed", 1)
+    assert updated.unwrap().version == 2
+    assert repo.search(1, status="Completed")[0].id == task.id
+    assert repo.update(task.id, "X", "", TODAY, "To Do", 2).is_err
+    assert repo.delete(task.id) is None
+    assert repo.get_by_id(task.id) is None
+    assert repo.delete(task.id) is not None
+
+    _, head = repo.change_feed_bounds(1)
+    assert repo.changes_since(1, head) == []
+    assert repo.change_feed_bounds()[1] >= head
+    with repo.snapshot():
+        assert len(repo.list_summaries_by_user(2)) == 2
+
+
+def test_rebalance_moves_users_to_added_shards(tmp_path):
+    """Test that rebalancing keeps tasks, IDs, statistics and sync cursors of moved users."""
+    from src.infra.db import get_connection, init_db
+
+    app = create_app_with_shards(tmp_path, 2)
+    with app.app_context():
+        init_db()
+        main = get_connection()
+        user_ids = create_users(main, 6)
+        # a task from before sharding, in the main database
+        main.execute(
+            "INSERT INTO tasks (user_id, title, due_date, status, created_at, updated_at) "
+            "VALUES (1, 'Legacy', ?, 'To Do', '2030-01-01', '2030-01-01')",
+            (TODAY,),
+        )
+        main.commit()
+        repo = app.extensions["task_repo"]
+        repo.init_shards()
+        tasks = {
+            user_id: repo.create("Task", "", TODAY, "To Do", user_id).unwrap()
+            for user_id in user_ids
+        }
+        gone = repo.create("Gone", "", TODAY, "To Do", 2).unwrap()
+        repo.delete(gone.id)
+        cursors = {u: repo.change_feed_bounds(u)[1] for u in user_ids}
+
+    app = create_app_with_shards(tmp_path, 3)
+    with app.app_context():
+        result = app.test_cli_runner().invoke(args=["rebalance-task-shards"])
+    assert result.exit_code == 0, result.output
+    moving = [
+        u for u in user_ids if shard_of_user(u, 2) != shard_of_user(u, 3)
+    ]
+    assert moving
+    assert (
+        f"Moved {len(moving) + 1} users across 3 shards, "
+        "removed leftover tasks of 0 users." in result.output
+    )
+
+    with app.app_context():
+        repo = app.extensions["task_repo"]
+        assert get_connection().execute("SELECT * FROM tasks").fetchall() == []
+        for user_id, task in tasks.items():
+            index = shard_of_user(user_id, 3)
+            assert repo.shard(index).get_by_id(task.id) is not None
+            assert repo.get_by_id(task.id).version == task.version
+            titles = {t.title for t in repo.list_by_user(user_id)}
+            assert titles == ({"Task", "Legacy"} if user_id == 1 else {"Task"})
+            assert repo.get_stats(user_id, date.today()).todo == len(titles)
+            # the changes after a cursor of the old shard include the move
+            changes = repo.changes_since(user_id, cursors[user_id])
+            if user_id in moving:
+                assert task.id in {c.task_id for c in changes}
+        changes = repo.changes_since(2, cursors[2] - 2)
+        assert (gone.id, "delete") in {(c.task_id, c.op) for c in changes}
+
+        # a copy in the wrong shard, e.g. of an interrupted move
+        stale = repo.shard((shard_of_user(3, 3) + 1) % 3)
+        stale._get_connection().execute(
+            "INSERT INTO tasks (user_id, title, due_date, status) "
+            "VALUES (3, 'Stale', ?, 'To Do')",
+            (TODAY,),
+        )
+        stale._get_connection().commit()
+        assert repo.rebalance() == {"moved": 0, "purged": 1}
+        assert stale.list_by_user(3) == []
+
+
+def test_compaction_retains_entries_per_shard(sharded_app):
+    """Test that each shard keeps the tombstones of its own last entries, whatever the other heads."""
+    repo = sharded_app.extensions["task_repo"]
+    first = 1
+    second = next(
+        user_id
+        for user_id in range(2, 7)
+        if shard_of_user(user_id, 3) != shard_of_user(first, 3)
+    )
+    deleted = {}
+    for user_id, count in ((first, 2), (second, 12)):
+        created = [
+            repo.create(f"Task {i}", "", TODAY, "To Do", user_id).unwrap()
+            for i in range(count)
+        ]
+        for task in created:
+            assert repo.delete(task.id) is None
+        deleted[user_id] = created[-1].id
+    busy_head = repo.change_feed_bounds(second)[1]
+    assert repo.change_feed_bounds(first)[1] < busy_head - 1
+
+    assert repo.compact_changes_retaining(1) > 0
+    for user_id, task_id in deleted.items():
+        changes = repo.changes_since(user_id, 0)
+        assert [(c.task_id, c.op) for c in changes] == [(task_id, "delete")]
+
+
+def test_writes_waiting_on_a_moving_user_follow_the_move(
+    tmp_path, monkeypatch
+):
+    """Test that writes which picked the source shard before a move are retried on the target."""
+    from src.infra.db import get_connection, init_db
+    from src.infra.repositories import sharded_task_repository
+
+    app = create_app_with_shards(tmp_path, 2)
+    with app.app_context():
+        init_db()
+        create_users(get_connection(), 6)
+        repo = app.extensions["task_repo"]
+        repo.init_shards()
+        user_id = next(
+            u
+            for u in range(1, 7)
+            if shard_of_user(u, 2) != shard_of_user(u, 3)
+        )
+        task = repo.create("Before", "", TODAY, "To Do", user_id).unwrap()
+
+    app = create_app_with_shards(tmp_path, 3)
+    repo = app.extensions["task_repo"]
+    writes = {}
+
+    def write():
+        with app.app_context():
+            writes["created"] = repo.create(
+                "During", "", TODAY, "To Do", user_id
+            ).unwrap()
+            writes["updated"] = repo.update(
+                task.id, "Edited", "", TODAY, "Completed", user_id
+            ).unwrap()
+
+    set_shard = sharded_task_repository._set_shard
+
+    def set_shard_with_writer(conn, moved_user_id, index):
+        # the writer resolves the source shard, then waits on its lock
+        writer = threading.Thread(target=write)
+        writer.start()
+        time.sleep(0.2)
+        writes["writer"] = writer
+        return set_shard(conn, moved_user_id, index)
+
+    monkeypatch.setattr(
+        sharded_task_repository, "_set_shard", set_shard_with_writer
+    )
+    with app.app_context():
+        assert repo.rebalance()["moved"] == 1
+        writes["writer"].join(5)
+        assert not writes["writer"].is_alive()
+        monkeypatch.setattr(sharded_task_repository, "_set_shard", set_shard)
+        assert repo.rebalance() == {"moved": 0, "purged": 0}
+        titles = {t.title for t in repo.list_by_user(user_id)}
+        assert titles == {"Edited", "During"}
+        assert repo.get_by_id(writes["created"].id).title == "During"
+        assert repo.get_by_id(task.id).version == 2
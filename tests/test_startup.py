@@ -0,0 +1,82 @@
+from pathlib import Path
+
+import json
+import subprocess
+import sys
+
+import pytest
+
+BENCHMARK = Path(__file__).parent.parent / "benchmarks" / "bench_startup.py"
+
+
+@pytest.mark.slow
+def test_cold_start_within_budget():
+    """Test that a fresh interpreter imports the app and serves a first response within budget."""
+    result = subprocess.run(
+        [sys.executable, str(BENCHMARK), "--runs", "3", "--json"],
+        capture_output=True,
+        text=True,
+    )
+    timings = json.loads(result.stdout)
+    assert result.returncode == 0, timings
+    assert timings["over_budget"] is False
+
+
+def test_app_import_defers_optional_modules():
+    """Test that importing the app module does not load repositories, services or orjson."""
+    code = (
+        "import sys; import src.web.app; "
+        "print(sorted(m for m in sys.modules if m.startswith("
+        "('src.infra.repositories', 'src.services', 'orjson'))))"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", code],
+        cwd=Path(__file__).parent.parent,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    assert result.stdout.strip() == "[]"
+
+
+def _file_config(tmp_path):
+    from src.config import TestConfig
+
+    return type(
+        "FileConfig",
+        (TestConfig,),
+        {"DATABASE": str(tmp_path / "app.db"), "PRECOMPILE_TEMPLATES": False},
+    )
+
+
+def test_warm_up_applies_pending_migrations(tmp_path):
+    """Test that serving a database initialized by an older release migrates it first."""
+    from src.infra.db import get_connection, init_db
+    from src.infra.migrations import MIGRATIONS
+    from src.web.app import create_app, warm_up
+
+    app = create_app(_file_config(tmp_path))
+    with app.app_context():
+        init_db()
+        conn = get_connection()
+        conn.execute("DROP TABLE task_shard_directory")
+        conn.execute(f"PRAGMA user_version = {len(MIGRATIONS) - 1}")
+        conn.commit()
+
+    warm_up(app)
+    with app.app_context():
+        conn = get_connection()
+        assert conn.execute("PRAGMA user_version").fetchone()[0] == len(
+            MIGRATIONS
+        )
+        conn.execute("SELECT * FROM task_shard_directory")
+
+
+def test_warm_up_refuses_uninitialized_database(tmp_path):
+    """Test that serving a database without tables fails with a hint to run init-db."""
+    from src.core.errors import DatabaseNotInitializedError
+    from src.web.app import create_app, warm_up
+
+    app = create_app(_file_config(tmp_path))
+    with pytest.raises(DatabaseNotInitializedError, match="init-db"):
+        warm_up(app)
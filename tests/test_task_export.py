@@ -0,0 +1,42 @@
+from datetime import date
+
+import csv
+import io
+
+
+def login(client, test_admin):
+    return client.post(
+        "/login",
+        data={
+            "username": test_admin["username"],
+            "password": test_admin["password"],
+        },
+    )
+
+
+def test_export_streams_csv(client, app, test_admin, monkeypatch):
+    """Test that /task/export streams every task as CSV in several chunks."""
+    login(client, test_admin)
+    for i in range(5):
+        client.post(
+            "/task",
+            data={
+                "title": f"Export {i}",
+                "description": "desc, with comma",
+                "due_date": str(date.today()),
+                "status": "To Do",
+            },
+        )
+
+    export_service = app.extensions["task_export_service"]
+    monkeypatch.setattr(export_service, "rows_per_chunk", 2)
+    resp = client.get("/task/export")
+    assert resp.is_streamed
+    assert resp.mimetype == "text/csv"
+    body = resp.get_data(as_text=True)
+
+    rows = list(csv.reader(io.StringIO(body)))
+    assert rows[0] == ["id", "title", "description", "due_date", "status"]
+    titles = [row[1] for row in rows[1:]]
+    assert titles == [f"Export {i}" for i in range(5)]
+    assert all(row[2] == "desc, with comma" for row in rows[1:])
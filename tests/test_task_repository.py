@@ -1,19 +1,27 @@
 from datetime import date
 
-from src.core.errors import ValidationError
-from src.core.task import Task
+import time
+
+from src.core.errors import (
+    TaskIdRangeExhaustedError,
+    TaskNotFoundError,
+    ValidationError,
+)
+from src.core.task import Task, TaskSummary
+from src.core.timestamp import now_timestamp
+from src.infra.repositories.in_memory_task import InMemoryTaskRepository
 from src.infra.repositories.sql_task_repository import SQLTaskRepository
 from src.infra.repositories.sql_user_repository import SQLUserRepository
 
 
-# SQL Task Repository Tests
-def test_create_and_get_task(db, bcrypt, test_admin):
+# Task Repository Tests, run against every implementation via `task_repo`
+def test_create_and_get_task(db, bcrypt, test_admin, task_repo):
     """Test creating a valid task."""
     user_repo = SQLUserRepository(bcrypt=bcrypt)
     user = user_repo.find_by_username(test_admin["username"])
     assert user is not None
 
-    repo = SQLTaskRepository()
+    repo = task_repo
 
     title = "Test Task"
     description = "A description"
@@ -29,12 +37,12 @@ def test_create_and_get_task(db, bcrypt, test_admin):
     assert created.status == "To Do"
 
 
-def test_list_all_and_list_by_user(db, bcrypt, test_admin):
+def test_list_all_and_list_by_user(db, bcrypt, test_admin, task_repo):
     """Test listing tasks for user and all tasks."""
     user_repo = SQLUserRepository(bcrypt=bcrypt)
     user = user_repo.find_by_username(test_admin["username"])
     assert user is not None
-    repo = SQLTaskRepository()
+    repo = task_repo
 
     # Ensure repo is empty? In case test tasks are added as fixture at some point
     conn = db
@@ -56,12 +64,94 @@ def test_list_all_and_list_by_user(db, bcrypt, test_admin):
     assert t1.id in ids and t2.id in ids
 
 
-def test_update_task(db, bcrypt, test_admin):
+def test_rows_map_to_slotted_tasks(db, bcrypt, test_admin, task_repo):
+    """Rows are mapped positionally, so every field must land in the right attribute."""
+    user_repo = SQLUserRepository(bcrypt=bcrypt)
+    user = user_repo.find_by_username(test_admin["username"])
+    assert user is not None
+    repo = task_repo
+
+    due = str(date.today())
+    created = repo.create("Mapped", "Desc", due, "In Progress", user.id)
+    t = created.unwrap()
+
+    for fetched in (
+        repo.get_by_id(t.id),
+        next(x for x in repo.list_by_user(user.id) if x.id == t.id),
+        next(x for x in repo.search(user.id, title="Mapped")),
+    ):
+        assert fetched is not None
+        assert not hasattr(fetched, "__dict__")
+        assert fetched.id == t.id
+        assert fetched.title == "Mapped"
+        assert fetched.description == "Desc"
+        assert fetched.due_date == due
+        assert fetched.status == "In Progress"
+        assert fetched.user_id == user.id
+
+
+def test_search_summaries_skip_full_description(
+    db, bcrypt, test_admin, task_repo
+):
+    """Summaries carry a bounded description preview instead of the full text."""
+    user_repo = SQLUserRepository(bcrypt=bcrypt)
+    user = user_repo.find_by_username(test_admin["username"])
+    assert user is not None
+    repo = task_repo
+
+    long_desc = "y" * 300
+    t1 = repo.create("Long", long_desc, str(date.today()), "To Do", user.id)
+    t2 = repo.create("Short", "brief", str(date.today()), "To Do", user.id)
+    t1, t2 = t1.unwrap(), t2.unwrap()
+
+    summaries = {s.id: s for s in repo.search_summaries(user.id)}
+    assert all(isinstance(s, TaskSummary) for s in summaries.values())
+    assert not hasattr(summaries[t1.id], "description")
+
+    long_summary = summaries[t1.id]
+    assert long_summary.title == "Long"
+    assert long_summary.status == "To Do"
+    assert long_summary.user_id == user.id
+    assert len(long_summary.preview) == repo.summary_preview_length
+    assert long_summary.truncated is True
+
+    assert summaries[t2.id].preview == "brief"
+    assert summaries[t2.id].truncated is False
+
+    filtered = repo.search_summaries(user.id, description="brief")
+    assert [s.id for s in filtered] == [t2.id]
+
+    # the full task is still available on demand
+    full = repo.get_by_id(t1.id)
+    assert full is not None and full.description == long_desc
+
+
+def test_iter_all_and_iter_by_user(db, bcrypt, test_admin, task_repo):
+    """Iterators yield the same tasks as the list methods across batch boundaries."""
+    user_repo = SQLUserRepository(bcrypt=bcrypt)
+    user = user_repo.find_by_username(test_admin["username"])
+    assert user is not None
+    repo = task_repo
+
+    for i in range(5):
+        repo.create(f"It{i}", "", str(date.today()), "To Do", user.id)
+
+    listed = [t.id for t in repo.list_by_user(user.id)]
+    iterated = repo.iter_by_user(user.id, batch_size=2)
+    assert not isinstance(iterated, list)
+    assert [t.id for t in iterated] == listed
+
+    assert [t.id for t in repo.iter_all(batch_size=3)] == [
+        t.id for t in repo.list_all()
+    ]
+
+
+def test_update_task(db, bcrypt, test_admin, task_repo):
     """Test updating an existing task."""
     user_repo = SQLUserRepository(bcrypt=bcrypt)
     user = user_repo.find_by_username(test_admin["username"])
     assert user is not None
-    repo = SQLTaskRepository()
+    repo = task_repo
 
     t = repo.create(
         "Old", "Desc", str(date.today()), "To Do", user.id
@@ -83,12 +173,12 @@ def test_update_task(db, bcrypt, test_admin):
     assert updated.status == "Completed"
 
 
-def test_delete_task(db, bcrypt, test_admin):
+def test_delete_task(db, bcrypt, test_admin, task_repo):
     """Test deleting a task."""
     user_repo = SQLUserRepository(bcrypt=bcrypt)
     user = user_repo.find_by_username(test_admin["username"])
     assert user is not None
-    repo = SQLTaskRepository()
+    repo = task_repo
 
     t = repo.create("Tmp", "", str(date.today()), "To Do", user.id).unwrap()
 
@@ -97,12 +187,12 @@ def test_delete_task(db, bcrypt, test_admin):
     assert repo.get_by_id(t.id) is None
 
 
-def test_create_task_invalid_status(db, bcrypt, test_admin):
+def test_create_task_invalid_status(db, bcrypt, test_admin, task_repo):
     """Invalid status should raise ValidationError due to domain validation."""
     user_repo = SQLUserRepository(bcrypt=bcrypt)
     user = user_repo.find_by_username(test_admin["username"])
     assert user is not None
-    repo = SQLTaskRepository()
+    repo = task_repo
 
     result = repo.create("Bad", "", str(date.today()), "Not a Status", user.id)
     assert result.is_err
@@ -110,12 +200,12 @@ def test_create_task_invalid_status(db, bcrypt, test_admin):
     assert isinstance(err, ValidationError)
 
 
-def test_create_task_title_length(db, bcrypt, test_admin):
+def test_create_task_title_length(db, bcrypt, test_admin, task_repo):
     """Title longer than 100 chars should raise ValidationError due to domain validation."""
     user_repo = SQLUserRepository(bcrypt=bcrypt)
     user = user_repo.find_by_username(test_admin["username"])
     assert user is not None
-    repo = SQLTaskRepository()
+    repo = task_repo
 
     long_title = "x" * 101
     # long title via signature
@@ -125,12 +215,12 @@ def test_create_task_title_length(db, bcrypt, test_admin):
     assert isinstance(err, ValidationError)
 
 
-def test_create_task_description_length(db, bcrypt, test_admin):
+def test_create_task_description_length(db, bcrypt, test_admin, task_repo):
     """Description longer than 500 chars should raise ValidationError due to domain validation."""
     user_repo = SQLUserRepository(bcrypt=bcrypt)
     user = user_repo.find_by_username(test_admin["username"])
     assert user is not None
-    repo = SQLTaskRepository()
+    repo = task_repo
 
     long_desc = "x" * 501
 
@@ -142,6 +232,205 @@ def test_create_task_description_length(db, bcrypt, test_admin):
     assert isinstance(err, ValidationError)
 
 
+def test_search_is_case_insensitive(db, bcrypt, test_admin, task_repo):
+    """Title and description search match substrings regardless of case."""
+    user_repo = SQLUserRepository(bcrypt=bcrypt)
+    user = user_repo.find_by_username(test_admin["username"])
+    assert user is not None
+    repo = task_repo
+
+    t = repo.create(
+        "Buy Milk", "From the Store", str(date.today()), "To Do", user.id
+    ).unwrap()
+    repo.create("Other", "", str(date.today()), "To Do", user.id)
+
+    assert [x.id for x in repo.search(user.id, title="milk")] == [t.id]
+    assert [x.id for x in repo.search(user.id, description="STORE")] == [t.id]
+    assert repo.search(user.id, title="milk", description="nope") == []
+
+
+def test_stats_follow_writes(db, bcrypt, test_admin, task_repo):
+    """Status, overdue and due-this-week counts track create, update and delete."""
+    user_repo = SQLUserRepository(bcrypt=bcrypt)
+    user = user_repo.find_by_username(test_admin["username"])
+    assert user is not None
+    repo = task_repo
+
+    today = date(2025, 6, 11)  # a Wednesday, the week ends on 2025-06-15
+    overdue = repo.create("A", "", "2025-06-01", "To Do", user.id).unwrap()
+    this_week = repo.create("B", "", "2025-06-15", "In Progress", user.id)
+    repo.create("C", "", "2025-06-16", "To Do", user.id)
+    repo.create("D", "", "2025-06-02", "Completed", user.id)
+    this_week = this_week.unwrap()
+
+    stats = repo.get_stats(user.id, today)
+    assert (stats.todo, stats.in_progress, stats.completed) == (2, 1, 1)
+    assert stats.total == 4
+    assert stats.overdue == 1
+    assert stats.due_this_week == 1
+
+    repo.update(overdue.id, "A", "", "2025-06-12", "To Do", user.id).unwrap()
+    repo.update(
+        this_week.id, "B", "", "2025-06-15", "Completed", user.id
+    ).unwrap()
+    stats = repo.get_stats(user.id, today)
+    assert (stats.todo, stats.in_progress, stats.completed) == (2, 0, 2)
+    assert stats.overdue == 0
+    assert stats.due_this_week == 1
+
+    repo.delete(overdue.id)
+    stats = repo.get_stats(user.id, today)
+    assert stats.todo == 1
+    assert stats.due_this_week == 0
+
+    assert repo.get_stats(user.id + 1000, today).total == 0
+
+
+def test_rebuild_stats_recovers_from_drift(db, bcrypt, test_admin):
+    """rebuild_stats recomputes the materialized tables from the tasks table."""
+    user_repo = SQLUserRepository(bcrypt=bcrypt)
+    user = user_repo.find_by_username(test_admin["username"])
+    assert user is not None
+    repo = SQLTaskRepository()
+    today = date(2025, 6, 11)
+
+    repo.create("A", "", "2025-06-01", "To Do", user.id)
+    repo.create("B", "", "2025-06-13", "To Do", user.id)
+    db.execute("UPDATE task_stats SET todo = 42")
+    db.execute("DELETE FROM task_due_stats")
+    db.commit()
+    assert repo.get_stats(user.id, today).todo == 42
+
+    repo.rebuild_stats()
+    stats = repo.get_stats(user.id, today)
+    assert stats.todo == 2
+    assert stats.overdue == 1
+    assert stats.due_this_week == 1
+
+
+def test_create_stops_at_the_end_of_the_id_range(db, bcrypt, test_admin):
+    """Test that a full ID range is reported instead of spilling into the next range."""
+    user_repo = SQLUserRepository(bcrypt=bcrypt)
+    user = user_repo.find_by_username(test_admin["username"])
+    assert user is not None
+    repo = SQLTaskRepository(id_range=(1000, 1002))
+    today = str(date.today())
+
+    ids = [
+        repo.create(f"Task {i}", "", today, "To Do", user.id).unwrap().id
+        for i in range(2)
+    ]
+    assert ids == [1001, 1002]
+    result = repo.create("Overflow", "", today, "To Do", user.id)
+    assert isinstance(result.unwrap_err(), TaskIdRangeExhaustedError)
+    assert repo.get_by_id(1003) is None
+
+
+def test_search_filters_and_sorting(db, bcrypt, test_admin, task_repo):
+    """Status, open-only and due date range filters combine with sorting."""
+    user_repo = SQLUserRepository(bcrypt=bcrypt)
+    user = user_repo.find_by_username(test_admin["username"])
+    assert user is not None
+    repo = task_repo
+
+    a = repo.create("a", "", "2025-03-10", "To Do", user.id).unwrap()
+    b = repo.create("b", "", "2025-03-01", "Completed", user.id).unwrap()
+    c = repo.create("c", "", "2025-03-05", "In Progress", user.id).unwrap()
+    d = repo.create("d", "", "2025-04-01", "To Do", user.id).unwrap()
+
+    def ids(**kwargs):
+        return [t.id for t in repo.search(user.id, **kwargs)]
+
+    assert ids(sort="due_date") == [b.id, c.id, a.id, d.id]
+    assert ids(sort="title") == [a.id, b.id, c.id, d.id]
+    assert ids(status="To Do") == [a.id, d.id]
+    assert ids(open_only=True, sort="due_date") == [c.id, a.id, d.id]
+    assert ids(
+        due_from=date(2025, 3, 2), due_to=date(2025, 3, 31), sort="due_date"
+    ) == [c.id, a.id]
+    assert ids(due_from=date(2025, 3, 6)) == [a.id, d.id]
+    assert ids(due_to=date(2025, 3, 5), open_only=True) == [c.id]
+    assert [
+        t.id
+        for t in repo.search_summaries(
+            user.id, open_only=True, due_to=date(2025, 3, 31), sort="due_date"
+        )
+    ] == [c.id, a.id]
+
+
+def test_open_due_range_uses_partial_index(db):
+    """Upcoming/overdue queries are answered from the open tasks partial index."""
+    plan = db.execute(
+        """
+        EXPLAIN QUERY PLAN
+        SELECT id FROM tasks
+        WHERE user_id = 1 AND status != 'Completed' AND due_day <= 739252
+        ORDER BY due_day
+        """
+    ).fetchall()
+    assert "idx_tasks_open_user_due_day" in " ".join(row[3] for row in plan)
+
+
+# In-Memory Task Repository index tests
+
+
+def test_in_memory_indexes_follow_updates_and_deletes():
+    """Status and due date indexes stay consistent across update and delete."""
+    repo = InMemoryTaskRepository()
+    t1 = repo.create("A", "", "2025-01-10", "To Do", 1).unwrap()
+    t2 = repo.create("B", "", "2025-01-05", "To Do", 1).unwrap()
+    t3 = repo.create("C", "", "2025-02-01", "Completed", 2).unwrap()
+
+    assert [t.id for t in repo.list_by_status("To Do")] == [t1.id, t2.id]
+    assert [
+        t.id for t in repo.list_due_between("2025-01-01", "2025-01-31")
+    ] == [
+        t2.id,
+        t1.id,
+    ]
+
+    repo.update(t1.id, "A", "", "2025-03-01", "Completed", 1).unwrap()
+    assert [t.id for t in repo.list_by_status("To Do")] == [t2.id]
+    assert [t.id for t in repo.list_by_status("Completed")] == [t1.id, t3.id]
+    assert [
+        t.id for t in repo.list_due_between("2025-01-01", "2025-01-31")
+    ] == [t2.id]
+
+    assert repo.delete(t2.id) is None
+    assert repo.list_by_status("To Do") == []
+    assert [t.id for t in repo.list_by_user(1)] == [t1.id]
+    assert isinstance(repo.delete(t2.id), TaskNotFoundError)
+
+
+def test_in_memory_returns_detached_copies():
+    """Mutating a returned task must not corrupt the stored task or its indexes."""
+    repo = InMemoryTaskRepository()
+    t = repo.create("A", "", "2025-01-10", "To Do", 1).unwrap()
+    t.status = "Completed"
+    assert repo.get_by_id(t.id).status == "To Do"
+    assert [x.id for x in repo.list_by_status("To Do")] == [t.id]
+
+
+def test_in_memory_due_range_uses_the_users_index():
+    """A due date range search only reads the searching user's index entries."""
+    repo = InMemoryTaskRepository()
+    mine = repo.create("A", "", "2025-01-10", "To Do", 1).unwrap()
+    for day in range(1, 29):
+        repo.create("B", "", f"2025-01-{day:02}", "To Do", 2).unwrap()
+
+    assert [
+        t.id
+        for t in repo.search(
+            1, due_from=date(2025, 1, 1), due_to=date(2025, 1, 31)
+        )
+    ] == [mine.id]
+    assert repo._by_due[1] == [("2025-01-10", mine.id)]
+    assert len(repo.list_due_between("2025-01-10", "2025-01-10")) == 2
+
+    repo.delete(mine.id)
+    assert 1 not in repo._by_due
+
+
 # Domain-level validation tests for Task.create
 def test_task_create_empty_title():
     """Task.create should fail when title is empty."""
@@ -257,3 +546,72 @@ def test_task_create_valid():
     assert task.title == "Title"
     assert task.status == "In Progress"
     assert task.user_id == 1
+
+
+def test_change_feed_collapses_and_compacts(db, bcrypt, test_admin, task_repo):
+    """Test that the change feed returns the latest change per task and resets after compaction."""
+    user_repo = SQLUserRepository(bcrypt=bcrypt)
+    user = user_repo.find_by_username(test_admin["username"])
+    due = str(date.today())
+
+    kept = task_repo.create("Kept", "", due, "To Do", user.id).unwrap()
+    gone = task_repo.create("Gone", "", due, "To Do", user.id).unwrap()
+    _, head = task_repo.change_feed_bounds()
+
+    task_repo.update(kept.id, "Kept 2", "", due, "Completed", user.id)
+    task_repo.update(kept.id, "Kept 3", "", due, "Completed", user.id)
+    task_repo.delete(gone.id)
+
+    changes = task_repo.changes_since(user.id, head)
+    assert [(c.task_id, c.op) for c in changes] == [
+        (kept.id, "upsert"),
+        (gone.id, "delete"),
+    ]
+    assert changes[0].task.title == "Kept 3"
+    assert changes[1].task is None
+    assert changes[0].seq < changes[1].seq
+    assert task_repo.changes_since(user.id, changes[-1].seq) == []
+    assert len(task_repo.changes_since(user.id, 0, limit=1)) == 1
+
+    _, latest = task_repo.change_feed_bounds()
+    assert task_repo.compact_changes(latest) >= 1
+    assert task_repo.change_feed_bounds() == (latest, latest)
+    # live tasks survive compaction so a reset client can rebuild from 0
+    full = task_repo.changes_since(user.id, 0)
+    assert [(c.task_id, c.op) for c in full] == [(kept.id, "upsert")]
+
+
+def test_changes_since_timestamp(db, bcrypt, test_admin, task_repo):
+    """Test that tasks and tombstones are selected by their change time and compaction is recorded."""
+    user_repo = SQLUserRepository(bcrypt=bcrypt)
+    user = user_repo.find_by_username(test_admin["username"])
+    due = str(date.today())
+
+    old = task_repo.create("Old", "", due, "To Do", user.id).unwrap()
+    edited = task_repo.create("Edited", "", due, "To Do", user.id).unwrap()
+    gone = task_repo.create("Gone", "", due, "To Do", user.id).unwrap()
+    assert old.created_at == old.updated_at
+    time.sleep(0.005)
+    since = now_timestamp()
+    time.sleep(0.005)
+
+    updated = task_repo.update(
+        edited.id, "Edited 2", "", due, "Completed", user.id
+    ).unwrap()
+    assert updated.created_at == edited.created_at
+    assert updated.updated_at > since
+    new = task_repo.create("New", "", due, "To Do", user.id).unwrap()
+    task_repo.delete(gone.id)
+
+    changed = list(task_repo.iter_changed_since(user.id, since))
+    assert [task.id for task in changed] == [edited.id, new.id]
+    deleted = task_repo.deleted_since(user.id, since)
+    assert [task_id for task_id, _ in deleted] == [gone.id]
+    assert deleted[0][1] >= since
+    time.sleep(0.005)
+    assert task_repo.deleted_since(user.id, now_timestamp()) == []
+
+    assert task_repo.compacted_at() is None
+    task_repo.compact_changes(task_repo.change_feed_bounds()[1])
+    assert task_repo.compacted_at() == deleted[0][1]
+    assert task_repo.deleted_since(user.id, since) == []
@@ -0,0 +1,164 @@
+from datetime import date
+
+
+def login(client, test_admin):
+    return client.post(
+        "/login",
+        data={
+            "username": test_admin["username"],
+            "password": test_admin["password"],
+        },
+    )
+
+
+def test_stats_endpoint(client, test_admin):
+    """Test that /task/stats returns the current user's task counts."""
+    login(client, test_admin)
+    client.post(
+        "/task",
+        data={
+            "title": "Stat",
+            "description": "",
+            "due_date": str(date.today()),
+            "status": "In Progress",
+        },
+    )
+
+    data = client.get("/task/stats").get_json()
+    assert data["ok"] is True
+    assert data["data"]["in_progress"] == 1
+    assert data["data"]["total"] == 1
+    assert data["data"]["overdue"] == 0
+    assert data["data"]["due_this_week"] == 1
+
+
+def test_calendar_buckets_and_invalidates(client, app, test_admin):
+    """Test that /task/calendar groups tasks by day and drops the cache on writes."""
+    login(client, test_admin)
+    for title, due in (("A", "2030-05-02"), ("B", "2030-05-02")):
+        client.post(
+            "/task",
+            data={
+                "title": title,
+                "description": "",
+                "due_date": due,
+                "status": "To Do",
+            },
+        )
+
+    data = client.get("/task/calendar?month=2030-05").get_json()["data"]
+    assert data["month"] == "2030-05"
+    assert [t["title"] for t in data["days"]["2030-05-02"]] == ["A", "B"]
+    assert (
+        client.get("/task/calendar?month=2030-05").get_json()["data"] == data
+    )
+
+    client.post(
+        "/task",
+        data={
+            "title": "C",
+            "description": "",
+            "due_date": "2030-05-31",
+            "status": "To Do",
+        },
+    )
+    days = client.get("/task/calendar?month=2030-05").get_json()["data"][
+        "days"
+    ]
+    assert [t["title"] for t in days["2030-05-31"]] == ["C"]
+    assert client.get("/task/calendar?month=2030-06").get_json()["data"] == {
+        "month": "2030-06",
+        "days": {},
+    }
+
+
+def test_calendar_rejects_invalid_month(client, test_admin):
+    """Test that /task/calendar answers 400 for a malformed month."""
+    login(client, test_admin)
+    data = client.get("/task/calendar?month=2030-13").get_json()
+    assert data["ok"] is False
+    assert data["status"] == 400
+
+
+def test_changes_endpoint_pages_and_resets(client, app, test_admin):
+    """Test that /task/changes returns deltas after a cursor and asks for a reset after compaction."""
+    login(client, test_admin)
+    for i in range(3):
+        client.post(
+            "/task",
+            data={
+                "title": f"Sync {i}",
+                "description": "",
+                "due_date": str(date.today()),
+                "status": "To Do",
+            },
+        )
+
+    first = client.get("/task/changes?since=0&limit=2").get_json()["data"]
+    assert first["has_more"] is True
+    assert [c["task"]["title"] for c in first["changes"]] == [
+        "Sync 0",
+        "Sync 1",
+    ]
+    rest = client.get(f"/task/changes?since={first['cursor']}").get_json()
+    assert rest["data"]["has_more"] is False
+    assert [c["task"]["title"] for c in rest["data"]["changes"]] == ["Sync 2"]
+    cursor = rest["data"]["cursor"]
+    assert (
+        client.get(f"/task/changes?since={cursor}").get_json()["data"][
+            "changes"
+        ]
+        == []
+    )
+
+    task_id = first["changes"][0]["task_id"]
+    client.delete(f"/task/{task_id}")
+    delta = client.get(f"/task/changes?since={cursor}").get_json()["data"]
+    assert delta["changes"] == [
+        {
+            "seq": delta["cursor"],
+            "op": "delete",
+            "task_id": task_id,
+            "task": None,
+        }
+    ]
+
+    app.extensions["task_repo"].compact_changes(delta["cursor"])
+    reset = client.get(f"/task/changes?since={cursor}").get_json()["data"]
+    assert reset["reset"] is True
+    assert len(reset["changes"]) == 2
+
+    bad = client.get("/task/changes?since=-1").get_json()
+    assert bad["ok"] is False
+    assert bad["status"] == 400
+
+
+def test_events_stream_pushes_task_writes(client, app, test_admin):
+    """Test that /task/events notifies an open stream about writes of the user."""
+    login(client, test_admin)
+    resp = client.get("/task/events", buffered=False)
+    assert resp.mimetype == "text/event-stream"
+    frames = iter(resp.response)
+    assert next(frames) == b": connected\n\n"
+
+    created = client.post(
+        "/task",
+        data={
+            "title": "Live",
+            "description": "",
+            "due_date": str(date.today()),
+            "status": "To Do",
+        },
+    ).get_json()
+    task_id = created["data"]["task_id"]
+    assert (
+        next(frames)
+        == (
+            f'event: task\ndata: {{"task_id":{task_id},"op":"upsert"}}\n\n'
+        ).encode()
+    )
+
+    broker = app.extensions["event_broker"]
+    assert broker.subscriber_count(1) == 1
+    resp.close()
+    assert broker.subscriber_count(1) == 0
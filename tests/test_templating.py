@@ -0,0 +1,108 @@
+from src.config import TestConfig
+from src.web.app import create_app, warm_up
+from src.web.templating import FragmentCache
+
+
+def test_fragment_cache_evicts_least_recently_used():
+    """Test that FragmentCache renders once per key and evicts the oldest entry."""
+    cache = FragmentCache(max_entries=2)
+    renders = []
+
+    def render(text):
+        renders.append(text)
+        return f"<p>{text}</p>"
+
+    assert cache.get_or_render((1, 1), lambda: render("a")) == "<p>a</p>"
+    cache.get_or_render((1, 1), lambda: render("a"))
+    cache.get_or_render((2, 1), lambda: render("b"))
+    cache.get_or_render((1, 1), lambda: render("a"))
+    cache.get_or_render((3, 1), lambda: render("c"))
+    assert renders == ["a", "b", "c"]
+    assert len(cache) == 2
+
+    cache.get_or_render((2, 1), lambda: render("b"))
+    assert renders == ["a", "b", "c", "b"]
+
+
+def test_dashboard_reuses_cards_until_the_task_changes(
+    client, app, test_admin
+):
+    """Test that dashboard cards are cached by their rendered fields and re-rendered after an update."""
+    client.post(
+        "/login",
+        data={
+            "username": test_admin["username"],
+            "password": test_admin["password"],
+        },
+    )
+    data = {
+        "title": "Cached",
+        "description": "<b>escaped</b>",
+        "due_date": "2030-01-01",
+        "status": "To Do",
+    }
+    task_id = client.post("/task", data=data).get_json()["data"]["task_id"]
+
+    fragment_cache = app.extensions["fragment_cache"]
+    page = client.get("/dashboard").get_data(as_text=True)
+    assert "&lt;b&gt;escaped&lt;/b&gt;" in page
+    assert len(fragment_cache) == 1
+    client.get("/dashboard")
+    assert len(fragment_cache) == 1
+
+    client.put(f"/task/{task_id}", data={**data, "title": "Renamed"})
+    page = client.get("/dashboard").get_data(as_text=True)
+    assert "Renamed" in page
+    assert len(fragment_cache) == 2
+
+
+def test_cached_cards_are_not_shared_across_users_of_a_reused_id(
+    client, app, test_admin
+):
+    """Test that a task reusing a deleted task's ID never shows the deleted task's cached card."""
+    client.post(
+        "/login",
+        data={
+            "username": test_admin["username"],
+            "password": test_admin["password"],
+        },
+    )
+    data = {
+        "title": "ALICE SECRET",
+        "description": "",
+        "due_date": "2030-01-01",
+        "status": "To Do",
+    }
+    task_id = client.post("/task", data=data).get_json()["data"]["task_id"]
+    assert "ALICE SECRET" in client.get("/dashboard").get_data(as_text=True)
+    client.delete(f"/task/{task_id}")
+    assert not app.extensions["fragment_cache"].discard(
+        lambda key: key[0] == task_id
+    )
+
+    app.extensions["user_repo"].register(
+        "bob", "bob@example.com", "password123"
+    )
+    other = app.test_client()
+    other.post("/login", data={"username": "bob", "password": "password123"})
+    reused = other.post("/task", data={**data, "title": "Bob's task"})
+    assert reused.get_json()["data"]["task_id"] == task_id
+    page = other.get("/dashboard").get_data(as_text=True)
+    assert "Bob&#39;s task" in page
+    assert "ALICE SECRET" not in page
+
+
+def test_precompile_writes_bytecode_cache(tmp_path):
+    """Test that the warm-up precompiles templates into the bytecode cache directory."""
+    config = type(
+        "CachedConfig",
+        (TestConfig,),
+        {
+            "JINJA_BYTECODE_CACHE_DIR": str(tmp_path),
+            "PRECOMPILE_TEMPLATES": True,
+        },
+    )
+    app = create_app(config)
+    assert not any(tmp_path.iterdir())
+    warm_up(app)
+    assert any(tmp_path.iterdir())
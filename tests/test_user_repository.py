@@ -3,6 +3,7 @@ from src.core.errors import (
     InvalidEmail,
     InvalidUsername,
     UsernameTaken,
+    UserNotFoundError,
 )
 from src.core.user import User
 from src.infra.repositories.in_memory_user import InMemoryUserRepository
@@ -110,6 +111,35 @@ def test_load_for_auth_sql(db, bcrypt):
     assert repo.verify_password(fetched, "hunter22")
 
 
+def test_sql_rows_map_to_slotted_users(db, bcrypt, test_admin):
+    """Test that SQL rows map to slotted users with the expected fields."""
+    repo = SQLUserRepository(bcrypt=bcrypt)
+
+    admin = repo.load_for_auth(test_admin["username"])
+    assert admin is not None
+    assert not hasattr(admin, "__dict__")
+    assert admin.email == test_admin["email"]
+    assert admin.pw_hash is not None
+    assert admin.is_admin is True
+
+    fetched = repo.get_by_id(admin.id)
+    assert fetched is not None
+    assert fetched.username == test_admin["username"]
+    assert fetched.pw_hash is None
+    assert fetched.is_admin is True
+
+
+def test_iter_all_sql(db, bcrypt):
+    """Test that iter_all streams the same users as list_all with SQL repository."""
+    repo = SQLUserRepository(bcrypt=bcrypt)
+    repo.register("bob", "bob@example.com", "hunter22")
+    repo.register("alice", "alice@example.com", "hunter22")
+
+    iterated = [u.username for u in repo.iter_all(batch_size=1)]
+    assert iterated == [u.username for u in repo.list_all()]
+    assert "bob" in iterated and "alice" in iterated
+
+
 def test_first_user_is_admin_sql(db, bcrypt):
     """Test that the first registered user becomes admin with SQL repository."""
     repo = SQLUserRepository(bcrypt=bcrypt)
@@ -220,6 +250,65 @@ def test_load_for_auth_in_memory(db, bcrypt):
     assert repo.verify_password(fetched, "hunter2")
 
 
+def test_iter_all_in_memory(db, bcrypt):
+    """Test that iter_all yields every registered user with in-memory repository."""
+    repo = InMemoryUserRepository(bcrypt=bcrypt)
+    repo.register("bob", "bob@example.com", "hunter2")
+    repo.register("alice", "alice@example.com", "hunter2")
+
+    assert [u.username for u in repo.iter_all()] == ["bob", "alice"]
+
+
+def test_in_memory_indexes_follow_delete(db, bcrypt):
+    """Test that id, username and email lookups stay consistent after delete in in-memory repository."""
+    repo = InMemoryUserRepository(bcrypt=bcrypt)
+    bob = repo.register("bob", "bob@example.com", "hunter2").unwrap()
+    alice = repo.register("alice", "alice@example.com", "hunter2").unwrap()
+
+    assert repo.get_by_id(bob.id) is bob
+    assert repo.load_for_auth("bob@example.com") is bob
+
+    assert repo.delete("bob@example.com") is None
+    assert repo.get_by_id(bob.id) is None
+    assert repo.find_by_username("bob") is None
+    assert repo.find_by_username_or_email("bob@example.com") is None
+    assert isinstance(repo.delete("bob"), UserNotFoundError)
+
+    assert repo.get_by_id(alice.id) is alice
+    # the freed username and email can be registered again
+    assert repo.register("bob", "bob@example.com", "hunter2").is_ok
+
+
+def test_register_in_memory_concurrent_same_username(db, bcrypt):
+    """Test that concurrent registrations of one username yield exactly one user in in-memory repository."""
+    from concurrent.futures import ThreadPoolExecutor
+
+    repo = InMemoryUserRepository(bcrypt=bcrypt)
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        results = list(
+            pool.map(
+                lambda i: repo.register("bob", f"bob{i}@example.com", "pw"),
+                range(4),
+            )
+        )
+
+    assert sum(r.is_ok for r in results) == 1
+    assert len(repo.list_all()) == 1
+    winner = repo.find_by_username("bob")
+    assert winner is not None
+    assert repo.find_by_username_or_email(winner.email) is not None
+
+
+def test_register_in_memory_duplicate_email(db, bcrypt):
+    """Test user registration fails when email is already taken in in-memory repository."""
+    repo = InMemoryUserRepository(bcrypt=bcrypt)
+    assert repo.register("bob", "bob@example.com", "hunter2").is_ok
+
+    result = repo.register("alice", "bob@example.com", "hunter2")
+    assert result.is_err
+    assert isinstance(result.unwrap_err(), EmailTaken)
+
+
 def test_first_user_is_admin_in_memory(db, bcrypt):
     """Test that the first registered user becomes admin with in-memory repository."""
     repo = InMemoryUserRepository(bcrypt=bcrypt)
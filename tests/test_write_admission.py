@@ -0,0 +1,177 @@
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date
+
+import sqlite3
+import threading
+import time
+
+import pytest
+
+from src.core.errors import DatabaseBusyError, WritesOverloadedError
+from src.infra.db import (
+    AdmissionController,
+    WriteMetrics,
+    retry_busy,
+    run_write,
+)
+
+
+def login(client, test_admin):
+    return client.post(
+        "/login",
+        data={
+            "username": test_admin["username"],
+            "password": test_admin["password"],
+        },
+    )
+
+
+@pytest.fixture
+def database(tmp_path):
+    path = str(tmp_path / "busy.db")
+    conn = sqlite3.connect(path)
+    conn.execute("PRAGMA journal_mode = WAL")
+    conn.execute("CREATE TABLE items (name TEXT)")
+    conn.close()
+    return path
+
+
+def test_retry_busy_waits_for_the_lock(database):
+    """Test that taking a held write lock is retried until released, or gives up at the deadline."""
+    holder = sqlite3.connect(
+        database, isolation_level=None, check_same_thread=False
+    )
+    holder.execute("BEGIN IMMEDIATE")
+    writer = sqlite3.connect(database, isolation_level=None, timeout=0.01)
+    metrics = WriteMetrics()
+
+    with pytest.raises(DatabaseBusyError) as error:
+        retry_busy(
+            lambda: writer.execute("BEGIN IMMEDIATE"),
+            0.05,
+            metrics,
+            retry_after=3,
+        )
+    assert error.value.retry_after == 3
+    assert metrics.snapshot()["busy_timeouts"] == 1
+
+    threading.Timer(0.05, lambda: holder.execute("COMMIT")).start()
+    retry_busy(lambda: writer.execute("BEGIN IMMEDIATE"), 2.0, metrics)
+    writer.execute("COMMIT")
+    snapshot = metrics.snapshot()
+    assert snapshot["busy_retries"] > 0
+    assert snapshot["lock_waits"] == 1
+    assert snapshot["lock_wait_max_seconds"] >= 0.04
+
+
+def test_admission_controller_rejects_when_full():
+    """Test that writers beyond the cap are rejected once they waited too long for a slot."""
+    admission = AdmissionController(2, 0.01, retry_after=2)
+    with admission.admit(), admission.admit():
+        assert admission.metrics.snapshot()["in_flight"] == 2
+        with pytest.raises(WritesOverloadedError) as error:
+            with admission.admit():
+                pass
+        assert error.value.retry_after == 2
+    with admission.admit():
+        pass
+    snapshot = admission.metrics.snapshot()
+    assert (snapshot["admitted"], snapshot["rejected"]) == (3, 1)
+    assert snapshot["in_flight"] == 0
+
+
+def test_overloaded_writes_get_503(client, app, test_admin, monkeypatch):
+    """Test that rejected writes answer 503 with Retry-After and show up in the metrics."""
+    login(client, test_admin)
+    admission = app.extensions["write_admission"]
+    monkeypatch.setattr(admission, "max_wait", 0.01)
+    data = {
+        "title": "Rejected",
+        "description": "",
+        "due_date": str(date.today()),
+        "status": "To Do",
+    }
+
+    # hold every slot, like writers stuck behind a lock
+    for _ in range(admission.max_writers):
+        admission._slots.acquire()
+    try:
+        resp = client.post("/task", data=data)
+    finally:
+        for _ in range(admission.max_writers):
+            admission._slots.release()
+    assert resp.status_code == 503
+    assert resp.headers["Retry-After"] == str(admission.retry_after)
+    assert resp.get_json()["status"] == 503
+    assert client.post("/task", data=data).status_code != 503
+
+    metrics = client.get("/metrics/writes").get_json()
+    assert metrics["status"] == 200
+    assert metrics["data"]["rejected"] == 1
+    assert metrics["data"]["admitted"] >= 1
+
+
+def test_concurrent_writers_are_capped(tmp_path):
+    """Test that concurrent task writes succeed through a small writer cap on a file database."""
+    from src.config import TestConfig
+    from src.infra.db import init_db
+    from src.web.app import create_app
+
+    class FileConfig(TestConfig):
+        DATABASE = str(tmp_path / "app.db")
+        WRITE_COORDINATOR = False
+        WRITE_MAX_CONCURRENCY = 2
+        WRITE_ADMISSION_TIMEOUT = 5.0
+
+    app = create_app(FileConfig)
+    with app.app_context():
+        init_db()
+        conn = app.extensions["task_repo"]._get_connection()
+        conn.execute(
+            "INSERT INTO users (username, email, pw_hash) VALUES ('u', 'u@u.u', 'x')"
+        )
+        conn.commit()
+
+    def create_tasks(worker):
+        with app.app_context():
+            for i in range(5):
+                app.extensions["task_repo"].create(
+                    f"Task {worker}-{i}", "", str(date.today()), "To Do", 1
+                ).unwrap()
+                time.sleep(0.001)
+
+    with ThreadPoolExecutor(6) as pool:
+        list(pool.map(create_tasks, range(6)))
+
+    with app.app_context():
+        assert len(app.extensions["task_repo"].list_by_user(1)) == 30
+    snapshot = app.extensions["write_metrics"].snapshot()
+    assert snapshot["admitted"] == 30
+    assert snapshot["rejected"] == 0
+
+
+def test_inline_writes_give_up_at_the_deadline(tmp_path, database):
+    """Test that SQLite's own wait for a held lock is cut short at `WRITE_BUSY_DEADLINE`."""
+    from src.config import TestConfig
+    from src.web.app import create_app
+
+    class FileConfig(TestConfig):
+        DATABASE = str(tmp_path / "app.db")
+        WRITE_COORDINATOR = False
+        WRITE_BUSY_DEADLINE = 0.2
+
+    holder = sqlite3.connect(database, isolation_level=None)
+    holder.execute("BEGIN IMMEDIATE")
+    app = create_app(FileConfig)
+    with app.app_context():
+        started = time.monotonic()
+        with pytest.raises(DatabaseBusyError):
+            run_write(
+                lambda conn: conn.execute("INSERT INTO items VALUES ('x')"),
+                database,
+            )
+        # far below the 5 s busy_timeout of the connection
+        assert time.monotonic() - started < 1.5
+        metrics = app.extensions["write_metrics"].snapshot()
+        assert metrics["busy_timeouts"] == 1
+    holder.execute("ROLLBACK")
@@ -0,0 +1,87 @@
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date
+
+import sqlite3
+
+import pytest
+
+from src.config import TestConfig
+from src.infra.db import WriteCoordinator
+
+
+@pytest.fixture
+def database(tmp_path):
+    path = str(tmp_path / "writes.db")
+    conn = sqlite3.connect(path)
+    conn.execute("PRAGMA journal_mode = WAL")
+    conn.execute("CREATE TABLE items (name TEXT NOT NULL UNIQUE)")
+    conn.close()
+    return path
+
+
+def insert(name):
+    return lambda conn: conn.execute(
+        "INSERT INTO items (name) VALUES (?)", (name,)
+    ).lastrowid
+
+
+def test_failed_write_is_rolled_back_alone(database):
+    """Test that writes of one batch succeed or fail independently and results reach their callers."""
+    # a long delay so the concurrent writes end up in one batch
+    coordinator = WriteCoordinator(database, max_batch=3, max_delay=1.0)
+    with ThreadPoolExecutor(3) as pool:
+        futures = [
+            pool.submit(coordinator.execute, insert(name))
+            for name in ("a", "b", "a")
+        ]
+    coordinator.close()
+
+    outcomes = [future.exception() or future.result() for future in futures]
+    assert sum(isinstance(o, sqlite3.IntegrityError) for o in outcomes) == 1
+    assert sorted(o for o in outcomes if isinstance(o, int)) == [1, 2]
+    assert coordinator.commits == 1
+    assert coordinator.writes == 3
+
+    conn = sqlite3.connect(database)
+    names = [row[0] for row in conn.execute("SELECT name FROM items")]
+    assert sorted(names) == ["a", "b"]
+
+
+def test_concurrent_task_writes_are_group_committed(tmp_path):
+    """Test that writes of concurrent requests are all committed, sharing commits."""
+    from src.infra.db import get_write_coordinator, init_db
+    from src.web.app import create_app
+
+    class FileConfig(TestConfig):
+        DATABASE = str(tmp_path / "app.db")
+        WRITE_BATCH_DELAY = 0.01
+
+    app = create_app(FileConfig)
+    with app.app_context():
+        init_db()
+        conn = app.extensions["task_repo"]._get_connection()
+        conn.execute(
+            "INSERT INTO users (username, email, pw_hash) VALUES ('u', 'u@u.u', 'x')"
+        )
+        conn.commit()
+
+    def create_tasks(worker):
+        with app.app_context():
+            task_repo = app.extensions["task_repo"]
+            for i in range(10):
+                task = task_repo.create(
+                    f"Task {worker}-{i}", "", str(date.today()), "To Do", 1
+                ).unwrap()
+                # the write is visible to the request's own connection
+                assert task_repo.get_by_id(task.id).title == task.title
+
+    with ThreadPoolExecutor(8) as pool:
+        list(pool.map(create_tasks, range(8)))
+
+    with app.app_context():
+        assert len(app.extensions["task_repo"].list_by_user(1)) == 80
+        assert app.extensions["task_repo"].delete(999) is not None
+        coordinator = get_write_coordinator()
+    assert coordinator.writes == 81
+    assert coordinator.commits < coordinator.writes
+    coordinator.close()